@@ -7,6 +7,8 @@ import time
 from pathlib import Path
 from typing import Dict
 
+import pytest
+
 # 确保项目根目录在Python路径中
 project_root = Path(__file__).parent
 if str(project_root) not in sys.path:
@@ -14,6 +16,38 @@ if str(project_root) not in sys.path:
 
 # 导入核心fixtures
 from core.fixtures import *
+from core.fixture.browser import start_browser_servers, stop_browser_servers
+from core.fixture.duration_history import collect_duration_report, save_duration_history
+from core.fixture.page_metrics import collect_page_metrics_report, page_metrics_summary_lines
+from core.fixture.service_monitor import collect_service_state_report, service_outage_summary_lines
+from core.fixture.tracing import collect_trace_report, trace_summary_lines
+from core.page_timing import RUN_ID_KEY, get_run_id, nav_timing_summary_lines, new_run_id, set_run_id
+from utils.artifact_retention import PROCESS_STARTED_AT, RetentionManager, format_results, retention_enabled
+from utils.context_routes import log_asset_cache_stats
+from utils.screenshot_writer import flush_screenshot_writer
+
+
+# ═══════════════════════════════════════════════════════════════
+# Pytest: 进程级启动/收尾（共享浏览器、后台截图写入、asset cache 统计）
+# ═══════════════════════════════════════════════════════════════
+
+
+def pytest_configure(config):
+    # 本次运行 id（导航耗时 JSONL 按它分文件）：controller 生成，worker 取 workerinput 里的同一个
+    workerinput = getattr(config, "workerinput", None) or {}
+    set_run_id(workerinput.get(RUN_ID_KEY) or new_run_id())
+    # 共享浏览器（BROWSER_SERVERS=N）：只在 controller 启动，worker 通过环境变量继承 endpoint
+    start_browser_servers(config)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """xdist controller 侧：把 run id 显式传给每个 worker。"""
+    node.workerinput[RUN_ID_KEY] = get_run_id()
+
+
+def pytest_unconfigure(config):
+    stop_browser_servers()
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -26,6 +60,8 @@ from core.fixtures import *
 # ═══════════════════════════════════════════════════════════════
 
 _FILE_DURATIONS_SEC: Dict[str, float] = {}
+# 每个用例 setup + call + teardown 总耗时（tracing 开销汇总与 TRACE_MODE=off 基线共用）
+_TEST_DURATIONS_SEC: Dict[str, float] = {}
 
 
 def _nodeid_to_file_key(nodeid: str) -> str:
@@ -35,6 +71,15 @@ def _nodeid_to_file_key(nodeid: str) -> str:
 
 
 def pytest_runtest_logreport(report):
+    # tracing 开销统计需要 setup/call/teardown 全阶段耗时
+    _TEST_DURATIONS_SEC[report.nodeid] = _TEST_DURATIONS_SEC.get(report.nodeid, 0.0) + float(
+        getattr(report, "duration", 0.0) or 0.0
+    )
+    collect_trace_report(report)
+    collect_page_metrics_report(report)
+    collect_service_state_report(report)
+    collect_duration_report(report)
+
     # 只在 call 阶段累加（setup/teardown 也可算，但通常用户关心 test body）
     if report.when != "call":
         return
@@ -45,7 +90,63 @@ def pytest_runtest_logreport(report):
     )
 
 
+_RETENTION_LINES: list = []
+_HISTORY_LINES: list = []
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # 每个进程（含 xdist worker）各自的后台写入与统计
+    flush_screenshot_writer()
+    log_asset_cache_stats()
+    if hasattr(session.config, "workerinput"):
+        return
+    # 用例耗时历史（utils/duration_history.py）：controller 一次性写库
+    _HISTORY_LINES[:] = save_duration_history(int(exitstatus))
+
+    # 产物保留策略（RETENTION=1）：只在 controller 执行一次；本次运行的产物不会被动到
+    if not retention_enabled():
+        return
+    try:
+        _RETENTION_LINES[:] = format_results(RetentionManager().run(protect_since=PROCESS_STARTED_AT))
+    except Exception as e:
+        _RETENTION_LINES[:] = [f"retention failed (ignored): {type(e).__name__}: {e}"]
+
+
 def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    trace_lines = trace_summary_lines(_TEST_DURATIONS_SEC)
+    if trace_lines:
+        terminalreporter.section("Playwright tracing overhead")
+        for line in trace_lines:
+            terminalreporter.write_line(line)
+
+    nav_lines = nav_timing_summary_lines()
+    if nav_lines:
+        terminalreporter.section("Navigation timing per page class")
+        for line in nav_lines:
+            terminalreporter.write_line(line)
+
+    metrics_lines = page_metrics_summary_lines()
+    if metrics_lines:
+        terminalreporter.section("Page resource growth (CDP metrics)")
+        for line in metrics_lines:
+            terminalreporter.write_line(line)
+
+    outage_lines = service_outage_summary_lines()
+    if outage_lines:
+        terminalreporter.section("Service outages (background monitor)")
+        for line in outage_lines:
+            terminalreporter.write_line(line)
+
+    if _HISTORY_LINES:
+        terminalreporter.section("Duration history")
+        for line in _HISTORY_LINES:
+            terminalreporter.write_line(line)
+
+    if _RETENTION_LINES:
+        terminalreporter.section("Artifact retention")
+        for line in _RETENTION_LINES:
+            terminalreporter.write_line(line)
+
     if not _FILE_DURATIONS_SEC:
         return
 
@@ -0,0 +1,294 @@
+# ═══════════════════════════════════════════════════════════════
+# Playwright Test Scaffold - Async Base Page (Core)
+# ═══════════════════════════════════════════════════════════════
+"""
+AsyncBasePage - 页面对象基类的 asyncio 版本（playwright.async_api）
+
+背景：
+- BasePage 家族基于 sync_api，一个 worker 线程同一时刻只能驱动一个页面
+- 多用户场景 / 压测 / 并发取证需要在一个进程内同时驱动多个 context
+
+说明：
+- API 与 BasePage 一致（方法名/参数/环境变量开关相同），所有与浏览器交互的方法都需 await
+- 下一用例预取（PREFETCH_NEXT，core/fixture/prefetch.py）只作用于 sync 的 auth_page/unauth_page，
+  AsyncBasePage.goto 不领取预取导航（async 页面不经过这些 fixture）
+- 导航计时（core/page_timing.py，NAV_TIMING）与自适应就绪等待（core/page_readiness.py）与 BasePage 共用同一套历史
+- 生成的 Page Object 可用 PageObjectGenerator.generate_page_object(info, async_api=True) 产出 async 版本
+
+使用方式:
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        pages = [await (await browser.new_context()).new_page() for _ in range(5)]
+        await asyncio.gather(*(LoginPage(pg).navigate() for pg in pages))
+"""
+
+import asyncio
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+
+from core.async_page_actions import AsyncPageActions
+from core.async_page_utils import AsyncPageUtils
+from core.async_page_waits import AsyncPageWaits
+from core.page_readiness import get_readiness_policy
+from core.page_timing import NavTimer
+from utils.config import ConfigManager
+from utils.logger import get_logger
+from utils.screenshot_writer import get_screenshot_writer
+
+logger = get_logger(__name__)
+
+
+class AsyncBasePage(ABC, AsyncPageActions, AsyncPageWaits):
+    """页面对象基类（async）- 继承操作和等待能力"""
+
+    URL: str = "/"
+    page_loaded_indicator: str = "body"
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.utils = AsyncPageUtils(page)
+        self.config = ConfigManager()
+        self.base_url = self.config.get_service_url("frontend") or ""
+        self._nav_timer: Optional[NavTimer] = None
+
+    # ═══════════════════════════════════════════════════════════════
+    # ABSTRACT METHODS
+    # ═══════════════════════════════════════════════════════════════
+
+    @abstractmethod
+    async def navigate(self) -> None:
+        """导航到页面"""
+        pass
+
+    @abstractmethod
+    async def is_loaded(self) -> bool:
+        """检查页面是否加载完成"""
+        pass
+
+    # ═══════════════════════════════════════════════════════════════
+    # NAVIGATION METHODS
+    # ═══════════════════════════════════════════════════════════════
+
+    async def goto(self, path: str = "", wait_for_load: bool = True) -> None:
+        """导航到指定路径（超时重试策略与 BasePage.goto 一致）"""
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        logger.info(f"导航到: {url}")
+
+        wait_until = os.getenv("PAGE_GOTO_WAIT_UNTIL", "commit").strip() or "commit"
+        timeout_ms = int(os.getenv("PAGE_GOTO_TIMEOUT_MS", "60000"))
+        retries = int(os.getenv("PAGE_GOTO_RETRIES", "1") or "1")
+        retry_delay_ms = int(os.getenv("PAGE_GOTO_RETRY_DELAY_MS", "400") or "400")
+        retry_wait_until = os.getenv("PAGE_GOTO_RETRY_WAIT_UNTIL", "commit").strip() or "commit"
+        timer = NavTimer("goto", self.__class__.__name__, path.split("?", 1)[0])
+        readiness = get_readiness_policy()
+        if wait_until == "commit":
+            timeout_ms = readiness.goto_timeout_ms(self.__class__.__name__, timeout_ms)
+
+        for attempt in range(retries + 1):
+            try:
+                use_wait_until = retry_wait_until if (attempt > 0 and retry_wait_until) else wait_until
+                await self.page.goto(url, wait_until=use_wait_until, timeout=timeout_ms)
+                timer.mark(use_wait_until)
+                if use_wait_until == "commit" and attempt == 0:
+                    readiness.observe_commit(self.__class__.__name__, timer.phases["commit"])
+                break
+            except PlaywrightTimeoutError:
+                try:
+                    await self.take_screenshot(name=f"goto_timeout_attempt_{attempt}", full_page=True)
+                except Exception:
+                    pass
+                try:
+                    import allure
+
+                    allure.attach(
+                        f"url={url}\nwait_until={wait_until}\nretry_wait_until={retry_wait_until!r}\n"
+                        f"timeout_ms={timeout_ms}\nattempt={attempt}/{retries}\ncurrent_url={self.page.url}\n",
+                        name=f"goto_timeout_attempt_{attempt}_meta",
+                        attachment_type=allure.attachment_type.TEXT,
+                    )
+                except Exception:
+                    pass
+                if attempt >= retries:
+                    await timer.finish_async(self.page, status="timeout")
+                    raise
+                logger.warning(f"Page.goto timeout, retrying... attempt={attempt + 1}/{retries} url={url}")
+                try:
+                    await self.page.goto("about:blank", wait_until="commit", timeout=5000)
+                except Exception:
+                    pass
+                await asyncio.sleep(retry_delay_ms / 1000)
+
+        if wait_for_load:
+            self._nav_timer = timer
+            await self.wait_for_page_load()
+        else:
+            await timer.finish_async(self.page)
+
+    async def wait_for_page_load(self, timeout: int = 30000) -> None:
+        """等待页面加载完成（load_state + page_loaded_indicator；导航计时与 BasePage 一致）"""
+        logger.debug(f"等待页面加载: {self.__class__.__name__}")
+        timer = getattr(self, "_nav_timer", None) or NavTimer("wait_for_page_load", self.__class__.__name__)
+        self._nav_timer = None
+        readiness = get_readiness_policy()
+        page_class = self.__class__.__name__
+        timeout = readiness.ready_timeout_ms(page_class, timeout)
+        outcome: dict = {"skipped": readiness.skip_load_state(page_class), "load_state_timeout": None, "indicator_timeout": False}
+        started = time.perf_counter()
+        try:
+            await self._wait_for_page_load(timeout, timer, outcome)
+        except Exception:
+            await timer.finish_async(self.page, status="error")
+            readiness.observe(page_class, ready_ms=0.0, ok=False, **outcome)
+            raise
+        await timer.finish_async(self.page)
+        if not outcome.pop("login_redirect", False):
+            readiness.observe(page_class, ready_ms=(time.perf_counter() - started) * 1000.0, ok=True, **outcome)
+
+    async def _wait_for_page_load(self, timeout: int, timer: NavTimer, outcome: dict) -> None:
+        if self.is_login_page():
+            timer.mark("login_redirect")
+            outcome["login_redirect"] = True
+            return
+        load_state = os.getenv("WAIT_FOR_LOAD_STATE", "domcontentloaded").strip() or "domcontentloaded"
+        try:
+            if not outcome.get("skipped"):
+                await self.page.wait_for_load_state(load_state, timeout=timeout)
+                outcome["load_state_timeout"] = False
+                timer.mark(load_state)
+        except PlaywrightTimeoutError:
+            outcome["load_state_timeout"] = True
+            timer.mark(f"{load_state}_timeout")
+            logger.warning(f"wait_for_load_state timeout (state={load_state}), fallback to indicator={self.page_loaded_indicator!r}")
+        if self.page_loaded_indicator:
+            try:
+                await self.page.wait_for_selector(self.page_loaded_indicator, state="visible", timeout=timeout)
+            except PlaywrightTimeoutError:
+                outcome["indicator_timeout"] = True
+                raise
+            timer.mark("indicator")
+
+    def is_login_page(self) -> bool:
+        """默认判断：URL 指向登录页即视为 login page（page.url 为同步属性）。"""
+        try:
+            url = (self.page.url or "").lower()
+            return ("/auth/login" in url) or ("/account/login" in url)
+        except Exception:
+            return False
+
+    async def refresh(self) -> None:
+        """刷新页面"""
+        logger.info("刷新页面")
+        timer = NavTimer("refresh", self.__class__.__name__, (self.page.url or "").split("?", 1)[0])
+        await self.page.reload(wait_until="networkidle")
+        timer.mark("networkidle")
+        self._nav_timer = timer
+        await self.wait_for_page_load()
+
+    async def go_back(self) -> None:
+        """返回上一页"""
+        logger.info("返回上一页")
+        await self.page.go_back()
+        await self.wait_for_page_load()
+
+    async def go_forward(self) -> None:
+        """前进到下一页"""
+        logger.info("前进到下一页")
+        await self.page.go_forward()
+        await self.wait_for_page_load()
+
+    # ═══════════════════════════════════════════════════════════════
+    # QUERY METHODS
+    # ═══════════════════════════════════════════════════════════════
+
+    async def is_visible(self, selector: str, timeout: int = 5000) -> bool:
+        try:
+            return await self.page.is_visible(selector, timeout=timeout)
+        except Exception:
+            return False
+
+    async def is_enabled(self, selector: str) -> bool:
+        return await self.page.is_enabled(selector)
+
+    async def is_checked(self, selector: str) -> bool:
+        return await self.page.is_checked(selector)
+
+    async def get_text(self, selector: str, timeout: int = 10000) -> Optional[str]:
+        try:
+            return await self.page.text_content(selector, timeout=timeout)
+        except Exception:
+            return None
+
+    async def get_input_value(self, selector: str) -> str:
+        return await self.page.input_value(selector)
+
+    async def get_attribute(self, selector: str, attribute: str) -> Optional[str]:
+        return await self.page.get_attribute(selector, attribute)
+
+    async def get_title(self) -> str:
+        return await self.page.title()
+
+    # ═══════════════════════════════════════════════════════════════
+    # SCREENSHOT METHODS
+    # ═══════════════════════════════════════════════════════════════
+
+    async def take_screenshot(self, name: str = "screenshot", full_page: bool = True) -> str:
+        """截取页面截图（保存到 screenshots/ 并附加 Allure），返回文件路径"""
+        writer = get_screenshot_writer()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        screenshot_bytes = await self.page.screenshot(full_page=full_page, **writer.options.screenshot_kwargs())
+        # 落盘交给后台写入器（不阻塞事件循环上的其它页面；Allure 附件硬链接到同一文件）
+        filepath = writer.submit(
+            screenshot_bytes,
+            Path("screenshots") / f"{name}_{timestamp}.{writer.options.extension}",
+            name=name,
+        )
+
+        logger.info(f"截图已保存: {filepath}")
+        return str(filepath)
+
+
+class AsyncBaseDialog(AsyncBasePage):
+    """对话框基类（async），用法同 BaseDialog"""
+
+    DIALOG_SELECTOR: str = ".dialog"
+    CLOSE_WAIT_MS: int = 1000
+
+    async def navigate(self) -> None:
+        """对话框不需要导航"""
+        pass
+
+    async def is_loaded(self) -> bool:
+        return await self.is_visible(self.DIALOG_SELECTOR)
+
+    async def close(self) -> None:
+        """关闭对话框：优先点关闭按钮，否则按 ESC"""
+        close_selectors = [
+            f"{self.DIALOG_SELECTOR} .close",
+            f"{self.DIALOG_SELECTOR} [aria-label='close']",
+            f"{self.DIALOG_SELECTOR} button:has-text('Close')",
+            f"{self.DIALOG_SELECTOR} button:has-text('Cancel')",
+        ]
+        # 先短暂等任一候选可见，超时不报错（见 BaseDialog.close）
+        try:
+            await self.page.wait_for_selector(
+                f"{', '.join(close_selectors)} >> visible=true", state="visible", timeout=self.CLOSE_WAIT_MS
+            )
+        except Exception:
+            pass
+        # 按列表优先级逐个候选查询，命中即停
+        for selector in close_selectors:
+            try:
+                records = await self.utils.query(selector, ["visible"])
+            except Exception:
+                continue
+            for index, record in enumerate(records):
+                if record.get("visible"):
+                    await self.click(f"{selector} >> nth={index}")
+                    return
+        await self.page.keyboard.press("Escape")
@@ -0,0 +1,69 @@
+# ═══════════════════════════════════════════════════════════════
+# Playwright Test Scaffold - Async Page Actions
+# ═══════════════════════════════════════════════════════════════
+"""
+AsyncPageActions - PageActions 的 asyncio 版本（playwright.async_api）
+方法名/参数与同步版一致，调用方需 await
+"""
+
+from core.page_actions import _value_len
+from utils.dom_query import FillValues, async_fill_many
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AsyncPageActions:
+    """页面操作封装（async）"""
+
+    async def click(self, selector: str, timeout: int = 10000) -> None:
+        """点击元素"""
+        logger.debug(f"点击元素: {selector}")
+        await self.page.click(selector, timeout=timeout)
+
+    async def fill(self, selector: str, value: str, timeout: int = 30000) -> None:
+        """填写输入框（先等待可见，再填写）"""
+        # 安全：禁止把用户输入值打进日志（可能包含密码/Token/PII）
+        logger.debug(f"填写输入框: {selector} (len={_value_len(value)})")
+        await self.page.wait_for_selector(selector, state="visible", timeout=timeout)
+        await self.page.wait_for_selector(selector, state="attached", timeout=5000)
+        await self.page.fill(selector, value, timeout=timeout)
+
+    async def secret_fill(self, selector: str, value: str, timeout: int = 30000) -> None:
+        """填写敏感输入框（例如密码），日志中不打印明文。"""
+        logger.debug(f"填写敏感输入框: {selector} = ***")
+        await self.page.wait_for_selector(selector, state="visible", timeout=timeout)
+        await self.page.wait_for_selector(selector, state="attached", timeout=5000)
+        await self.page.fill(selector, value, timeout=timeout)
+
+    async def clear_and_fill(self, selector: str, value: str, timeout: int = 10000) -> None:
+        """清空并填写输入框"""
+        logger.debug(f"清空并填写: {selector} (len={_value_len(value)})")
+        element = self.page.locator(selector)
+        await element.clear()
+        await element.fill(value)
+
+    async def fill_many(self, values: FillValues, timeout: int = 30000) -> None:
+        """批量填写（一次页面脚本完成校验 + 赋值），用法同 PageActions.fill_many"""
+        logger.debug(f"批量填写: {len(values)} 个字段")
+        await async_fill_many(self.page, values, timeout=timeout)
+
+    async def type_text(self, selector: str, text: str, delay: int = 50) -> None:
+        """逐字符输入文本（模拟真实输入）"""
+        logger.debug(f"逐字符输入: {selector}")
+        await self.page.locator(selector).press_sequentially(text, delay=delay)
+
+    async def select_option(self, selector: str, value: str) -> None:
+        """选择下拉框选项"""
+        logger.debug(f"选择选项: {selector} (len={_value_len(value)})")
+        await self.page.select_option(selector, value)
+
+    async def check(self, selector: str) -> None:
+        """勾选复选框"""
+        logger.debug(f"勾选: {selector}")
+        await self.page.check(selector)
+
+    async def uncheck(self, selector: str) -> None:
+        """取消勾选复选框"""
+        logger.debug(f"取消勾选: {selector}")
+        await self.page.uncheck(selector)
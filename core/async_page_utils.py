@@ -0,0 +1,217 @@
+# ═══════════════════════════════════════════════════════════════
+# Playwright Test Scaffold - Async Page Utilities
+# ═══════════════════════════════════════════════════════════════
+"""
+AsyncPageUtils - PageUtils 的 asyncio 版本（playwright.async_api）
+方法名/参数/返回值与同步版一致，调用方需 await
+"""
+
+import asyncio
+
+from playwright.async_api import Page
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Any, Dict, Sequence
+from core.page_utils import _FORM_VALUES_JS
+from utils.dom_query import DOM_QUERY_JS, normalize_fields
+from utils.logger import get_logger
+from utils.screenshot_writer import get_screenshot_writer
+
+logger = get_logger(__name__)
+
+_DEFAULT_ERROR_SELECTORS = [
+    ".invalid-feedback",
+    ".text-danger",
+    "[role='alert']",
+    ".error-message",
+    ".field-error",
+    ".toast-error",
+    ".Toastify__toast--error",
+]
+
+
+class AsyncPageUtils:
+    """页面操作工具类（async）"""
+
+    def __init__(self, page: Page):
+        self.page = page
+
+    # ═══════════════════════════════════════════════════════════════
+    # SAFE OPERATIONS - 带错误处理的操作
+    # ═══════════════════════════════════════════════════════════════
+
+    async def safe_click(self, selector: str, timeout: int = 10000) -> bool:
+        """安全点击（带错误处理），返回是否成功"""
+        try:
+            await self.page.wait_for_selector(selector, state="visible", timeout=timeout)
+            await self.page.click(selector, timeout=timeout)
+            logger.debug(f"✓ 点击成功: {selector}")
+            return True
+        except Exception as e:
+            logger.error(f"✗ 点击失败: {selector} - {e}")
+            return False
+
+    async def safe_fill(self, selector: str, value: str, timeout: int = 10000) -> bool:
+        """安全填写（带错误处理），返回是否成功"""
+        try:
+            await self.page.wait_for_selector(selector, state="visible", timeout=timeout)
+            await self.page.fill(selector, value, timeout=timeout)
+            # 安全：禁止把输入值写进日志（可能包含密码/Token/PII）
+            logger.debug(f"✓ 填写成功: {selector} (len={len(value or '')})")
+            return True
+        except Exception as e:
+            logger.error(f"✗ 填写失败: {selector} - {e}")
+            return False
+
+    async def safe_get_text(self, selector: str, timeout: int = 10000) -> Optional[str]:
+        """安全获取文本（带错误处理），失败返回 None"""
+        try:
+            await self.page.wait_for_selector(selector, state="visible", timeout=timeout)
+            text = await self.page.text_content(selector, timeout=timeout)
+            logger.debug(f"获取文本: {selector} (len={len(text or '')})")
+            return text
+        except Exception as e:
+            logger.error(f"✗ 获取文本失败: {selector} - {e}")
+            return None
+
+    # ═══════════════════════════════════════════════════════════════
+    # ELEMENT QUERIES
+    # ═══════════════════════════════════════════════════════════════
+
+    async def count_elements(self, selector: str) -> int:
+        return await self.page.locator(selector).count()
+
+    async def get_all_texts(self, selector: str) -> List[str]:
+        return await self.page.locator(selector).all_text_contents()
+
+    async def get_all_attributes(self, selector: str, attribute: str) -> List[str]:
+        key = f"attr:{attribute}"
+        return [record[key] for record in await self.query(selector, [key])]
+
+    async def query(self, selector: str, fields: Sequence[str] = ("text",)) -> List[Dict[str, Any]]:
+        """批量读取所有匹配元素的字段（一次 evaluate_all 往返），字段同 PageUtils.query"""
+        return await self.page.locator(selector).evaluate_all(DOM_QUERY_JS, normalize_fields(fields))
+
+    # ═══════════════════════════════════════════════════════════════
+    # SCROLL OPERATIONS
+    # ═══════════════════════════════════════════════════════════════
+
+    async def scroll_to_top(self) -> None:
+        await self.page.evaluate("window.scrollTo(0, 0)")
+        logger.debug("滚动到页面顶部")
+
+    async def scroll_to_bottom(self) -> None:
+        await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        logger.debug("滚动到页面底部")
+
+    async def scroll_to_element(self, selector: str) -> None:
+        try:
+            await self.page.locator(selector).scroll_into_view_if_needed()
+            logger.debug(f"滚动到元素: {selector}")
+        except Exception as e:
+            logger.error(f"✗ 滚动失败: {selector} - {e}")
+
+    async def scroll_by(self, x: int = 0, y: int = 0) -> None:
+        await self.page.evaluate(f"window.scrollBy({x}, {y})")
+
+    # ═══════════════════════════════════════════════════════════════
+    # SCREENSHOT
+    # ═══════════════════════════════════════════════════════════════
+
+    async def take_screenshot(
+        self,
+        file_path: str = None,
+        full_page: bool = False,
+        attach_to_allure: bool = True,
+        step_name: str = "Screenshot",
+    ) -> bytes:
+        """截取屏幕截图（可选保存文件/附加 Allure），失败返回 b"" """
+        try:
+            writer = get_screenshot_writer()
+            screenshot_bytes = await self.page.screenshot(full_page=full_page, **writer.options.screenshot_kwargs())
+            if file_path or attach_to_allure:
+                target = Path(file_path) if file_path else (
+                    Path("screenshots")
+                    / f"{step_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{writer.options.extension}"
+                )
+                writer.submit(screenshot_bytes, target, name=step_name, attach=attach_to_allure)
+                if file_path:
+                    await asyncio.to_thread(writer.wait, target)
+                logger.debug(f"截图已提交写入: {target}")
+            return screenshot_bytes
+        except Exception as e:
+            logger.error(f"✗ 截图失败: {e}")
+            return b""
+
+    # ═══════════════════════════════════════════════════════════════
+    # JAVASCRIPT EXECUTION
+    # ═══════════════════════════════════════════════════════════════
+
+    async def execute_script(self, script: str) -> Any:
+        try:
+            result = await self.page.evaluate(script)
+            logger.debug("执行脚本成功")
+            return result
+        except Exception as e:
+            logger.error(f"✗ 执行脚本失败: {e}")
+            return None
+
+    # ═══════════════════════════════════════════════════════════════
+    # FORM HELPERS
+    # ═══════════════════════════════════════════════════════════════
+
+    async def fill_form(self, form_data: dict) -> None:
+        """逐字段 safe_fill（单个字段失败不影响其余字段）；一次往返的批量填写见 fill_many"""
+        for selector, value in form_data.items():
+            await self.safe_fill(selector, value)
+
+    async def get_form_values(self, selectors: List[str]) -> dict:
+        selectors = list(selectors)
+        try:
+            values = await self.page.evaluate(_FORM_VALUES_JS, selectors)
+        except Exception as e:
+            logger.debug(f"批量读取表单值失败，逐个读取: {e}")
+            values = [None] * len(selectors)
+        return {
+            selector: value if value is not None else await self.page.input_value(selector)
+            for selector, value in zip(selectors, values)
+        }
+
+    # ═══════════════════════════════════════════════════════════════
+    # VALIDATION HELPERS
+    # ═══════════════════════════════════════════════════════════════
+
+    async def has_validation_error(self, error_selectors: List[str] = None) -> bool:
+        for selector in error_selectors or _DEFAULT_ERROR_SELECTORS:
+            if await self.page.is_visible(selector, timeout=1000):
+                return True
+        return False
+
+    async def get_validation_errors(self, error_selectors: List[str] = None) -> List[str]:
+        if error_selectors is None:
+            error_selectors = _DEFAULT_ERROR_SELECTORS[:4]
+        errors = []
+        for selector in error_selectors:
+            if await self.page.is_visible(selector, timeout=500):
+                texts = await self.page.locator(selector).all_text_contents()
+                errors.extend([t.strip() for t in texts if t.strip()])
+        return errors
+
+    # ═══════════════════════════════════════════════════════════════
+    # DRAG & DROP / KEYBOARD
+    # ═══════════════════════════════════════════════════════════════
+
+    async def drag_and_drop(self, source: str, target: str) -> None:
+        try:
+            await self.page.locator(source).drag_to(self.page.locator(target))
+            logger.debug(f"拖拽: {source} -> {target}")
+        except Exception as e:
+            logger.error(f"✗ 拖拽失败: {e}")
+
+    async def press_key(self, key: str) -> None:
+        await self.page.keyboard.press(key)
+        logger.debug(f"按键: {key}")
+
+    async def press_keys(self, keys: str) -> None:
+        await self.page.keyboard.press(keys)
+        logger.debug(f"组合键: {keys}")
@@ -0,0 +1,31 @@
+# ═══════════════════════════════════════════════════════════════
+# Playwright Test Scaffold - Async Page Waits
+# ═══════════════════════════════════════════════════════════════
+"""
+页面等待策略（Waits）的 asyncio 版本。
+
+说明：
+- 该类作为 mixin 被 `AsyncBasePage` 组合使用，API 与 `PageWaits` 一致（需 await）。
+"""
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AsyncPageWaits:
+    """页面等待策略（async）"""
+
+    async def wait_for_element(self, selector: str, state: str = "visible", timeout: int = 10000) -> None:
+        """等待元素出现（state: visible, attached, detached, hidden）"""
+        logger.debug(f"等待元素: {selector} ({state})")
+        await self.page.wait_for_selector(selector, state=state, timeout=timeout)
+
+    async def wait_for_url(self, url_pattern: str, timeout: int = 10000) -> None:
+        """等待URL匹配（支持正则）"""
+        logger.debug(f"等待URL匹配: {url_pattern}")
+        await self.page.wait_for_url(url_pattern, timeout=timeout)
+
+    async def wait(self, milliseconds: int) -> None:
+        """等待指定毫秒数"""
+        await self.page.wait_for_timeout(milliseconds)
@@ -10,14 +10,20 @@ from abc import ABC, abstractmethod
 from typing import Optional
 from datetime import datetime
 import os
+import time
 from core.page_actions import PageActions
 from core.page_waits import PageWaits
 from core.page_utils import PageUtils
+from core.page_timing import NavTimer
+from core.page_readiness import get_readiness_policy
 from utils.logger import get_logger
 from utils.config import ConfigManager
 
 logger = get_logger(__name__)
 
+# core/fixture/prefetch.py 在预取页面上设置：该页面已在浏览器侧发起到此 URL 的导航
+PREFETCHED_URL_ATTR = "_pts_prefetched_url"
+
 
 class BasePage(ABC, PageActions, PageWaits):
     """页面对象基类 - 继承操作和等待能力"""
@@ -31,6 +37,7 @@ class BasePage(ABC, PageActions, PageWaits):
         self.utils = PageUtils(page)
         self.config = ConfigManager()
         self.base_url = self.config.get_service_url("frontend") or ""
+        self._nav_timer: Optional[NavTimer] = None
     
     # ═══════════════════════════════════════════════════════════════
     # ABSTRACT METHODS
@@ -69,14 +76,25 @@ class BasePage(ABC, PageActions, PageWaits):
         retries = int(os.getenv("PAGE_GOTO_RETRIES", "1") or "1")
         retry_delay_ms = int(os.getenv("PAGE_GOTO_RETRY_DELAY_MS", "400") or "400")
         retry_wait_until = os.getenv("PAGE_GOTO_RETRY_WAIT_UNTIL", "commit").strip() or "commit"
+        timer = NavTimer("goto", self.__class__.__name__, path.split("?", 1)[0])
+        readiness = get_readiness_policy()
+        if wait_until == "commit":
+            # 自适应超时（TEST_ADAPTIVE_WAITS=1）：按该页面历史 commit 耗时收紧，卡死的页面几秒内失败
+            timeout_ms = readiness.goto_timeout_ms(self.__class__.__name__, timeout_ms)
 
         last_err: Exception | None = None
-        for attempt in range(retries + 1):
+        adopted = self._adopt_prefetched_navigation(url, timeout_ms)
+        if adopted:
+            timer.mark("prefetched")
+        for attempt in range(0 if adopted else retries + 1):
             try:
                 use_wait_until = wait_until
                 if attempt > 0 and retry_wait_until:
                     use_wait_until = retry_wait_until
                 self.page.goto(url, wait_until=use_wait_until, timeout=timeout_ms)
+                timer.mark(use_wait_until)
+                if use_wait_until == "commit" and attempt == 0:
+                    readiness.observe_commit(self.__class__.__name__, timer.phases["commit"])
                 last_err = None
                 break
             except PlaywrightTimeoutError as e:
@@ -99,6 +117,7 @@ class BasePage(ABC, PageActions, PageWaits):
                     pass
 
                 if attempt >= retries:
+                    timer.finish(self.page, status="timeout")
                     raise
                 logger.warning(f"Page.goto timeout, retrying... attempt={attempt + 1}/{retries} url={url}")
                 # 重试前尽量把页面状态拉回“可控”，避免卡在半拉子导航里
@@ -115,7 +134,32 @@ class BasePage(ABC, PageActions, PageWaits):
             raise last_err
         
         if wait_for_load:
+            self._nav_timer = timer
             self.wait_for_page_load()
+        else:
+            timer.finish(self.page)
+    
+    def _adopt_prefetched_navigation(self, url: str, timeout_ms: int) -> bool:
+        """
+        预取（PREFETCH_NEXT=1）的页面已在导航到 url：只等 commit，不重复导航。
+        不是预取页面 / URL 不一致 / 等待失败时返回 False，由 goto 正常导航。
+        """
+        prefetched = getattr(self.page, PREFETCHED_URL_ATTR, None)
+        if not isinstance(prefetched, str):
+            return False
+        try:
+            delattr(self.page, PREFETCHED_URL_ATTR)
+        except Exception:
+            pass
+        if prefetched != url:
+            return False
+        try:
+            self.page.wait_for_url(lambda u: u != "about:blank", wait_until="commit", timeout=timeout_ms)
+        except Exception as e:
+            logger.debug(f"预取导航未完成，回退为正常导航: {type(e).__name__}: {e}")
+            return False
+        logger.info(f"复用预取导航: {url}")
+        return True
     
     def wait_for_page_load(self, timeout: int = 30000) -> None:
         """
@@ -125,11 +169,33 @@ class BasePage(ABC, PageActions, PageWaits):
             timeout: 超时时间(毫秒)
         """
         logger.debug(f"等待页面加载: {self.__class__.__name__}")
+        # goto/refresh 会把自己的计时器交过来；单独调用时从这里开始计时
+        timer = getattr(self, "_nav_timer", None) or NavTimer("wait_for_page_load", self.__class__.__name__)
+        self._nav_timer = None
+        readiness = get_readiness_policy()
+        page_class = self.__class__.__name__
+        timeout = readiness.ready_timeout_ms(page_class, timeout)
+        outcome: dict = {"skipped": readiness.skip_load_state(page_class), "load_state_timeout": None, "indicator_timeout": False}
+        started = time.perf_counter()
+        try:
+            self._wait_for_page_load(timeout, timer, outcome)
+        except Exception:
+            timer.finish(self.page, status="error")
+            readiness.observe(page_class, ready_ms=0.0, ok=False, **outcome)
+            raise
+        timer.finish(self.page)
+        if not outcome.pop("login_redirect", False):
+            ready_ms = (time.perf_counter() - started) * 1000.0
+            readiness.observe(page_class, ready_ms=ready_ms, ok=True, **outcome)
+
+    def _wait_for_page_load(self, timeout: int, timer: NavTimer, outcome: dict) -> None:
         # 允许的“安全跳转”：未登录访问受保护页面时可能跳转到登录页。
         # 这类场景不应卡死在 page_loaded_indicator 上（否则 security 用例会被动等待超时）。
         try:
             url = (self.page.url or "").lower()
             if ("/auth/login" in url) or ("/account/login" in url):
+                timer.mark("login_redirect")
+                outcome["login_redirect"] = True
                 return
         except Exception:
             pass
@@ -138,19 +204,30 @@ class BasePage(ABC, PageActions, PageWaits):
         # - 需要更“严格”时可显式设置 WAIT_FOR_LOAD_STATE=networkidle
         load_state = os.getenv("WAIT_FOR_LOAD_STATE", "domcontentloaded").strip() or "domcontentloaded"
         try:
-            self.page.wait_for_load_state(load_state, timeout=timeout)
+            # 自适应：历史上 load_state 只增加延迟（经常超时、最终仍靠 indicator 判定）的页面直接跳过
+            if not outcome.get("skipped"):
+                self.page.wait_for_load_state(load_state, timeout=timeout)
+                outcome["load_state_timeout"] = False
+                timer.mark(load_state)
         except PlaywrightTimeoutError:
+            outcome["load_state_timeout"] = True
+            timer.mark(f"{load_state}_timeout")
             # 经验：某些页面（长连接/流式/高并发）可能永远达不到指定 load_state，
             # 但关键交互元素已经可见。此处降级为“以 page_loaded_indicator 为准”。
             logger.warning(f"wait_for_load_state timeout (state={load_state}), fallback to indicator={self.page_loaded_indicator!r}")
 
         # 等待页面标识元素（这是“可交互”的硬判据）
         if self.page_loaded_indicator:
-            self.page.wait_for_selector(
-                self.page_loaded_indicator,
-                state="visible",
-                timeout=timeout,
-            )
+            try:
+                self.page.wait_for_selector(
+                    self.page_loaded_indicator,
+                    state="visible",
+                    timeout=timeout,
+                )
+            except PlaywrightTimeoutError:
+                outcome["indicator_timeout"] = True
+                raise
+            timer.mark("indicator")
 
     def is_login_page(self) -> bool:
         """默认判断：URL 指向登录页即视为 login page（子类可覆盖更精确的判断）。"""
@@ -163,7 +240,10 @@ class BasePage(ABC, PageActions, PageWaits):
     def refresh(self) -> None:
         """刷新页面"""
         logger.info("刷新页面")
+        timer = NavTimer("refresh", self.__class__.__name__, (self.page.url or "").split("?", 1)[0])
         self.page.reload(wait_until='networkidle')
+        timer.mark("networkidle")
+        self._nav_timer = timer
         self.wait_for_page_load()
     
     def go_back(self) -> None:
@@ -265,29 +345,15 @@ class BasePage(ABC, PageActions, PageWaits):
             str: 截图文件路径
         """
         from pathlib import Path
-        import allure
+        from utils.screenshot_writer import get_screenshot_writer
         
-        # 创建截图目录
-        screenshot_dir = Path("screenshots")
-        screenshot_dir.mkdir(exist_ok=True)
-        
-        # 生成截图文件路径
+        # 截图在当前线程完成；落盘（含 Allure 附件硬链接）交给后台写入器，同一帧只写一次
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{name}_{timestamp}.png"
-        filepath = screenshot_dir / filename
-        
-        # 截取截图
-        screenshot_bytes = self.page.screenshot(full_page=full_page)
-        
-        # 保存文件
-        with open(filepath, "wb") as f:
-            f.write(screenshot_bytes)
-        
-        # 附加到 Allure 报告
-        allure.attach(
-            screenshot_bytes,
+        filepath = get_screenshot_writer().capture(
+            self.page,
+            Path("screenshots") / f"{name}_{timestamp}",
             name=name,
-            attachment_type=allure.attachment_type.PNG
+            full_page=full_page,
         )
         
         logger.info(f"截图已保存: {filepath}")
@@ -327,6 +393,8 @@ class BaseDialog(BasePage):
     """
     
     DIALOG_SELECTOR: str = ".dialog"
+    # close() 等待关闭按钮出现的上限（毫秒）
+    CLOSE_WAIT_MS: int = 1000
     
     def navigate(self) -> None:
         """对话框不需要导航"""
@@ -346,10 +414,26 @@ class BaseDialog(BasePage):
             f"{self.DIALOG_SELECTOR} button:has-text('Cancel')",
         ]
         
+        # 对话框刚弹出时按钮可能还没渲染：先短暂等任一候选可见（最多 1 秒，沿用原 is_visible 的等待），
+        # 超时不报错，直接进入查询/ESC 兜底
+        try:
+            self.page.wait_for_selector(
+                f"{', '.join(close_selectors)} >> visible=true", state="visible", timeout=self.CLOSE_WAIT_MS
+            )
+        except Exception:
+            pass
+        
+        # 按列表优先级逐个候选查询（每个候选一次往返，命中即停）：不能合并成一个选择器列表，
+        # 否则按 DOM 顺序取第一个可见元素，footer 的 Cancel 可能先于 header 的 .close
         for selector in close_selectors:
-            if self.is_visible(selector, timeout=1000):
-                self.click(selector)
-                return
+            try:
+                records = self.utils.query(selector, ["visible"])
+            except Exception:
+                continue
+            for index, record in enumerate(records):
+                if record.get("visible"):
+                    self.click(f"{selector} >> nth={index}")
+                    return
         
         # 按ESC键关闭
         self.page.keyboard.press("Escape")
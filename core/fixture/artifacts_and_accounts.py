@@ -11,7 +11,10 @@ from pathlib import Path
 
 import pytest
 
-from core.fixture.shared import _collect_set_cookie_oversize, config, data_manager, logger
+from core.fixture.diagnostics import DiagnosticsSettings, PageDiagnostics
+from core.fixture.shared import config, data_manager, logger, resolve_test_page
+from core.fixture.tracing import end_trace
+from utils.screenshot_writer import get_screenshot_writer
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -50,53 +53,13 @@ def pytest_runtest_makereport(item, call):
 @pytest.fixture(scope="function", autouse=True)
 def artifacts_on_failure(request):
     """失败时自动收集诊断信息（截图/console/requestfailed/trace），并尽量附加到 Allure。"""
-    console_lines = []
-    requestfailed_lines = []
-    set_cookie_oversize_lines = []
-
-    def _get_page():
-        wanted = set(getattr(request, "fixturenames", []) or [])
-        for name in ("page", "test_page", "logged_in_page", "auth_page", "unauth_page"):
-            if name not in wanted:
-                continue
-            try:
-                return request.getfixturevalue(name)
-            except Exception:
-                continue
-        return None
-
-    page = _get_page()
-    if page is not None:
-        try:
-            page.on("console", lambda m: console_lines.append(f"[{m.type}] {m.text}"))
-
-            def _on_request_failed(req):
-                try:
-                    failure = req.failure
-                    if isinstance(failure, dict):
-                        failure = failure.get("errorText") or failure.get("error_text") or ""
-                    elif failure is None:
-                        failure = ""
-                    else:
-                        failure = str(failure)
-                except Exception:
-                    failure = ""
-                requestfailed_lines.append(f"{req.method} {req.url} -> {failure}".strip())
-
-            page.on("requestfailed", _on_request_failed)
-
-            def _on_response(resp):
-                try:
-                    _collect_set_cookie_oversize(resp.headers, resp.url, resp.status, set_cookie_oversize_lines)
-                except Exception:
-                    pass
-
-            page.on("response", _on_response)
-        except Exception:
-            pass
+    page = resolve_test_page(request)
+    diagnostics = PageDiagnostics(page, DiagnosticsSettings.from_config())
+    diagnostics.attach()
 
     yield
 
+    diagnostics.detach()
     failed = bool(getattr(request.node, "rep_call", None) and request.node.rep_call.failed)
     if not failed:
         return
@@ -108,62 +71,27 @@ def artifacts_on_failure(request):
     except Exception:
         allure = None  # noqa: N816
 
-    # 1) screenshot
-    screenshot_path = Path("screenshots") / f"{test_id}_failure.png"
+    # 1) screenshot（后台写入；Allure 附件硬链接到同一文件，见 utils/screenshot_writer.py）
     if page is not None:
         try:
-            screenshot_path.parent.mkdir(exist_ok=True)
-            page.screenshot(path=str(screenshot_path), full_page=True)
-            logger.info(f"📸 失败截图已保存: {screenshot_path}")
-            if allure is not None:
-                allure.attach.file(
-                    str(screenshot_path),
-                    name="failure_screenshot",
-                    attachment_type=allure.attachment_type.PNG,
-                )
+            screenshot_path = get_screenshot_writer().capture(
+                page, Path("screenshots") / f"{test_id}_failure", name="failure_screenshot", full_page=True
+            )
+            logger.info(f"📸 失败截图已提交写入: {screenshot_path}")
         except Exception as e:
             logger.error(f"截图失败: {e}")
 
-    # 2) console logs
-    if console_lines and allure is not None:
-        try:
-            allure.attach("\n".join(console_lines), name="console", attachment_type=allure.attachment_type.TEXT)
-        except Exception:
-            pass
-
-    # 3) requestfailed
-    if requestfailed_lines and allure is not None:
-        try:
-            allure.attach("\n".join(requestfailed_lines), name="requestfailed", attachment_type=allure.attachment_type.TEXT)
-        except Exception:
-            pass
-
-    # 3.5) set-cookie oversize
-    if set_cookie_oversize_lines and allure is not None:
-        try:
-            allure.attach(
-                "\n".join(set_cookie_oversize_lines[-50:]),
-                name="set_cookie_oversize",
-                attachment_type=allure.attachment_type.TEXT,
-            )
-        except Exception:
-            pass
-
-    # 4) trace (only for contexts we created)
-    if page is not None:
-        try:
-            ctx = page.context
-            trace_path = Path("reports") / f"{test_id}.zip"
+    # 2) console / requestfailed / set-cookie oversize（lazy 模式下到这里才格式化，见 core/fixture/diagnostics.py）
+    if allure is not None:
+        for name, text in diagnostics.sections():
             try:
-                ctx.tracing.stop(path=str(trace_path))
+                allure.attach(text, name=name, attachment_type=allure.attachment_type.TEXT)
             except Exception:
-                trace_path = None
-            if trace_path and trace_path.exists() and allure is not None:
-                allure.attach.file(
-                    str(trace_path), name="playwright_trace", attachment_type=allure.attachment_type.ZIP
-                )
-        except Exception:
-            pass
+                pass
+
+    # 3) trace (only for contexts we created; see core/fixture/tracing.py for TRACE_MODE)
+    if page is not None:
+        end_trace(request.node, keep=True, path=Path("reports") / f"{test_id}.zip", attach=allure is not None)
 
 
 # ═══════════════════════════════════════════════════════════════
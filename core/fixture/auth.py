@@ -21,6 +21,11 @@ from core.fixture.shared import (
     logger,
 )
 from core.fixture.auth_session_login import try_login_with_account
+from core.fixture.context_pool import ContextPool, context_pool_enabled
+from core.fixture.prefetch import get_prefetcher, next_item_of, prefetch_enabled
+from core.fixture.tracing import begin_trace, end_trace, keep_on_pass, record_trace_property
+from utils.context_routes import attach_route_stats, install_context_routes
+from utils.har_replay import finish_har, install_har
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -241,33 +246,122 @@ def session_test_account(ensure_auth_storage_state, xdist_worker_id: str):
     return acc
 
 
-@pytest.fixture(scope="function")
-def auth_page(browser, ensure_auth_storage_state, auth_storage_state_path: str):
-    """已登录页面（function 级别独立 context）。"""
-    ctx = browser.new_context(
-        ignore_https_errors=True,
-        viewport={"width": 1920, "height": 1080},
-        storage_state=auth_storage_state_path,
+# ═══════════════════════════════════════════════════════════════
+# AUTH / UNAUTH PAGES
+# ═══════════════════════════════════════════════════════════════
+
+_PAGE_CONTEXT_KWARGS = {"ignore_https_errors": True, "viewport": {"width": 1920, "height": 1080}}
+
+
+@pytest.fixture(scope="session")
+def browser_context_pool(browser):
+    """
+    worker 级 BrowserContext 复用池（CONTEXT_POOL=1 启用，否则返回 None）。
+    """
+    if not context_pool_enabled():
+        yield None
+        _finish_prefetch(None)
+        return
+    pool = ContextPool(
+        browser,
+        context_kwargs=_PAGE_CONTEXT_KWARGS,
+        max_idle=int(os.getenv("CONTEXT_POOL_SIZE", "2") or "2"),
     )
     try:
-        ctx.tracing.start(screenshots=True, snapshots=True, sources=True)
-    except Exception:
-        pass
-    p = ctx.new_page()
-    yield p
-    ctx.close()
+        yield pool
+    finally:
+        _finish_prefetch(pool)
+        logger.info(f"♻️ context pool stats: {pool.stats.as_dict()}")
+        pool.close_all()
+
+
+def _finish_prefetch(pool) -> None:
+    prefetcher = get_prefetcher()
+    prefetcher.discard(lambda ctx: _release_context(ctx, pool))
+    if prefetch_enabled():
+        logger.info(f"⏩ prefetch stats: hits={prefetcher.hits} misses={prefetcher.misses}")
+
+
+def _test_failed(request) -> bool:
+    return any(
+        bool(getattr(request.node, f"rep_{when}", None) and getattr(request.node, f"rep_{when}").failed)
+        for when in ("setup", "call")
+    )
+
+
+def _new_context(browser, pool, kind: str, state_path: Optional[str] = None):
+    if pool is not None:
+        return pool.acquire(kind, state_path=state_path)
+    kwargs = dict(_PAGE_CONTEXT_KWARGS)
+    if state_path:
+        kwargs["storage_state"] = state_path
+    ctx = browser.new_context(**kwargs)
+    return ctx, ctx.new_page()
+
+
+def _release_context(ctx, pool, *, reusable: bool = True) -> None:
+    if pool is not None:
+        pool.release(ctx, reusable=reusable)
+    else:
+        ctx.close()
+
+
+def _open_page(browser, pool, request, *, kind: str, state_path: Optional[str] = None):
+    prefetching = prefetch_enabled()
+    claimed = get_prefetcher().claim(request.node.nodeid, kind, state_path) if prefetching else None
+    if claimed is not None:
+        # 上一个用例已为本用例开好 context 并发起导航（route/HAR 已安装），见 core/fixture/prefetch.py
+        ctx, p = claimed
+    else:
+        ctx, p = _new_context(browser, pool, kind, state_path)
+        install_context_routes(ctx)
+        install_har(ctx, request.node.nodeid)
+    begin_trace(ctx, request.node)
+    if prefetching:
+        # 登录态只有在本用例已确保生成时才可用于预取（避免在当前用例里触发登录）
+        known_state = (
+            request.getfixturevalue("auth_storage_state_path")
+            if "ensure_auth_storage_state" in request.fixturenames
+            else None
+        )
+        get_prefetcher().schedule(
+            next_item_of(request.node),
+            open_context=lambda k, s: _new_context(browser, pool, k, s),
+            release_context=lambda c: _release_context(c, pool),
+            state_path=known_state,
+            current_item=request.node,
+        )
+    return ctx, p
+
+
+def _close_page(ctx, pool, request) -> None:
+    attach_route_stats(ctx)
+    har_error = finish_har(ctx)
+    # 失败用例的 trace 已由 artifacts_on_failure 落盘；这里只处理“通过也要保留”与“丢弃 chunk”
+    end_trace(
+        request.node,
+        keep=keep_on_pass(),
+        path=Path("reports") / f"{request.node.nodeid.replace('/', '_').replace('::', '_')}.zip",
+        attach=True,
+    )
+    record_trace_property(request.node)
+    # 失败用例的 context 状态不可信：不回收，直接丢弃
+    _release_context(ctx, pool, reusable=not _test_failed(request))
+    if har_error:
+        pytest.fail(har_error, pytrace=False)
 
 
 @pytest.fixture(scope="function")
-def unauth_page(browser):
-    """未登录页面（function 级别独立 context）。"""
-    ctx = browser.new_context(ignore_https_errors=True, viewport={"width": 1920, "height": 1080})
-    try:
-        ctx.tracing.start(screenshots=True, snapshots=True, sources=True)
-    except Exception:
-        pass
-    p = ctx.new_page()
+def auth_page(browser, ensure_auth_storage_state, auth_storage_state_path: str, browser_context_pool, request):
+    """已登录页面（function 级别独立 context；CONTEXT_POOL=1 时从 worker 池复用）。"""
+    ctx, p = _open_page(browser, browser_context_pool, request, kind="auth", state_path=auth_storage_state_path)
     yield p
-    ctx.close()
+    _close_page(ctx, browser_context_pool, request)
 
 
+@pytest.fixture(scope="function")
+def unauth_page(browser, browser_context_pool, request):
+    """未登录页面（function 级别独立 context；CONTEXT_POOL=1 时从 worker 池复用）。"""
+    ctx, p = _open_page(browser, browser_context_pool, request, kind="unauth")
+    yield p
+    _close_page(ctx, browser_context_pool, request)
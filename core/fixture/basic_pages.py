@@ -10,6 +10,7 @@ import pytest
 from playwright.sync_api import Page
 
 from core.fixture.shared import logger
+from utils.context_routes import install_context_routes
 
 
 @pytest.fixture(scope="function")
@@ -24,6 +25,7 @@ def test_page(page: Page) -> Page:
 def shared_page(browser) -> Page:
     """共享页面 fixture - 测试类内共享"""
     context = browser.new_context(viewport={"width": 1920, "height": 1080}, ignore_https_errors=True)
+    install_context_routes(context)
     page = context.new_page()
     logger.info("创建共享页面")
     yield page
@@ -6,14 +6,23 @@
 
 from __future__ import annotations
 
+import os
+
 import pytest
 
-from core.fixture.shared import config
+from core.fixture.shared import config, logger
+from utils.context_routes import attach_route_stats, install_context_routes
+from utils.har_replay import finish_har, install_har
 
 
 @pytest.fixture(scope="session")
 def browser_context_args(browser_context_args):
-    """配置浏览器上下文参数"""
+    """
+    配置浏览器上下文参数
+
+    说明：第三方请求拦截（network.block）无法用 new_context 参数表达，
+    由 utils.context_routes.install_context_routes 在 context 创建后统一安装。
+    """
     browser_config = config.get_browser_config()
     return {
         **browser_context_args,
@@ -47,3 +56,91 @@ def browser_type_launch_args(browser_type_launch_args):
     }
 
 
+
+
+# ═══════════════════════════════════════════════════════════════
+# SHARED BROWSER SERVERS (BROWSER_SERVERS=N, see utils/browser_server.py)
+# ═══════════════════════════════════════════════════════════════
+
+_BROWSER_SERVER_GROUP = None
+
+
+def start_browser_servers(pytest_config) -> None:
+    """
+    由根 conftest 的 pytest_configure 调用：controller 侧（xdist master 或单进程）按需启动共享浏览器；
+    worker 通过环境变量继承 endpoint。
+    """
+    global _BROWSER_SERVER_GROUP
+    if hasattr(pytest_config, "workerinput"):
+        return
+    from utils.browser_server import ENDPOINTS_ENV, BrowserServerGroup, configured_server_count, shared_endpoints
+
+    count = configured_server_count()
+    if count <= 0 or shared_endpoints():
+        return
+    if (getattr(pytest_config.option, "browser", None) or ["chromium"])[0] != "chromium":
+        return
+    browser_config = config.get_browser_config()
+    group = BrowserServerGroup(
+        count=count,
+        headless=bool(browser_config.get("headless", True)),
+        args=config.get("browser.args", []) or [],
+    )
+    try:
+        os.environ[ENDPOINTS_ENV] = ",".join(group.start())
+    except Exception as e:
+        # 共享模式失败不应阻塞运行：回退为每个 worker 自行 launch
+        logger.warning(f"共享浏览器启动失败，回退为 per-worker launch: {type(e).__name__}: {e}")
+        group.stop()
+        return
+    _BROWSER_SERVER_GROUP = group
+
+
+def stop_browser_servers() -> None:
+    """由根 conftest 的 pytest_unconfigure 调用：停止 start_browser_servers 启动的共享浏览器。"""
+    global _BROWSER_SERVER_GROUP
+    if _BROWSER_SERVER_GROUP is None:
+        return
+    from utils.browser_server import ENDPOINTS_ENV
+
+    _BROWSER_SERVER_GROUP.stop()
+    _BROWSER_SERVER_GROUP = None
+    os.environ.pop(ENDPOINTS_ENV, None)
+
+
+@pytest.fixture(scope="session")
+def browser(browser_type, launch_browser):
+    """
+    覆盖 pytest-playwright 的 browser：
+    - 有共享 endpoint 时 connect_over_cdp（context 作为隔离单元，close 只断开连接）
+    - 否则沿用 pytest-playwright 的 launch_browser
+    """
+    from utils.browser_server import endpoint_for_worker, shared_endpoints
+
+    endpoint = None
+    if browser_type.name == "chromium":
+        endpoint = endpoint_for_worker(os.getenv("PYTEST_XDIST_WORKER") or "master", shared_endpoints())
+    b = None
+    if endpoint:
+        try:
+            b = browser_type.connect_over_cdp(endpoint)
+            logger.info(f"🌐 已连接共享浏览器: {endpoint}")
+        except Exception as e:
+            logger.warning(f"连接共享浏览器失败，回退为本地 launch: {type(e).__name__}: {e}")
+    if b is None:
+        b = launch_browser()
+    yield b
+    b.close()
+
+
+@pytest.fixture
+def context(new_context, request):
+    """覆盖 pytest-playwright 的 context：创建后安装 opt-in route 层（asset cache / HAR 回放等）。"""
+    ctx = new_context()
+    install_context_routes(ctx)
+    install_har(ctx, request.node.nodeid)
+    yield ctx
+    attach_route_stats(ctx)
+    har_error = finish_har(ctx)
+    if har_error:
+        pytest.fail(har_error, pytrace=False)
@@ -0,0 +1,249 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Fixtures - BrowserContext recycling pool (per worker)
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - auth_page/unauth_page 每个用例都 new_context + close，且 auth_page 每次都从磁盘读 storage_state
+# - 大套件下 context 创建/销毁的开销可累计到“每用例秒级”
+#
+# 方案：
+# - 每个 worker 进程一个池（session 级 fixture 持有），按 kind（auth/unauth）维护空闲 context
+# - 用例结束时 reset 后放回：清 cookie 并回灌登录 cookie、清 origin storage、移除 route、关闭多余页面
+# - reset 任一步失败：直接丢弃该 context，下次 acquire 走 new_context（安全兜底）
+#
+# 开关：
+# - CONTEXT_POOL=1          启用（默认关闭，保持原有“每用例新 context”行为）
+# - CONTEXT_POOL_SIZE=2     每种 kind 最多保留的空闲 context 数
+#
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from core.fixture.shared import config, logger
+
+_TRUE_VALUES = {"1", "true", "True", "yes", "YES"}
+
+# reset 时用来“站”到目标 origin 的占位文档（由 route 直接 fulfill，不打到真实服务）
+_RESET_PATH = "/__pts_context_reset__"
+_RESET_SCRIPT = """
+(items) => {
+  try { window.localStorage.clear(); } catch (e) {}
+  try { window.sessionStorage.clear(); } catch (e) {}
+  try {
+    for (const [k, v] of items || []) window.localStorage.setItem(k, v);
+  } catch (e) {}
+  try {
+    if (window.indexedDB && indexedDB.databases) {
+      return indexedDB.databases().then((dbs) => {
+        for (const db of dbs || []) { if (db && db.name) indexedDB.deleteDatabase(db.name); }
+        return true;
+      });
+    }
+  } catch (e) {}
+  return true;
+}
+"""
+
+
+def context_pool_enabled() -> bool:
+    return os.getenv("CONTEXT_POOL", "").strip() in _TRUE_VALUES
+
+
+def _origin_of(url: str) -> str:
+    p = urlparse(url or "")
+    if not p.scheme or not p.netloc:
+        return ""
+    return f"{p.scheme}://{p.netloc}"
+
+
+@dataclass
+class _PooledContext:
+    ctx: Any
+    kind: str
+    state_path: Optional[str] = None
+    reuses: int = 0
+
+
+@dataclass
+class ContextPoolStats:
+    created: int = 0
+    reused: int = 0
+    reset_failed: int = 0
+    discarded: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "reset_failed": self.reset_failed,
+            "discarded": self.discarded,
+        }
+
+
+class ContextPool:
+    """
+    单 worker 内的 BrowserContext 复用池。
+
+    说明：
+    - 非线程安全：pytest 单 worker 内用例串行执行
+    - storage_state 按 (path, mtime) 缓存解析结果，避免每个用例重复读盘
+    """
+
+    def __init__(self, browser, *, context_kwargs: Dict[str, Any], max_idle: int = 2) -> None:
+        self.browser = browser
+        self.context_kwargs = dict(context_kwargs)
+        self.max_idle = max_idle
+        self.stats = ContextPoolStats()
+        self._idle: Dict[str, List[_PooledContext]] = {}
+        self._leased: Dict[int, _PooledContext] = {}
+        self._state_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    # ═══════════════════════════════════════════════════════════════
+    # storage_state
+    # ═══════════════════════════════════════════════════════════════
+
+    def load_storage_state(self, state_path: str) -> Dict[str, Any]:
+        p = Path(state_path)
+        mtime = p.stat().st_mtime
+        cached = self._state_cache.get(state_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        data = json.loads(p.read_text(encoding="utf-8"))
+        self._state_cache[state_path] = (mtime, data)
+        return data
+
+    # ═══════════════════════════════════════════════════════════════
+    # acquire / release
+    # ═══════════════════════════════════════════════════════════════
+
+    def acquire(self, kind: str, *, state_path: Optional[str] = None):
+        """返回 (context, page)。优先复用空闲 context，否则新建。"""
+        idle = self._idle.setdefault(kind, [])
+        while idle:
+            item = idle.pop()
+            if item.state_path != state_path:
+                self._discard(item)
+                continue
+            try:
+                page = item.ctx.new_page()
+            except Exception:
+                self._discard(item)
+                continue
+            item.reuses += 1
+            self.stats.reused += 1
+            self._leased[id(item.ctx)] = item
+            return item.ctx, page
+
+        kwargs = dict(self.context_kwargs)
+        if state_path:
+            kwargs["storage_state"] = self.load_storage_state(state_path)
+        ctx = self.browser.new_context(**kwargs)
+        self.stats.created += 1
+        item = _PooledContext(ctx=ctx, kind=kind, state_path=state_path)
+        self._leased[id(ctx)] = item
+        return ctx, ctx.new_page()
+
+    def release(self, ctx, *, reusable: bool = True) -> None:
+        """归还 context：reset 成功则放回池中，否则关闭。"""
+        item = self._leased.pop(id(ctx), None)
+        if item is None:
+            _safe_close(ctx)
+            return
+        idle = self._idle.setdefault(item.kind, [])
+        if not reusable or len(idle) >= max(self.max_idle, 0):
+            self._discard(item)
+            return
+        try:
+            self.reset(item)
+        except Exception as e:
+            self.stats.reset_failed += 1
+            logger.warning(f"context reset 失败，已丢弃并回退为新 context: {type(e).__name__}: {e}")
+            self._discard(item)
+            return
+        idle.append(item)
+
+    def close_all(self) -> None:
+        for items in self._idle.values():
+            for item in items:
+                _safe_close(item.ctx)
+        self._idle.clear()
+        for item in list(self._leased.values()):
+            _safe_close(item.ctx)
+        self._leased.clear()
+
+    # ═══════════════════════════════════════════════════════════════
+    # reset
+    # ═══════════════════════════════════════════════════════════════
+
+    def reset(self, item: _PooledContext) -> None:
+        """
+        把 context 恢复到“刚创建”的等价状态。任何异常向上抛出，由 release 负责丢弃。
+        """
+        ctx = item.ctx
+        # 1) 丢弃上一用例未收尾的 trace chunk（tracing 本身保持开启，下个用例只需 start_chunk）
+        try:
+            ctx.tracing.stop_chunk()
+        except Exception:
+            pass
+
+        # 2) 关闭所有页面（连带清掉用例注册在 page 上的监听器）
+        for p in list(ctx.pages):
+            p.close()
+
+        # 3) route / 权限 / 额外请求头
+        ctx.unroute_all(behavior="ignoreErrors")
+        ctx.clear_permissions()
+        ctx.set_extra_http_headers({})
+
+        # 4) cookie：清空后回灌 storage_state 中的登录 cookie
+        state: Dict[str, Any] = {}
+        if item.state_path:
+            state = self.load_storage_state(item.state_path)
+        ctx.clear_cookies()
+        cookies = state.get("cookies") or []
+        if cookies:
+            ctx.add_cookies(cookies)
+
+        # 5) origin storage：清 local/session storage + IndexedDB，并回灌 storage_state 中的 localStorage
+        origins: Dict[str, List[List[str]]] = {}
+        frontend_origin = _origin_of(config.get_service_url("frontend") or "")
+        if frontend_origin:
+            origins[frontend_origin] = []
+        for o in state.get("origins") or []:
+            origin = (o or {}).get("origin") or ""
+            if origin:
+                origins[origin] = [[x.get("name", ""), x.get("value", "")] for x in (o.get("localStorage") or [])]
+        if origins:
+            self._reset_origin_storage(ctx, origins)
+
+    @staticmethod
+    def _reset_origin_storage(ctx, origins: Dict[str, List[List[str]]]) -> None:
+        page = ctx.new_page()
+        try:
+            for origin, items in origins.items():
+                url = f"{origin}{_RESET_PATH}"
+                page.route(url, lambda route: route.fulfill(status=200, content_type="text/html", body="<html></html>"))
+                page.goto(url, wait_until="commit", timeout=5000)
+                page.evaluate(_RESET_SCRIPT, items)
+                page.unroute(url)
+        finally:
+            page.close()
+
+    def _discard(self, item: _PooledContext) -> None:
+        self.stats.discarded += 1
+        _safe_close(item.ctx)
+
+
+def _safe_close(ctx) -> None:
+    try:
+        ctx.close()
+    except Exception:
+        pass
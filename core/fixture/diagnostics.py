@@ -0,0 +1,189 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Fixtures - Bounded, lazy page diagnostics (console / requestfailed / response)
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - artifacts_on_failure 给每个用例的页面挂 console/requestfailed/response 三个监听器
+# - response 监听器对每个响应都跑 _collect_set_cookie_oversize；console/requestfailed 列表无上限增长
+# - 复用页面（context 池 / shared_page）上监听器从不移除，用例越跑越多
+# - 但只有失败用例才用得到这些数据
+#
+# 方案（config/project.yaml -> diagnostics，环境变量 DIAGNOSTICS_* 优先）：
+#   diagnostics:
+#     mode: "lazy"            # lazy：事件回调只把原始对象放进环形缓冲区，失败时才格式化/检查
+#                             # eager：事件发生时即格式化（旧行为，但仍有上限）
+#                             # off：不挂监听器
+#     console_max: 200        # 各缓冲区容量（只保留最近 N 条）
+#     requestfailed_max: 200
+#     response_max: 500
+#     response_sample: 1.0    # response 采样率（0~1，确定性抽样；0 = 不挂 response 监听器）
+#
+# 说明：
+# - 用例结束时移除本用例挂上的监听器，复用页面不会累积回调
+# - 通过的用例只付出 deque.append 的开销
+#
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+from core.fixture.shared import _collect_set_cookie_oversize, config, logger
+
+DIAGNOSTICS_MODES = ("lazy", "eager", "off")
+
+
+def _int_setting(key: str, default: int) -> int:
+    try:
+        return max(int(config.get(key, default) or 0), 0)
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass
+class DiagnosticsSettings:
+    mode: str = "lazy"
+    console_max: int = 200
+    requestfailed_max: int = 200
+    response_max: int = 500
+    response_sample: float = 1.0
+
+    @classmethod
+    def from_config(cls) -> "DiagnosticsSettings":
+        mode = str(config.get("diagnostics.mode", "lazy") or "lazy").strip().lower()
+        if mode not in DIAGNOSTICS_MODES:
+            logger.warning(f"未知 diagnostics.mode={mode!r}，回退为 lazy")
+            mode = "lazy"
+        try:
+            sample = min(max(float(config.get("diagnostics.response_sample", 1.0)), 0.0), 1.0)
+        except (TypeError, ValueError):
+            sample = 1.0
+        return cls(
+            mode=mode,
+            console_max=_int_setting("diagnostics.console_max", 200),
+            requestfailed_max=_int_setting("diagnostics.requestfailed_max", 200),
+            response_max=_int_setting("diagnostics.response_max", 500),
+            response_sample=sample,
+        )
+
+
+def format_console(msg) -> str:
+    return f"[{msg.type}] {msg.text}"
+
+
+def format_requestfailed(req) -> str:
+    try:
+        failure = req.failure
+        if isinstance(failure, dict):
+            failure = failure.get("errorText") or failure.get("error_text") or ""
+        elif failure is None:
+            failure = ""
+        else:
+            failure = str(failure)
+    except Exception:
+        failure = ""
+    return f"{req.method} {req.url} -> {failure}".strip()
+
+
+class PageDiagnostics:
+    """
+    单个用例在一个页面上的诊断采集（见模块说明）。
+
+    使用方式:
+        diag = PageDiagnostics(page, DiagnosticsSettings.from_config())
+        diag.attach()
+        ...
+        diag.detach()
+        if failed:
+            for name, text in diag.sections():
+                allure.attach(text, name=name, ...)
+    """
+
+    def __init__(self, page, settings: Optional[DiagnosticsSettings] = None) -> None:
+        self.page = page
+        self.settings = settings or DiagnosticsSettings()
+        s = self.settings
+        self.console: Deque[Any] = deque(maxlen=s.console_max)
+        self.requestfailed: Deque[Any] = deque(maxlen=s.requestfailed_max)
+        self.responses: Deque[Any] = deque(maxlen=s.response_max)
+        self.set_cookie_oversize: List[str] = []
+        self._sample_acc = 0.0
+        self._listeners: List[Tuple[str, Callable]] = []
+
+    # ───────────────────────── listeners ─────────────────────────
+
+    def attach(self) -> None:
+        s = self.settings
+        if s.mode == "off" or self.page is None:
+            return
+        eager = s.mode == "eager"
+        if s.console_max:
+            self._on("console", (lambda m: self.console.append(format_console(m))) if eager else self.console.append)
+        if s.requestfailed_max:
+            self._on(
+                "requestfailed",
+                (lambda r: self.requestfailed.append(format_requestfailed(r))) if eager else self.requestfailed.append,
+            )
+        if s.response_max and s.response_sample > 0:
+            self._on("response", self._on_response)
+
+    def _on(self, event: str, handler: Callable) -> None:
+        try:
+            self.page.on(event, handler)
+            self._listeners.append((event, handler))
+        except Exception:
+            pass
+
+    def _on_response(self, resp) -> None:
+        if self.settings.response_sample < 1.0:
+            self._sample_acc += self.settings.response_sample
+            if self._sample_acc < 1.0:
+                return
+            self._sample_acc -= 1.0
+        if self.settings.mode == "eager":
+            try:
+                _collect_set_cookie_oversize(resp.headers, resp.url, resp.status, self.set_cookie_oversize)
+            except Exception:
+                pass
+        else:
+            self.responses.append(resp)
+
+    def detach(self) -> None:
+        """移除本对象挂上的监听器（复用页面时避免回调累积）。"""
+        for event, handler in self._listeners:
+            try:
+                self.page.remove_listener(event, handler)
+            except Exception:
+                pass
+        self._listeners = []
+
+    # ───────────────────────── failure output ─────────────────────────
+
+    def sections(self) -> List[Tuple[str, str]]:
+        """失败时调用：格式化缓冲区内容，返回 [(附件名, 文本), ...]（空的部分不返回）。"""
+        out: List[Tuple[str, str]] = []
+        console = [x if isinstance(x, str) else self._safe(format_console, x) for x in self.console]
+        if console:
+            out.append(("console", "\n".join(console)))
+        failed = [x if isinstance(x, str) else self._safe(format_requestfailed, x) for x in self.requestfailed]
+        if failed:
+            out.append(("requestfailed", "\n".join(failed)))
+        oversize = list(self.set_cookie_oversize)
+        for resp in self.responses:
+            try:
+                _collect_set_cookie_oversize(resp.headers, resp.url, resp.status, oversize)
+            except Exception:
+                pass
+        if oversize:
+            out.append(("set_cookie_oversize", "\n".join(oversize[-50:])))
+        return out
+
+    @staticmethod
+    def _safe(fn: Callable[[Any], str], obj: Any) -> str:
+        try:
+            return fn(obj)
+        except Exception as e:
+            return f"<unformattable {type(obj).__name__}: {type(e).__name__}>"
@@ -0,0 +1,139 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Fixtures - Duration history recording (see utils/duration_history.py)
+# ═══════════════════════════════════════════════════════════════
+#
+# 采集：
+# - pytest_fixture_setup（hookwrapper）记录每个 fixture 实际执行的 setup 耗时，
+#   写进 item.user_properties（同一个 dict，随各阶段 report 回传 controller）
+# - collect_duration_report 在 pytest_runtest_logreport 中调用（只在 controller / 非 xdist 进程生效）：
+#   按 setup -> call -> teardown 拼出每个用例每次尝试的 DurationRecord
+# - save_duration_history 在 pytest_sessionfinish（controller）中一次性写库，并返回本次回归汇总
+#
+# 开关：DURATION_HISTORY=0 或 duration_history.enabled=false 关闭（默认开启）；
+#       单个用例在 user_properties 里带 SKIP_PROPERTY 则不记录（框架单测用它避免混进业务用例历史）
+#
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Dict, List
+
+import pytest
+
+from core.fixture.shared import config, logger
+from utils.duration_history import DurationHistory, DurationRecord, format_regressions, history_enabled
+
+FIXTURE_TIMES_PROPERTY = "pts_fixture_times"
+SKIP_PROPERTY = "pts_duration_history_skip"
+
+_FIXTURE_TIMES_KEY = pytest.StashKey[Dict[str, list]]()
+_SESSION_STARTED_AT = time.time()
+_ENABLED: List[bool] = []
+
+
+def _enabled() -> bool:
+    if not _ENABLED:
+        _ENABLED.append(history_enabled(config))
+    return _ENABLED[0]
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    t0 = time.perf_counter()
+    yield
+    item = getattr(request, "_pyfuncitem", None)
+    if item is None or not _enabled():
+        return
+    times = item.stash.get(_FIXTURE_TIMES_KEY, None)
+    if times is None:
+        times = {}
+        item.stash[_FIXTURE_TIMES_KEY] = times
+        item.user_properties.append((FIXTURE_TIMES_PROPERTY, times))
+    times[fixturedef.argname] = [fixturedef.scope, round(time.perf_counter() - t0, 4)]
+
+
+# ═══════════════════════════════════════════════════════════════
+# SESSION COLLECTION (controller side)
+# ═══════════════════════════════════════════════════════════════
+
+_RECORDS: List[DurationRecord] = []
+_OPEN: Dict[str, DurationRecord] = {}
+_ATTEMPTS: Dict[str, int] = {}
+
+
+def _worker_of(report) -> str:
+    worker = getattr(report, "worker_id", None)
+    if not worker:
+        gateway = getattr(getattr(report, "node", None), "gateway", None)
+        worker = getattr(gateway, "id", None)
+    return str(worker or os.getenv("PYTEST_XDIST_WORKER") or "main")
+
+
+def _outcome(report) -> str:
+    if hasattr(report, "wasxfail"):
+        return "xfailed" if report.skipped else "xpassed"
+    if report.when != "call" and report.failed:
+        return "error"
+    return report.outcome
+
+
+def collect_duration_report(report) -> None:
+    """在 pytest_runtest_logreport 中调用：拼出每个用例每次尝试的三阶段耗时。"""
+    if os.getenv("PYTEST_XDIST_WORKER") or not _enabled():
+        return
+    properties = getattr(report, "user_properties", None) or []
+    if any(name == SKIP_PROPERTY for name, _value in properties):
+        return
+    nodeid = report.nodeid
+    record = _OPEN.get(nodeid)
+    if report.when == "setup" or record is None:
+        _ATTEMPTS[nodeid] = _ATTEMPTS.get(nodeid, 0) + 1
+        record = DurationRecord(nodeid=nodeid, attempt=_ATTEMPTS[nodeid], worker=_worker_of(report))
+        _OPEN[nodeid] = record
+        _RECORDS.append(record)
+
+    setattr(record, f"{report.when}_s", round(float(getattr(report, "duration", 0.0) or 0.0), 4))
+    outcome = _outcome(report)
+    if report.when == "setup" or (record.outcome == "passed" and outcome != "passed"):
+        record.outcome = outcome
+    for name, value in properties:
+        if name == FIXTURE_TIMES_PROPERTY and isinstance(value, dict):
+            record.fixtures = {k: (str(v[0]), float(v[1])) for k, v in value.items()}
+    if report.when == "teardown":
+        _OPEN.pop(nodeid, None)
+
+
+def save_duration_history(exitstatus: int = 0, top: int = 10) -> List[str]:
+    """写入本次运行（controller 调用一次）；返回终端汇总行（含相对历史的耗时回归）。"""
+    if not _RECORDS or not _enabled():
+        return []
+    recorded = len(_RECORDS)
+    try:
+        history = DurationHistory.from_config(config)
+        run_id = history.record_run(
+            _RECORDS, env=config.get_environment(), started_at=_SESSION_STARTED_AT, exitstatus=exitstatus
+        )
+        found = history.regressions(
+            run_id=run_id,
+            window=int(config.get("duration_history.regression.window", 20)),
+            z=float(config.get("duration_history.regression.z", 3.0)),
+            min_ratio=float(config.get("duration_history.regression.min_ratio", 1.5)),
+            min_delta_s=float(config.get("duration_history.regression.min_delta_s", 0.5)),
+            min_samples=int(config.get("duration_history.regression.min_samples", 5)),
+        )
+    except Exception as e:
+        logger.warning(f"耗时历史写入失败（已忽略）: {type(e).__name__}: {e}")
+        return [f"duration history failed (ignored): {type(e).__name__}: {e}"]
+    finally:
+        _RECORDS.clear()
+        _OPEN.clear()
+        _ATTEMPTS.clear()
+
+    lines = [f"recorded {recorded} tests as run #{run_id} -> {history.path}"]
+    if found:
+        lines.append(f"duration regressions vs history: {len(found)}")
+        lines += [f"  {line}" for line in format_regressions(found[:top])]
+    return lines
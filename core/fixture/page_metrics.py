@@ -0,0 +1,233 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Fixtures - Page resource monitor (CDP Performance.getMetrics)
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - 部分页面在 SPA 导航间泄漏（JS heap / DOM 节点只增不减），shared_page 这类长寿命页面越跑越慢
+# - worker 后期用例变慢时，缺少数据区分“被测页面变重”还是“环境抖动”
+#
+# 方案（PAGE_METRICS=1 或 test.page_metrics: true 开启，默认关闭；仅 chromium）：
+# - 用例前后各采样一次 CDP Performance.getMetrics（同一页面复用一个 CDP session）
+#     JSHeapUsedSize / Nodes / LayoutCount / ScriptDuration / JSEventListeners / Documents
+# - 差值附加到 Allure（page_metrics），并写进 report.user_properties（xdist 下回传 master）
+# - 增长超过阈值的用例记 warning + Allure tag resource-growth：
+#     PAGE_METRICS_HEAP_MB=20      JS heap 增长（MB）
+#     PAGE_METRICS_NODES=5000      DOM 节点增长
+#     PAGE_METRICS_GC=1            采样前先触发 GC（HeapProfiler.collectGarbage），heap 差值更接近真实泄漏，多 ~50ms/用例
+# - master 在 terminal summary 汇总：超阈值用例、按页面（URL path）平均增长、各 worker 前后半程对比
+#
+"""
+
+from __future__ import annotations
+
+import os
+import weakref
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import pytest
+
+from core.fixture.shared import config, logger, resolve_test_page
+
+PAGE_METRICS_PROPERTY = "pts_page_metrics"
+METRIC_NAMES = ("JSHeapUsedSize", "Nodes", "LayoutCount", "ScriptDuration", "JSEventListeners", "Documents")
+
+# 比 artifacts_on_failure 多看 shared_page：长寿命页面正是泄漏最明显的地方
+_MONITORED_PAGE_FIXTURES = ("page", "test_page", "shared_page", "logged_in_page", "auth_page", "unauth_page")
+
+_TRUE_VALUES = {"1", "true", "True", "yes", "YES", "on"}
+_CDP_SESSIONS: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+_WORKER_SEQ = {"n": 0}
+
+
+def page_metrics_enabled() -> bool:
+    raw = os.getenv("PAGE_METRICS")
+    if raw is None:
+        raw = str(config.get("test.page_metrics", False) or "")
+    return raw.strip() in _TRUE_VALUES
+
+
+def _threshold(env: str, default: float) -> float:
+    try:
+        return float(os.getenv(env, "") or default)
+    except ValueError:
+        return default
+
+
+def _cdp_session(page):
+    """每个页面只建一个 CDP session（shared_page 跨用例复用）；非 chromium 返回 None。"""
+    try:
+        return _CDP_SESSIONS[page]
+    except KeyError:
+        pass
+    try:
+        session = page.context.new_cdp_session(page)
+        session.send("Performance.enable")
+    except Exception as e:
+        logger.debug(f"page metrics: CDP 不可用（非 chromium？）{type(e).__name__}: {e}")
+        session = None
+    _CDP_SESSIONS[page] = session
+    return session
+
+
+def sample_metrics(page, *, collect_garbage: bool = False) -> Optional[Dict[str, float]]:
+    """采样一次 Performance.getMetrics，只保留 METRIC_NAMES；失败返回 None。"""
+    session = _cdp_session(page)
+    if session is None:
+        return None
+    try:
+        if collect_garbage:
+            session.send("HeapProfiler.collectGarbage")
+        raw = session.send("Performance.getMetrics") or {}
+    except Exception as e:
+        logger.debug(f"page metrics: getMetrics 失败 {type(e).__name__}: {e}")
+        return None
+    values = {m.get("name"): float(m.get("value") or 0.0) for m in raw.get("metrics") or []}
+    return {name: values[name] for name in METRIC_NAMES if name in values}
+
+
+def metrics_delta(before: Dict[str, float], after: Dict[str, float]) -> Dict[str, float]:
+    return {name: after[name] - before[name] for name in METRIC_NAMES if name in before and name in after}
+
+
+def growth_flags(delta: Dict[str, float]) -> List[str]:
+    """返回超阈值的指标说明（空列表 = 未超阈值）。"""
+    flags = []
+    heap_mb = delta.get("JSHeapUsedSize", 0.0) / 1024 / 1024
+    if heap_mb > _threshold("PAGE_METRICS_HEAP_MB", 20.0):
+        flags.append(f"JSHeapUsedSize +{heap_mb:.1f}MB")
+    nodes = delta.get("Nodes", 0.0)
+    if nodes > _threshold("PAGE_METRICS_NODES", 5000.0):
+        flags.append(f"Nodes +{int(nodes)}")
+    return flags
+
+
+def format_metrics(before: Dict[str, float], after: Dict[str, float], delta: Dict[str, float]) -> str:
+    lines = [f"{'metric':<18}{'before':>14}{'after':>14}{'delta':>14}"]
+    for name in METRIC_NAMES:
+        if name not in delta:
+            continue
+        if name == "JSHeapUsedSize":
+            fmt = lambda v: f"{v / 1024 / 1024:.2f}MB"  # noqa: E731
+        elif name == "ScriptDuration":
+            fmt = lambda v: f"{v * 1000:.0f}ms"  # noqa: E731
+        else:
+            fmt = lambda v: f"{int(v)}"  # noqa: E731
+        lines.append(f"{name:<18}{fmt(before[name]):>14}{fmt(after[name]):>14}{fmt(delta[name]):>14}")
+    return "\n".join(lines)
+
+
+def _page_key(page) -> str:
+    try:
+        return urlparse(page.url or "").path or "/"
+    except Exception:
+        return "?"
+
+
+@pytest.fixture(scope="function", autouse=True)
+def page_resource_monitor(request):
+    """用例前后采样页面资源指标（PAGE_METRICS=1 时生效），附加差值并标记增长异常的用例。"""
+    if not page_metrics_enabled():
+        yield
+        return
+    page = resolve_test_page(request, _MONITORED_PAGE_FIXTURES)
+    gc = os.getenv("PAGE_METRICS_GC", "").strip() in _TRUE_VALUES
+    before = sample_metrics(page, collect_garbage=gc) if page is not None else None
+
+    yield
+
+    if before is None:
+        return
+    after = sample_metrics(page, collect_garbage=gc)
+    if after is None:
+        return
+    delta = metrics_delta(before, after)
+    flags = growth_flags(delta)
+    _WORKER_SEQ["n"] += 1
+    request.node.user_properties.append(
+        (
+            PAGE_METRICS_PROPERTY,
+            {
+                "page": _page_key(page),
+                "worker": os.getenv("PYTEST_XDIST_WORKER", "main"),
+                "seq": _WORKER_SEQ["n"],
+                "delta": {k: round(v, 4) for k, v in delta.items()},
+                "heap_after": after.get("JSHeapUsedSize", 0.0),
+                "flags": flags,
+            },
+        )
+    )
+    if flags:
+        logger.warning(f"⚠️ 页面资源增长超阈值: {request.node.nodeid} ({_page_key(page)}) {', '.join(flags)}")
+    try:
+        import allure  # type: ignore
+
+        allure.attach(
+            format_metrics(before, after, delta),
+            name="page_metrics" + (" (resource growth)" if flags else ""),
+            attachment_type=allure.attachment_type.TEXT,
+        )
+        if flags:
+            allure.dynamic.tag("resource-growth")
+    except Exception:
+        pass
+
+
+# ═══════════════════════════════════════════════════════════════
+# SESSION SUMMARY (master side)
+# ═══════════════════════════════════════════════════════════════
+
+_PAGE_METRICS: Dict[str, Dict[str, Any]] = {}
+
+
+def collect_page_metrics_report(report) -> None:
+    """在 pytest_runtest_logreport 中调用：收集各用例回传的资源指标。"""
+    for name, value in getattr(report, "user_properties", None) or []:
+        if name == PAGE_METRICS_PROPERTY and isinstance(value, dict):
+            _PAGE_METRICS[report.nodeid] = value
+
+
+def page_metrics_summary_lines(top: int = 5) -> List[str]:
+    if not _PAGE_METRICS:
+        return []
+
+    def heap_mb(v: Dict[str, Any]) -> float:
+        return float((v.get("delta") or {}).get("JSHeapUsedSize", 0.0)) / 1024 / 1024
+
+    def nodes(v: Dict[str, Any]) -> int:
+        return int((v.get("delta") or {}).get("Nodes", 0.0))
+
+    flagged = sorted(((k, v) for k, v in _PAGE_METRICS.items() if v.get("flags")), key=lambda kv: heap_mb(kv[1]), reverse=True)
+    lines = [f"sampled={len(_PAGE_METRICS)} flagged={len(flagged)}"]
+    for nodeid, v in flagged[:top]:
+        lines.append(f"  ⚠ {', '.join(v['flags'])}  {nodeid} ({v.get('page')})")
+
+    by_page: Dict[str, List[Dict[str, Any]]] = {}
+    for v in _PAGE_METRICS.values():
+        by_page.setdefault(str(v.get("page")), []).append(v)
+    ranked = sorted(by_page.items(), key=lambda kv: sum(heap_mb(v) for v in kv[1]) / len(kv[1]), reverse=True)
+    lines.append("avg growth per page:")
+    for page, rows in ranked[:top]:
+        lines.append(
+            f"  {sum(heap_mb(v) for v in rows) / len(rows):+8.2f}MB heap "
+            f"{sum(nodes(v) for v in rows) / len(rows):+8.0f} nodes  n={len(rows):<4} {page}"
+        )
+
+    by_worker: Dict[str, List[Dict[str, Any]]] = {}
+    for v in _PAGE_METRICS.values():
+        by_worker.setdefault(str(v.get("worker")), []).append(v)
+    for worker, rows in sorted(by_worker.items()):
+        rows.sort(key=lambda v: int(v.get("seq") or 0))
+        half = len(rows) // 2
+        if half == 0:
+            continue
+
+        def script_ms(chunk: List[Dict[str, Any]]) -> float:
+            return sum(float((v.get("delta") or {}).get("ScriptDuration", 0.0)) for v in chunk) / len(chunk) * 1000
+
+        lines.append(
+            f"{worker}: heap {rows[0]['heap_after'] / 1024 / 1024:.1f}MB -> {rows[-1]['heap_after'] / 1024 / 1024:.1f}MB, "
+            f"script/test {script_ms(rows[:half]):.0f}ms (1st half) -> {script_ms(rows[half:]):.0f}ms (2nd half)"
+        )
+    return lines
@@ -0,0 +1,196 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Fixtures - Next-test prefetch (pipelining per worker)
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - 每个用例串行经历：new_context + storage_state → 首次 navigate()（前端 bundle/接口/渲染）→ 用例 → close
+# - 首次导航通常是秒级，占小用例总耗时的大头，而这段时间 Python 侧只是在等浏览器
+#
+# 方案（PREFETCH_NEXT=1 或 test.prefetch_next: true 开启，默认关闭）：
+# - pytest_runtest_protocol 拿到本 worker 的下一个用例（nextitem）
+# - 当前用例的 auth_page/unauth_page 就绪后，为下一个用例提前开好同类 context/页面（含 route/HAR 安装），
+#   并在浏览器侧发起导航（location.href = URL，不等待）；浏览器加载下一页的同时当前用例继续执行
+# - 下一个用例打开页面时直接领取预取的 context；其 Page Object 的 goto() 发现目标 URL 已在导航中，
+#   只等 commit + 就绪判断，不再重复导航
+#
+# 目标 URL 的确定：
+# - @pytest.mark.prefetch_url("/admin/users")（相对路径拼 frontend base_url）
+# - 否则：用例模块里恰好只有一个带 URL 的 BasePage 子类（生成的用例即如此）时取其 URL
+# - 都没有则不预取
+#
+# 说明：
+# - sync API 不能跨线程驱动 Playwright，context 创建仍是当前线程上的一次短调用；并行的是导航本身（浏览器侧）
+# - 下一用例是 mutate（会改服务端数据）时不预取：其 setup 的数据准备必须发生在页面加载之前
+# - 当前用例是 mutate 时同样不预取：预取在当前用例主体执行前发起，下一页会加载到改动之前的数据
+# - 下一用例依赖框架之外的 function 级 fixture（数据准备、账号分配等，定义在 tests/ 的 conftest 或用例模块里）时不预取：
+#   预取发生在这些 fixture 执行之前，页面会展示准备之前的数据（has_test_setup_fixtures）
+# - 未被领取的预取（用例被跳过/选择器变化）在下一次预取或 session 结束时丢弃
+#
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import pytest
+
+from core.base_page import PREFETCHED_URL_ATTR
+from core.fixture.shared import config, logger
+from utils.context_routes import install_context_routes
+from utils.har_replay import install_har
+
+_NEXT_ITEM_KEY = pytest.StashKey[Any]()
+_TRUE_VALUES = {"1", "true", "True", "yes", "YES"}
+_PAGE_KINDS = (("auth_page", "auth"), ("unauth_page", "unauth"))
+# 这些模块里的 fixture 属于框架/pytest 自身（页面、登录态、tmp_path 等），不会改变页面要展示的数据
+_FRAMEWORK_FIXTURE_MODULES = ("core.", "_pytest.", "pytest_", "allure_pytest")
+
+
+def prefetch_enabled() -> bool:
+    raw = os.getenv("PREFETCH_NEXT")
+    if raw is None:
+        raw = str(config.get("test.prefetch_next", False) or "")
+    return raw.strip() in _TRUE_VALUES
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item, nextitem):
+    """记录本 worker 的下一个用例（xdist 下同样由 worker 调用，nextitem 即该 worker 的下一个）。"""
+    item.stash[_NEXT_ITEM_KEY] = nextitem
+
+
+def next_item_of(item):
+    return item.stash.get(_NEXT_ITEM_KEY, None)
+
+
+def page_kind_of(item) -> Optional[str]:
+    names = set(getattr(item, "fixturenames", []) or [])
+    for fixture_name, kind in _PAGE_KINDS:
+        if fixture_name in names:
+            return kind
+    return None
+
+
+def has_test_setup_fixtures(item) -> bool:
+    """item 是否依赖框架之外的 function 级 fixture（它们必须在页面加载之前执行）。"""
+    defs_by_name = getattr(getattr(item, "_fixtureinfo", None), "name2fixturedefs", None)
+    if not isinstance(defs_by_name, dict):
+        return False
+    for defs in defs_by_name.values():
+        if not defs or defs[-1].scope != "function":
+            continue
+        module = getattr(defs[-1].func, "__module__", "") or ""
+        if not module.startswith(_FRAMEWORK_FIXTURE_MODULES):
+            return True
+    return False
+
+
+def prefetch_url_of(item) -> Optional[str]:
+    """下一个用例首次导航的目标 URL（见模块说明），确定不了返回 None。"""
+    marker = item.get_closest_marker("prefetch_url")
+    path = str(marker.args[0]) if marker and marker.args else None
+    if path is None:
+        from core.base_page import BaseDialog, BasePage
+
+        module = getattr(item, "module", None)
+        urls = {
+            obj.URL
+            for obj in vars(module).values()
+            if isinstance(obj, type)
+            and issubclass(obj, BasePage)
+            and obj not in (BasePage, BaseDialog)
+            and not issubclass(obj, BaseDialog)
+            and (getattr(obj, "URL", "/") or "/") != "/"
+        } if module is not None else set()
+        if len(urls) != 1:
+            return None
+        path = urls.pop()
+    if path.startswith("http"):
+        return path
+    base = (config.get_service_url("frontend") or "").rstrip("/")
+    return f"{base}{path}" if base else None
+
+
+@dataclass
+class _Prefetched:
+    nodeid: str
+    kind: str
+    state_path: Optional[str]
+    url: str
+    ctx: Any
+    page: Any
+
+
+class Prefetcher:
+    """每个 worker 一个，最多持有一个预取槽位（下一个用例）。"""
+
+    def __init__(self) -> None:
+        self._slot: Optional[_Prefetched] = None
+        self.hits = 0
+        self.misses = 0
+
+    def schedule(
+        self, next_item, *, open_context, release_context, state_path: Optional[str], current_item=None
+    ) -> None:
+        """
+        为 next_item 预开 context 并发起导航（不等待）。
+        open_context(kind, state_path) -> (ctx, page)；release_context(ctx) 用于丢弃未领取的预取。
+        current_item（发起预取的当前用例）或 next_item 是 mutate、next_item 有自己的数据准备 fixture 时不预取。
+        """
+        self.discard(release_context)
+        if next_item is None or any(
+            item is not None and item.get_closest_marker("mutate") is not None for item in (current_item, next_item)
+        ):
+            return
+        if has_test_setup_fixtures(next_item):
+            return
+        kind = page_kind_of(next_item)
+        if kind is None or (kind == "auth" and not state_path):
+            return
+        url = prefetch_url_of(next_item)
+        if not url:
+            return
+        ctx = None
+        try:
+            ctx, page = open_context(kind, state_path if kind == "auth" else None)
+            install_context_routes(ctx)
+            install_har(ctx, next_item.nodeid)
+            # 浏览器侧发起导航后立即返回；不用 page.goto（会阻塞到 commit）
+            page.evaluate("(url) => { window.location.href = url; }", url)
+        except Exception as e:
+            logger.debug(f"prefetch 失败（已忽略）: {next_item.nodeid} {type(e).__name__}: {e}")
+            if ctx is not None:
+                release_context(ctx)
+            return
+        self._slot = _Prefetched(next_item.nodeid, kind, state_path if kind == "auth" else None, url, ctx, page)
+        logger.debug(f"⏩ 已预取下一个用例页面: {next_item.nodeid} -> {url}")
+
+    def claim(self, nodeid: str, kind: str, state_path: Optional[str]):
+        """领取为 nodeid 预取的 (ctx, page)；不匹配返回 None（槽位保留给 discard 处理）。"""
+        slot = self._slot
+        if slot is None or slot.nodeid != nodeid or slot.kind != kind or slot.state_path != state_path:
+            return None
+        self._slot = None
+        self.hits += 1
+        setattr(slot.page, PREFETCHED_URL_ATTR, slot.url)
+        return slot.ctx, slot.page
+
+    def discard(self, release_context) -> None:
+        slot, self._slot = self._slot, None
+        if slot is None:
+            return
+        self.misses += 1
+        try:
+            release_context(slot.ctx)
+        except Exception:
+            pass
+
+
+_PREFETCHER = Prefetcher()
+
+
+def get_prefetcher() -> Prefetcher:
+    return _PREFETCHER
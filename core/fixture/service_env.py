@@ -8,12 +8,13 @@ from __future__ import annotations
 
 import os
 import shutil
-import time
 from pathlib import Path
 
 import pytest
 
 from core.fixture.shared import config, logger, _is_tcp_open
+from utils.artifact_trash import purge_trash_async, reset_directory
+from utils.session_barrier import SessionBarrier
 
 
 @pytest.fixture(scope="session")
@@ -38,10 +39,8 @@ def ensure_services_running(service_checker):
         logger.info("服务健康检查已禁用")
         return
 
-    report = service_checker.get_status_report()
-    print(report)
-
     results = service_checker.check_all_services()
+    print(service_checker.get_status_report())
     failed = [name for name, (ok, _) in results.items() if not ok]
 
     if failed:
@@ -54,8 +53,9 @@ def setup_test_environment():
     # xdist 并发下：每个 worker 都会执行 session 级 fixture。
     # 如果每个 worker 都 rm -rf allure-results/screenshots，会互相踩踏，导致进度卡住/报告丢失。
     worker = os.getenv("PYTEST_XDIST_WORKER")  # e.g. gw0/gw1/...；非 xdist 时为 None
-    is_primary_worker = (worker is None) or (worker == "gw0")
-    ready_flag = Path(".tmp_env_ready")
+    # 第一个到达的 worker 负责清场 + 预检，完成后放行其它 worker；它失败/崩溃时其它 worker 直接报错
+    # （不固定 gw0：用例数少于 worker 数时 gw0 可能分不到用例、永远不会执行本 fixture；见 utils/session_barrier.py）
+    env_ready = SessionBarrier("env_ready")
 
     # APPEND_ALLURE_RESULTS=1：追加模式（允许“分段跑”后汇总一个报告）
     # - 不清空 allure-results / screenshots / allure-report
@@ -67,10 +67,6 @@ def setup_test_environment():
     #   KEEP_ALLURE_HISTORY=1
     keep_history = os.getenv("KEEP_ALLURE_HISTORY", "").strip() in {"1", "true", "True", "yes", "YES"}
 
-    allure_results = Path("allure-results")
-    allure_report = Path("allure-report")
-    screenshots = Path("screenshots")
-
     history_tmp: Path = Path(".tmp_allure_history")
     if append_results:
         # 追加模式：只确保目录存在，不做清理/等待
@@ -81,14 +77,41 @@ def setup_test_environment():
         yield
         return
 
-    if is_primary_worker:
-        # primary worker 负责“清场”
-        try:
-            if ready_flag.exists():
-                ready_flag.unlink()
-        except Exception:
-            pass
+    if worker is None:
+        # 单进程：总是 leader（ppid 形式的 run id 可能与同一 shell 里上一次运行相同，不能靠状态文件选举）
+        env_ready.begin()
+        is_primary_worker = True
+    else:
+        is_primary_worker = env_ready.try_begin()
+    try:
+        _prepare_environment(env_ready, is_primary_worker, keep_history, history_tmp)
+    except BaseException as e:
+        # leader 出错（含 pytest.exit）：先把原因告诉 follower，再原样抛出（follower 侧 fail 为 no-op）
+        env_ready.fail(f"{type(e).__name__}: {e}")
+        raise
+
+    logger.info("=" * 60)
+    logger.info("🚀 测试环境初始化完成")
+    logger.info(f"   环境: {config.get_environment()}")
+    logger.info(f"   前端: {config.get_service_url('frontend')}")
+    logger.info(f"   后端: {config.get_service_url('backend')}")
+    logger.info("=" * 60)
+
+    yield
+
+    logger.info("=" * 60)
+    logger.info("🏁 测试执行完成")
+    logger.info("=" * 60)
 
+
+def _prepare_environment(env_ready: SessionBarrier, is_primary_worker: bool, keep_history: bool, history_tmp: Path) -> None:
+    """leader：清场 + 预检后放行其它 worker；follower：等待 leader 完成。"""
+    allure_results = Path("allure-results")
+    allure_report = Path("allure-report")
+    screenshots = Path("screenshots")
+
+    if is_primary_worker:
+        # primary worker 负责“清场”（begin/try_begin 已持有 leader 锁）
         if keep_history and (allure_results / "history").exists():
             history_tmp.mkdir(parents=True, exist_ok=True)
             # 保存一份 history，避免 rm -rf 直接丢失趋势
@@ -96,16 +119,14 @@ def setup_test_environment():
             shutil.copytree(allure_results / "history", history_tmp)
 
         # 仅 primary worker 清理目录，避免并发互删
-        shutil.rmtree(allure_results, ignore_errors=True)
-        shutil.rmtree(allure_report, ignore_errors=True)
-        shutil.rmtree(screenshots, ignore_errors=True)
+        # 旧目录 rename 进 trash 后由后台进程删除：耗时与上次运行的产物大小无关（见 utils/artifact_trash.py）
+        reset_directory(allure_results)
+        reset_directory(allure_report, recreate=False)
+        reset_directory(screenshots)
+        purge_trash_async()
     else:
-        # 非 primary worker 等待清场完成，避免“别人刚写入 allure-results 又被 gw0 删掉”
-        deadline = time.time() + 60
-        while time.time() < deadline:
-            if ready_flag.exists():
-                break
-            time.sleep(0.2)
+        # 非 primary worker 等待清场 + 预检完成，避免“别人刚写入 allure-results 又被 leader 删掉”
+        env_ready.wait()
 
     # 重建目录
     os.makedirs("reports", exist_ok=True)
@@ -145,11 +166,20 @@ def setup_test_environment():
                     checker = ServiceChecker()
                     if checker.is_enabled():
                         results = checker.check_all_services()
-                        failed = [(name, reason) for name, (ok, reason) in results.items() if not ok]
-                        if failed:
+                        logger.info(
+                            "🩺 服务健康检查: "
+                            + ", ".join(f"{name}={'OK' if ok else 'FAIL'} ({reason})" for name, (ok, reason) in results.items())
+                        )
+                        # 只有必需服务（health_check.required，为空 = 全部）自己确定失败才 fail-fast；
+                        # 可选服务失败、因提前结束而 aborted 的探测只告警
+                        blocking = checker.blocking_failures()
+                        for probe in checker.last_probes.values():
+                            if not probe.ok and probe not in blocking:
+                                logger.warning(f"服务健康检查未通过（不阻塞运行）: {probe.name} ({probe.summary()}) url={probe.url}")
+                        if blocking:
                             lines = ["服务健康检查失败（fail-fast）："]
-                            for name, reason in failed:
-                                lines.append(f"- {name}: FAIL ({reason}) url={checker.config.get_health_check_url(name)}")
+                            for probe in blocking:
+                                lines.append(f"- {probe.name}: FAIL ({probe.summary()}) url={probe.url}")
                             lines.append("提示：这通常会导致 Page.goto 长时间超时。请先恢复服务，再运行用例。")
                             lines.append("如确需跳过该检查：设置 PRECHECK_HTTP=0。")
                             pytest.exit("\n".join(lines), returncode=2)
@@ -209,22 +239,6 @@ def setup_test_environment():
             shutil.rmtree(history_tmp, ignore_errors=True)
 
         # 发出“环境就绪”信号
-        try:
-            ready_flag.write_text("ready", encoding="utf-8")
-        except Exception:
-            pass
-
-    logger.info("=" * 60)
-    logger.info("🚀 测试环境初始化完成")
-    logger.info(f"   环境: {config.get_environment()}")
-    logger.info(f"   前端: {config.get_service_url('frontend')}")
-    logger.info(f"   后端: {config.get_service_url('backend')}")
-    logger.info("=" * 60)
-
-    yield
-
-    logger.info("=" * 60)
-    logger.info("🏁 测试执行完成")
-    logger.info("=" * 60)
+        env_ready.complete()
 
 
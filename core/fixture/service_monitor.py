@@ -0,0 +1,298 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Fixtures - Background service monitor (outage guard)
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - setup_test_environment 的健康检查只在 session 开始时跑一次
+# - 运行中后端重启/挂掉时，后续几十个用例各自耗满 60s goto 超时再失败，报告里全是“误报”
+#
+# 方案（SERVICE_MONITOR=1 或 health_check.monitor.enabled: true 开启，默认关闭）：
+# - 每个 worker 一个后台线程（首个用例 setup 时启动），按 interval 周期探测各服务健康检查 URL（单次探测，不重试）
+#     连续 down_after 次失败 -> 判定 DOWN；一次成功 -> 恢复 UP
+#     有服务 DOWN 时探测间隔缩短到 1s，以便尽快发现恢复
+# - pytest_runtest_setup（早于所有 fixture）在每个用例开始前查看状态：
+#     必需服务（health_check.required，为空=全部）DOWN 时最多等待 wait 秒恢复
+#     仍未恢复 -> 按 on_outage 标记为 skip（默认）或 xfail，原因前缀 "environment outage"，
+#     Allure tag environment-outage；不再进入页面 fixture 去等 goto 超时
+# - 用例失败时把当时的服务状态附加到 Allure（service_state），并写入 report.user_properties，
+#   master 在 terminal summary 里统计“失败时有服务 DOWN”的用例
+#
+#   health_check:
+#     monitor:
+#       enabled: false
+#       interval: 5          # 正常探测间隔（秒）
+#       probe_timeout: 3     # 单次探测超时（秒）
+#       down_after: 2        # 连续失败几次判定 DOWN（避免偶发抖动）
+#       wait: 30             # 用例开始前最多等待恢复的秒数
+#       on_outage: "skip"    # skip | xfail
+#
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from core.fixture.shared import config, logger
+
+SERVICE_STATE_PROPERTY = "pts_service_state"
+OUTAGE_OUTCOMES = ("skip", "xfail")
+
+_TRUE_VALUES = {"1", "true", "True", "yes", "YES"}
+_OUTAGE_INTERVAL_S = 1.0
+
+
+def monitor_enabled() -> bool:
+    raw = os.getenv("SERVICE_MONITOR")
+    if raw is None:
+        raw = str(config.get("health_check.monitor.enabled", False) or "")
+    return raw.strip() in _TRUE_VALUES
+
+
+def _float_setting(key: str, default: float) -> float:
+    try:
+        return max(float(config.get(key, default)), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass
+class ServiceState:
+    name: str
+    up: bool = True
+    reason: str = "not probed"
+    since: float = 0.0
+    checked_at: float = 0.0
+    latency_ms: float = 0.0
+    consecutive_failures: int = 0
+
+    def describe(self, now: Optional[float] = None) -> str:
+        now = time.time() if now is None else now
+        status = "UP" if self.up else f"DOWN for {max(now - self.since, 0):.0f}s"
+        return f"{self.name}: {status} ({self.reason}, latency={self.latency_ms:.0f}ms)"
+
+
+class ServiceMonitor:
+    """
+    后台周期探测服务健康状态（每个 worker 一个实例，见模块说明）。
+
+    probe(name) -> ServiceProbe 由调用方注入，默认使用 ServiceChecker.probe_once。
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        probe,
+        *,
+        interval: float = 5.0,
+        down_after: int = 2,
+        required: Optional[List[str]] = None,
+    ) -> None:
+        self.probe = probe
+        self.interval = interval
+        self.down_after = max(int(down_after), 1)
+        self.required = set(required or []) or set(names)
+        self.states: Dict[str, ServiceState] = {name: ServiceState(name) for name in names}
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ───────────────────────── lifecycle ─────────────────────────
+
+    def start(self) -> None:
+        if self._thread is not None or not self.states:
+            return
+        self._thread = threading.Thread(target=self._run, name="service-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(_OUTAGE_INTERVAL_S if self.down_services() else self.interval)
+
+    def poll(self) -> None:
+        """探测一轮所有服务并更新状态（后台线程调用；测试中可直接调用）。"""
+        for name, state in self.states.items():
+            try:
+                result = self.probe(name)
+                ok, reason, latency = result.ok, result.reason, result.latency_ms
+            except Exception as e:
+                ok, reason, latency = False, f"{type(e).__name__}: {e}", 0.0
+            now = time.time()
+            with self._cond:
+                state.checked_at, state.reason, state.latency_ms = now, reason, latency
+                if ok:
+                    if not state.up:
+                        logger.info(f"✅ 服务已恢复: {name}（中断 {now - state.since:.0f}s）")
+                        state.since = now
+                    state.up, state.consecutive_failures = True, 0
+                else:
+                    state.consecutive_failures += 1
+                    if state.up and state.consecutive_failures >= self.down_after:
+                        logger.warning(f"🚨 服务不可用: {name} ({reason})")
+                        state.up, state.since = False, now
+        with self._cond:
+            self._cond.notify_all()
+
+    # ───────────────────────── queries ─────────────────────────
+
+    def down_services(self, *, required_only: bool = False) -> List[str]:
+        with self._cond:
+            return [
+                name
+                for name, state in self.states.items()
+                if not state.up and (not required_only or name in self.required)
+            ]
+
+    def wait_until_healthy(self, timeout: float) -> bool:
+        """必需服务全部 UP 时立即返回 True；否则最多等待 timeout 秒。"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if not any(not self.states[n].up for n in self.required if n in self.states):
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    return False
+                self._cond.wait(remaining)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._cond:
+            return {
+                name: {"up": s.up, "reason": s.reason, "since": s.since, "checked_at": s.checked_at}
+                for name, s in self.states.items()
+            }
+
+    def describe(self) -> str:
+        now = time.time()
+        with self._cond:
+            return "\n".join(state.describe(now) for state in self.states.values())
+
+
+_MONITOR: Dict[str, Optional[ServiceMonitor]] = {"instance": None}
+_MONITOR_LOCK = threading.Lock()
+
+
+def _build_monitor() -> ServiceMonitor:
+    from utils.service_checker import ServiceChecker
+
+    checker = ServiceChecker()
+    timeout_s = _float_setting("health_check.monitor.probe_timeout", 3.0) or 3.0
+    return ServiceMonitor(
+        list(config.get_all_services().keys()),
+        lambda name: checker.probe_once(name, timeout_s=timeout_s),
+        interval=_float_setting("health_check.monitor.interval", 5.0) or 5.0,
+        down_after=int(_float_setting("health_check.monitor.down_after", 2) or 2),
+        required=list(config.get("health_check.required", []) or []),
+    )
+
+
+def get_service_monitor() -> Optional[ServiceMonitor]:
+    """本 worker 的监控实例（首次调用时启动后台线程）；未开启时返回 None。"""
+    if not monitor_enabled():
+        return None
+    with _MONITOR_LOCK:
+        if _MONITOR["instance"] is None:
+            monitor = _build_monitor()
+            monitor.start()
+            atexit.register(monitor.stop)
+            _MONITOR["instance"] = monitor
+            logger.info(f"🩺 后台服务监控已启动: {', '.join(monitor.states)} (interval={monitor.interval}s)")
+        return _MONITOR["instance"]
+
+
+def _on_outage_outcome() -> str:
+    outcome = str(config.get("health_check.monitor.on_outage", "skip") or "skip").strip().lower()
+    return outcome if outcome in OUTAGE_OUTCOMES else "skip"
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """
+    用例 setup 之前（早于所有 fixture，包括页面 fixture）检查服务状态：
+    必需服务 DOWN 时等待恢复，仍未恢复则标记为 environment outage。
+    """
+    monitor = get_service_monitor()
+    if monitor is None or not monitor.down_services(required_only=True):
+        return
+    wait_s = _float_setting("health_check.monitor.wait", 30.0)
+    logger.warning(f"⏸️ 服务中断，等待恢复（最多 {wait_s:.0f}s）: {item.nodeid}")
+    if monitor.wait_until_healthy(wait_s):
+        return
+    reason = f"environment outage: {', '.join(monitor.down_services(required_only=True))} down"
+    item.user_properties.append((SERVICE_STATE_PROPERTY, {"outage": True, "services": monitor.snapshot()}))
+    try:
+        import allure  # type: ignore
+
+        allure.dynamic.tag("environment-outage")
+        allure.attach(monitor.describe(), name="service_state", attachment_type=allure.attachment_type.TEXT)
+    except Exception:
+        pass
+    if _on_outage_outcome() == "xfail":
+        pytest.xfail(reason)
+    pytest.skip(reason)
+
+
+@pytest.fixture(scope="function", autouse=True)
+def service_state_on_failure(request):
+    """用例失败时附加当时的服务状态（SERVICE_MONITOR=1 时生效）。"""
+    yield
+
+    rep = getattr(request.node, "rep_call", None)
+    monitor = _MONITOR["instance"]
+    if monitor is None or not (rep and rep.failed):
+        return
+    down = monitor.down_services()
+    request.node.user_properties.append((SERVICE_STATE_PROPERTY, {"outage": False, "down": down, "services": monitor.snapshot()}))
+    if down:
+        logger.warning(f"⚠️ 用例失败时有服务不可用: {', '.join(down)}（{request.node.nodeid}）")
+    try:
+        import allure  # type: ignore
+
+        allure.attach(monitor.describe(), name="service_state", attachment_type=allure.attachment_type.TEXT)
+        if down:
+            allure.dynamic.tag("service-down-during-failure")
+    except Exception:
+        pass
+
+
+# ═══════════════════════════════════════════════════════════════
+# SESSION SUMMARY (master side)
+# ═══════════════════════════════════════════════════════════════
+
+_OUTAGE_REPORTS: Dict[str, Dict[str, Any]] = {}
+
+
+def collect_service_state_report(report) -> None:
+    """在 pytest_runtest_logreport 中调用：收集 outage 用例 / 失败时的服务状态。"""
+    for name, value in getattr(report, "user_properties", None) or []:
+        if name == SERVICE_STATE_PROPERTY and isinstance(value, dict):
+            _OUTAGE_REPORTS[report.nodeid] = value
+
+
+def service_outage_summary_lines(top: int = 10) -> List[str]:
+    outage = sorted(k for k, v in _OUTAGE_REPORTS.items() if v.get("outage"))
+    failed_while_down = sorted(k for k, v in _OUTAGE_REPORTS.items() if not v.get("outage") and v.get("down"))
+    if not outage and not failed_while_down:
+        return []
+    lines = [f"environment outage (not run): {len(outage)}  failed while a service was down: {len(failed_while_down)}"]
+    for nodeid in outage[:top]:
+        lines.append(f"  ⏸ {nodeid}")
+    for nodeid in failed_while_down[:top]:
+        lines.append(f"  ⚠ {nodeid} (down: {', '.join(_OUTAGE_REPORTS[nodeid]['down'])})")
+    return lines
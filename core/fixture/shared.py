@@ -27,6 +27,23 @@ data_manager = DataManager()
 _WORKER_SESSION_ACCOUNT = {}
 
 
+# 诊断类 autouse fixture 查找“本用例使用的页面”时依次尝试的 fixture 名
+TEST_PAGE_FIXTURES = ("page", "test_page", "logged_in_page", "auth_page", "unauth_page")
+
+
+def resolve_test_page(request, names=TEST_PAGE_FIXTURES):
+    """返回用例显式依赖的第一个页面 fixture 值；没有依赖页面时返回 None（不会额外创建页面）。"""
+    wanted = set(getattr(request, "fixturenames", []) or [])
+    for name in names:
+        if name not in wanted:
+            continue
+        try:
+            return request.getfixturevalue(name)
+        except Exception:
+            continue
+    return None
+
+
 # ═══════════════════════════════════════════════════════════════
 # DIAGNOSTICS - Cookie oversize (iron-session etc.)
 # ═══════════════════════════════════════════════════════════════
@@ -0,0 +1,313 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Fixtures - Playwright tracing policy (per test chunk)
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - 之前 auth_page/unauth_page 对每个用例无条件 tracing.start(screenshots+snapshots+sources)，
+#   但只有失败用例才会用到 trace，通过的用例白白承担 CPU/内存/磁盘开销
+#
+# 模式（TRACE_MODE，默认 on-failure）：
+# - off         不录制
+# - on-failure  每个用例录一个 chunk；通过则 stop_chunk() 丢弃（不写 zip），失败才落盘
+# - first-retry 仅在第一次重试（pytest-rerunfailures execution_count == 2）时录制并保留
+# - always      每个用例都录制并保留
+#
+# 其它开关：
+# - TRACE_MAX_MB=100        单用例 trace 体积上限（0 = 不限制）。注意是事后丢弃：Playwright 不提供录制中的体积信息，
+#                           只能在 stop_chunk 写出 zip 后检查，超出则删除并附说明；它限制的是留存的磁盘/报告体积，
+#                           不限制录制期间的内存与写盘 I/O
+# - TRACE_SCREENSHOTS / TRACE_SNAPSHOTS / TRACE_SOURCES = 0  关闭对应录制项：这才是缩小录制期间内存窗口的手段
+#   （录制内容按 chunk 划分，每个用例结束即 stop_chunk，窗口上限是单个用例）
+#
+# 落盘位置：
+# - allure 插件启用时 stop_chunk 直接写到 allure-results/<uuid>-attachment.zip 并登记为附件（不再 attach.file 复制一份），
+#   reports/<test_id>.zip 是指向同一文件的硬链接；未启用 allure 时仍写 reports/ 下
+# - 登记附件失败时把 zip 移到 reports/<test_id>.zip 再 attach_trace（不在 allure-results 留下未登记的孤儿文件）
+# - Playwright trace zip 本身已 deflate 压缩，不再二次压缩；体积仍由 TRACE_MAX_MB 约束
+#
+# 开销统计：
+# - 每个用例把 tracing 调用耗时/字节数写进 report.user_properties（xdist 下可回传 master）
+# - master 在 terminal summary 汇总，并与 TRACE_MODE=off 时落盘的基线（reports/trace_baseline.json）对比；
+#   用例耗时由根 conftest 统一采集后传入 trace_summary_lines（本模块只收集 tracing 自身的统计）
+#
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from core.fixture.shared import config, logger
+from utils.allure_attach import link_alias, open_attachment_slot
+
+TRACE_MODES = ("off", "on-failure", "first-retry", "always")
+TRACE_PROPERTY = "pts_trace"
+TRACE_BASELINE_PATH = Path("reports") / "trace_baseline.json"
+
+_TRACE_HANDLE_KEY = pytest.StashKey["TraceHandle"]()
+# 已 tracing.start 过的 context（池化复用的 context 之后只需 start_chunk）；context 回收后自动移除
+_STARTED_CONTEXTS: "weakref.WeakSet[Any]" = weakref.WeakSet()
+_FALSE_VALUES = {"0", "false", "False", "no", "NO"}
+
+
+def trace_mode() -> str:
+    raw = (os.getenv("TRACE_MODE") or config.get("test.trace_mode", "on-failure") or "on-failure").strip().lower()
+    if raw not in TRACE_MODES:
+        logger.warning(f"未知 TRACE_MODE={raw!r}，回退为 on-failure")
+        return "on-failure"
+    return raw
+
+
+def _trace_start_kwargs() -> Dict[str, bool]:
+    return {
+        "screenshots": os.getenv("TRACE_SCREENSHOTS", "").strip() not in _FALSE_VALUES,
+        "snapshots": os.getenv("TRACE_SNAPSHOTS", "").strip() not in _FALSE_VALUES,
+        "sources": os.getenv("TRACE_SOURCES", "").strip() not in _FALSE_VALUES,
+    }
+
+
+def _max_trace_bytes() -> int:
+    try:
+        return int(float(os.getenv("TRACE_MAX_MB", "100") or "100") * 1024 * 1024)
+    except ValueError:
+        return 100 * 1024 * 1024
+
+
+def _should_record(mode: str, item) -> bool:
+    if mode == "off":
+        return False
+    if mode == "first-retry":
+        return int(getattr(item, "execution_count", 1) or 1) == 2
+    return True
+
+
+@dataclass
+class TraceHandle:
+    ctx: Any
+    mode: str
+    overhead_s: float = 0.0
+    done: bool = False
+    kept: bool = False
+    bytes: int = 0
+
+
+# ═══════════════════════════════════════════════════════════════
+# PER-TEST LIFECYCLE
+# ═══════════════════════════════════════════════════════════════
+
+def begin_trace(ctx, item) -> Optional[TraceHandle]:
+    """
+    为当前用例开启一个 trace chunk。
+
+    说明：
+    - context 首次录制走 tracing.start（隐式开启首个 chunk），复用池里的 context 之后只 start_chunk
+    - 录制失败永远不影响用例主流程
+    """
+    mode = trace_mode()
+    if not _should_record(mode, item):
+        return None
+    t0 = time.perf_counter()
+    try:
+        if ctx in _STARTED_CONTEXTS:
+            ctx.tracing.start_chunk()
+        else:
+            ctx.tracing.start(**_trace_start_kwargs())
+            _STARTED_CONTEXTS.add(ctx)
+    except Exception as e:
+        logger.debug(f"tracing start 失败（已忽略）: {type(e).__name__}: {e}")
+        return None
+    handle = TraceHandle(ctx=ctx, mode=mode, overhead_s=time.perf_counter() - t0)
+    item.stash[_TRACE_HANDLE_KEY] = handle
+    return handle
+
+
+def _trace_slot():
+    try:
+        import allure  # type: ignore
+    except Exception:
+        return None
+    return open_attachment_slot("playwright_trace", allure.attachment_type.ZIP)
+
+
+def end_trace(item, *, keep: bool, path: Optional[Path] = None, attach: bool = False) -> Optional[Path]:
+    """
+    结束当前用例的 trace chunk。
+
+    - keep=False：stop_chunk() 不带 path，Playwright 直接丢弃录制内容（不写 zip）
+    - keep=True：写入 path，并按 TRACE_MAX_MB 做体积上限检查
+    - attach=True：直接写进 allure-results 并登记为附件，path 为指向它的硬链接（见模块说明）；
+      allure 不可用时写 path 后回退 attach_trace
+    返回最终保留的 trace 路径（未保留返回 None）。重复调用为 no-op。
+    """
+    handle = item.stash.get(_TRACE_HANDLE_KEY, None)
+    if handle is None or handle.done:
+        return None
+    handle.done = True
+    slot = _trace_slot() if keep and attach else None
+    target = slot.path if slot is not None else path
+    t0 = time.perf_counter()
+    out: Optional[Path] = None
+    try:
+        if keep and target is not None:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            handle.ctx.tracing.stop_chunk(path=str(target))
+            out = target if target.exists() else None
+        else:
+            handle.ctx.tracing.stop_chunk()
+    except Exception as e:
+        logger.debug(f"tracing stop 失败（已忽略）: {type(e).__name__}: {e}")
+        out = None
+    handle.overhead_s += time.perf_counter() - t0
+
+    if out is not None:
+        size = out.stat().st_size
+        cap = _max_trace_bytes()
+        if cap > 0 and size > cap:
+            logger.warning(f"trace 超出体积上限，已丢弃: {out} size={size} cap={cap}")
+            try:
+                out.unlink()
+            except Exception:
+                pass
+            _attach_text(f"trace dropped: size={size} bytes > TRACE_MAX_MB cap={cap} bytes", "playwright_trace_dropped")
+            out = None
+        else:
+            handle.bytes = size
+            handle.kept = True
+
+    if out is None or not attach:
+        return out
+    if slot is None:
+        attach_trace(out)
+        return out
+    if not slot.register():
+        return _fallback_attach(out, path)
+    if path is not None and link_alias(out, path):
+        return path
+    return out
+
+
+def _fallback_attach(out: Path, path: Optional[Path]) -> Path:
+    """附件登记失败：zip 移出 allure-results（落到 path），再按普通附件 attach_trace。"""
+    if path is not None and path != out:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.replace(out, path)
+            except OSError:
+                shutil.move(str(out), str(path))
+            out = path
+        except Exception as e:
+            logger.debug(f"trace 移出 allure-results 失败（已忽略）: {type(e).__name__}: {e}")
+    attach_trace(out)
+    return out
+
+
+def keep_on_pass() -> bool:
+    """通过的用例是否也保留 trace（always / first-retry）。"""
+    return trace_mode() in {"always", "first-retry"}
+
+
+def record_trace_property(item) -> None:
+    """把本用例的 tracing 开销写进 user_properties（随 teardown report 回传 master）。"""
+    handle = item.stash.get(_TRACE_HANDLE_KEY, None)
+    if handle is None:
+        return
+    item.user_properties.append(
+        (
+            TRACE_PROPERTY,
+            {
+                "mode": handle.mode,
+                "overhead_s": round(handle.overhead_s, 4),
+                "bytes": handle.bytes,
+                "kept": handle.kept,
+            },
+        )
+    )
+
+
+def attach_trace(path: Path) -> None:
+    try:
+        import allure  # type: ignore
+
+        allure.attach.file(str(path), name="playwright_trace", attachment_type=allure.attachment_type.ZIP)
+    except Exception:
+        pass
+
+
+def _attach_text(text: str, name: str) -> None:
+    try:
+        import allure  # type: ignore
+
+        allure.attach(text, name=name, attachment_type=allure.attachment_type.TEXT)
+    except Exception:
+        pass
+
+
+# ═══════════════════════════════════════════════════════════════
+# SESSION SUMMARY (master side)
+# ═══════════════════════════════════════════════════════════════
+
+_TRACE_STATS: Dict[str, Dict[str, Any]] = {}
+
+
+def collect_trace_report(report) -> None:
+    """在 pytest_runtest_logreport 中调用：收集每个用例的 tracing 开销。"""
+    for name, value in getattr(report, "user_properties", None) or []:
+        if name == TRACE_PROPERTY and isinstance(value, dict):
+            _TRACE_STATS[report.nodeid] = value
+
+
+def trace_summary_lines(
+    durations: Dict[str, float], mode: Optional[str] = None, baseline_path: Path = TRACE_BASELINE_PATH
+) -> List[str]:
+    """
+    生成 tracing 开销汇总；durations 为每个用例 setup+call+teardown 总耗时（根 conftest 采集）。
+    TRACE_MODE=off 时把本次耗时写为基线。
+    """
+    mode = mode or trace_mode()
+    if not durations:
+        return []
+
+    if mode == "off":
+        try:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(durations, indent=2), encoding="utf-8")
+        except Exception:
+            return []
+        return [f"TRACE_MODE=off: baseline saved ({len(durations)} tests) -> {baseline_path}"]
+
+    if not _TRACE_STATS:
+        return []
+    traced = len(_TRACE_STATS)
+    kept = sum(1 for v in _TRACE_STATS.values() if v.get("kept"))
+    overhead = sum(float(v.get("overhead_s") or 0.0) for v in _TRACE_STATS.values())
+    total_bytes = sum(int(v.get("bytes") or 0) for v in _TRACE_STATS.values())
+    lines = [
+        f"mode={mode} traced={traced} kept={kept} "
+        f"tracing_api={overhead:.2f}s written={total_bytes / 1024 / 1024:.1f}MB"
+    ]
+
+    try:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    except Exception:
+        baseline = {}
+    common = [k for k in durations if k in baseline]
+    if common:
+        cur = sum(durations[k] for k in common)
+        base = sum(float(baseline[k]) for k in common)
+        pct = ((cur - base) / base * 100.0) if base > 0 else 0.0
+        lines.append(
+            f"vs baseline (TRACE_MODE=off, {len(common)} common tests): {cur:.2f}s vs {base:.2f}s ({pct:+.1f}%)"
+        )
+    else:
+        lines.append(f"no baseline: run once with TRACE_MODE=off to create {baseline_path}")
+    return lines
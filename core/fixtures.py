@@ -14,7 +14,11 @@ from core.fixture.browser import *  # noqa: F403
 from core.fixture.basic_pages import *  # noqa: F403
 from core.fixture.urls_and_data import *  # noqa: F403
 from core.fixture.service_env import *  # noqa: F403
+from core.fixture.service_monitor import *  # noqa: F403
 from core.fixture.auth import *  # noqa: F403
 from core.fixture.artifacts_and_accounts import *  # noqa: F403
+from core.fixture.page_metrics import *  # noqa: F403
+from core.fixture.prefetch import *  # noqa: F403
+from core.fixture.duration_history import *  # noqa: F403
 
 
@@ -8,6 +8,7 @@ BasePage - 所有页面对象的抽象基类
 
 from typing import Optional
 
+from utils.dom_query import FillValues, fill_many
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -78,9 +79,24 @@ class PageActions:
         element.clear()
         element.fill(value)
     
+    def fill_many(self, values: FillValues, timeout: int = 30000) -> None:
+        """
+        批量填写（一次页面脚本完成校验 + 赋值，并派发 input/change 事件）
+        
+        Args:
+            values: 选择器与值的映射；需要真实键盘事件的字段用 FillValue(value, realistic=True)
+            timeout: 回退到逐个 fill / 逐键输入时的超时时间(毫秒)
+            
+        使用方式:
+            self.fill_many({self.USERNAME: "alice", self.CITY: FillValue("Par", realistic=True)})
+        """
+        # 安全：只记录字段数量，不记录值
+        logger.debug(f"批量填写: {len(values)} 个字段")
+        fill_many(self.page, values, timeout=timeout)
+    
     def type_text(self, selector: str, text: str, delay: int = 50) -> None:
         """
-        逐字符输入文本（模拟真实输入）
+        逐字符输入文本（模拟真实输入；普通输入请用 fill / fill_many）
         
         Args:
             selector: 元素选择器
@@ -88,7 +104,7 @@ class PageActions:
             delay: 字符间延迟(毫秒)
         """
         logger.debug(f"逐字符输入: {selector}")
-        self.page.locator(selector).type(text, delay=delay)
+        self.page.locator(selector).press_sequentially(text, delay=delay)
     
     def select_option(self, selector: str, value: str) -> None:
         """
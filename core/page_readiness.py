@@ -0,0 +1,214 @@
+# ═══════════════════════════════════════════════════════════════
+# Playwright Test Scaffold - Adaptive Readiness Waits
+# ═══════════════════════════════════════════════════════════════
+"""
+按页面类学习“就绪耗时”，自适应调整等待策略。
+
+背景：
+- wait_for_page_load 固定等 WAIT_FOR_LOAD_STATE（超时再降级到 indicator），goto 一律 60s 超时
+- 页面卡死要等满一分钟才失败；健康页面也要为最坏情况买单
+
+方案：
+- 每次 goto / wait_for_page_load 记录样本（按页面类 + 环境 TEST_ENV）：
+  - commit_ms   goto 到 commit 的耗时
+  - ready_ms    wait_for_page_load 内部耗时（load_state + indicator）
+  - load_state_timeout  load_state 等待是否超时（超时后仍靠 indicator 成功 = 纯延迟）
+  - skip_failed         每次都记录：跳过 load_state 且 indicator 等待超时记 1，否则记 0
+- 历史落盘：.cache/readiness/<env>.json（每个指标只保留最近 N 个样本；进程退出时在 flock 下合并写入）
+- 开启后（test.adaptive_waits / TEST_ADAPTIVE_WAITS=1）：
+  - 超时 = clamp(p99 * factor, floor, 调用方给定的超时)，只会收紧、不会放宽
+  - 某页面 load_state 经常超时但 indicator 仍然成功，且最近 ADAPTIVE_SKIP_COOLDOWN（默认 20）次加载里
+    没有“跳过后 indicator 超时”时，直接跳过 load_state 等待
+  - 跳过期间每 ADAPTIVE_SKIP_PROBE_EVERY（默认 10）次仍完整等待一次 load_state（探测），load_state_timeout 持续有新样本
+- 样本不足（ADAPTIVE_WAIT_MIN_SAMPLES，默认 10）时沿用原有默认值
+
+说明：
+- 记录永远开启（开销只是内存里追加几个数字），应用策略需显式开启
+- 跳过 load_state 后 indicator 超时会暂停跳过；之后的正常加载不断写入 skip_failed=0，冷却期过后自动恢复跳过
+- 其它异常（断言、页面崩溃、应用报错等）与跳过无关，不计入 skip_failed
+"""
+
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.page_timing import percentile
+from utils.config import ConfigManager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+READINESS_DIR = Path(".cache") / "readiness"
+MAX_SAMPLES = 50
+
+_TRUE_VALUES = {"1", "true", "True", "yes", "YES"}
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+class ReadinessHistory:
+    """
+    某个环境下所有页面类的就绪历史。
+
+    数据结构:
+        {"LoginPage": {"commit_ms": [...], "ready_ms": [...], "load_state_timeout": [0, 1, ...],
+                       "skip_failed": [0, 0, 1, ...]}}
+    """
+
+    def __init__(self, env: str, root: Optional[Path] = None) -> None:
+        self.env = env
+        self.path = Path(root or READINESS_DIR) / f"{env}.json"
+        self.history: Dict[str, Dict[str, List[float]]] = self._load()
+        self.pending: Dict[str, Dict[str, List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, List[float]]]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    # ═══════════════════════════════════════════════════════════════
+    # RECORD
+    # ═══════════════════════════════════════════════════════════════
+
+    def add(self, page_class: str, metric: str, value: float) -> None:
+        with self._lock:
+            for store in (self.history, self.pending):
+                series = store.setdefault(page_class, {}).setdefault(metric, [])
+                series.append(round(float(value), 1))
+                del series[:-MAX_SAMPLES]
+
+    @contextmanager
+    def _file_lock(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(f"{self.path}.lock", "w", encoding="utf-8") as lf:
+            fcntl.flock(lf, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                try:
+                    fcntl.flock(lf, fcntl.LOCK_UN)
+                except Exception:
+                    pass
+
+    def flush(self) -> None:
+        """把本进程新增样本合并进磁盘历史（多 worker 并发安全）。"""
+        with self._lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        try:
+            with self._file_lock():
+                merged = self._load()
+                for page_class, metrics in pending.items():
+                    for metric, values in metrics.items():
+                        series = merged.setdefault(page_class, {}).setdefault(metric, [])
+                        series.extend(values)
+                        del series[:-MAX_SAMPLES]
+                tmp = self.path.with_name(f"{self.path.name}.tmp.{os.getpid()}.{time.time_ns()}")
+                tmp.write_text(json.dumps(merged, separators=(",", ":")), encoding="utf-8")
+                os.replace(tmp, self.path)
+        except Exception as e:
+            logger.debug(f"readiness 历史写入失败（已忽略）: {type(e).__name__}: {e}")
+
+    def series(self, page_class: str, metric: str) -> List[float]:
+        return list((self.history.get(page_class) or {}).get(metric) or [])
+
+
+class ReadinessPolicy:
+    """根据历史给出超时与是否跳过 load_state 的决策。"""
+
+    def __init__(self, history: ReadinessHistory, *, enabled: bool) -> None:
+        self.history = history
+        self.enabled = enabled
+        self.min_samples = int(_env_float("ADAPTIVE_WAIT_MIN_SAMPLES", 10))
+        self.factor = _env_float("ADAPTIVE_WAIT_FACTOR", 3.0)
+        self.floor_ms = _env_float("ADAPTIVE_WAIT_FLOOR_MS", 5000)
+        self.skip_timeout_ratio = _env_float("ADAPTIVE_SKIP_TIMEOUT_RATIO", 0.2)
+        self.skip_cooldown = int(_env_float("ADAPTIVE_SKIP_COOLDOWN", 20))
+        self.probe_every = int(_env_float("ADAPTIVE_SKIP_PROBE_EVERY", 10))
+        self._skip_calls: Dict[str, int] = {}
+
+    def _derived(self, page_class: str, metric: str, default_ms: int) -> int:
+        if not self.enabled:
+            return default_ms
+        samples = self.history.series(page_class, metric)
+        if len(samples) < self.min_samples:
+            return default_ms
+        derived = max(self.floor_ms, percentile(samples, 99) * self.factor)
+        return int(min(default_ms, derived))
+
+    def goto_timeout_ms(self, page_class: str, default_ms: int) -> int:
+        return self._derived(page_class, "commit_ms", default_ms)
+
+    def ready_timeout_ms(self, page_class: str, default_ms: int) -> int:
+        return self._derived(page_class, "ready_ms", default_ms)
+
+    def skip_load_state(self, page_class: str) -> bool:
+        """
+        load_state 等待“只增加延迟、不增加稳定性”时跳过：
+        - 历史样本足够，且 load_state 超时比例 >= ADAPTIVE_SKIP_TIMEOUT_RATIO（超时后仍靠 indicator 成功）
+        - 最近 skip_cooldown 次加载中没有“跳过后 indicator 超时”
+        满足时每 probe_every 次仍返回 False 一次（探测），保证 load_state_timeout 持续采样。
+        """
+        if not self.enabled:
+            return False
+        timeouts = self.history.series(page_class, "load_state_timeout")
+        if len(timeouts) < self.min_samples:
+            return False
+        if sum(timeouts) / len(timeouts) < self.skip_timeout_ratio:
+            return False
+        if any(v >= 1 for v in self.history.series(page_class, "skip_failed")[-self.skip_cooldown:]):
+            return False
+        calls = self._skip_calls[page_class] = self._skip_calls.get(page_class, 0) + 1
+        return self.probe_every <= 0 or calls % self.probe_every != 0
+
+    def observe(
+        self,
+        page_class: str,
+        *,
+        ready_ms: float,
+        ok: bool,
+        load_state_timeout: Optional[bool],
+        skipped: bool,
+        indicator_timeout: bool = False,
+    ) -> None:
+        if ok:
+            self.history.add(page_class, "ready_ms", ready_ms)
+        if load_state_timeout is not None:
+            self.history.add(page_class, "load_state_timeout", 1 if load_state_timeout else 0)
+        # 只有“跳过了 load_state 且 indicator 等待超时”才算跳过导致的失败；其它异常与跳过无关
+        self.history.add(page_class, "skip_failed", 1 if (skipped and not ok and indicator_timeout) else 0)
+
+    def observe_commit(self, page_class: str, commit_ms: float) -> None:
+        self.history.add(page_class, "commit_ms", commit_ms)
+
+
+_POLICY: Optional[ReadinessPolicy] = None
+_POLICY_LOCK = threading.Lock()
+
+
+def get_readiness_policy() -> ReadinessPolicy:
+    """进程级单例（首次使用时按当前环境加载历史，并注册退出时合并写盘）。"""
+    global _POLICY
+    with _POLICY_LOCK:
+        if _POLICY is None:
+            config = ConfigManager()
+            history = ReadinessHistory(config.get_environment())
+            enabled = str(config.get("test.adaptive_waits", False)).strip() in _TRUE_VALUES
+            _POLICY = ReadinessPolicy(history, enabled=enabled)
+            atexit.register(history.flush)
+        return _POLICY
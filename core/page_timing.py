@@ -0,0 +1,230 @@
+# ═══════════════════════════════════════════════════════════════
+# Playwright Test Scaffold - Navigation Timing
+# ═══════════════════════════════════════════════════════════════
+"""
+导航耗时采集（BasePage.goto / wait_for_page_load / refresh）。
+
+背景：
+- goto 超时会重试并截图，但通过的导航耗时完全没有记录
+- 慢用例到底慢在应用（TTFB/DCL/load）还是慢在我们的等待（load_state/indicator），无从判断
+
+方案：
+- Python 侧按阶段打点（相对导航开始的毫秒数）：commit / <load_state> / indicator
+- 导航结束后读取一次浏览器 PerformanceNavigationTiming（ttfb / dcl / load），不额外等待任何事件
+- 每条记录追加到本次运行的 JSONL：reports/nav_timing/<run_id>.<worker>.jsonl
+- 运行结束由 master 汇总：按页面类输出各阶段 p50/p95，并只保留最近 NAV_TIMING_KEEP_RUNS 次运行的文件
+- AsyncBasePage 使用同一计时器（finish_async）
+
+开关：
+- NAV_TIMING=0 关闭采集
+- NAV_TIMING_KEEP_RUNS=20 reports/nav_timing 下保留的运行数（0 = 不清理）
+- 本次运行 id：根 conftest 的 pytest_configure 在 controller 上生成（set_run_id），
+  xdist 下经 pytest_configure_node 写入 workerinput 显式传给各 worker；不读写环境变量
+"""
+
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+NAV_TIMING_DIR = Path("reports") / "nav_timing"
+# xdist workerinput 中传递 run id 的键
+RUN_ID_KEY = "pts_run_id"
+_RUN_ID: Optional[str] = None
+
+_FALSE_VALUES = {"0", "false", "False", "no", "NO"}
+
+
+def new_run_id() -> str:
+    """run id 以时间戳开头（prune_runs 按字典序即时间序），带 pid 避免同一秒内的两次运行撞名。"""
+    return time.strftime("%Y%m%d_%H%M%S") + f"_{os.getpid()}"
+
+
+def set_run_id(run_id: str) -> None:
+    global _RUN_ID
+    _RUN_ID = run_id
+
+
+def get_run_id() -> str:
+    """本次运行 id；未经 pytest_configure 设置时（脚本/生成器直接使用 BasePage）按进程生成一个。"""
+    global _RUN_ID
+    if _RUN_ID is None:
+        _RUN_ID = new_run_id()
+    return _RUN_ID
+
+
+# 只取需要的字段，避免把整个 entry（含 serverTiming 等）序列化回 Python
+_NAV_ENTRY_JS = """() => {
+  const e = performance.getEntriesByType('navigation')[0];
+  if (!e) return null;
+  return {
+    ttfb: e.responseStart,
+    dcl: e.domContentLoadedEventEnd,
+    load: e.loadEventEnd,
+    transfer: e.transferSize,
+    type: e.type,
+  };
+}"""
+
+
+def nav_timing_enabled() -> bool:
+    return os.getenv("NAV_TIMING", "").strip() not in _FALSE_VALUES
+
+
+def percentile(values: List[float], q: float) -> float:
+    """最近秩百分位（q: 0~100）；空列表返回 0。"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, math.ceil(q / 100.0 * len(ordered)) - 1))
+    return float(ordered[k])
+
+
+class NavTimer:
+    """
+    单次导航的阶段计时。
+
+    使用方式:
+        timer = NavTimer("goto", "LoginPage", url)
+        page.goto(url, wait_until="commit"); timer.mark("commit")
+        ...
+        timer.finish(page)
+    """
+
+    def __init__(self, action: str, page_class: str, url: str = "") -> None:
+        self.action = action
+        self.page_class = page_class
+        self.url = url
+        self.t0 = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.done = not nav_timing_enabled()
+
+    def mark(self, phase: str) -> None:
+        self.phases[phase] = round((time.perf_counter() - self.t0) * 1000.0, 1)
+
+    def finish(self, page, *, status: str = "ok") -> Optional[Dict[str, Any]]:
+        """读取浏览器侧 navigation timing 并落盘；重复调用为 no-op。采集失败不影响用例。"""
+        if self.done:
+            return None
+        self.done = True
+        nav = None
+        if status == "ok":
+            try:
+                nav = page.evaluate(_NAV_ENTRY_JS)
+            except Exception:
+                nav = None
+        return self._record(nav, status)
+
+    async def finish_async(self, page, *, status: str = "ok") -> Optional[Dict[str, Any]]:
+        """finish 的 async 版本（playwright.async_api 页面）。"""
+        if self.done:
+            return None
+        self.done = True
+        nav = None
+        if status == "ok":
+            try:
+                nav = await page.evaluate(_NAV_ENTRY_JS)
+            except Exception:
+                nav = None
+        return self._record(nav, status)
+
+    def _record(self, nav: Optional[Dict[str, Any]], status: str) -> Dict[str, Any]:
+        record = {
+            "ts": round(time.time(), 3),
+            "run": get_run_id(),
+            "worker": os.getenv("PYTEST_XDIST_WORKER") or "master",
+            "test": (os.getenv("PYTEST_CURRENT_TEST") or "").rsplit(" ", 1)[0],
+            "page": self.page_class,
+            "action": self.action,
+            "url": self.url,
+            "status": status,
+            "total_ms": round((time.perf_counter() - self.t0) * 1000.0, 1),
+            "phases": self.phases,
+            "nav": {k: round(float(v), 1) for k, v in (nav or {}).items() if isinstance(v, (int, float)) and v > 0},
+        }
+        _append_record(record)
+        return record
+
+
+def _run_file(run_id: Optional[str] = None) -> Path:
+    return NAV_TIMING_DIR / f"{run_id or get_run_id()}.{os.getenv('PYTEST_XDIST_WORKER') or 'master'}.jsonl"
+
+
+def _append_record(record: Dict[str, Any]) -> None:
+    try:
+        path = _run_file()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except Exception as e:
+        logger.debug(f"nav timing 写入失败（已忽略）: {type(e).__name__}: {e}")
+
+
+def load_records(run_id: Optional[str] = None, root: Path = NAV_TIMING_DIR) -> List[Dict[str, Any]]:
+    """读取某次运行（run_id=None 表示本次运行，"*" 表示全部历史）的导航记录。"""
+    pattern = f"{run_id or get_run_id()}.*.jsonl"
+    out: List[Dict[str, Any]] = []
+    for path in sorted(root.glob(pattern)):
+        try:
+            for line in path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    out.append(json.loads(line))
+        except Exception:
+            continue
+    return out
+
+
+def prune_runs(root: Path = NAV_TIMING_DIR, keep: Optional[int] = None) -> int:
+    """只保留最近 keep 次运行（run id 以时间戳开头，按字典序即时间序）的 JSONL；返回删除的文件数。"""
+    if keep is None:
+        try:
+            keep = int(os.getenv("NAV_TIMING_KEEP_RUNS", "") or 20)
+        except ValueError:
+            keep = 20
+    if keep <= 0 or not root.is_dir():
+        return 0
+    files = list(root.glob("*.jsonl"))
+    runs = sorted({p.name.split(".", 1)[0] for p in files})
+    stale = set(runs[:-keep])
+    removed = 0
+    for path in files:
+        if path.name.split(".", 1)[0] in stale:
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def nav_timing_summary_lines(run_id: Optional[str] = None, root: Path = NAV_TIMING_DIR) -> List[str]:
+    """按页面类汇总本次运行各阶段 p50/p95（ms）；顺带清理过旧的运行文件。"""
+    prune_runs(root)
+    records = [r for r in load_records(run_id, root) if r.get("status") == "ok"]
+    if not records:
+        return []
+    by_page: Dict[str, List[Dict[str, Any]]] = {}
+    for r in records:
+        by_page.setdefault(str(r.get("page") or "?"), []).append(r)
+
+    lines = []
+    for page_class, rows in sorted(by_page.items(), key=lambda kv: -percentile([r["total_ms"] for r in kv[1]], 95)):
+        cols = []
+        series: Dict[str, List[float]] = {"total": [float(r["total_ms"]) for r in rows]}
+        for r in rows:
+            for k, v in (r.get("phases") or {}).items():
+                series.setdefault(k, []).append(float(v))
+            for k, v in (r.get("nav") or {}).items():
+                if k in {"ttfb", "dcl", "load"}:
+                    series.setdefault(f"nav.{k}", []).append(float(v))
+        for name, values in series.items():
+            cols.append(f"{name}={percentile(values, 50):.0f}/{percentile(values, 95):.0f}")
+        lines.append(f"{page_class:<32} n={len(rows):<4} " + " ".join(cols))
+    lines.append(f"(p50/p95 ms; records: {root}/{run_id or '*'}.*.jsonl)")
+    return lines
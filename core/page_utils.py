@@ -7,12 +7,24 @@ PageUtils - 页面操作工具类
 """
 
 from playwright.sync_api import Page, Locator
-from typing import Optional, List, Any
-import allure
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Any, Dict, Sequence
+from utils.dom_query import query_locator
 from utils.logger import get_logger
+from utils.screenshot_writer import get_screenshot_writer
 
 logger = get_logger(__name__)
 
+# 按 CSS 选择器一次读取多个表单值；非法 CSS / 未命中 / 非表单元素返回 null，由调用方回退到 input_value
+_FORM_VALUES_JS = """
+(selectors) => selectors.map((sel) => {
+  let el = null;
+  try { el = document.querySelector(sel); } catch (e) { return null; }
+  return el && ('value' in el) && typeof el.value === 'string' ? el.value : null;
+})
+"""
+
 
 class PageUtils:
     """页面操作工具类"""
@@ -132,8 +144,24 @@ class PageUtils:
         Returns:
             List[str]: 属性值列表
         """
-        elements = self.page.locator(selector).all()
-        return [el.get_attribute(attribute) for el in elements]
+        key = f"attr:{attribute}"
+        return [record[key] for record in self.query(selector, [key])]
+    
+    def query(self, selector: str, fields: Sequence[str] = ("text",)) -> List[Dict[str, Any]]:
+        """
+        批量读取所有匹配元素的字段（一次 evaluate_all 往返，与元素数量无关）
+        
+        Args:
+            selector: 元素选择器（支持 Playwright 扩展语法）
+            fields: 字段列表，如 ["text", "value", "attr:href", "visible", "bbox"]（完整列表见 utils.dom_query）
+            
+        Returns:
+            List[Dict]: 每个元素一条记录，key 为字段名；无匹配返回空列表
+            
+        使用方式:
+            rows = utils.query("table tbody tr", ["text", "attr:data-id"])
+        """
+        return query_locator(self.page.locator(selector), fields)
     
     # ═══════════════════════════════════════════════════════════════
     # SCROLL OPERATIONS
@@ -196,22 +224,20 @@ class PageUtils:
             bytes: 截图数据
         """
         try:
-            screenshot_bytes = self.page.screenshot(full_page=full_page)
+            writer = get_screenshot_writer()
+            screenshot_bytes = self.page.screenshot(full_page=full_page, **writer.options.screenshot_kwargs())
             
-            # 保存到文件
-            if file_path:
-                with open(file_path, 'wb') as f:
-                    f.write(screenshot_bytes)
-                logger.debug(f"截图已保存: {file_path}")
-            
-            # 附加到Allure报告
-            if attach_to_allure:
-                allure.attach(
-                    screenshot_bytes,
-                    name=step_name,
-                    attachment_type=allure.attachment_type.PNG
+            # 落盘与 Allure 附件由后台写入器完成：只写一个文件，Allure 附件硬链接到它
+            if file_path or attach_to_allure:
+                target = Path(file_path) if file_path else (
+                    Path("screenshots")
+                    / f"{step_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{writer.options.extension}"
                 )
-                logger.debug(f"截图已附加到Allure: {step_name}")
+                writer.submit(screenshot_bytes, target, name=step_name, attach=attach_to_allure)
+                if file_path:
+                    # 显式指定路径：调用方通常马上读取/断言该文件，返回前等它落盘
+                    writer.wait(target)
+                logger.debug(f"截图已提交写入: {target}")
             
             return screenshot_bytes
         except Exception as e:
@@ -246,7 +272,7 @@ class PageUtils:
     
     def fill_form(self, form_data: dict) -> None:
         """
-        批量填写表单
+        批量填写表单（逐字段 safe_fill，单个字段失败不影响其余字段；一次往返的批量填写见 fill_many）
         
         Args:
             form_data: 字段选择器与值的映射 {"#username": "testuser", "#password": "123456"}
@@ -264,7 +290,17 @@ class PageUtils:
         Returns:
             dict: 选择器与值的映射
         """
-        return {selector: self.page.input_value(selector) for selector in selectors}
+        selectors = list(selectors)
+        try:
+            values = self.page.evaluate(_FORM_VALUES_JS, selectors)
+        except Exception as e:
+            logger.debug(f"批量读取表单值失败，逐个读取: {e}")
+            values = [None] * len(selectors)
+        # 只有 Playwright 扩展选择器 / 尚未渲染的字段才逐个 input_value（保持原有等待语义）
+        return {
+            selector: value if value is not None else self.page.input_value(selector)
+            for selector, value in zip(selectors, values)
+        }
     
     # ═══════════════════════════════════════════════════════════════
     # VALIDATION HELPERS
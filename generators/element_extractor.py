@@ -8,10 +8,19 @@
 from playwright.sync_api import Page
 from typing import List, Optional, Dict
 from generators.page_types import PageElement
+from utils.dom_query import query_locator
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 生成 PageElement 所需的全部字段（一次 evaluate_all 取回）
+_ELEMENT_FIELDS = [
+    "tag", "text",
+    "attr:id", "attr:name", "attr:class", "attr:href", "attr:aria-label", "attr:role", "attr:type",
+    "attr:placeholder", "attr:maxlength", "attr:pattern",
+    "has:required", "has:disabled",
+]
+
 
 class ElementExtractor:
     """元素提取器"""
@@ -64,17 +73,7 @@ class ElementExtractor:
         ]
         
         for selector in input_types:
-            try:
-                locators = page.locator(selector).all()
-                for i, loc in enumerate(locators):
-                    try:
-                        element = self._extract_element_info(loc, "input")
-                        if element:
-                            elements.append(element)
-                    except:
-                        pass
-            except:
-                pass
+            elements.extend(self._query_elements(page, selector, "input"))
         
         return elements
     
@@ -90,103 +89,76 @@ class ElementExtractor:
         ]
         
         for selector in button_selectors:
-            try:
-                locators = page.locator(selector).all()
-                for loc in locators:
-                    try:
-                        element = self._extract_element_info(loc, "button")
-                        if element:
-                            elements.append(element)
-                    except:
-                        pass
-            except:
-                pass
+            elements.extend(self._query_elements(page, selector, "button"))
         
         return elements
     
     def _get_links(self, page: Page) -> List[PageElement]:
         """获取链接元素"""
-        elements = []
-        
-        try:
-            locators = page.locator("a[href]").all()
-            for loc in locators:
-                try:
-                    element = self._extract_element_info(loc, "link")
-                    if element:
-                        elements.append(element)
-                except:
-                    pass
-        except:
-            pass
-        
-        return elements
+        return self._query_elements(page, "a[href]", "link")
     
     def _get_selects(self, page: Page) -> List[PageElement]:
         """获取下拉框元素"""
-        elements = []
-        
+        return self._query_elements(page, "select", "select")
+    
+    def _query_elements(self, page: Page, selector: str, element_type: str) -> List[PageElement]:
+        """一次 evaluate_all 读取 selector 命中的所有元素信息（原先每个元素 10+ 次往返）"""
         try:
-            locators = page.locator("select").all()
-            for loc in locators:
-                try:
-                    element = self._extract_element_info(loc, "select")
-                    if element:
-                        elements.append(element)
-                except:
-                    pass
-        except:
-            pass
-        
+            records = query_locator(page.locator(selector), _ELEMENT_FIELDS)
+        except Exception as e:
+            logger.debug(f"批量查询元素失败: {selector} - {e}")
+            return []
+        elements = []
+        for record in records:
+            element = self._extract_element_info(record, element_type)
+            if element:
+                elements.append(element)
         return elements
     
-    def _extract_element_info(self, locator, element_type: str) -> Optional[PageElement]:
+    def _extract_element_info(self, record: Dict, element_type: str) -> Optional[PageElement]:
         """
         提取元素信息
         
         Args:
-            locator: Playwright定位器
+            record: query_locator 返回的单个元素记录（字段见 _ELEMENT_FIELDS）
             element_type: 元素类型
             
         Returns:
             PageElement: 元素信息
         """
         try:
-            tag = locator.evaluate("el => el.tagName.toLowerCase()")
-            selector = self._build_selector(locator, tag)
-            attributes = self._extract_attributes(locator)
-            
+            tag = record.get("tag") or ""
             return PageElement(
-                selector=selector,
+                selector=self._build_selector(record, tag),
                 tag=tag,
                 type=element_type,
-                text=locator.text_content() or "",
-                placeholder=locator.get_attribute("placeholder") or "",
-                name=locator.get_attribute("name") or "",
-                id=locator.get_attribute("id") or "",
-                role=locator.get_attribute("role") or "",
-                required=locator.get_attribute("required") is not None,
-                disabled=locator.get_attribute("disabled") is not None,
-                attributes=attributes
+                text=record.get("text") or "",
+                placeholder=record.get("attr:placeholder") or "",
+                name=record.get("attr:name") or "",
+                id=record.get("attr:id") or "",
+                role=record.get("attr:role") or "",
+                required=bool(record.get("has:required")),
+                disabled=bool(record.get("has:disabled")),
+                attributes=self._extract_attributes(record),
             )
         except Exception as e:
             logger.debug(f"提取元素信息失败: {e}")
             return None
     
-    def _build_selector(self, locator, tag: str) -> str:
+    def _build_selector(self, record: Dict, tag: str) -> str:
         """构建元素选择器"""
         def _esc(v: str) -> str:
             # CSS attribute selector: keep it simple and safe for single quotes
             return (v or "").replace("\\", "\\\\").replace("'", "\\'")
 
-        element_id = locator.get_attribute("id") or ""
-        element_name = locator.get_attribute("name") or ""
-        element_class = locator.get_attribute("class") or ""
+        element_id = record.get("attr:id") or ""
+        element_name = record.get("attr:name") or ""
+        element_class = record.get("attr:class") or ""
 
-        href = locator.get_attribute("href") or ""
-        aria = locator.get_attribute("aria-label") or ""
-        role = locator.get_attribute("role") or ""
-        typ = locator.get_attribute("type") or ""
+        href = record.get("attr:href") or ""
+        aria = record.get("attr:aria-label") or ""
+        role = record.get("attr:role") or ""
+        typ = record.get("attr:type") or ""
 
         # 优先级：id > 可判定的关键属性（href/aria/type/name）> class > tag
         if element_id:
@@ -217,12 +189,12 @@ class ElementExtractor:
 
         return tag
     
-    def _extract_attributes(self, locator) -> Dict[str, str]:
+    def _extract_attributes(self, record: Dict) -> Dict[str, str]:
         """提取元素属性"""
         return {
-            "type": locator.get_attribute("type") or "",
-            "maxlength": locator.get_attribute("maxlength") or "",
-            "pattern": locator.get_attribute("pattern") or "",
+            "type": record.get("attr:type") or "",
+            "maxlength": record.get("attr:maxlength") or "",
+            "pattern": record.get("attr:pattern") or "",
         }
     def _get_forms(self, page: Page) -> List[Dict]:
         """获取表单信息"""
@@ -264,19 +236,16 @@ class ElementExtractor:
         
         for selector in nav_selectors:
             try:
-                links = page.locator(selector).all()
-                for link in links:
-                    try:
-                        nav_item = {
-                            "text": link.text_content() or "",
-                            "href": link.get_attribute("href") or "",
-                        }
-                        if nav_item["text"] and nav_item["href"]:
-                            navigation.append(nav_item)
-                    except:
-                        pass
-            except:
-                pass
+                records = query_locator(page.locator(selector), ["text", "attr:href"])
+            except Exception:
+                records = []
+            for record in records:
+                nav_item = {
+                    "text": record.get("text") or "",
+                    "href": record.get("attr:href") or "",
+                }
+                if nav_item["text"] and nav_item["href"]:
+                    navigation.append(nav_item)
         
         return navigation
     
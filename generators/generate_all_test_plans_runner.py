@@ -13,6 +13,8 @@ from playwright.sync_api import Page, sync_playwright
 from generators.generate_all_test_plans_evidence import capture_and_generate_one, ensure_dir, try_fetch_json, write_json
 from generators.generate_all_test_plans_url import canonicalize, crawl_urls, is_login_like, is_same_origin, origin_of
 from pages.login_page import LoginPage
+from utils.browser_server import open_browser
+from utils.context_routes import install_context_routes
 from utils.data_manager import DataManager
 from utils.logger import get_logger
 
@@ -82,10 +84,12 @@ def run_generation(*, frontend: str, backend: str, max_pages: int, urls_file: st
     ensure_dir(docs_root / "test-plans" / "artifacts")
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=headless)
+        browser = open_browser(p, headless=headless)
         ctx_anon = browser.new_context(ignore_https_errors=True, viewport={"width": 1920, "height": 1080})
+        install_context_routes(ctx_anon)
         page_anon = ctx_anon.new_page()
         ctx_auth = browser.new_context(ignore_https_errors=True, viewport={"width": 1920, "height": 1080})
+        install_context_routes(ctx_auth)
         page_auth = ctx_auth.new_page()
 
         all_urls, anon_accessible, mode = resolve_all_urls(
@@ -9,24 +9,8 @@ from urllib.parse import urljoin, urlparse, urlunparse
 
 from playwright.sync_api import Page
 
-_ASSET_EXTS = {
-    ".js",
-    ".css",
-    ".map",
-    ".png",
-    ".jpg",
-    ".jpeg",
-    ".gif",
-    ".webp",
-    ".svg",
-    ".ico",
-    ".woff",
-    ".woff2",
-    ".ttf",
-    ".eot",
-    ".pdf",
-    ".zip",
-}
+from utils.asset_cache import is_probably_asset  # noqa: F401 (re-export: 资源判定与 asset cache 共用一份规则)
+from utils.dom_query import query_locator
 
 
 def canonicalize(url: str) -> str:
@@ -49,16 +33,6 @@ def origin_of(url: str) -> str:
     return f"{p.scheme}://{p.netloc}"
 
 
-def is_probably_asset(url: str) -> bool:
-    p = urlparse(url)
-    path = (p.path or "").lower()
-    if not path:
-        return False
-    if path.startswith("/_next/") or path.startswith("/static/") or path.startswith("/assets/"):
-        return True
-    return any(path.endswith(ext) for ext in _ASSET_EXTS)
-
-
 def is_login_like(url: str) -> bool:
     path = (urlparse(url).path or "").lower()
     return any(x in path for x in ["/account/login", "/auth/login", "/login", "/signin"])
@@ -68,15 +42,12 @@ def extract_links(page: Page, *, origin: str) -> List[str]:
     """抽取当前页同源可访问链接。"""
     hrefs: List[str] = []
     try:
-        locs = page.locator("a[href]").all()
+        records = query_locator(page.locator("a[href]"), ["attr:href"])
     except Exception:
-        locs = []
+        records = []
 
-    for loc in locs:
-        try:
-            href = (loc.get_attribute("href") or "").strip()
-        except Exception:
-            href = ""
+    for record in records:
+        href = (record.get("attr:href") or "").strip()
         if not href or href.startswith(("#", "javascript:", "mailto:")):
             continue
 
@@ -28,6 +28,8 @@ from generators.page_types import PageInfo
 from generators.element_extractor import ElementExtractor
 from utils.logger import get_logger
 from utils.config import ConfigManager
+from utils.browser_server import open_browser
+from utils.context_routes import install_context_routes
 
 logger = get_logger(__name__)
 
@@ -112,7 +114,8 @@ class PageAnalyzer:
         logger.info(f"开始分析页面: {url}")
         
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=headless)
+            # BROWSER_SERVERS 共享模式下连接已有浏览器，避免每次分析都冷启动一个 Chromium
+            browser = open_browser(p, headless=headless)
 
             context_kwargs: Dict = {
                 "viewport": {"width": 1920, "height": 1080},
@@ -126,6 +129,7 @@ class PageAnalyzer:
                     logger.warning(f"storage_state 不存在或为空: {storage_state_path}（将以未登录态分析）")
 
             context = browser.new_context(**context_kwargs)
+            install_context_routes(context)
             page = context.new_page()
             
             try:
@@ -15,7 +15,7 @@ Allure 报告增强：
 - allure.attach() - 预期目标附件
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 import json
@@ -53,8 +53,14 @@ class PageObjectGenerator:
         "textarea",
     }
 
-    def generate_page_object(self, page_info: PageInfo) -> str:
-        """生成 Page Object 代码"""
+    def generate_page_object(self, page_info: PageInfo, async_api: bool = False) -> str:
+        """
+        生成 Page Object 代码
+
+        Args:
+            page_info: 页面分析结果
+            async_api: True 时生成继承 AsyncBasePage 的 async 版本（供 asyncio 并发驱动多个 context）
+        """
         class_name = to_class_name(get_page_name_from_url(page_info.url))
         url_path = extract_url_path(page_info.url)
         # 对于跨域页面（例如后端 ABP /Account/*），直接使用完整 URL，避免 BasePage 默认拼接 frontend base_url
@@ -62,7 +68,10 @@ class PageObjectGenerator:
         indicator = self._pick_page_loaded_indicator(page_info)
         
         selectors, name_map = self._gen_selectors(page_info)
-        methods = self._gen_methods(page_info, name_map)
+        methods = self._gen_methods(page_info, name_map, async_api=async_api)
+        d, aw = ("async def", "await ") if async_api else ("def", "")
+        page_api = "async_api" if async_api else "sync_api"
+        base_module, base_class = ("core.async_base_page", "AsyncBasePage") if async_api else ("core.base_page", "BasePage")
         
         return f'''# ═══════════════════════════════════════════════════════════════
 # {class_name} Page Object
@@ -74,14 +83,14 @@ URL: {page_info.url}
 Type: {page_info.page_type}
 """
 
-from playwright.sync_api import Page
-from core.base_page import BasePage
+from playwright.{page_api} import Page
+from {base_module} import {base_class}
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-class {class_name}Page(BasePage):
+class {class_name}Page({base_class}):
     """
     {class_name} 页面对象
     
@@ -101,16 +110,16 @@ class {class_name}Page(BasePage):
     # NAVIGATION
     # ═══════════════════════════════════════════════════════════════
     
-    def navigate(self) -> None:
+    {d} navigate(self) -> None:
         """导航到页面"""
         logger.info(f"导航到 {class_name} 页面")
-        self.goto(self.URL)
-        self.wait_for_page_load()
+        {aw}self.goto(self.URL)
+        {aw}self.wait_for_page_load()
     
-    def is_loaded(self) -> bool:
+    {d} is_loaded(self) -> bool:
         """检查页面是否加载完成"""
         try:
-            return self.is_visible(self.page_loaded_indicator, timeout=5000)
+            return {aw}self.is_visible(self.page_loaded_indicator, timeout=5000)
         except Exception:
             return False
     
@@ -123,13 +132,13 @@ class {class_name}Page(BasePage):
     # VERIFICATION
     # ═══════════════════════════════════════════════════════════════
     
-    def get_validation_errors(self) -> list:
+    {d} get_validation_errors(self) -> list:
         """获取页面上的验证错误信息"""
-        return self.utils.get_validation_errors()
+        return {aw}self.utils.get_validation_errors()
     
-    def has_validation_error(self) -> bool:
+    {d} has_validation_error(self) -> bool:
         """检查是否有验证错误"""
-        return self.utils.has_validation_error()
+        return {aw}self.utils.has_validation_error()
 '''
     
     # ═══════════════════════════════════════════════════════════════
@@ -271,10 +280,11 @@ class {class_name}Page(BasePage):
 
         return ("\n".join(lines) if lines else "    pass"), selector_to_const
     
-    def _gen_methods(self, page_info: PageInfo, selector_to_const: Dict[str, str]) -> str:
+    def _gen_methods(self, page_info: PageInfo, selector_to_const: Dict[str, str], async_api: bool = False) -> str:
         """生成操作方法代码（与 selector 去重后的 CONST 对齐）。"""
         methods: List[str] = []
         used_methods: Dict[str, int] = {}
+        input_fields: List[Tuple[str, str]] = []
 
         for elem in page_info.elements:
             if not self._is_meaningful_element(elem):
@@ -283,15 +293,25 @@ class {class_name}Page(BasePage):
             const = selector_to_const.get((elem.selector or "").strip(), get_element_constant_name(elem))
 
             if elem.type == "input":
-                methods.append(self._input_method(elem, const, used_methods))
+                methods.append(self._input_method(elem, const, used_methods, async_api, input_fields))
             elif elem.type == "button":
-                methods.append(self._button_method(elem, const, used_methods))
+                methods.append(self._button_method(elem, const, used_methods, async_api))
             elif elem.type == "select":
-                methods.append(self._select_method(elem, const, used_methods))
+                methods.append(self._select_method(elem, const, used_methods, async_api))
+
+        if len(input_fields) >= 2:
+            methods.append(self._fill_inputs_method(input_fields, used_methods, async_api))
 
         return "\n".join(methods) if methods else "\n    pass"
     
-    def _input_method(self, elem: PageElement, const: str, used_methods: Dict[str, int]) -> str:
+    def _input_method(
+        self,
+        elem: PageElement,
+        const: str,
+        used_methods: Dict[str, int],
+        async_api: bool = False,
+        input_fields: Optional[List[Tuple[str, str]]] = None,
+    ) -> str:
         name = to_snake_case(elem.name or elem.id or elem.placeholder or "input")
         name = self._make_unique_name(name, used_methods)
         desc = elem.placeholder or elem.name or "input"
@@ -299,37 +319,62 @@ class {class_name}Page(BasePage):
         input_type = (elem.attributes or {}).get("type", "") if getattr(elem, "attributes", None) else ""
         key = " ".join([elem.name or "", elem.id or "", elem.placeholder or "", desc]).lower()
         is_password = (str(input_type).lower() == "password") or ("password" in key)
-        fill_call = "self.secret_fill" if is_password else "self.fill"
+        # 密码字段不进 fill_inputs（fill_many 不走 secret_fill），只能用单独的 fill_<name>
+        if input_fields is not None and not is_password:
+            input_fields.append((name, const))
+        # 普通字段走 fill_many：一次往返完成校验 + 赋值（fill 需要 3 次）
+        fill_line = f"self.secret_fill(self.{const}, value)" if is_password else f"self.fill_many({{self.{const}: value}})"
         log_line = f'logger.info("填写 {desc}: ***")' if is_password else f'logger.info("填写 {desc} (len={{len(value)}})")'
+        d, aw = ("async def", "await ") if async_api else ("def", "")
         return f'''
-    def fill_{name}(self, value: str) -> None:
+    {d} fill_{name}(self, value: str) -> None:
         """填写 {desc}"""
         {log_line}
-        {fill_call}(self.{const}, value)
+        {aw}{fill_line}
     
-    def get_{name}_value(self) -> str:
+    {d} get_{name}_value(self) -> str:
         """获取 {desc} 的值"""
         # NOTE: 用 super() 避免方法名与 BasePage.get_input_value 冲突导致递归
-        return super().get_input_value(self.{const})'''
+        return {aw}super().get_input_value(self.{const})'''
+    
+    def _fill_inputs_method(self, input_fields: List[Tuple[str, str]], used_methods: Dict[str, int], async_api: bool = False) -> str:
+        """生成 fill_inputs(**values)：多个非密码输入框一次往返填写（key 与 fill_<name> 的 <name> 一致）。"""
+        name = self._make_unique_name("fill_inputs", used_methods)
+        mapping = "\n".join(f'            "{field}": self.{const},' for field, const in input_fields)
+        d, aw = ("async def", "await ") if async_api else ("def", "")
+        return f'''
+    {d} {name}(self, **values: str) -> None:
+        """一次填写多个输入框，例如 {name}({input_fields[0][0]}="...", {input_fields[1][0]}="...")"""
+        fields = {{
+{mapping}
+        }}
+        unknown = sorted(set(values) - set(fields))
+        if unknown:
+            raise ValueError(f"未知字段: {{unknown}}")
+        # 安全：只记录字段名，不记录值
+        logger.info(f"批量填写: {{sorted(values)}}")
+        {aw}self.fill_many({{fields[key]: value for key, value in values.items()}})'''
     
-    def _button_method(self, elem: PageElement, const: str, used_methods: Dict[str, int]) -> str:
+    def _button_method(self, elem: PageElement, const: str, used_methods: Dict[str, int], async_api: bool = False) -> str:
         aria = (elem.attributes or {}).get("aria-label") if getattr(elem, "attributes", None) else None
         text = (elem.text or aria or elem.name or elem.id or "button").strip()
         name = to_snake_case(text)
         name = self._make_unique_name(name or "button", used_methods)
+        d, aw = ("async def", "await ") if async_api else ("def", "")
         return f'''
-    def click_{name}(self) -> None:
+    {d} click_{name}(self) -> None:
         """点击 {text} 按钮"""
         logger.info("点击 {text} 按钮")
-        self.click(self.{const})'''
+        {aw}self.click(self.{const})'''
     
-    def _select_method(self, elem: PageElement, const: str, used_methods: Dict[str, int]) -> str:
+    def _select_method(self, elem: PageElement, const: str, used_methods: Dict[str, int], async_api: bool = False) -> str:
         name = to_snake_case(elem.name or elem.id or "option")
         name = self._make_unique_name(name, used_methods)
         desc = elem.name or "option"
+        d, aw = ("async def", "await ") if async_api else ("def", "")
         return f'''
-    def select_{name}(self, value: str) -> None:
+    {d} select_{name}(self, value: str) -> None:
         """选择 {desc}"""
         logger.info(f"选择 {desc} (len={{len(value)}})")
-        self.select_option(self.{const}, value)'''
+        {aw}self.select_option(self.{const}, value)'''
     
@@ -67,3 +67,21 @@ def temp_data_dir(tmp_path):
     data_dir.mkdir()
     return data_dir
 
+
+@pytest.fixture(autouse=True)
+def isolate_page_history(request, tmp_path, monkeypatch):
+    """
+    导航耗时 / 就绪 / 耗时历史与框架单测隔离，避免污染 reports/、.cache/readiness 与 .test-history/。
+
+    耗时历史在 session 结束时统一写库：本用例带上 SKIP_PROPERTY（各阶段 report 都不采集），
+    用例内直接调用写库的测试则落到临时数据库。
+    """
+    import core.fixture.duration_history as duration_history
+    import core.page_readiness as page_readiness
+    import core.page_timing as page_timing
+
+    request.node.user_properties.append((duration_history.SKIP_PROPERTY, True))
+    monkeypatch.setenv("DURATION_HISTORY_PATH", str(tmp_path / "durations.sqlite"))
+    monkeypatch.setattr(page_timing, "NAV_TIMING_DIR", tmp_path / "nav_timing")
+    history = page_readiness.ReadinessHistory("test", root=tmp_path / "readiness")
+    monkeypatch.setattr(page_readiness, "_POLICY", page_readiness.ReadinessPolicy(history, enabled=False))
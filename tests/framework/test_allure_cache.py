@@ -0,0 +1,96 @@
+# ═══════════════════════════════════════════════════════════════
+# Allure Suite Cache Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""utils.allure_cache 单元测试
+
+测试目标：
+- 首次同步默认硬链接（不复制数据）；再次同步未变化的文件全部跳过
+- 内容相同的新附件直接链接缓存里已有的文件
+- 源目录已删除的文件从缓存移除；copy 模式下同样按 size/mtime 跳过
+- 内容寻址存储：相同内容跨 suite 只存一份；suite 被替换后无引用的 blob 被回收
+"""
+
+import os
+
+from utils import allure_cache
+from utils.allure_cache import blob_path, gc_blobs, sync_results_dir
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_hardlink_sync_then_incremental(tmp_path):
+    src, dst = tmp_path / "allure-results", tmp_path / "cache"
+    src.mkdir()
+    a = _write(src / "a-result.json", '{"name": "a"}')
+    _write(src / "shot-attachment.png", "PNG" * 1000)
+
+    first = sync_results_dir(src, dst, mode="auto", blobs=tmp_path / "blobs")
+    assert (first.added, first.method, first.bytes_written) == (2, "hardlink", 0)
+    assert os.path.samefile(a, dst / "a-result.json")
+
+    second = sync_results_dir(src, dst, mode="auto", blobs=tmp_path / "blobs")
+    assert (second.added, second.skipped, second.removed) == (0, 2, 0)
+
+
+def test_duplicate_content_links_existing_and_stale_removed(tmp_path):
+    src, dst = tmp_path / "allure-results", tmp_path / "cache"
+    src.mkdir()
+    _write(src / "old-attachment.png", "same-bytes")
+    _write(src / "gone-result.json", "{}")
+    sync_results_dir(src, dst, mode="copy", blobs=tmp_path / "blobs")
+
+    (src / "gone-result.json").unlink()
+    _write(src / "new-attachment.png", "same-bytes")
+    stats = sync_results_dir(src, dst, mode="copy", blobs=tmp_path / "blobs")
+
+    assert (stats.linked, stats.removed, stats.skipped, stats.added) == (1, 1, 1, 0)
+    assert os.path.samefile(dst / "old-attachment.png", dst / "new-attachment.png")
+    assert not (dst / "gone-result.json").exists()
+
+
+def test_changed_file_is_replaced_without_touching_source(tmp_path, monkeypatch):
+    src, dst = tmp_path / "allure-results", tmp_path / "cache"
+    src.mkdir()
+    f = _write(src / "x-result.json", "v1")
+    monkeypatch.setattr(allure_cache, "cache_root", lambda: dst)
+    out = allure_cache.sync_suite_results(suite_key="Smoke Suite", src_results_dir=src)
+    assert out == dst / "smoke_suite" / "allure-results"
+
+    f.unlink()
+    _write(src / "x-result.json", "v2-longer")
+    stats = sync_results_dir(src, out)
+
+    assert stats.added == 1 and (out / "x-result.json").read_text(encoding="utf-8") == "v2-longer"
+
+
+def test_blobs_shared_across_suites_and_gc(tmp_path, monkeypatch):
+    monkeypatch.setattr(allure_cache, "cache_root", lambda: tmp_path / "cache")
+    run = tmp_path / "allure-results"
+    run.mkdir()
+    _write(run / "down-attachment.png", "service-down-screenshot")
+    _write(run / "s1-result.json", '{"suite": 1}')
+    allure_cache.sync_suite_results(suite_key="smoke", src_results_dir=run)
+
+    for f in run.iterdir():
+        f.unlink()
+    _write(run / "other-attachment.png", "service-down-screenshot")
+    _write(run / "s2-result.json", '{"suite": 2}')
+    regression = allure_cache.sync_suite_results(suite_key="regression", src_results_dir=run)
+
+    blobs = [b for shard in (tmp_path / "cache" / "blobs").iterdir() for b in shard.iterdir()]
+    assert len(blobs) == 3
+    assert os.path.samefile(regression / "other-attachment.png", tmp_path / "cache" / "smoke" / "allure-results" / "down-attachment.png")
+
+    # smoke 被替换：旧的 s1-result.json 失去引用；共享截图仍被 regression 引用
+    for f in run.iterdir():
+        f.unlink()
+    _write(run / "s3-result.json", '{"suite": 3}')
+    allure_cache.sync_suite_results(suite_key="smoke", src_results_dir=run)
+
+    digest = allure_cache._file_sha1(regression / "other-attachment.png")
+    assert blob_path(digest, tmp_path / "cache" / "blobs").exists()
+    remaining = {b.name for shard in (tmp_path / "cache" / "blobs").iterdir() for b in shard.iterdir()}
+    assert len(remaining) == 3 and gc_blobs() == (0, 0)
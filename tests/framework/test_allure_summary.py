@@ -0,0 +1,129 @@
+# ═══════════════════════════════════════════════════════════════
+# Allure Summary Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""utils.allure_summary 单元测试
+
+测试目标：
+- 索引只解析新增/变化的 result 文件；已删除的文件移出当前结果
+- 汇总 totals / failures / slowest；跨运行历史识别 flaky
+- 本次重试按 suite 计：同一 suite 内多次尝试算 flaky，跨 suite 各跑一次不算
+- 当前结果按 (suite, historyId) 计：一个 suite 失败、另一个通过时两条都计入，失败不被覆盖
+- 结果未变时跳过 allure generate（指纹一致 + 报告存在）
+"""
+
+import json
+from unittest.mock import patch
+
+from utils import allure_cache
+from utils.allure_summary import SummaryIndex, fingerprint_results, format_summary
+
+
+def _result(d, uuid, name, status, start, stop, message=""):
+    payload = {
+        "uuid": uuid,
+        "historyId": f"h-{name}",
+        "fullName": name,
+        "status": status,
+        "start": start,
+        "stop": stop,
+        "statusDetails": {"message": message} if message else {},
+    }
+    (d / f"{uuid}-result.json").write_text(json.dumps(payload), encoding="utf-8")
+
+
+def test_incremental_index_and_summary(tmp_path):
+    d = tmp_path / "smoke"
+    d.mkdir()
+    _result(d, "u1", "t.login", "passed", 0, 1200)
+    _result(d, "u2", "t.search", "failed", 0, 300, message="AssertionError: no rows\ntrace")
+    (d / "x-container.json").write_text("{}", encoding="utf-8")
+
+    index = SummaryIndex.load(tmp_path / "index.json")
+    index.update({"smoke": d})
+    index.save()
+    assert index.parsed == 2
+
+    again = SummaryIndex.load(tmp_path / "index.json")
+    again.update({"smoke": d})
+    assert again.parsed == 0
+
+    summary = again.summary()
+    assert summary["total"] == 2 and summary["totals"] == {"failed": 1, "passed": 1}
+    assert [r["name"] for r in summary["slowest"]] == ["t.login", "t.search"]
+    assert summary["failures"][0]["message"] == "AssertionError: no rows"
+    assert "- [failed] t.search (smoke) — AssertionError: no rows" in format_summary(summary)
+
+
+def test_flaky_from_history_across_runs(tmp_path):
+    d = tmp_path / "smoke"
+    d.mkdir()
+    index = SummaryIndex(tmp_path / "index.json")
+    for run, status in enumerate(("passed", "failed", "passed")):
+        for f in d.iterdir():
+            f.unlink()
+        _result(d, f"run{run}", "t.flaky", status, run * 1000, run * 1000 + 10)
+        _result(d, f"stable{run}", "t.stable", "passed", run * 1000, run * 1000 + 10)
+        index.update({"smoke": d})
+
+    summary = index.summary()
+    assert summary["total"] == 2
+    assert [(r["name"], r["pattern"]) for r in summary["flaky"]] == [("t.flaky", "PFP")]
+
+
+def test_retries_counted_per_suite(tmp_path):
+    smoke, regression = tmp_path / "smoke", tmp_path / "regression"
+    smoke.mkdir()
+    regression.mkdir()
+    _result(smoke, "s1", "t.shared", "passed", 0, 10)
+    _result(regression, "r1", "t.shared", "passed", 0, 20)
+    _result(smoke, "s2", "t.retried", "broken", 0, 10)
+    _result(smoke, "s3", "t.retried", "passed", 20, 30)
+
+    index = SummaryIndex(tmp_path / "index.json")
+    index.update({"smoke": smoke, "regression": regression})
+
+    assert [r["name"] for r in index.summary()["flaky"]] == ["t.retried"]
+
+
+def test_current_results_kept_per_suite(tmp_path):
+    smoke, regression = tmp_path / "smoke", tmp_path / "regression"
+    smoke.mkdir()
+    regression.mkdir()
+    index = SummaryIndex(tmp_path / "index.json")
+    for run in range(2):
+        for f in list(smoke.iterdir()) + list(regression.iterdir()):
+            f.unlink()
+        _result(smoke, f"s{run}", "t.shared", "failed", run * 100, run * 100 + 10, message="boom")
+        _result(regression, f"r{run}", "t.shared", "passed", run * 100, run * 100 + 50)
+        index.update({"smoke": smoke, "regression": regression})
+
+    summary = index.summary()
+    assert summary["total"] == 2 and summary["totals"] == {"failed": 1, "passed": 1}
+    assert [(r["suite"], r["name"]) for r in summary["failures"]] == [("smoke", "t.shared")]
+    assert summary["flaky"] == []
+
+
+def test_report_skipped_when_results_unchanged(tmp_path, monkeypatch):
+    monkeypatch.setattr(allure_cache, "cache_root", lambda: tmp_path / "cache")
+    results = tmp_path / "cache" / "smoke" / "allure-results"
+    results.mkdir(parents=True)
+    _result(results, "u1", "t.login", "passed", 0, 10)
+    report = tmp_path / "allure-report"
+
+    def _fake_allure(cmd, cwd):
+        report.mkdir(exist_ok=True)
+        (report / "index.html").write_text("<html/>", encoding="utf-8")
+        return type("P", (), {"returncode": 0})()
+
+    with patch.object(allure_cache, "_allure_binary", return_value="allure"), patch.object(
+        allure_cache.subprocess, "run", side_effect=_fake_allure
+    ) as run:
+        assert allure_cache.generate_report(report_dir=report) == 0
+        assert allure_cache.generate_report(report_dir=report) == 0
+        assert run.call_count == 1
+
+        before = fingerprint_results([results])
+        _result(results, "u2", "t.search", "passed", 0, 10)
+        assert fingerprint_results([results]) != before
+        assert allure_cache.generate_report(report_dir=report) == 0
+        assert run.call_count == 2
@@ -0,0 +1,101 @@
+# ═══════════════════════════════════════════════════════════════
+# Artifact Retention Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""utils.artifact_retention 单元测试
+
+测试目标：
+- 超出容量时按最近使用时间从旧到新清理，到预算内即停
+- 超过年龄上限的条目无论容量都清理
+- 本次运行的产物与 pinned 条目永不清理
+- 与类别外共享的硬链接不计入释放空间；.allure-cache 按 suite 清理并回收 blob
+- .cache/assets 按单个 blob / 索引文件清理
+"""
+
+import os
+import time
+from unittest.mock import MagicMock
+
+from utils.artifact_retention import RetentionManager, _scan_unit, plan_evictions
+
+NOW = time.time()
+DAY = 86400
+
+
+def _file(path, size, age_days):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    t = NOW - age_days * DAY
+    os.utime(path, (t, t))
+    return path
+
+
+def _units(root):
+    return [_scan_unit(p) for p in sorted(root.iterdir())]
+
+
+def test_lru_until_under_budget(tmp_path):
+    for name, age in (("a.png", 3), ("b.png", 2), ("c.png", 1)):
+        _file(tmp_path / name, 1000, age)
+
+    evicted, freed, remaining, protected = plan_evictions(
+        _units(tmp_path), max_bytes=1500, max_age_s=0, protect_since=NOW, now=NOW
+    )
+
+    assert [u.path.name for u in evicted] == ["a.png", "b.png"]
+    assert (freed, remaining, protected) == (2000, 1000, 0)
+
+
+def test_age_limit_current_run_and_pinned_protected(tmp_path):
+    _file(tmp_path / "old.png", 10, 30)
+    _file(tmp_path / "pinned" / "x.png", 10, 30)
+    _file(tmp_path / "pinned" / ".pinned", 0, 30)
+    _file(tmp_path / "current.png", 10_000, 0)
+
+    evicted, _freed, _remaining, protected = plan_evictions(
+        _units(tmp_path), max_bytes=1, max_age_s=7 * DAY, protect_since=NOW - 60, now=NOW
+    )
+
+    assert [u.path.name for u in evicted] == ["old.png"]
+    assert protected == 2
+
+
+def test_shared_hardlink_not_counted_as_freed(tmp_path):
+    shot = _file(tmp_path / "screenshots" / "fail.png", 1000, 10)
+    os.link(shot, tmp_path / "allure-attachment.png")
+
+    evicted, freed, remaining, _ = plan_evictions(
+        _units(tmp_path / "screenshots"), max_bytes=0, max_age_s=DAY, protect_since=NOW, now=NOW
+    )
+
+    assert len(evicted) == 1 and freed == 0 and remaining == 0
+
+
+def test_manager_evicts_old_allure_suite_and_reports(tmp_path, monkeypatch):
+    _file(tmp_path / ".allure-cache" / "old_suite" / "allure-results" / "a-result.json", 100, 60)
+    _file(tmp_path / ".allure-cache" / "keep" / "allure-results" / "b-result.json", 100, 60)
+    _file(tmp_path / "screenshots" / "recent.png", 100, 1)
+    for suite in ("old_suite", "keep"):
+        for d in (tmp_path / ".allure-cache" / suite, tmp_path / ".allure-cache" / suite / "allure-results"):
+            os.utime(d, (NOW - 60 * DAY, NOW - 60 * DAY))
+    config = MagicMock()
+    config.get.side_effect = lambda key, default=None: ["keep"] if key == "retention.pinned_suites" else default
+    monkeypatch.setattr(RetentionManager, "_gc_blobs", staticmethod(lambda: 100))
+
+    results = {r.name: r for r in RetentionManager(config, root=tmp_path).run(protect_since=NOW)}
+
+    assert results["allure_cache"].freed_bytes == 100 and results["allure_cache"].protected == 1
+    assert not (tmp_path / ".allure-cache" / "old_suite").exists()
+    assert (tmp_path / ".allure-cache" / "keep").exists() and (tmp_path / "screenshots" / "recent.png").exists()
+
+
+def test_manager_evicts_asset_cache_blobs_lru(tmp_path):
+    _file(tmp_path / ".cache" / "assets" / "blobs" / "aa" / "aa01", 600 * 1024, 3)
+    _file(tmp_path / ".cache" / "assets" / "blobs" / "bb" / "bb01", 600 * 1024, 1)
+    _file(tmp_path / ".cache" / "assets" / "index" / "cc" / "cc01.json", 100, 30)
+    config = MagicMock()
+    config.get.side_effect = lambda key, default=None: 1 if key == "retention.categories.asset_cache.max_mb" else default
+
+    results = {r.name: r for r in RetentionManager(config, root=tmp_path).run(protect_since=NOW)}
+
+    assert sorted(os.path.basename(p) for p in results["asset_cache"].evicted) == ["aa01", "cc01.json"]
+    assert (tmp_path / ".cache" / "assets" / "blobs" / "bb" / "bb01").exists()
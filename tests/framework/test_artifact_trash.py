@@ -0,0 +1,58 @@
+# ═══════════════════════════════════════════════════════════════
+# Artifact Trash Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""utils.artifact_trash 单元测试
+
+测试目标：
+- reset_directory 把旧目录移入 trash 并重建空目录（recreate=False 时不重建）
+- purge_trash_async 在后台进程删除 trash（含上次残留）；trash 为空时不启动进程
+- rename 失败时回退同步删除
+"""
+
+import os
+from unittest.mock import patch
+
+from utils.artifact_trash import purge_trash_async, reset_directory
+
+
+def _populate(path, n=50):
+    path.mkdir(parents=True)
+    for i in range(n):
+        (path / f"{i}-result.json").write_text("{}", encoding="utf-8")
+
+
+def test_reset_moves_old_content_to_trash(tmp_path):
+    results, report, trash = tmp_path / "allure-results", tmp_path / "allure-report", tmp_path / "trash"
+    _populate(results)
+    _populate(report)
+
+    assert reset_directory(results, trash_dir=trash) is True
+    assert reset_directory(report, trash_dir=trash, recreate=False) is True
+    assert reset_directory(tmp_path / "missing", trash_dir=trash) is False
+
+    assert results.is_dir() and not any(results.iterdir())
+    assert not report.exists() and (tmp_path / "missing").is_dir()
+    moved = sorted(p.name.split("-")[0] + "-" + p.name.split("-")[1] for p in trash.iterdir())
+    assert moved == ["allure-report", "allure-results"]
+
+
+def test_purge_runs_in_background(tmp_path):
+    trash = tmp_path / "trash"
+    assert purge_trash_async(trash) is None
+
+    _populate(trash / "leftover-from-last-run")
+    proc = purge_trash_async(trash)
+    assert proc is not None
+    proc.wait(timeout=30)
+
+    assert trash.is_dir() and os.listdir(trash) == []
+
+
+def test_rename_failure_falls_back_to_rmtree(tmp_path):
+    results = tmp_path / "allure-results"
+    _populate(results, n=3)
+
+    with patch("utils.artifact_trash.os.rename", side_effect=OSError(18, "Invalid cross-device link")):
+        assert reset_directory(results, trash_dir=tmp_path / "trash") is False
+
+    assert results.is_dir() and not any(results.iterdir())
@@ -0,0 +1,105 @@
+# ═══════════════════════════════════════════════════════════════
+# AssetCache Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""utils.asset_cache 单元测试
+
+测试目标：
+- API / 非 GET 请求永不缓存
+- 未命中落盘，命中从磁盘 fulfill
+- ETag 复验：304 走磁盘；no-cache 响应落盘但每次复验，no-store 不落盘
+
+使用 Mock 替代真实 Playwright Route/Request
+"""
+
+from unittest.mock import MagicMock
+
+from utils.asset_cache import ASSET_URL_PATTERN, AssetCache, is_cacheable_request
+
+
+def _request(url, method="GET", resource_type="script"):
+    req = MagicMock()
+    req.url = url
+    req.method = method
+    req.resource_type = resource_type
+    req.headers = {"accept": "*/*"}
+    return req
+
+
+def _response(status=200, body=b"console.log(1)", headers=None):
+    resp = MagicMock()
+    resp.status = status
+    resp.body.return_value = body
+    resp.headers = headers or {"content-type": "application/javascript", "etag": '"v1"'}
+    return resp
+
+
+def test_api_and_non_get_are_never_cacheable():
+    assert not is_cacheable_request("https://fe/api/app.js", "GET", "script")
+    assert not is_cacheable_request("https://fe/main.js", "POST", "script")
+    assert not is_cacheable_request("https://fe/main.js", "GET", "fetch")
+    assert is_cacheable_request("https://fe/_next/static/chunks/main.js", "GET", "script")
+
+
+def test_route_pattern_matches_assets_only():
+    assert ASSET_URL_PATTERN.search("https://fe/_next/static/a.js")
+    assert ASSET_URL_PATTERN.search("https://fe/logo.PNG?v=1")
+    assert not ASSET_URL_PATTERN.search("https://fe/admin/profile")
+
+
+def test_miss_then_hit_served_from_disk(tmp_path):
+    cache = AssetCache(root=tmp_path)
+    url = "https://fe/_next/static/chunks/main.js"
+
+    route = MagicMock()
+    route.fetch.return_value = _response()
+    cache.handle(route, _request(url))
+    assert cache.stats.misses == 1 and cache.stats.stored == 1
+
+    route2 = MagicMock()
+    cache.handle(route2, _request(url))
+    route2.fetch.assert_not_called()
+    assert route2.fulfill.call_args.kwargs["body"] == b"console.log(1)"
+    assert cache.stats.hits == 1
+
+
+def test_etag_revalidation_304_uses_disk(tmp_path):
+    cache = AssetCache(root=tmp_path)
+    url = "https://fe/img/logo.png"
+    cache.store(url, b"PNG", {"etag": '"v1"', "content-type": "image/png", "cache-control": "no-cache"})
+
+    route = MagicMock()
+    route.fetch.return_value = _response(status=304, body=b"")
+    cache.handle(route, _request(url, resource_type="image"))
+
+    assert route.fetch.call_args.kwargs["headers"]["if-none-match"] == '"v1"'
+    assert route.fulfill.call_args.kwargs["body"] == b"PNG"
+    assert cache.stats.revalidated == 1
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    cache = AssetCache(root=tmp_path)
+    cache.store("https://fe/a.js", b"same", {})
+    cache.store("https://fe/b.js", b"same", {})
+    assert len(list((tmp_path / "blobs").rglob("*"))) == 2  # 1 个前缀目录 + 1 个 blob
+
+
+def test_no_cache_is_stored_and_always_revalidated(tmp_path):
+    cache = AssetCache(root=tmp_path)
+    url = "https://fe/img/logo.png"
+    no_cache = {"content-type": "image/png", "etag": '"v1"', "cache-control": "no-cache"}
+
+    route = MagicMock()
+    route.fetch.return_value = _response(body=b"PNG", headers=no_cache)
+    cache.handle(route, _request(url, resource_type="image"))
+    assert cache.stats.stored == 1
+
+    route2 = MagicMock()
+    route2.fetch.return_value = _response(status=304, body=b"")
+    cache.handle(route2, _request(url, resource_type="image"))
+    assert route2.fetch.call_args.kwargs["headers"]["if-none-match"] == '"v1"'
+    assert route2.fulfill.call_args.kwargs["body"] == b"PNG"
+
+    route3 = MagicMock()
+    route3.fetch.return_value = _response(headers={"etag": '"v2"', "cache-control": "no-store"})
+    cache.handle(route3, _request("https://fe/img/private.png", resource_type="image"))
+    assert cache.stats.stored == 1
@@ -0,0 +1,113 @@
+# ═══════════════════════════════════════════════════════════════
+# AsyncBasePage Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""AsyncBasePage 单元测试
+
+测试目标：
+- async 导航 / 查询 / 对话框方法与同步版 API 一致
+- 多个页面对象可在同一事件循环中并发驱动
+- PageObjectGenerator(async_api=True) 生成的代码可直接 await
+
+使用 AsyncMock 替代真实 Playwright
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture
+def mock_config():
+    """Mock ConfigManager"""
+    with patch("core.async_base_page.ConfigManager") as mock:
+        config_instance = MagicMock()
+        config_instance.get_service_url.return_value = "http://localhost:3000"
+        mock.return_value = config_instance
+        yield mock
+
+
+def _mock_page(url="http://localhost:3000/test"):
+    page = MagicMock()
+    page.url = url
+    for name in ("goto", "reload", "wait_for_load_state", "wait_for_selector", "fill", "click"):
+        setattr(page, name, AsyncMock())
+    page.is_visible = AsyncMock(return_value=False)
+    page.title = AsyncMock(return_value="Page Title")
+    page.keyboard = MagicMock(press=AsyncMock())
+    return page
+
+
+def _page_class():
+    from core.async_base_page import AsyncBasePage
+
+    class TestPage(AsyncBasePage):
+        URL = "/test"
+        page_loaded_indicator = "#ready"
+
+        async def navigate(self):
+            await self.goto(self.URL)
+
+        async def is_loaded(self):
+            return await self.is_visible(self.page_loaded_indicator)
+
+    return TestPage
+
+
+def test_goto_waits_for_indicator(mock_config):
+    page = _mock_page()
+    asyncio.run(_page_class()(page).navigate())
+
+    assert page.goto.await_args[0][0] == "http://localhost:3000/test"
+    page.wait_for_load_state.assert_awaited_once()
+    page.wait_for_selector.assert_awaited_with("#ready", state="visible", timeout=30000)
+
+
+def test_pages_are_driven_concurrently(mock_config):
+    TestPage = _page_class()
+    pages = [_mock_page() for _ in range(3)]
+
+    async def _run():
+        await asyncio.gather(*(TestPage(p).navigate() for p in pages))
+        return await asyncio.gather(*(TestPage(p).get_title() for p in pages))
+
+    assert asyncio.run(_run()) == ["Page Title"] * 3
+    assert all(p.goto.await_count == 1 for p in pages)
+
+
+def test_dialog_close_falls_back_to_escape(mock_config):
+    from core.async_base_page import AsyncBaseDialog
+
+    class TestDialog(AsyncBaseDialog):
+        DIALOG_SELECTOR = ".test-dialog"
+
+    page = _mock_page()
+    asyncio.run(TestDialog(page).close())
+    page.keyboard.press.assert_awaited_once_with("Escape")
+
+
+def test_generated_async_page_object(mock_config):
+    from generators.page_object_generator import PageObjectGenerator
+    from generators.page_types import PageElement, PageInfo
+
+    info = PageInfo(
+        url="http://localhost:3000/admin/users",
+        title="Users",
+        page_type="FORM",
+        elements=[
+            PageElement(selector="#userName", tag="input", type="input", name="userName"),
+            PageElement(selector="#save-btn", tag="button", type="button", text="Save"),
+        ],
+    )
+    code = PageObjectGenerator().generate_page_object(info, async_api=True)
+    assert "from core.async_base_page import AsyncBasePage" in code
+
+    ns: dict = {}
+    exec(compile(code, "<generated>", "exec"), ns)  # noqa: S102
+    page = _mock_page()
+    obj = ns["AdminUsersPage"](page)
+    page.evaluate = AsyncMock(return_value=["ok"])
+    asyncio.run(obj.fill_username("alice"))
+    page.evaluate.assert_awaited_once()
+    assert page.evaluate.await_args[0][1] == [["#userName", "alice"]]
+    page.fill.assert_not_awaited()
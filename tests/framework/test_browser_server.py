@@ -0,0 +1,44 @@
+# ═══════════════════════════════════════════════════════════════
+# Browser Server Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""utils.browser_server 单元测试
+
+测试目标：
+- worker -> endpoint 分配（浏览器进程数与 worker 数解耦）
+- 共享 endpoint 环境变量解析
+- open_browser 的 connect / launch 回退
+"""
+
+from unittest.mock import MagicMock
+
+from utils.browser_server import ENDPOINTS_ENV, endpoint_for_worker, open_browser, shared_endpoints
+
+
+def test_endpoint_for_worker_round_robin():
+    eps = ["ws://a", "ws://b"]
+    assert endpoint_for_worker("gw0", eps) == "ws://a"
+    assert endpoint_for_worker("gw1", eps) == "ws://b"
+    assert endpoint_for_worker("gw5", eps) == "ws://b"
+    assert endpoint_for_worker("master", eps) == "ws://a"
+    assert endpoint_for_worker("gw0", []) is None
+
+
+def test_shared_endpoints_parsing(monkeypatch):
+    monkeypatch.setenv(ENDPOINTS_ENV, " ws://a , ,ws://b ")
+    assert shared_endpoints() == ["ws://a", "ws://b"]
+
+
+def test_open_browser_connects_when_endpoint_present(monkeypatch):
+    monkeypatch.setenv(ENDPOINTS_ENV, "ws://a")
+    pw = MagicMock()
+    open_browser(pw, worker_id="gw0")
+    pw.chromium.connect_over_cdp.assert_called_once_with("ws://a")
+    pw.chromium.launch.assert_not_called()
+
+
+def test_open_browser_falls_back_to_launch(monkeypatch):
+    monkeypatch.setenv(ENDPOINTS_ENV, "ws://a")
+    pw = MagicMock()
+    pw.chromium.connect_over_cdp.side_effect = RuntimeError("refused")
+    open_browser(pw, headless=True, worker_id="gw0")
+    pw.chromium.launch.assert_called_once_with(headless=True)
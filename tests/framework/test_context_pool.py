@@ -0,0 +1,81 @@
+# ═══════════════════════════════════════════════════════════════
+# ContextPool Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""ContextPool 单元测试
+
+测试目标：
+- acquire/release 复用空闲 context
+- reset 回灌 storage_state cookie
+- reset 失败 / 用例失败时丢弃 context（安全兜底）
+
+使用 Mock 替代真实 Playwright
+"""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.fixture.context_pool import ContextPool
+
+
+@pytest.fixture
+def browser():
+    b = MagicMock()
+    b.new_context.side_effect = lambda **kw: MagicMock(pages=[])
+    return b
+
+
+@pytest.fixture
+def state_file(tmp_path):
+    p = tmp_path / "storage_state.json"
+    p.write_text(
+        json.dumps({"cookies": [{"name": "sid", "value": "x", "domain": "localhost", "path": "/"}], "origins": []}),
+        encoding="utf-8",
+    )
+    return str(p)
+
+
+def test_release_then_acquire_reuses_context(browser):
+    pool = ContextPool(browser, context_kwargs={"ignore_https_errors": True})
+    ctx1, _ = pool.acquire("unauth")
+    pool.release(ctx1)
+    ctx2, _ = pool.acquire("unauth")
+
+    assert ctx1 is ctx2
+    assert browser.new_context.call_count == 1
+    assert pool.stats.reused == 1
+    ctx1.clear_cookies.assert_called_once()
+    ctx1.unroute_all.assert_called_once()
+
+
+def test_reset_restores_auth_cookies(browser, state_file):
+    pool = ContextPool(browser, context_kwargs={})
+    ctx, _ = pool.acquire("auth", state_path=state_file)
+    pool.release(ctx)
+
+    ctx.add_cookies.assert_called_once()
+    assert ctx.add_cookies.call_args[0][0][0]["name"] == "sid"
+    # storage_state 以解析后的 dict 传入，而不是每次读盘的路径
+    assert isinstance(browser.new_context.call_args.kwargs["storage_state"], dict)
+
+
+def test_reset_failure_falls_back_to_fresh_context(browser):
+    pool = ContextPool(browser, context_kwargs={})
+    ctx1, _ = pool.acquire("unauth")
+    ctx1.clear_cookies.side_effect = RuntimeError("boom")
+    pool.release(ctx1)
+    ctx2, _ = pool.acquire("unauth")
+
+    assert ctx2 is not ctx1
+    assert pool.stats.reset_failed == 1
+    ctx1.close.assert_called_once()
+
+
+def test_release_not_reusable_discards(browser):
+    pool = ContextPool(browser, context_kwargs={})
+    ctx, _ = pool.acquire("unauth")
+    pool.release(ctx, reusable=False)
+
+    ctx.close.assert_called_once()
+    assert pool.stats.discarded == 1
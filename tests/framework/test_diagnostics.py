@@ -0,0 +1,74 @@
+# ═══════════════════════════════════════════════════════════════
+# Page Diagnostics Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""core.fixture.diagnostics 单元测试
+
+测试目标：
+- 缓冲区有上限，只保留最近 N 条
+- lazy 模式回调只缓存原始对象，失败时才格式化 / 检查 Set-Cookie
+- response 采样率生效；detach 移除全部监听器
+"""
+
+from unittest.mock import MagicMock
+
+from core.fixture.diagnostics import DiagnosticsSettings, PageDiagnostics
+
+
+class _FakePage:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event, handler):
+        self.handlers[event].remove(handler)
+
+    def emit(self, event, obj):
+        for h in list(self.handlers.get(event, [])):
+            h(obj)
+
+
+def _msg(i):
+    return MagicMock(type="log", text=f"line {i}")
+
+
+def test_lazy_buffers_are_bounded_and_formatted_on_demand():
+    page = _FakePage()
+    diag = PageDiagnostics(page, DiagnosticsSettings(console_max=3))
+    diag.attach()
+    for i in range(10):
+        page.emit("console", _msg(i))
+
+    assert len(diag.console) == 3 and not isinstance(diag.console[0], str)
+    assert dict(diag.sections())["console"] == "[log] line 7\n[log] line 8\n[log] line 9"
+
+
+def test_response_checked_only_on_failure_and_sampled():
+    page = _FakePage()
+    diag = PageDiagnostics(page, DiagnosticsSettings(response_sample=0.5))
+    diag.attach()
+    big = MagicMock(url="http://x/api/login", status=200)
+    big.headers = {"set-cookie": "session=" + "a" * 5000}
+    small = MagicMock(url="http://x/api/ping", status=200)
+    small.headers = {}
+    for resp in [small, big, small, big]:
+        page.emit("response", resp)
+
+    assert list(diag.responses) == [big, big]
+    sections = dict(diag.sections())
+    assert "session" in sections["set_cookie_oversize"]
+
+
+def test_detach_and_off_mode():
+    page = _FakePage()
+    diag = PageDiagnostics(page, DiagnosticsSettings())
+    diag.attach()
+    assert sorted(page.handlers) == ["console", "requestfailed", "response"]
+    diag.detach()
+    assert all(not hs for hs in page.handlers.values())
+
+    off_page = _FakePage()
+    PageDiagnostics(off_page, DiagnosticsSettings(mode="off")).attach()
+    assert off_page.handlers == {}
+    assert PageDiagnostics(off_page, DiagnosticsSettings(mode="off")).sections() == []
@@ -0,0 +1,153 @@
+# ═══════════════════════════════════════════════════════════════
+# Duration History Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""utils.duration_history / core.fixture.duration_history 单元测试
+
+测试目标：
+- 每次运行的 setup/call/teardown 耗时、outcome、worker 写入 SQLite，超过 keep_runs 的旧运行被删除
+- slowest / expected_durations 按历史中位数计算
+- regressions：明显变慢才报（稳健 z 分数 + 倍数 + 绝对差），普通抖动与样本不足不报；
+  基线是每个用例最近 window 个 passed 样本，中间没跑它的运行不挤占窗口
+- fixture_overhead 按 fixture 汇总 setup 开销
+- collect_duration_report 按阶段拼出记录（含重跑与 fixture 耗时，跳过带 SKIP_PROPERTY 的用例），
+  save_duration_history 一次性写库
+"""
+
+from types import SimpleNamespace
+
+from core.fixture import duration_history as recorder
+from utils.duration_history import DurationHistory, DurationRecord, robust_score
+
+
+def _run(history, durations, env="dev", fixtures=None):
+    records = [
+        DurationRecord(nodeid=nodeid, call_s=seconds, fixtures=dict(fixtures or {}))
+        for nodeid, seconds in durations.items()
+    ]
+    return history.record_run(records, env=env, started_at=0.0, finished_at=1.0)
+
+
+def test_record_and_query_slowest(tmp_path):
+    history = DurationHistory(tmp_path / "h.sqlite")
+    for seconds in (1.0, 1.2, 5.0):
+        _run(history, {"t::slow": seconds + 2, "t::fast": seconds / 10})
+
+    slowest = history.slowest(top=1)
+    assert [r["nodeid"] for r in slowest] == ["t::slow"]
+    assert slowest[0]["median"] == 3.2 and slowest[0]["max"] == 7.0
+    assert history.expected_durations()["t::fast"] == 0.12
+    assert history.runs()[0]["tests"] == 2
+
+
+def test_regression_needs_statistical_and_absolute_slowdown(tmp_path):
+    history = DurationHistory(tmp_path / "h.sqlite")
+    for jitter in (0.0, 0.05, -0.05, 0.1, -0.1, 0.02):
+        _run(history, {"t::regressed": 2.0 + jitter, "t::noisy": 2.0 + jitter * 4, "t::tiny": 0.01})
+    run_id = _run(history, {"t::regressed": 4.0, "t::noisy": 2.5, "t::tiny": 0.1})
+
+    found = history.regressions(run_id=run_id)
+
+    assert [r["nodeid"] for r in found] == ["t::regressed"]
+    assert found[0]["median"] == 2.01 and found[0]["samples"] == 6
+
+
+def test_regression_ignores_other_envs_and_short_history(tmp_path):
+    history = DurationHistory(tmp_path / "h.sqlite")
+    for _ in range(6):
+        _run(history, {"t::a": 1.0}, env="staging")
+    for _ in range(2):
+        _run(history, {"t::a": 1.0}, env="dev")
+    _run(history, {"t::a": 9.0}, env="dev")
+
+    assert history.regressions() == []
+    assert history.regressions(min_samples=2)[0]["nodeid"] == "t::a"
+
+
+def test_regression_baseline_is_per_test_passed_samples(tmp_path):
+    history = DurationHistory(tmp_path / "h.sqlite")
+    for jitter in (0.0, 0.05, -0.05, 0.1, -0.1, 0.02):
+        _run(history, {"t::nightly": 2.0 + jitter})
+    for _ in range(20):
+        _run(history, {"t::other": 1.0})
+    run_id = _run(history, {"t::nightly": 4.0})
+
+    found = history.regressions(run_id=run_id, window=20)
+
+    assert [(r["nodeid"], r["samples"]) for r in found] == [("t::nightly", 6)]
+    assert history.regressions(run_id=run_id, window=3, min_samples=3)[0]["samples"] == 3
+
+
+def test_robust_score_is_not_dominated_by_outliers():
+    median, score = robust_score(2.0, [1.0, 1.0, 1.1, 0.9, 30.0])
+    assert median == 1.0 and score > 3
+
+
+def test_prune_keeps_latest_runs(tmp_path):
+    history = DurationHistory(tmp_path / "h.sqlite", keep_runs=2)
+    ids = [_run(history, {"t::a": 1.0}, fixtures={"page": ("function", 0.1)}) for _ in range(4)]
+
+    assert [r["id"] for r in history.runs()] == ids[:1:-1]
+    assert history.fixture_overhead()[0]["count"] == 2
+
+
+def test_fixture_overhead_per_run(tmp_path):
+    history = DurationHistory(tmp_path / "h.sqlite")
+    for _ in range(2):
+        history.record_run(
+            [
+                DurationRecord("t::a", fixtures={"browser": ("session", 3.0), "page": ("function", 0.2)}),
+                DurationRecord("t::b", fixtures={"page": ("function", 0.4)}),
+            ],
+            env="dev",
+            started_at=0.0,
+        )
+
+    rows = history.fixture_overhead()
+    assert [(r["fixture"], r["scope"], r["count"]) for r in rows] == [("browser", "session", 2), ("page", "function", 4)]
+    assert abs(rows[1]["per_run"] - 0.6) < 1e-9 and abs(rows[1]["mean"] - 0.3) < 1e-9
+
+
+def _report(nodeid, when, outcome="passed", duration=0.1, props=None, worker="gw1"):
+    return SimpleNamespace(
+        nodeid=nodeid,
+        when=when,
+        outcome=outcome,
+        failed=outcome == "failed",
+        skipped=outcome == "skipped",
+        duration=duration,
+        user_properties=props or [],
+        worker_id=worker,
+    )
+
+
+def test_collect_and_save(monkeypatch, tmp_path):
+    monkeypatch.delenv("PYTEST_XDIST_WORKER", raising=False)
+    monkeypatch.setenv("DURATION_HISTORY_PATH", str(tmp_path / "h.sqlite"))
+    monkeypatch.setattr(recorder, "_ENABLED", [True])
+    monkeypatch.setattr(recorder, "_RECORDS", [])
+    monkeypatch.setattr(recorder, "_OPEN", {})
+    monkeypatch.setattr(recorder, "_ATTEMPTS", {})
+    props = [(recorder.FIXTURE_TIMES_PROPERTY, {"page": ["function", 0.3]})]
+
+    for outcome in ("rerun", "passed"):
+        recorder.collect_duration_report(_report("t::a", "setup", duration=0.5, props=props))
+        recorder.collect_duration_report(_report("t::a", "call", outcome=outcome, duration=2.0, props=props))
+        recorder.collect_duration_report(_report("t::a", "teardown", duration=0.25, props=props))
+    recorder.collect_duration_report(_report("t::b", "setup", outcome="failed"))
+    recorder.collect_duration_report(_report("t::b", "teardown"))
+    skipped = [(recorder.SKIP_PROPERTY, True)]
+    for when in ("setup", "call", "teardown"):
+        recorder.collect_duration_report(_report("t::framework", when, props=skipped))
+
+    records = list(recorder._RECORDS)
+    assert [(r.nodeid, r.attempt, r.outcome) for r in records] == [("t::a", 1, "rerun"), ("t::a", 2, "passed"), ("t::b", 1, "error")]
+    assert records[1].total_s == 2.75 and records[1].worker == "gw1"
+    assert records[1].fixtures == {"page": ("function", 0.3)}
+
+    lines = recorder.save_duration_history(exitstatus=1)
+
+    assert lines and "recorded 3 tests" in lines[0]
+    history = DurationHistory(tmp_path / "h.sqlite")
+    assert history.runs()[0]["exitstatus"] == 1
+    assert history.expected_durations() == {"t::a": 2.75}
+    assert recorder._RECORDS == []
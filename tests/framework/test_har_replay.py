@@ -0,0 +1,110 @@
+# ═══════════════════════════════════════════════════════════════
+# HAR Record / Replay Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""utils.har_replay 单元测试
+
+测试目标：
+- 匹配 key 忽略易变 query / body 字段与未声明的请求头
+- 录制落盘（敏感字段脱敏）后可按 key 回放，同 key 按顺序返回
+- module 粒度下按用例分段合并写入；回放优先本用例录制的条目，没有才用同模块其它用例的
+- strict 模式未命中 abort 并返回失败说明
+"""
+
+import json
+from unittest.mock import MagicMock
+
+from utils.har_replay import HarRules, HarSession, finish_har, install_har, load_har
+
+
+def _rules():
+    return HarRules(ignore_query_params=["_"], ignore_body_fields=["nonce"])
+
+
+def _session(tmp_path, mode, nodeid="tests/a.py::t1", strict=False, name="a.har"):
+    return HarSession(mode=mode, nodeid=nodeid, har_path=tmp_path / name, rules=_rules(), strict=strict)
+
+
+def _record(session, method, url, post, status, text):
+    route = MagicMock()
+    resp = MagicMock(status=status, headers={"content-type": "application/json"})
+    resp.body.return_value = text.encode("utf-8")
+    route.fetch.return_value = resp
+    req = MagicMock(method=method, url=url, headers={"authorization": "Bearer x"}, post_data=post)
+    session._handle_record(route, req)
+    route.fulfill.assert_called_once()
+
+
+def test_request_key_ignores_volatile_parts():
+    r = _rules()
+    a = r.request_key("post", "https://h/api/x?b=1&_=111", {"x-req": "1"}, '{"a":1,"nonce":"n1"}')
+    b = r.request_key("POST", "https://other/api/x?_=222&b=1", {"x-req": "2"}, '{"nonce":"n2","a":1}')
+    assert a == b
+    assert a != r.request_key("POST", "https://h/api/x?b=2", {}, '{"a":1}')
+
+
+def test_record_then_replay_in_order(tmp_path):
+    rec = _session(tmp_path, "record")
+    _record(rec, "GET", "https://h/api/profile?_=1", None, 200, '{"v":1}')
+    _record(rec, "GET", "https://h/api/profile?_=2", None, 200, '{"v":2}')
+    _record(rec, "POST", "https://h/api/login", '{"user":"u","password":"secret"}', 200, "{}")
+    assert rec.finish() == (True, [])
+
+    raw = (tmp_path / "a.har").read_text(encoding="utf-8")
+    assert "secret" not in raw and "Bearer" not in raw
+
+    rep = _session(tmp_path, "replay")
+    rep._load_replay()
+    first = rep.match("GET", "https://h/api/profile?_=9", {}, None)
+    second = rep.match("GET", "https://h/api/profile", {}, None)
+    third = rep.match("GET", "https://h/api/profile", {}, None)
+    assert [json.loads(e["response"]["content"]["text"])["v"] for e in (first, second, third)] == [1, 2, 2]
+    assert rep.match("POST", "https://h/api/login", {}, '{"user":"u","password":"other"}') is not None
+
+
+def test_module_scope_merges_per_test(tmp_path):
+    for nodeid, v in (("tests/a.py::t1", "1"), ("tests/a.py::t2", "2"), ("tests/a.py::t1", "3")):
+        s = _session(tmp_path, "record", nodeid=nodeid)
+        _record(s, "GET", f"https://h/api/{nodeid[-2:]}", None, 200, v)
+        s.finish()
+    entries = load_har(tmp_path / "a.har")["log"]["entries"]
+    assert sorted((e["comment"], e["response"]["content"]["text"]) for e in entries) == [
+        ("tests/a.py::t1", "3"),
+        ("tests/a.py::t2", "2"),
+    ]
+
+
+def test_module_scope_replay_prefers_own_entries(tmp_path):
+    for nodeid, values in (("tests/a.py::t1", ("before", "after")), ("tests/a.py::t2", ("t2",))):
+        s = _session(tmp_path, "record", nodeid=nodeid)
+        for v in values:
+            _record(s, "GET", "https://h/api/items", None, 200, v)
+        _record(s, "GET", f"https://h/api/only/{nodeid[-2:]}", None, 200, nodeid)
+        s.finish()
+
+    rep = _session(tmp_path, "replay", nodeid="tests/a.py::t2")
+    rep._load_replay()
+    assert [rep.match("GET", "https://h/api/items", {}, None)["response"]["content"]["text"] for _ in range(2)] == ["t2", "t2"]
+    assert rep.match("GET", "https://h/api/only/t1", {}, None)["comment"] == "tests/a.py::t1"
+
+
+def test_strict_replay_aborts_unmatched(tmp_path, monkeypatch):
+    monkeypatch.setenv("API_HAR_MODE", "replay")
+    monkeypatch.setenv("API_HAR_STRICT", "1")
+    monkeypatch.setenv("API_HAR_DIR", str(tmp_path))
+    ctx = MagicMock()
+    assert install_har(ctx, "tests/a.py::t1") is not None
+    handler = ctx.route.call_args[0][1]
+
+    route = MagicMock()
+    handler(route, MagicMock(method="GET", url="https://h/api/missing", headers={}, post_data=None))
+    route.abort.assert_called_once()
+    error = finish_har(ctx)
+    assert error and "https://h/api/missing" in error
+
+
+def test_off_mode_installs_nothing(monkeypatch):
+    monkeypatch.delenv("API_HAR_MODE", raising=False)
+    ctx = MagicMock()
+    assert install_har(ctx, "tests/a.py::t1") is None
+    ctx.route.assert_not_called()
+    assert finish_har(MagicMock(spec=[])) is None
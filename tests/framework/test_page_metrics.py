@@ -0,0 +1,77 @@
+# ═══════════════════════════════════════════════════════════════
+# Page Resource Monitor Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""core.fixture.page_metrics 单元测试
+
+测试目标：
+- 只保留关注的 CDP 指标；同一页面复用一个 CDP session
+- 差值超过阈值时给出标记
+- master 汇总按用例/页面/worker 输出
+"""
+
+from unittest.mock import MagicMock
+
+import core.fixture.page_metrics as pm
+
+
+def _page(*heaps):
+    page = MagicMock(url="http://localhost:3000/admin/users?page=2")
+    session = page.context.new_cdp_session.return_value
+    samples = iter(heaps)
+
+    def _send(method, params=None):
+        if method == "Performance.getMetrics":
+            return {"metrics": [{"name": "JSHeapUsedSize", "value": next(samples)}, {"name": "Nodes", "value": 100}, {"name": "Timestamp", "value": 1}]}
+        return {}
+
+    session.send.side_effect = _send
+    return page
+
+
+def test_sample_reuses_session_and_filters_metrics():
+    page = _page(1.0, 2.0)
+    assert pm.sample_metrics(page) == {"JSHeapUsedSize": 1.0, "Nodes": 100.0}
+    assert pm.sample_metrics(page) == {"JSHeapUsedSize": 2.0, "Nodes": 100.0}
+    page.context.new_cdp_session.assert_called_once_with(page)
+
+
+def test_non_chromium_page_is_skipped():
+    page = MagicMock()
+    page.context.new_cdp_session.side_effect = Exception("CDP session is only available in Chromium")
+    assert pm.sample_metrics(page) is None
+    assert pm.sample_metrics(page) is None
+    page.context.new_cdp_session.assert_called_once()
+
+
+def test_growth_flags(monkeypatch):
+    monkeypatch.setenv("PAGE_METRICS_HEAP_MB", "5")
+    monkeypatch.delenv("PAGE_METRICS_NODES", raising=False)
+    assert pm.growth_flags({"JSHeapUsedSize": 1024 * 1024, "Nodes": 10}) == []
+    assert pm.growth_flags({"JSHeapUsedSize": 6 * 1024 * 1024, "Nodes": 6000}) == ["JSHeapUsedSize +6.0MB", "Nodes +6000"]
+
+
+def test_summary_lines(monkeypatch):
+    monkeypatch.setattr(pm, "_PAGE_METRICS", {})
+    mb = 1024 * 1024
+    for i, heap in enumerate([1, 2, 30]):
+        report = MagicMock(nodeid=f"t.py::test_{i}")
+        report.user_properties = [
+            (
+                pm.PAGE_METRICS_PROPERTY,
+                {
+                    "page": "/admin/users",
+                    "worker": "gw0",
+                    "seq": i + 1,
+                    "delta": {"JSHeapUsedSize": heap * mb, "Nodes": 10, "ScriptDuration": 0.1 * (i + 1)},
+                    "heap_after": (10 + heap) * mb,
+                    "flags": ["JSHeapUsedSize +30.0MB"] if heap == 30 else [],
+                },
+            )
+        ]
+        pm.collect_page_metrics_report(report)
+
+    lines = pm.page_metrics_summary_lines()
+    assert lines[0] == "sampled=3 flagged=1"
+    assert "t.py::test_2" in lines[1]
+    assert "/admin/users" in lines[3] and "+11.00MB" in lines[3]
+    assert lines[-1].startswith("gw0: heap 11.0MB -> 40.0MB")
@@ -0,0 +1,180 @@
+# ═══════════════════════════════════════════════════════════════
+# Bulk DOM Query / Fill Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""utils.dom_query / PageUtils.query / fill_many 单元测试
+
+测试目标：
+- 字段名校验（未知字段直接报错）
+- query / get_all_attributes 只走一次 evaluate_all
+- get_form_values 一次 evaluate，仅对未命中的选择器回退 input_value
+- BaseDialog.close 先短暂等任一候选可见，再按候选列表顺序查询，点第一个有可见元素的候选（不按 DOM 顺序）
+- 生成器元素抽取按记录构建 PageElement（不再逐元素 get_attribute）
+- fill_many 一次 evaluate 填写；脚本处理不了的字段回退 page.fill；realistic 字段按原顺序逐键输入
+- fill_many 的 selector 匹配多个元素时报错；fill_form 仍逐字段 safe_fill（出错继续，返回 None）
+- 生成的 fill_inputs 一次填写多个非密码输入框（密码字段只走 secret_fill）
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.page_utils import PageUtils
+from utils.dom_query import DOM_QUERY_JS, FillValue, fill_many, normalize_fields
+
+
+def test_normalize_fields():
+    assert normalize_fields(None) == ["text"]
+    assert normalize_fields(["text", "attr:href", "text", "bbox"]) == ["text", "attr:href", "bbox"]
+    with pytest.raises(ValueError):
+        normalize_fields(["txt"])
+    with pytest.raises(ValueError):
+        normalize_fields(["attr:"])
+
+
+def test_query_is_single_round_trip():
+    page = MagicMock()
+    rows = [{"attr:href": f"/row/{i}"} for i in range(500)]
+    page.locator.return_value.evaluate_all.return_value = rows
+
+    assert PageUtils(page).get_all_attributes("table tr a", "href") == [f"/row/{i}" for i in range(500)]
+    page.locator.return_value.evaluate_all.assert_called_once_with(DOM_QUERY_JS, ["attr:href"])
+    page.locator.return_value.all.assert_not_called()
+
+
+def test_get_form_values_falls_back_only_for_unresolved():
+    page = MagicMock()
+    page.evaluate.return_value = ["alice", None]
+    page.input_value.return_value = "from-playwright"
+
+    values = PageUtils(page).get_form_values(["#username", "input:near(#label)"])
+
+    assert values == {"#username": "alice", "input:near(#label)": "from-playwright"}
+    page.evaluate.assert_called_once()
+    page.input_value.assert_called_once_with("input:near(#label)")
+
+
+def test_dialog_close_keeps_candidate_priority():
+    from core.base_page import BaseDialog
+
+    page = MagicMock(url="http://localhost:3000/x")
+    visible_by_selector = {
+        ".dialog .close": [{"visible": False}],
+        ".dialog [aria-label='close']": [{"visible": False}, {"visible": True}],
+        ".dialog button:has-text('Cancel')": [{"visible": True}],
+    }
+    page.locator.side_effect = lambda sel: MagicMock(
+        evaluate_all=MagicMock(return_value=visible_by_selector.get(sel, []))
+    )
+    with patch("core.base_page.ConfigManager"):
+        BaseDialog(page).close()
+
+    page.wait_for_selector.assert_called_once()
+    assert page.wait_for_selector.call_args.args[0].endswith(" >> visible=true")
+    assert page.wait_for_selector.call_args.kwargs["timeout"] == BaseDialog.CLOSE_WAIT_MS
+    page.click.assert_called_once()
+    assert page.click.call_args[0][0] == ".dialog [aria-label='close'] >> nth=1"
+    assert [c.args[0] for c in page.locator.call_args_list] == [".dialog .close", ".dialog [aria-label='close']"]
+    page.is_visible.assert_not_called()
+    page.keyboard.press.assert_not_called()
+
+
+def test_dialog_close_wait_timeout_falls_back_to_escape():
+    from core.base_page import BaseDialog
+
+    page = MagicMock(url="http://localhost:3000/x")
+    page.wait_for_selector.side_effect = TimeoutError("no close button")
+    page.locator.return_value.evaluate_all.return_value = []
+    with patch("core.base_page.ConfigManager"):
+        BaseDialog(page).close()
+
+    assert page.locator.call_count == 4
+    page.click.assert_not_called()
+    page.keyboard.press.assert_called_once_with("Escape")
+
+
+def test_element_extractor_builds_from_records():
+    from generators.element_extractor import ElementExtractor
+
+    page = MagicMock()
+    page.locator.return_value.evaluate_all.return_value = [
+        {"tag": "input", "text": "", "attr:name": "email", "attr:type": "email", "has:required": True},
+    ]
+    [element] = ElementExtractor()._query_elements(page, "input[type='email']", "input")
+
+    assert element.selector == "[name='email']"
+    assert element.required is True and element.disabled is False
+    assert element.attributes["type"] == "email"
+
+
+def test_fill_many_single_round_trip_with_fallback():
+    page = MagicMock()
+    page.evaluate.return_value = ["ok", "invalid", "ok"]
+
+    fill_many(page, {"#a": "1", "text=Name": "2", "#c": "3"})
+
+    page.evaluate.assert_called_once()
+    assert page.evaluate.call_args[0][1] == [["#a", "1"], ["text=Name", "2"], ["#c", "3"]]
+    page.fill.assert_called_once_with("text=Name", "2", timeout=30000)
+
+
+def test_fill_many_rejects_ambiguous_selector():
+    page = MagicMock()
+    page.evaluate.return_value = ["ok", "multiple"]
+
+    with pytest.raises(ValueError, match=".row input"):
+        fill_many(page, {"#a": "1", ".row input": "2"})
+    page.fill.assert_not_called()
+
+
+def test_fill_form_keeps_per_field_safe_fill():
+    from core.page_utils import PageUtils
+
+    page = MagicMock()
+    page.fill.side_effect = [Exception("boom"), None]
+
+    assert PageUtils(page).fill_form({"#a": "1", "#b": "2"}) is None
+    assert [c.args[:2] for c in page.fill.call_args_list] == [("#a", "1"), ("#b", "2")]
+    page.evaluate.assert_not_called()
+
+
+def test_fill_many_types_only_realistic_fields_in_order(monkeypatch):
+    monkeypatch.delenv("TYPE_TEXT_DELAY_MS", raising=False)
+    page = MagicMock()
+    calls = []
+    page.evaluate.side_effect = lambda js, items: calls.append([sel for sel, _ in items]) or ["ok"] * len(items)
+    page.locator.return_value.press_sequentially.side_effect = lambda *a, **k: calls.append("typed")
+
+    fill_many(page, {"#a": "1", "#city": FillValue("Par", realistic=True), "#b": "2", "#c": "3"})
+
+    assert calls == [["#a"], "typed", ["#b", "#c"]]
+    page.locator.assert_called_once_with("#city")
+    page.locator.return_value.press_sequentially.assert_called_once_with("Par", delay=0, timeout=30000)
+
+
+def test_generated_fill_inputs():
+    from generators.page_object_generator import PageObjectGenerator
+    from generators.page_types import PageElement, PageInfo
+
+    info = PageInfo(
+        url="http://localhost:3000/profile",
+        title="Profile",
+        page_type="FORM",
+        elements=[
+            PageElement(selector="#email", tag="input", type="input", name="email"),
+            PageElement(selector="#phone", tag="input", type="input", name="phone"),
+            PageElement(selector="#password", tag="input", type="input", name="password"),
+        ],
+    )
+    ns: dict = {}
+    exec(compile(PageObjectGenerator().generate_page_object(info), "<generated>", "exec"), ns)  # noqa: S102
+    page = MagicMock(url="http://localhost:3000/profile")
+    page.evaluate.return_value = ["ok", "ok"]
+    with patch("core.base_page.ConfigManager"):
+        obj = ns["ProfilePage"](page)
+    obj.fill_inputs(email="a@b.c", phone="123")
+
+    assert page.evaluate.call_args[0][1] == [["#email", "a@b.c"], ["#phone", "123"]]
+    with pytest.raises(ValueError):
+        obj.fill_inputs(mail="x")
+    with pytest.raises(ValueError):
+        obj.fill_inputs(password="secret")
@@ -0,0 +1,145 @@
+# ═══════════════════════════════════════════════════════════════
+# Adaptive Readiness Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""core.page_readiness 单元测试
+
+测试目标：
+- 样本不足 / 未开启时沿用调用方默认超时
+- 超时按 p99 * factor 收紧（有下限，不会放宽）
+- load_state 经常超时且近期跳过无 indicator 超时时跳过 load_state；跳过失败后暂停，冷却期后恢复
+- 跳过期间定期探测（仍等待 load_state），非 indicator 超时的异常不计入跳过失败
+- AsyncBasePage 使用同一策略
+- 多进程样本 flush 合并写盘
+"""
+
+from unittest.mock import MagicMock, patch
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+import core.page_readiness as page_readiness
+from core.page_readiness import ReadinessHistory, ReadinessPolicy
+
+
+def _policy(tmp_path, enabled=True):
+    return ReadinessPolicy(ReadinessHistory("test", root=tmp_path), enabled=enabled)
+
+
+def test_timeout_derived_from_history(tmp_path):
+    policy = _policy(tmp_path)
+    assert policy.ready_timeout_ms("P", 30000) == 30000
+    for v in [100.0] * 9 + [2500.0]:
+        policy.history.add("P", "ready_ms", v)
+    assert policy.ready_timeout_ms("P", 30000) == 7500
+    assert policy.ready_timeout_ms("P", 6000) == 6000
+    assert _policy(tmp_path, enabled=False).ready_timeout_ms("P", 30000) == 30000
+
+
+def test_timeout_has_floor(tmp_path):
+    policy = _policy(tmp_path)
+    for _ in range(10):
+        policy.history.add("P", "commit_ms", 50.0)
+    assert policy.goto_timeout_ms("P", 60000) == 5000
+
+
+def test_skip_load_state_when_it_only_adds_latency(tmp_path):
+    policy = _policy(tmp_path)
+    for i in range(10):
+        policy.observe("P", ready_ms=100.0, ok=True, load_state_timeout=(i % 3 == 0), skipped=False)
+    assert policy.skip_load_state("P") is True
+
+    policy.observe("P", ready_ms=0.0, ok=False, load_state_timeout=None, skipped=True, indicator_timeout=True)
+    assert policy.skip_load_state("P") is False
+
+
+def test_skip_failure_ages_out_and_unrelated_errors_ignored(tmp_path, monkeypatch):
+    monkeypatch.setenv("ADAPTIVE_SKIP_COOLDOWN", "5")
+    policy = _policy(tmp_path)
+    for _ in range(10):
+        policy.observe("P", ready_ms=100.0, ok=True, load_state_timeout=True, skipped=False)
+    policy.observe("P", ready_ms=0.0, ok=False, load_state_timeout=None, skipped=True, indicator_timeout=False)
+    assert policy.skip_load_state("P") is True
+
+    policy.observe("P", ready_ms=0.0, ok=False, load_state_timeout=None, skipped=True, indicator_timeout=True)
+    for _ in range(4):
+        assert policy.skip_load_state("P") is False
+        policy.observe("P", ready_ms=100.0, ok=True, load_state_timeout=True, skipped=False)
+    policy.observe("P", ready_ms=100.0, ok=True, load_state_timeout=True, skipped=False)
+    assert policy.skip_load_state("P") is True
+
+
+def test_skipping_probes_load_state_periodically(tmp_path, monkeypatch):
+    monkeypatch.setenv("ADAPTIVE_SKIP_PROBE_EVERY", "3")
+    policy = _policy(tmp_path)
+    for _ in range(10):
+        policy.observe("P", ready_ms=100.0, ok=True, load_state_timeout=True, skipped=False)
+    assert [policy.skip_load_state("P") for _ in range(6)] == [True, True, False, True, True, False]
+
+
+def test_flush_merges_into_disk(tmp_path):
+    a, b = ReadinessHistory("test", root=tmp_path), ReadinessHistory("test", root=tmp_path)
+    a.add("P", "ready_ms", 1.0)
+    b.add("P", "ready_ms", 2.0)
+    a.flush()
+    b.flush()
+    assert ReadinessHistory("test", root=tmp_path).series("P", "ready_ms") == [1.0, 2.0]
+
+
+def test_wait_for_page_load_skips_load_state(tmp_path, monkeypatch):
+    from core.base_page import BasePage
+
+    policy = _policy(tmp_path)
+    for _ in range(10):
+        policy.observe("SlowPage", ready_ms=100.0, ok=True, load_state_timeout=True, skipped=False)
+    monkeypatch.setattr(page_readiness, "_POLICY", policy)
+
+    class SlowPage(BasePage):
+        page_loaded_indicator = "#ready"
+
+        def navigate(self):
+            pass
+
+        def is_loaded(self):
+            return True
+
+    page = MagicMock(url="http://localhost:3000/slow")
+    page.wait_for_load_state.side_effect = PlaywrightTimeoutError("never")
+    with patch("core.base_page.ConfigManager"):
+        SlowPage(page).wait_for_page_load()
+
+    page.wait_for_load_state.assert_not_called()
+    page.wait_for_selector.assert_called_once_with("#ready", state="visible", timeout=5000)
+    assert policy.history.series("SlowPage", "skip_failed")[-1] == 0
+
+
+def test_async_wait_for_page_load_uses_policy(tmp_path, monkeypatch):
+    import asyncio
+    from unittest.mock import AsyncMock
+
+    from core.async_base_page import AsyncBasePage
+
+    policy = _policy(tmp_path)
+    for _ in range(10):
+        policy.observe("AsyncSlowPage", ready_ms=100.0, ok=True, load_state_timeout=True, skipped=False)
+    monkeypatch.setattr(page_readiness, "_POLICY", policy)
+
+    class AsyncSlowPage(AsyncBasePage):
+        page_loaded_indicator = "#ready"
+
+        async def navigate(self):
+            pass
+
+        async def is_loaded(self):
+            return True
+
+    page = MagicMock(url="http://localhost:3000/slow")
+    page.wait_for_load_state = AsyncMock()
+    page.wait_for_selector = AsyncMock(side_effect=PlaywrightTimeoutError("gone"))
+    with patch("core.async_base_page.ConfigManager"):
+        try:
+            asyncio.run(AsyncSlowPage(page).wait_for_page_load())
+        except PlaywrightTimeoutError:
+            pass
+
+    page.wait_for_load_state.assert_not_called()
+    assert policy.history.series("AsyncSlowPage", "skip_failed")[-1] == 1
+    assert policy.skip_load_state("AsyncSlowPage") is False
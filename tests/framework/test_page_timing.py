@@ -0,0 +1,126 @@
+# ═══════════════════════════════════════════════════════════════
+# Navigation Timing Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""core.page_timing 单元测试
+
+测试目标：
+- goto + wait_for_page_load 共用一个计时器，按阶段打点并写入本次运行 JSONL
+- 浏览器侧 PerformanceNavigationTiming 字段被记录
+- 按页面类汇总 p50/p95，只保留最近 NAV_TIMING_KEEP_RUNS 次运行的文件
+- AsyncBasePage 记录同样的阶段
+- run id 由 pytest_configure 设置并经 workerinput 传给 xdist worker，不写环境变量
+"""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import core.page_timing as page_timing
+
+
+@pytest.fixture
+def timing_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_timing, "NAV_TIMING_DIR", tmp_path)
+    monkeypatch.delenv("NAV_TIMING", raising=False)
+    return tmp_path
+
+
+def _login_page(page):
+    from core.base_page import BasePage
+
+    class LoginPage(BasePage):
+        page_loaded_indicator = "#username"
+
+        def navigate(self):
+            self.goto("/login?returnUrl=x")
+
+        def is_loaded(self):
+            return True
+
+    with patch("core.base_page.ConfigManager") as cfg:
+        cfg.return_value.get_service_url.return_value = "http://localhost:3000"
+        return LoginPage(page)
+
+
+def test_percentile_nearest_rank():
+    assert page_timing.percentile([], 50) == 0.0
+    assert page_timing.percentile([5, 1, 3, 2, 4], 50) == 3
+    assert page_timing.percentile(list(range(1, 101)), 95) == 95
+
+
+def test_goto_records_phases_and_browser_timing(timing_dir):
+    page = MagicMock(url="http://localhost:3000/login")
+    page.evaluate.return_value = {"ttfb": 12.5, "dcl": 80.0, "load": 0, "type": "navigate"}
+    _login_page(page).navigate()
+
+    (record,) = page_timing.load_records(root=timing_dir)
+    assert record["page"] == "LoginPage" and record["action"] == "goto" and record["url"] == "/login"
+    assert list(record["phases"]) == ["commit", "domcontentloaded", "indicator"]
+    assert record["nav"] == {"ttfb": 12.5, "dcl": 80.0}
+
+    lines = page_timing.nav_timing_summary_lines(root=timing_dir)
+    assert lines[0].startswith("LoginPage") and "nav.ttfb=12/12" in lines[0]
+
+
+def test_disabled_writes_nothing(timing_dir, monkeypatch):
+    monkeypatch.setenv("NAV_TIMING", "0")
+    _login_page(MagicMock(url="http://localhost:3000/login")).navigate()
+    assert page_timing.load_records(root=timing_dir) == []
+
+
+def test_async_goto_records_phases(timing_dir):
+    import asyncio
+    from unittest.mock import AsyncMock
+
+    from core.async_base_page import AsyncBasePage
+
+    class AsyncLoginPage(AsyncBasePage):
+        page_loaded_indicator = "#username"
+
+        async def navigate(self):
+            await self.goto("/login")
+
+        async def is_loaded(self):
+            return True
+
+    page = MagicMock(url="http://localhost:3000/dashboard")
+    for name in ("goto", "wait_for_load_state", "wait_for_selector"):
+        setattr(page, name, AsyncMock())
+    page.evaluate = AsyncMock(return_value={"ttfb": 5.0})
+    with patch("core.async_base_page.ConfigManager") as cfg:
+        cfg.return_value.get_service_url.return_value = "http://localhost:3000"
+        asyncio.run(AsyncLoginPage(page).navigate())
+
+    (record,) = page_timing.load_records(root=timing_dir)
+    assert record["page"] == "AsyncLoginPage" and record["nav"] == {"ttfb": 5.0}
+    assert list(record["phases"]) == ["commit", "domcontentloaded", "indicator"]
+
+
+def test_prune_keeps_latest_runs(timing_dir):
+    for run in ("20260101_000000_1", "20260102_000000_1", "20260103_000000_1"):
+        for worker in ("gw0", "gw1"):
+            (timing_dir / f"{run}.{worker}.jsonl").write_text("{}\n", encoding="utf-8")
+
+    assert page_timing.prune_runs(timing_dir, keep=2) == 2
+    assert sorted(p.name.split(".")[0] for p in timing_dir.glob("*.jsonl"))[0] == "20260102_000000_1"
+
+
+def test_run_id_is_passed_to_workers_not_env(monkeypatch):
+    import conftest
+
+    monkeypatch.setattr(page_timing, "_RUN_ID", None)
+    monkeypatch.delenv("PTS_RUN_ID", raising=False)
+    controller = MagicMock(spec=["option"])
+    monkeypatch.setattr(conftest, "start_browser_servers", lambda config: None)
+    conftest.pytest_configure(controller)
+    run_id = page_timing.get_run_id()
+
+    node = MagicMock(workerinput={})
+    conftest.pytest_configure_node(node)
+    assert node.workerinput == {page_timing.RUN_ID_KEY: run_id}
+
+    page_timing.set_run_id("other")
+    conftest.pytest_configure(MagicMock(workerinput=node.workerinput))
+    assert page_timing.get_run_id() == run_id
+    assert "PTS_RUN_ID" not in os.environ
@@ -0,0 +1,136 @@
+# ═══════════════════════════════════════════════════════════════
+# Next-Test Prefetch Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""core.fixture.prefetch 单元测试
+
+测试目标：
+- 目标 URL：prefetch_url 标记优先，其次是模块里唯一的 Page Object URL
+- 预取只发起导航不等待；下一个用例按 nodeid/kind/登录态领取
+- 下一个或当前用例是 mutate、下一个用例有框架之外的 function 级 fixture 时不预取；未领取的预取会被丢弃
+- BasePage.goto 复用预取的导航，不再重复 page.goto
+"""
+
+import types
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import core.fixture.prefetch as prefetch
+from core.base_page import PREFETCHED_URL_ATTR, BasePage
+from core.fixture.prefetch import Prefetcher
+
+
+class UsersPage(BasePage):
+    URL = "/admin/users"
+
+    def navigate(self):
+        self.goto(self.URL)
+
+    def is_loaded(self):
+        return True
+
+
+def _item(nodeid="t.py::test_next", fixtures=("auth_page",), markers=None, module=None):
+    markers = markers or {}
+    item = MagicMock(nodeid=nodeid, fixturenames=list(fixtures), module=module)
+    item.get_closest_marker.side_effect = lambda name: markers.get(name)
+    return item
+
+
+@pytest.fixture
+def frontend(monkeypatch):
+    monkeypatch.setattr(prefetch.config, "get_service_url", lambda name: "http://localhost:3000")
+
+
+def _fixturedef(module, scope="function"):
+    func = lambda: None  # noqa: E731
+    func.__module__ = module
+    return types.SimpleNamespace(scope=scope, func=func)
+
+
+def test_test_setup_fixtures_block_prefetch(frontend):
+    item = _item(markers={"prefetch_url": MagicMock(args=("/admin/users",))})
+    item._fixtureinfo = types.SimpleNamespace(
+        name2fixturedefs={
+            "auth_page": [_fixturedef("core.fixture.auth")],
+            "tmp_path": [_fixturedef("_pytest.tmpdir")],
+            "shared_org": [_fixturedef("tests.conftest", scope="session")],
+        }
+    )
+    assert prefetch.has_test_setup_fixtures(item) is False
+
+    item._fixtureinfo.name2fixturedefs["seeded_user"] = [_fixturedef("tests.admin.conftest")]
+    opener = MagicMock()
+    Prefetcher().schedule(item, open_context=opener, release_context=MagicMock(), state_path="s")
+    assert prefetch.has_test_setup_fixtures(item) is True
+    opener.assert_not_called()
+
+
+def test_prefetch_url_resolution(frontend):
+    module = types.ModuleType("test_users")
+    module.UsersPage = UsersPage
+    module.BasePage = BasePage
+    assert prefetch.prefetch_url_of(_item(module=module)) == "http://localhost:3000/admin/users"
+
+    marker = MagicMock(args=("/profile",))
+    assert prefetch.prefetch_url_of(_item(module=module, markers={"prefetch_url": marker})) == "http://localhost:3000/profile"
+    assert prefetch.prefetch_url_of(_item(module=types.ModuleType("empty"))) is None
+
+
+def test_schedule_and_claim(frontend):
+    ctx, page = MagicMock(), MagicMock()
+    opened = []
+    fetcher = Prefetcher()
+    marker = MagicMock(args=("/admin/users",))
+    with patch.object(prefetch, "install_context_routes"), patch.object(prefetch, "install_har") as har:
+        fetcher.schedule(
+            _item(markers={"prefetch_url": marker}),
+            open_context=lambda kind, state: opened.append((kind, state)) or (ctx, page),
+            release_context=MagicMock(),
+            state_path=".auth/state.json",
+        )
+
+    assert opened == [("auth", ".auth/state.json")]
+    har.assert_called_once_with(ctx, "t.py::test_next")
+    page.evaluate.assert_called_once()
+    page.goto.assert_not_called()
+
+    assert fetcher.claim("t.py::other", "auth", ".auth/state.json") is None
+    assert fetcher.claim("t.py::test_next", "auth", ".auth/state.json") == (ctx, page)
+    assert getattr(page, PREFETCHED_URL_ATTR) == "http://localhost:3000/admin/users"
+    assert fetcher.hits == 1
+
+
+def test_mutate_skipped_and_unclaimed_discarded(frontend):
+    fetcher = Prefetcher()
+    marker = MagicMock(args=("/x",))
+    opener = MagicMock(return_value=(MagicMock(), MagicMock()))
+    release = MagicMock()
+    with patch.object(prefetch, "install_context_routes"), patch.object(prefetch, "install_har"):
+        fetcher.schedule(_item(markers={"prefetch_url": marker, "mutate": MagicMock()}), open_context=opener, release_context=release, state_path="s")
+        opener.assert_not_called()
+        fetcher.schedule(
+            _item(markers={"prefetch_url": marker}),
+            open_context=opener,
+            release_context=release,
+            state_path="s",
+            current_item=_item(nodeid="t.py::test_current", markers={"mutate": MagicMock()}),
+        )
+        opener.assert_not_called()
+        fetcher.schedule(_item(fixtures=("unauth_page",), markers={"prefetch_url": marker}), open_context=opener, release_context=release, state_path=None)
+        fetcher.schedule(None, open_context=opener, release_context=release, state_path=None)
+
+    release.assert_called_once_with(opener.return_value[0])
+    assert fetcher.misses == 1
+
+
+def test_goto_adopts_prefetched_navigation():
+    page = MagicMock(url="http://localhost:3000/admin/users")
+    setattr(page, PREFETCHED_URL_ATTR, "http://localhost:3000/admin/users")
+    with patch("core.base_page.ConfigManager") as cfg:
+        cfg.return_value.get_service_url.return_value = "http://localhost:3000"
+        UsersPage(page).goto("/admin/users", wait_for_load=False)
+
+    page.goto.assert_not_called()
+    page.wait_for_url.assert_called_once()
+    assert not hasattr(page, PREFETCHED_URL_ATTR) or not isinstance(getattr(page, PREFETCHED_URL_ATTR), str)
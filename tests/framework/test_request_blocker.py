@@ -0,0 +1,65 @@
+# ═══════════════════════════════════════════════════════════════
+# Request Blocker Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""utils.request_blocker 单元测试
+
+测试目标：
+- domain / glob / resource_type 规则与 allow 优先级
+- route 匹配模式下发（domain 正则）
+- 按 context 统计拦截数
+"""
+
+from unittest.mock import MagicMock
+
+from utils.request_blocker import BlockPolicy, RequestBlocker, blocked_counts
+
+
+def _policy(**kw):
+    base = dict(domains=["google-analytics.com"], first_party_hosts=["localhost"])
+    base.update(kw)
+    return BlockPolicy(**base)
+
+
+def test_domain_rule_matches_subdomains():
+    p = _policy()
+    assert p.block_reason("https://www.google-analytics.com/collect", "script") == "domain:google-analytics.com"
+    assert p.block_reason("https://notgoogle-analytics.com/x.js", "script") is None
+
+
+def test_allow_wins_over_block():
+    p = _policy(allow_domains=["google-analytics.com"])
+    assert p.block_reason("https://www.google-analytics.com/collect", "script") is None
+
+
+def test_resource_type_only_applies_to_third_party():
+    p = _policy(resource_types=["font"])
+    assert p.block_reason("https://cdn.example.net/a.woff2", "font") == "type:font"
+    assert p.block_reason("https://localhost:3000/a.woff2", "font") is None
+    assert p.route_patterns() == ["**/*"]
+
+
+def test_glob_rule_and_pattern():
+    p = _policy(domains=[], url_globs=["*/beacon/*"])
+    assert p.block_reason("https://t.example.com/beacon/v1", "ping") == "glob:*/beacon/*"
+    (pattern,) = p.route_patterns()
+    assert pattern.search("https://t.example.com/beacon/v1")
+
+
+def test_domain_pattern_is_driver_side_regex():
+    (pattern,) = _policy().route_patterns()
+    assert pattern.search("https://www.google-analytics.com/g/collect")
+    assert not pattern.search("https://localhost:3000/?ref=google-analytics.com")
+
+
+def test_blocker_counts_per_context():
+    ctx = MagicMock()
+    RequestBlocker(_policy()).install(ctx)
+    handler = ctx.route.call_args[0][1]
+
+    route, req = MagicMock(), MagicMock(url="https://www.google-analytics.com/collect", resource_type="xhr")
+    handler(route, req)
+    route.abort.assert_called_once_with("blockedbyclient")
+
+    counts = blocked_counts(ctx)
+    assert sum(counts.values()) == 1
+    assert not blocked_counts(ctx)  # 读取后清零
@@ -0,0 +1,102 @@
+# ═══════════════════════════════════════════════════════════════
+# Screenshot Writer Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""utils.screenshot_writer 单元测试
+
+测试目标：
+- 格式/质量/缩放配置映射到 page.screenshot 参数
+- 相同内容的帧只写一次，但每个请求的路径都存在（硬链接到首次写入的文件）
+- Allure 附件与落盘文件是同一个 inode（硬链接），不写第二份；无法预留附件时回退 allure.attach
+- wait(path) 等待指定路径落盘
+- 路径被改写为新内容后，旧内容的后续请求不会链接到新文件；内容索引有上限
+"""
+
+from unittest.mock import MagicMock
+
+import utils.screenshot_writer as sw
+from utils.screenshot_writer import ScreenshotOptions, ScreenshotWriter
+
+
+def test_options_to_screenshot_kwargs():
+    assert ScreenshotOptions().screenshot_kwargs() == {"type": "png", "scale": "device"}
+    jpeg = ScreenshotOptions(format="jpeg", quality=60, scale="css")
+    assert jpeg.screenshot_kwargs() == {"type": "jpeg", "scale": "css", "quality": 60}
+    assert jpeg.extension == "jpg"
+
+
+def test_capture_uses_options_and_dedups(tmp_path):
+    writer = ScreenshotWriter(ScreenshotOptions(format="jpeg", quality=50))
+    page = MagicMock()
+    page.screenshot.return_value = b"frame"
+
+    first = writer.capture(page, tmp_path / "a", name="a", attach=False)
+    second = writer.capture(page, tmp_path / "b", name="b", attach=False)
+    writer.flush()
+
+    page.screenshot.assert_called_with(full_page=True, type="jpeg", scale="device", quality=50)
+    assert (first, second) == (tmp_path / "a.jpg", tmp_path / "b.jpg")
+    assert second.read_bytes() == b"frame" and second.stat().st_ino == first.stat().st_ino
+    assert writer.stats.written == 1 and writer.stats.deduped == 1
+
+
+def test_wait_for_requested_path(tmp_path):
+    writer = ScreenshotWriter()
+    writer.submit(b"abc", tmp_path / "a.png", name="a", attach=False)
+    target = writer.submit(b"abc", tmp_path / "sub" / "b.png", name="b", attach=False)
+
+    assert writer.wait(target) is True
+    assert target.read_bytes() == b"abc"
+
+
+def test_falls_back_to_allure_attach_without_slot(tmp_path, monkeypatch):
+    attached = []
+    monkeypatch.setattr(sw, "_reserve_allure_attachment", lambda name, options: None)
+    monkeypatch.setattr(sw, "_attach_bytes", lambda data, name, options: attached.append((data, name)))
+
+    writer = ScreenshotWriter()
+    writer.submit(b"png", tmp_path / "x.png", name="x")
+    writer.flush()
+
+    assert attached == [(b"png", "x")] and (tmp_path / "x.png").exists()
+
+
+def test_allure_attachment_is_hardlink(tmp_path, monkeypatch):
+    results = tmp_path / "allure-results"
+    names = iter(["one-attachment.png", "two-attachment.png"])
+    monkeypatch.setattr(sw, "_reserve_allure_attachment", lambda name, options: results / next(names))
+
+    writer = ScreenshotWriter()
+    primary = writer.submit(b"png-bytes", tmp_path / "shots" / "x.png", name="x")
+    other = writer.submit(b"png-bytes", tmp_path / "shots" / "y.png", name="y")
+    writer.flush()
+
+    inode = primary.stat().st_ino
+    assert other.stat().st_ino == inode
+    assert (results / "one-attachment.png").stat().st_ino == inode
+    assert (results / "two-attachment.png").stat().st_ino == inode
+
+
+def test_rewritten_path_is_not_reused_for_old_digest(tmp_path):
+    writer = ScreenshotWriter()
+    shot = tmp_path / "shot.png"
+    writer.submit(b"old", shot, name="a", attach=False)
+    writer.flush()
+    writer.submit(b"new", shot, name="a", attach=False)
+    other = writer.submit(b"old", tmp_path / "other.png", name="b", attach=False)
+    writer.flush()
+
+    assert shot.read_bytes() == b"new"
+    assert other.read_bytes() == b"old"
+    assert writer.stats.written == 3 and writer.stats.deduped == 0
+
+
+def test_dedup_index_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(sw, "DEDUP_MAX_ENTRIES", 2)
+    writer = ScreenshotWriter()
+    for i in range(3):
+        writer.submit(f"frame{i}".encode(), tmp_path / f"{i}.png", name=str(i), attach=False)
+    writer.submit(b"frame0", tmp_path / "again.png", name="again", attach=False)
+    writer.flush()
+
+    assert writer.stats.deduped == 0 and len(writer._by_digest) == 2
+    assert (tmp_path / "again.png").read_bytes() == b"frame0"
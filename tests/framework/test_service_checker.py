@@ -0,0 +1,94 @@
+# ═══════════════════════════════════════════════════════════════
+# Service Checker Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""utils.service_checker 单元测试
+
+测试目标：
+- 所有服务并发探测（总耗时约等于最慢的服务，而不是求和）
+- 必需服务确定不可用时，其余服务的重试立即结束
+- 总时限生效；结果带每个服务的耗时/次数
+- blocking_failures 只包含必需服务自己的失败（可选服务、aborted 探测不阻塞）
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+from utils.service_checker import ServiceChecker
+
+
+def _checker(services, **hc):
+    with patch("utils.service_checker.ConfigManager") as cfg:
+        cfg.return_value.get_health_check_config.return_value = {
+            "enabled": True, "timeout": 1, "retry_count": 3, "retry_interval": 0.01, "deadline": 5, "required": [], **hc
+        }
+        cfg.return_value.get_all_services.return_value = {name: {} for name in services}
+        cfg.return_value.get_health_check_url.side_effect = lambda name: f"http://{name}/health"
+        return ServiceChecker()
+
+
+def test_probes_run_concurrently_and_report_latency():
+    checker = _checker(["frontend", "backend"])
+    threads = set()
+
+    def _get(url, *, timeout_s):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.2)
+        return True, "status=200"
+
+    with patch.object(checker, "_http_get_ok", side_effect=_get):
+        started = time.monotonic()
+        results = checker.check_all_services()
+        elapsed = time.monotonic() - started
+
+    assert elapsed < 0.35 and len(threads) == 2
+    assert results["frontend"][0] and "latency=" in results["frontend"][1]
+    assert checker.last_probes["backend"].attempts == 1
+    assert "OK status=200" in checker.get_status_report()
+
+
+def test_required_service_down_aborts_others():
+    checker = _checker(["frontend", "backend"], required=["backend"])
+
+    def _get(url, *, timeout_s):
+        if "backend" in url:
+            return False, "ConnectionRefusedError"
+        time.sleep(0.3)
+        return False, "status=503"
+
+    with patch.object(checker, "_http_get_ok", side_effect=_get):
+        started = time.monotonic()
+        results = checker.check_all_services()
+
+    assert time.monotonic() - started < 0.6
+    assert checker.last_probes["backend"].attempts == 3
+    assert checker.last_probes["frontend"].attempts == 1
+    assert results["frontend"][1].startswith("aborted (status=503)")
+    assert [p.name for p in checker.blocking_failures()] == ["backend"]
+
+
+def test_optional_and_aborted_failures_do_not_block():
+    checker = _checker(["frontend", "backend"], required=["backend"])
+
+    def _get(url, *, timeout_s):
+        return ("backend" in url), "status=200" if "backend" in url else "status=503"
+
+    with patch.object(checker, "_http_get_ok", side_effect=_get):
+        results = checker.check_all_services()
+
+    assert results["frontend"][0] is False
+    assert checker.blocking_failures() == []
+
+
+def test_global_deadline_caps_retries():
+    checker = _checker(["backend"], retry_count=10, retry_interval=0.2, deadline=0.3)
+
+    with patch.object(checker, "_http_get_ok", return_value=(False, "status=503")), patch(
+        "utils.service_checker.random.uniform", return_value=1.0
+    ):
+        started = time.monotonic()
+        results = checker.check_all_services()
+
+    assert time.monotonic() - started < 0.5
+    assert checker.last_probes["backend"].attempts == 2
+    assert results["backend"][1].startswith("deadline exceeded")
@@ -0,0 +1,81 @@
+# ═══════════════════════════════════════════════════════════════
+# Background Service Monitor Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""core.fixture.service_monitor 单元测试
+
+测试目标：
+- 连续 down_after 次失败才判定 DOWN，一次成功即恢复
+- wait_until_healthy 在恢复时立即返回，超时返回 False
+- 只看必需服务；服务状态描述包含原因
+- 汇总：outage 用例与“失败时有服务 DOWN”的用例
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from core.fixture import service_monitor as sm
+from core.fixture.service_monitor import ServiceMonitor
+
+
+def _monitor(status, **kwargs):
+    return ServiceMonitor(
+        list(status),
+        lambda name: SimpleNamespace(ok=status[name], reason="status=200" if status[name] else "status=503", latency_ms=5.0),
+        **kwargs,
+    )
+
+
+def test_down_after_consecutive_failures_and_recovery():
+    status = {"frontend": True, "backend": False}
+    monitor = _monitor(status, down_after=2)
+
+    monitor.poll()
+    assert monitor.down_services() == []
+    monitor.poll()
+    assert monitor.down_services() == ["backend"]
+    assert "backend: DOWN" in monitor.describe() and "status=503" in monitor.describe()
+
+    status["backend"] = True
+    monitor.poll()
+    assert monitor.down_services() == []
+
+
+def test_wait_until_healthy_wakes_on_recovery():
+    status = {"frontend": False, "backend": True}
+    monitor = _monitor(status, down_after=1, required=["frontend"])
+    monitor.poll()
+    assert monitor.wait_until_healthy(0.05) is False
+
+    def _recover():
+        time.sleep(0.1)
+        status["frontend"] = True
+        monitor.poll()
+
+    threading.Thread(target=_recover).start()
+    started = time.monotonic()
+    assert monitor.wait_until_healthy(5) is True
+    assert time.monotonic() - started < 1.0
+
+
+def test_non_required_service_does_not_block():
+    monitor = _monitor({"frontend": True, "docs": False}, down_after=1, required=["frontend"])
+    monitor.poll()
+
+    assert monitor.down_services() == ["docs"]
+    assert monitor.down_services(required_only=True) == []
+    assert monitor.wait_until_healthy(0) is True
+
+
+def test_outage_summary(monkeypatch):
+    monkeypatch.setattr(sm, "_OUTAGE_REPORTS", {})
+    for nodeid, value in (
+        ("t.py::a", {"outage": True, "services": {}}),
+        ("t.py::b", {"outage": False, "down": ["backend"], "services": {}}),
+        ("t.py::c", {"outage": False, "down": [], "services": {}}),
+    ):
+        sm.collect_service_state_report(SimpleNamespace(nodeid=nodeid, user_properties=[(sm.SERVICE_STATE_PROPERTY, value)]))
+
+    lines = sm.service_outage_summary_lines()
+    assert lines[0] == "environment outage (not run): 1  failed while a service was down: 1"
+    assert "  ⏸ t.py::a" in lines and "  ⚠ t.py::b (down: backend)" in lines
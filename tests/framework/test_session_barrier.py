@@ -0,0 +1,117 @@
+# ═══════════════════════════════════════════════════════════════
+# Session Barrier Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""utils.session_barrier 单元测试
+
+测试目标：
+- follower 在 leader complete 的瞬间醒来（不是轮询间隔）
+- leader fail / 进程未完成就退出 -> follower 抛 BarrierError
+- 上一次运行（不同 run id）留下的状态不会被误认；leader 不出现时按 start_timeout 报错
+- run_once：只有一个进程执行 fn
+- try_begin：先到者成为 leader；后到者在 leader 结束后拿到 False（并能读到失败原因）
+"""
+
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from utils.session_barrier import BarrierError, SessionBarrier
+
+
+def test_follower_wakes_on_complete(tmp_path):
+    leader = SessionBarrier("env", run_id="r1", directory=tmp_path)
+    leader.begin()
+    done_at = {}
+
+    def _follow():
+        SessionBarrier("env", run_id="r1", directory=tmp_path).wait()
+        done_at["t"] = time.monotonic()
+
+    t = threading.Thread(target=_follow)
+    t.start()
+    time.sleep(0.2)
+    assert "t" not in done_at
+    completed = time.monotonic()
+    leader.complete()
+    t.join(timeout=5)
+
+    assert done_at["t"] - completed < 0.1
+
+
+def test_follower_raises_when_leader_fails(tmp_path):
+    leader = SessionBarrier("env", run_id="r1", directory=tmp_path)
+    leader.begin()
+    leader.fail("pytest.exit: 服务不可达")
+
+    with pytest.raises(BarrierError, match="服务不可达"):
+        SessionBarrier("env", run_id="r1", directory=tmp_path).wait()
+
+
+def _lead_and_die(directory):
+    SessionBarrier("env", run_id="r1", directory=directory).begin()
+    # 不调用 complete，直接退出：flock 随进程退出释放
+
+
+def test_follower_raises_when_leader_dies(tmp_path):
+    proc = multiprocessing.get_context("fork").Process(target=_lead_and_die, args=(tmp_path,))
+    proc.start()
+    proc.join(timeout=10)
+
+    with pytest.raises(BarrierError, match="未完成就退出"):
+        SessionBarrier("env", run_id="r1", directory=tmp_path, start_timeout=1).wait()
+
+
+def test_stale_state_from_previous_run_is_ignored(tmp_path):
+    old = SessionBarrier("env", run_id="old", directory=tmp_path)
+    old.begin()
+    old.complete()
+
+    with pytest.raises(BarrierError, match="未启动"):
+        SessionBarrier("env", run_id="new", directory=tmp_path, start_timeout=0.1).wait()
+
+
+def test_run_once_executes_fn_once(tmp_path):
+    calls = []
+
+    def _setup():
+        time.sleep(0.1)
+        calls.append(1)
+        return "ok"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(SessionBarrier("once", run_id="r1", directory=tmp_path).run_once(_setup)))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert calls == [1]
+    assert sorted(results, key=str) == [None, None, None, "ok"]
+
+
+def test_try_begin_elects_first_arrival(tmp_path):
+    first = SessionBarrier("env", run_id="r1", directory=tmp_path)
+    assert first.try_begin() is True
+    result = {}
+
+    def _second():
+        barrier = SessionBarrier("env", run_id="r1", directory=tmp_path)
+        result["leader"] = barrier.try_begin()
+        try:
+            barrier.wait()
+        except BarrierError as e:
+            result["error"] = str(e)
+
+    t = threading.Thread(target=_second)
+    t.start()
+    time.sleep(0.1)
+    assert "leader" not in result
+    first.fail("pytest.exit: 服务不可达")
+    t.join(timeout=5)
+
+    assert result["leader"] is False and "服务不可达" in result["error"]
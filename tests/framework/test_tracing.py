@@ -0,0 +1,166 @@
+# ═══════════════════════════════════════════════════════════════
+# Tracing Policy Unit Tests
+# ═══════════════════════════════════════════════════════════════
+"""core.fixture.tracing 单元测试
+
+测试目标：
+- TRACE_MODE 决定是否录制
+- 通过用例丢弃 chunk（不写 zip），失败用例落盘
+- TRACE_MAX_MB 体积上限
+- attach=True 时直接写进 allure-results（不复制），reports/ 下为硬链接；登记失败时移到 reports/ 再 attach
+
+使用 Mock 替代真实 Playwright
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.fixture import tracing
+
+
+class _Item:
+    def __init__(self, execution_count: int = 1):
+        self.stash = pytest.Stash()
+        self.user_properties = []
+        self.execution_count = execution_count
+
+
+def _ctx_writing(size: int):
+    ctx = MagicMock()
+
+    def _stop_chunk(path=None):
+        if path:
+            with open(path, "wb") as f:
+                f.write(b"x" * size)
+
+    ctx.tracing.stop_chunk.side_effect = _stop_chunk
+    return ctx
+
+
+class _Slot:
+    def __init__(self, path, ok=True):
+        self.path = path
+        self.ok = ok
+        self.registered = 0
+
+    def register(self):
+        self.registered += 1
+        return self.ok
+
+
+def test_off_mode_does_not_record(monkeypatch):
+    monkeypatch.setenv("TRACE_MODE", "off")
+    ctx = MagicMock()
+    assert tracing.begin_trace(ctx, _Item()) is None
+    ctx.tracing.start.assert_not_called()
+
+
+def test_first_retry_records_only_on_second_execution(monkeypatch):
+    monkeypatch.setenv("TRACE_MODE", "first-retry")
+    assert tracing.begin_trace(MagicMock(), _Item(execution_count=1)) is None
+    assert tracing.begin_trace(MagicMock(), _Item(execution_count=2)) is not None
+
+
+def test_pass_discards_chunk_without_zip(monkeypatch, tmp_path):
+    monkeypatch.setenv("TRACE_MODE", "on-failure")
+    ctx, item = _ctx_writing(10), _Item()
+    tracing.begin_trace(ctx, item)
+
+    out = tracing.end_trace(item, keep=False, path=tmp_path / "t.zip")
+
+    assert out is None
+    ctx.tracing.stop_chunk.assert_called_once_with()
+    assert not (tmp_path / "t.zip").exists()
+
+
+def test_pooled_context_uses_start_chunk(monkeypatch):
+    monkeypatch.setenv("TRACE_MODE", "on-failure")
+    ctx = MagicMock()
+    first = _Item()
+    tracing.begin_trace(ctx, first)
+    tracing.end_trace(first, keep=False)
+    ctx.tracing.start.assert_called_once()
+    ctx.tracing.start.reset_mock()
+
+    tracing.begin_trace(ctx, _Item())
+    ctx.tracing.start_chunk.assert_called_once()
+    ctx.tracing.start.assert_not_called()
+
+
+def test_keep_respects_size_cap(monkeypatch, tmp_path):
+    monkeypatch.setenv("TRACE_MODE", "on-failure")
+    monkeypatch.setenv("TRACE_MAX_MB", "0.001")
+    ctx, item = _ctx_writing(4096), _Item()
+    tracing.begin_trace(ctx, item)
+
+    out = tracing.end_trace(item, keep=True, path=tmp_path / "t.zip")
+
+    assert out is None
+    assert not (tmp_path / "t.zip").exists()
+
+
+def test_trace_property_recorded(monkeypatch, tmp_path):
+    monkeypatch.setenv("TRACE_MODE", "always")
+    ctx, item = _ctx_writing(100), _Item()
+    tracing.begin_trace(ctx, item)
+    assert tracing.end_trace(item, keep=True, path=tmp_path / "t.zip") == tmp_path / "t.zip"
+    tracing.record_trace_property(item)
+
+    name, value = item.user_properties[0]
+    assert name == tracing.TRACE_PROPERTY
+    assert value["kept"] is True and value["bytes"] == 100
+
+
+def test_attach_writes_into_allure_results_and_links(monkeypatch, tmp_path):
+    monkeypatch.setenv("TRACE_MODE", "on-failure")
+    slot = _Slot(tmp_path / "allure-results" / "abc-attachment.zip")
+    monkeypatch.setattr(tracing, "_trace_slot", lambda: slot)
+    ctx, item = _ctx_writing(100), _Item()
+    tracing.begin_trace(ctx, item)
+
+    out = tracing.end_trace(item, keep=True, path=tmp_path / "reports" / "t.zip", attach=True)
+
+    assert out == tmp_path / "reports" / "t.zip"
+    ctx.tracing.stop_chunk.assert_called_once_with(path=str(slot.path))
+    assert slot.registered == 1
+    assert out.stat().st_ino == slot.path.stat().st_ino
+
+
+def test_attach_over_cap_is_not_registered(monkeypatch, tmp_path):
+    monkeypatch.setenv("TRACE_MODE", "on-failure")
+    monkeypatch.setenv("TRACE_MAX_MB", "0.001")
+    slot = _Slot(tmp_path / "allure-results" / "abc-attachment.zip")
+    monkeypatch.setattr(tracing, "_trace_slot", lambda: slot)
+    ctx, item = _ctx_writing(4096), _Item()
+    tracing.begin_trace(ctx, item)
+
+    assert tracing.end_trace(item, keep=True, path=tmp_path / "reports" / "t.zip", attach=True) is None
+    assert slot.registered == 0
+    assert not slot.path.exists()
+    assert not (tmp_path / "reports" / "t.zip").exists()
+
+
+def test_attach_falls_back_when_register_fails(monkeypatch, tmp_path):
+    monkeypatch.setenv("TRACE_MODE", "on-failure")
+    slot = _Slot(tmp_path / "allure-results" / "abc-attachment.zip", ok=False)
+    monkeypatch.setattr(tracing, "_trace_slot", lambda: slot)
+    attached = []
+    monkeypatch.setattr(tracing, "attach_trace", attached.append)
+    ctx, item = _ctx_writing(100), _Item()
+    tracing.begin_trace(ctx, item)
+
+    out = tracing.end_trace(item, keep=True, path=tmp_path / "reports" / "t.zip", attach=True)
+
+    assert out == tmp_path / "reports" / "t.zip" and out.stat().st_size == 100
+    assert not slot.path.exists()
+    assert attached == [out]
+
+
+def test_summary_uses_durations_from_conftest(monkeypatch, tmp_path):
+    baseline = tmp_path / "trace_baseline.json"
+    monkeypatch.setattr(tracing, "_TRACE_STATS", {"t::a": {"overhead_s": 0.1, "bytes": 0, "kept": False}})
+
+    assert "baseline saved (1 tests)" in tracing.trace_summary_lines({"t::a": 1.0}, mode="off", baseline_path=baseline)[0]
+    lines = tracing.trace_summary_lines({"t::a": 1.5}, mode="on-failure", baseline_path=baseline)
+    assert "1.50s vs 1.00s (+50.0%)" in lines[1]
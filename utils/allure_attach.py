@@ -0,0 +1,108 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Allure Attach - write attachments in place (no second copy)
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - allure.attach.file(src) 会把 src 完整复制一份到 allure-results（report_attached_file -> shutil.copy2）
+# - trace zip / 整页截图是最大的产物，先写 reports/ 或 screenshots/ 再复制 = 双倍 I/O 与磁盘
+#
+# 方案：
+# - open_attachment_slot(name, type)：预先生成 Allure 附件文件名（<uuid>-attachment.<ext>，与 allure-pytest 一致），
+#   返回 allure-results 下的目标路径；调用方直接把产物写到这里
+# - 写完并确认保留后 slot.register()：只把附件条目挂到当前 step/test（results json 通过 source 引用该文件），不复制
+# - 需要本地固定路径（reports/<test_id>.zip）时用硬链接指向同一文件
+# - allure 插件未启用 / 内部 API 变化时返回 None，调用方回退到原来的写文件 + attach.file
+#
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Tuple
+from uuid import uuid4
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _allure_plugins() -> Tuple[Any, Any]:
+    """返回 (reporter 插件, 文件 logger 插件)；任一不可用返回 (None, None)。"""
+    try:
+        from allure_commons import plugin_manager
+    except Exception:
+        return None, None
+    listener = file_logger = None
+    for plugin in plugin_manager.get_plugins():
+        if listener is None and hasattr(plugin, "allure_logger"):
+            listener = plugin
+        if file_logger is None and hasattr(plugin, "_report_dir"):
+            file_logger = plugin
+    if listener is None or file_logger is None:
+        return None, None
+    return listener, file_logger
+
+
+@dataclass
+class AttachmentSlot:
+    """allure-results 中一个尚未登记的附件位置。"""
+
+    uuid: str
+    name: str
+    attachment_type: Any
+    path: Path
+    _listener: Any = None
+
+    def register(self) -> bool:
+        """把附件挂到当前 step/test（文件需已写好）；失败返回 False。"""
+        try:
+            self._listener.allure_logger._attach(self.uuid, name=self.name, attachment_type=self.attachment_type)
+            return True
+        except Exception as e:
+            logger.debug(f"Allure 附件登记失败（已忽略）: {type(e).__name__}: {e}")
+            return False
+
+
+def open_attachment_slot(name: str, attachment_type) -> Optional[AttachmentSlot]:
+    listener, file_logger = _allure_plugins()
+    if listener is None:
+        return None
+    uid = str(uuid4())
+    path = Path(file_logger._report_dir) / f"{uid}-attachment.{attachment_type.extension}"
+    return AttachmentSlot(uuid=uid, name=name, attachment_type=attachment_type, path=path, _listener=listener)
+
+
+def reserve_attachment(name: str, attachment_type) -> Optional[Path]:
+    """立即登记附件并返回目标路径（由调用方负责写入，例如后台写截图）。"""
+    slot = open_attachment_slot(name, attachment_type)
+    if slot is None or not slot.register():
+        return None
+    return slot.path
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        pass
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def link_alias(src: Path, alias: Path) -> bool:
+    """为 src 建一个硬链接别名（已存在则替换）；跨设备等无法链接时返回 False（不复制）。"""
+    try:
+        alias.parent.mkdir(parents=True, exist_ok=True)
+        tmp = alias.with_name(f"{alias.name}.tmp.{os.getpid()}")
+        tmp.unlink(missing_ok=True)
+        os.link(src, tmp)
+        os.replace(tmp, alias)
+        return True
+    except OSError as e:
+        logger.debug(f"硬链接失败（已跳过）: {alias} -> {src} ({type(e).__name__}: {e})")
+        return False
@@ -16,16 +16,54 @@
 # - 每次 pytest 运行完成后，把 `allure-results/` 覆盖同步到对应 suite 的缓存目录
 # - 生成报告时：用 Allure CLI 的“多 results 目录输入”能力，把所有 suite 的最新 results 一次性生成到 `allure-report/`
 #
+# 同步（sync_suite_results）：
+# - 不再 rmtree + 逐文件 copy2（trace zip/截图每次同步都重复写 GB 级数据）
+# - 文件落地方式按 ALLURE_CACHE_LINK 选择：auto（默认：硬链接 -> reflink -> 复制）| hardlink | reflink | copy
+#   （allure-results 里的文件写完后不再原地修改，硬链接安全；reflink 仅 Linux FICLONE，如 btrfs/xfs）
+# - 目标目录维护 .sync-manifest.json（name -> size/mtime_ns/sha1）：
+#     同名且 size/mtime 未变（或本就是同一 inode）-> 跳过，不读内容
+#     新文件内容的 sha1 已在目标目录存在（同一截图/HAR）-> 直接链接目标目录里的已有文件
+#     源目录里已不存在的文件 -> 从缓存删除
+#   同步耗时与“新数据量”成正比，而不是总数据量
+#
+# 内容寻址存储（跨 suite 去重）：
+# - 文件内容只存一份：`.allure-cache/blobs/<sha1[:2]>/<sha1>`；各 suite 目录里的文件是指向 blob 的硬链接
+#   （同一张“服务挂了”的失败截图、同一份 HAR 在所有 suite 里只占一份磁盘）
+# - 引用计数来自各 suite 的 .sync-manifest.json：每次 suite 被替换（sync）后做一次 GC，
+#   没有任何 manifest 引用的 blob 被删除；也可手动 `python -m utils.allure_cache gc`
+#
+# 汇总 / 跳过重建（见 utils/allure_summary.py）：
+# - `summary`：纯 Python 增量汇总（totals / failures / slowest / flaky），不启动 JVM
+# - `report`：结果指纹与上次成功生成时一致则跳过 allure generate（--force 强制）
+# - sync/gc 持有 `.allure-cache/.lock`（flock），并行的 make 目标不会互相删掉对方刚写入的 blob
+#
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
 import shutil
 import subprocess
 import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.allure_summary import (
+    SummaryIndex,
+    fingerprint_results,
+    format_summary,
+    record_fingerprint,
+    report_is_current,
+)
+
+LINK_MODES = ("auto", "hardlink", "reflink", "copy")
+SYNC_MANIFEST = ".sync-manifest.json"
+_FICLONE = 0x40049409  # linux/fs.h
 
 
 def project_root() -> Path:
@@ -52,6 +90,31 @@ def sanitize_suite_key(s: str) -> str:
     return key.strip("_") or "default"
 
 
+def blob_root() -> Path:
+    return cache_root() / "blobs"
+
+
+def blob_path(digest: str, root: Optional[Path] = None) -> Path:
+    return (root or blob_root()) / digest[:2] / digest
+
+
+@contextmanager
+def _cache_lock():
+    import fcntl
+
+    root = cache_root()
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / ".lock", "w", encoding="utf-8") as lf:
+        fcntl.flock(lf, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            try:
+                fcntl.flock(lf, fcntl.LOCK_UN)
+            except Exception:
+                pass
+
+
 def suite_results_dir(suite_key: str) -> Path:
     k = sanitize_suite_key(suite_key)
     return cache_root() / k / "allure-results"
@@ -77,22 +140,200 @@ def _reset_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
 
-def sync_suite_results(*, suite_key: str, src_results_dir: Path) -> Path:
+@dataclass
+class SyncStats:
+    added: int = 0       # 新内容（写入 blob 存储）
+    linked: int = 0      # 内容已在 blob 存储中（其它 suite / 之前的运行），直接链接
+    skipped: int = 0     # 未变化
+    removed: int = 0
+    bytes_written: int = 0
+    method: str = ""
+
+    def __str__(self) -> str:
+        return (
+            f"added={self.added} dedup-linked={self.linked} unchanged={self.skipped} removed={self.removed} "
+            f"written={self.bytes_written / 1024 / 1024:.1f}MB via={self.method or '-'}"
+        )
+
+
+def _file_sha1(p: Path) -> str:
+    h = hashlib.sha1()
+    with open(p, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    import fcntl
+
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+    except OSError:
+        dst.unlink(missing_ok=True)
+        raise
+    shutil.copystat(src, dst)
+
+
+def _link_mode() -> str:
+    mode = (os.getenv("ALLURE_CACHE_LINK", "") or "auto").strip().lower()
+    return mode if mode in LINK_MODES else "auto"
+
+
+class _Placer:
+    """按模式把文件放到目标位置；auto 模式下记住第一次成功的方式，失败的方式不再重试。"""
+
+    def __init__(self, mode: str) -> None:
+        self.methods = ["hardlink", "reflink", "copy"] if mode == "auto" else [mode]
+        if "copy" not in self.methods:
+            self.methods.append("copy")
+        self.used = ""
+
+    def place(self, src: Path, dst: Path) -> str:
+        tmp = dst.with_name(f".{dst.name}.sync-tmp")
+        tmp.unlink(missing_ok=True)
+        while True:
+            method = self.methods[0]
+            try:
+                if method == "hardlink":
+                    os.link(src, tmp)
+                elif method == "reflink":
+                    _reflink(src, tmp)
+                else:
+                    shutil.copy2(src, tmp)
+                break
+            except OSError:
+                if method == "copy":
+                    raise
+                self.methods.pop(0)
+        os.replace(tmp, dst)
+        self.used = method
+        return method
+
+
+def _load_manifest(dst: Path) -> Dict[str, Dict]:
+    try:
+        data = json.loads((dst / SYNC_MANIFEST).read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(dst: Path, manifest: Dict[str, Dict]) -> None:
+    tmp = dst / f"{SYNC_MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, dst / SYNC_MANIFEST)
+
+
+def _link_into(blob: Path, target: Path) -> None:
+    """suite 文件 -> blob 的硬链接（同在 .allure-cache 下，通常总能成功；否则复制）。"""
+    tmp = target.with_name(f".{target.name}.sync-tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(blob, tmp)
+    except OSError:
+        shutil.copy2(blob, tmp)
+    os.replace(tmp, target)
+
+
+def sync_results_dir(src: Path, dst: Path, *, mode: Optional[str] = None, blobs: Optional[Path] = None) -> SyncStats:
+    """把 src 下的文件增量同步到 dst（内容落在 blob 存储，dst 中为链接；见模块说明），返回统计。"""
+    dst.mkdir(parents=True, exist_ok=True)
+    blobs = blobs or blob_root()
+    placer = _Placer(mode or _link_mode())
+    stats = SyncStats()
+    old = _load_manifest(dst)
+    manifest: Dict[str, Dict] = {}
+
+    for p in sorted(src.iterdir()):
+        if p.is_dir() or p.name == SYNC_MANIFEST:
+            continue
+        st = p.stat()
+        target = dst / p.name
+        entry = old.get(p.name)
+        if target.exists() and entry and entry.get("size") == st.st_size:
+            tst = target.stat()
+            if (tst.st_ino == st.st_ino and tst.st_dev == st.st_dev) or entry.get("mtime_ns") == st.st_mtime_ns:
+                manifest[p.name] = entry
+                stats.skipped += 1
+                continue
+
+        digest = _file_sha1(p)
+        record = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": digest}
+        if target.exists() and entry and entry.get("sha1") == digest:
+            manifest[p.name] = record
+            stats.skipped += 1
+            continue
+        blob = blob_path(digest, blobs)
+        if blob.exists():
+            stats.linked += 1
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            placer.place(p, blob)
+            if placer.used != "hardlink":
+                stats.bytes_written += st.st_size
+            stats.added += 1
+        _link_into(blob, target)
+        manifest[p.name] = record
+
+    for q in dst.iterdir():
+        if q.is_file() and q.name not in manifest and q.name != SYNC_MANIFEST:
+            q.unlink(missing_ok=True)
+            stats.removed += 1
+    _save_manifest(dst, manifest)
+    stats.method = placer.used
+    return stats
+
+
+def gc_blobs(*, blobs: Optional[Path] = None, suite_dirs: Optional[Iterable[Path]] = None) -> Tuple[int, int]:
     """
-    覆盖写入某个 suite 的最新 results。
+    删除没有被任何 suite manifest 引用的 blob，返回 (删除个数, 释放字节数)。
+    suite_dirs 默认为所有缓存 suite 的 allure-results 目录。
+    """
+    blobs = blobs or blob_root()
+    if not blobs.exists():
+        return 0, 0
+    if suite_dirs is None:
+        suite_dirs = [cache_root() / s / "allure-results" for s in list_cached_suites()]
+    refs: Dict[str, int] = {}
+    for d in suite_dirs:
+        for entry in _load_manifest(Path(d)).values():
+            digest = entry.get("sha1")
+            if digest:
+                refs[digest] = refs.get(digest, 0) + 1
+    removed = freed = 0
+    for shard in blobs.iterdir():
+        if not shard.is_dir():
+            continue
+        for blob in shard.iterdir():
+            if refs.get(blob.name, 0) > 0:
+                continue
+            try:
+                size = blob.stat().st_size
+                blob.unlink()
+            except OSError:
+                continue
+            removed += 1
+            freed += size
+    return removed, freed
+
+
+def sync_suite_results(*, suite_key: str, src_results_dir: Path, verbose: bool = False) -> Path:
+    """
+    覆盖写入某个 suite 的最新 results（增量：只落地新内容，见模块说明），随后回收无引用的 blob。
     """
     src = src_results_dir
     if not src.exists() or not src.is_dir():
         raise RuntimeError(f"src_results_dir not found: {src}")
 
     dst = suite_results_dir(suite_key)
-    _reset_dir(dst)
-
-    # copytree 目标需不存在；我们已 reset_dir，所以逐文件复制
-    for p in src.iterdir():
-        if p.is_dir():
-            continue
-        shutil.copy2(p, dst / p.name)
+    with _cache_lock():
+        stats = sync_results_dir(src, dst)
+        removed, freed = gc_blobs()
+    if verbose:
+        print(f"sync stats: {stats}")
+        print(f"blob gc: removed={removed} freed={freed / 1024 / 1024:.1f}MB")
     return dst
 
 
@@ -100,33 +341,68 @@ def _allure_binary() -> Optional[str]:
     return shutil.which("allure")
 
 
-def generate_report(*, report_dir: Path, include_suites: Optional[Iterable[str]] = None) -> int:
-    """
-    从所有 suite 的最新 results 生成一个“完整最新”的报告。
-    """
-    allure = _allure_binary()
-    if not allure:
-        print("allure not found in PATH", file=sys.stderr)
-        return 2
-
+def _results_dirs(include_suites: Optional[Iterable[str]] = None) -> Dict[str, Path]:
+    """参与汇总/报告的 {suite: results 目录}；没有缓存时回退到项目根的 allure-results。"""
     suites = list_cached_suites()
     if include_suites is not None:
         want = {sanitize_suite_key(x) for x in include_suites}
         suites = [s for s in suites if sanitize_suite_key(s) in want]
 
     # 允许“第一次运行还没有 cache”：fallback 到项目根的 allure-results
-    results_dirs: List[str] = []
+    dirs: Dict[str, Path] = {}
     for s in suites:
         d = cache_root() / sanitize_suite_key(s) / "allure-results"
         if d.exists():
-            results_dirs.append(str(d))
-    if not results_dirs:
+            dirs[s] = d
+    if not dirs:
         fallback = project_root() / "allure-results"
         if fallback.exists():
-            results_dirs = [str(fallback)]
+            dirs = {"allure-results": fallback}
+    return dirs
 
-    if not results_dirs:
+
+def write_summary(
+    *, include_suites: Optional[Iterable[str]] = None, out_dir: Optional[Path] = None, top: int = 10
+) -> Optional[Dict]:
+    """增量更新结果索引并输出静态汇总（不调用 Allure CLI，见 utils/allure_summary.py）。"""
+    dirs = _results_dirs(include_suites)
+    if not dirs:
         print("no allure results found (cache empty and allure-results missing)", file=sys.stderr)
+        return None
+    index = SummaryIndex.load(cache_root() / "summary-index.json")
+    index.update(dirs)
+    index.save()
+    summary = index.summary(top=top)
+    text = format_summary(summary)
+    out = out_dir or (project_root() / "reports")
+    out.mkdir(parents=True, exist_ok=True)
+    (out / "allure-summary.md").write_text(text, encoding="utf-8")
+    (out / "allure-summary.json").write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(text)
+    print(f"(parsed {index.parsed} new/changed result files; written to {out / 'allure-summary.md'})")
+    return summary
+
+
+def generate_report(*, report_dir: Path, include_suites: Optional[Iterable[str]] = None, force: bool = False) -> int:
+    """
+    从所有 suite 的最新 results 生成一个“完整最新”的报告。
+    结果与上次成功生成时相同（指纹一致）且报告仍在时直接跳过，force=True 强制重建。
+    """
+    dirs = _results_dirs(include_suites)
+    if not dirs:
+        print("no allure results found (cache empty and allure-results missing)", file=sys.stderr)
+        return 2
+    results_dirs = [str(d) for d in dirs.values()]
+
+    fingerprint_path = cache_root() / "report-fingerprint.json"
+    fingerprint = fingerprint_results(dirs.values())
+    if not force and report_is_current(fingerprint_path, fingerprint, report_dir):
+        print(f"allure report is up to date (no result changes): {report_dir}  (use --force to rebuild)")
+        return 0
+
+    allure = _allure_binary()
+    if not allure:
+        print("allure not found in PATH", file=sys.stderr)
         return 2
 
     # clear report dir and generate
@@ -135,6 +411,8 @@ def generate_report(*, report_dir: Path, include_suites: Optional[Iterable[str]]
     print(f"\n$ {' '.join(cmd)}")
     try:
         p = subprocess.run(cmd, cwd=str(project_root()))
+        if p.returncode == 0:
+            record_fingerprint(fingerprint_path, fingerprint, report_dir)
         return int(p.returncode)
     except BlockingIOError as e:
         # 某些环境在进程资源紧张时会 fork 失败（例如 "Resource temporarily unavailable"）
@@ -168,23 +446,41 @@ def main(argv: Optional[List[str]] = None) -> int:
     p_report = sub.add_parser("report", help="generate combined report from cached suites")
     p_report.add_argument("--out", default="allure-report", help="output report directory")
     p_report.add_argument("--include", default="", help="comma-separated suite keys to include (optional)")
+    p_report.add_argument("--force", action="store_true", help="rebuild even if results are unchanged")
+
+    p_summary = sub.add_parser("summary", help="fast pure-Python summary of cached suites (no Allure CLI)")
+    p_summary.add_argument("--include", default="", help="comma-separated suite keys to include (optional)")
+    p_summary.add_argument("--out", default="reports", help="directory for allure-summary.md/.json")
+    p_summary.add_argument("--top", type=int, default=10, help="rows in slowest/flaky sections")
 
     p_list = sub.add_parser("list", help="list cached suites")
+    sub.add_parser("gc", help="remove blobs no longer referenced by any suite")
 
     args = parser.parse_args(argv)
 
     if args.cmd == "sync":
         suite_key = (args.suite_key or "").strip() or _guess_suite_key(args.guess_from)
         src = project_root() / str(args.src)
-        dst = sync_suite_results(suite_key=suite_key, src_results_dir=src)
+        dst = sync_suite_results(suite_key=suite_key, src_results_dir=src, verbose=True)
         print(f"synced suite={sanitize_suite_key(suite_key)} -> {dst}")
         return 0
 
     if args.cmd == "report":
         include = [x.strip() for x in (args.include or "").split(",") if x.strip()]
-        rc = generate_report(report_dir=project_root() / str(args.out), include_suites=include or None)
+        rc = generate_report(report_dir=project_root() / str(args.out), include_suites=include or None, force=args.force)
         return rc
 
+    if args.cmd == "summary":
+        include = [x.strip() for x in (args.include or "").split(",") if x.strip()]
+        summary = write_summary(include_suites=include or None, out_dir=project_root() / str(args.out), top=args.top)
+        return 0 if summary is not None else 2
+
+    if args.cmd == "gc":
+        with _cache_lock():
+            removed, freed = gc_blobs()
+        print(f"blob gc: removed={removed} freed={freed / 1024 / 1024:.1f}MB")
+        return 0
+
     if args.cmd == "list":
         for s in list_cached_suites():
             print(s)
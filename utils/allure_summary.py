@@ -0,0 +1,227 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Allure Summary - incremental pure-Python summary + report fingerprint
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - make report 每次都 `allure generate -c` 全部 suite 缓存：一次 JVM 启动 + 全量重建，几十秒起
+# - 多数时候只想看“总数/失败/最慢/不稳定用例”，或者结果根本没变
+#
+# 方案：
+# - summary：流式读取各 suite 缓存的 *-result.json，维护索引 .allure-cache/summary-index.json
+#     files:   "<suite>/<文件名>" -> [size, mtime_ns, 解析后的精简记录]（只解析新增/变化的文件）
+#     history: "<suite>/<historyId>" -> 最近 HISTORY_MAX 次结果（status/duration/uuid），跨运行累积
+#   当前结果按 (suite, historyId) 计：同一用例在多个 suite 里各算一条，互不覆盖
+#   输出 totals / failures / slowest / flaky（最近几次结果里既有 passed 又有 failed/broken，或本次有重试）
+#   写到 reports/allure-summary.md 与 .json，并打印到终端；常见规模下远低于 1s
+# - fingerprint：对参与生成报告的 results 目录做 (文件名, size, mtime_ns) 摘要；
+#   与上次成功生成时一致且 allure-report/index.html 存在 -> 跳过 allure generate（--force 强制重建）
+#
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+INDEX_VERSION = 2
+HISTORY_MAX = 10
+FAILED_STATUSES = ("failed", "broken")
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _load_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def parse_result(data: Dict[str, Any], suite: str) -> Dict[str, Any]:
+    """从 Allure result json 提取汇总需要的字段。"""
+    start, stop = int(data.get("start") or 0), int(data.get("stop") or 0)
+    details = data.get("statusDetails") or {}
+    message = str(details.get("message") or "").strip().splitlines()
+    return {
+        "uuid": data.get("uuid") or "",
+        "history_id": data.get("historyId") or data.get("fullName") or data.get("name") or "",
+        "name": data.get("fullName") or data.get("name") or "",
+        "status": data.get("status") or "unknown",
+        "duration_ms": max(stop - start, 0),
+        "stop": stop,
+        "suite": suite,
+        "message": message[0][:200] if message else "",
+        "flaky": bool(details.get("flaky")),
+    }
+
+
+# ═══════════════════════════════════════════════════════════════
+# INDEX
+# ═══════════════════════════════════════════════════════════════
+
+def _series_key(suite: str, history_id: str) -> str:
+    return f"{suite}/{history_id}"
+
+
+class SummaryIndex:
+    """
+    结果索引（见模块说明）。
+
+    使用方式:
+        index = SummaryIndex.load(path)
+        index.update({"smoke": Path(".allure-cache/smoke/allure-results")})
+        index.save()
+        summary = index.summary()
+    """
+
+    def __init__(self, path: Path, data: Optional[Dict[str, Any]] = None) -> None:
+        self.path = path
+        data = data if data and data.get("version") == INDEX_VERSION else {}
+        self.files: Dict[str, List[Any]] = data.get("files") or {}
+        self.history: Dict[str, List[Dict[str, Any]]] = data.get("history") or {}
+        self.parsed = 0
+
+    @classmethod
+    def load(cls, path: Path) -> "SummaryIndex":
+        return cls(path, _load_json(path))
+
+    def save(self) -> None:
+        _atomic_write(self.path, json.dumps({"version": INDEX_VERSION, "files": self.files, "history": self.history}))
+
+    def update(self, results_dirs: Dict[str, Path]) -> None:
+        """扫描 {suite: results_dir}，只解析新增/变化的 *-result.json；已消失的文件移出当前结果。"""
+        seen = set()
+        for suite, d in results_dirs.items():
+            if not d.is_dir():
+                continue
+            with os.scandir(d) as it:
+                for entry in it:
+                    if not entry.name.endswith("-result.json"):
+                        continue
+                    key = f"{suite}/{entry.name}"
+                    seen.add(key)
+                    st = entry.stat()
+                    cached = self.files.get(key)
+                    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+                        continue
+                    data = _load_json(Path(entry.path))
+                    if data is None:
+                        continue
+                    record = parse_result(data, suite)
+                    self.files[key] = [st.st_size, st.st_mtime_ns, record]
+                    self.parsed += 1
+                    self._add_history(record)
+        for key in [k for k in self.files if k not in seen]:
+            del self.files[key]
+
+    def _add_history(self, record: Dict[str, Any]) -> None:
+        series = self.history.setdefault(_series_key(record["suite"], record["history_id"]), [])
+        if any(h.get("uuid") == record["uuid"] for h in series):
+            return
+        series.append({"uuid": record["uuid"], "status": record["status"], "duration_ms": record["duration_ms"], "stop": record["stop"]})
+        series.sort(key=lambda h: h.get("stop") or 0)
+        del series[:-HISTORY_MAX]
+
+    # ───────────────────────── summary ─────────────────────────
+
+    def current(self) -> Tuple[Dict[Tuple[str, str], Dict[str, Any]], Dict[Tuple[str, str], int]]:
+        """
+        每个 (suite, historyId) 取 stop 最新的一条作为当前结果；同时返回各用例本次的尝试次数（>1 即有重试）。
+        同一用例出现在多个 suite 里各算一条当前结果，各跑一次也不算重试。
+        """
+        latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        attempts: Dict[Tuple[str, str], int] = {}
+        for _size, _mtime, record in self.files.values():
+            key = (record["suite"], record["history_id"])
+            attempts[key] = attempts.get(key, 0) + 1
+            if key not in latest or record["stop"] >= latest[key]["stop"]:
+                latest[key] = record
+        return latest, attempts
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        latest, attempts = self.current()
+        totals: Dict[str, int] = {}
+        for record in latest.values():
+            totals[record["status"]] = totals.get(record["status"], 0) + 1
+        failures = sorted(
+            (r for r in latest.values() if r["status"] in FAILED_STATUSES), key=lambda r: (r["suite"], r["name"])
+        )
+        slowest = sorted(latest.values(), key=lambda r: r["duration_ms"], reverse=True)[:top]
+        flaky = []
+        for (suite, hid), record in latest.items():
+            statuses = [h["status"] for h in self.history.get(_series_key(suite, hid), [])]
+            mixed = "passed" in statuses and any(s in FAILED_STATUSES for s in statuses)
+            if record["flaky"] or mixed or (attempts.get((suite, hid), 1) > 1 and record["status"] == "passed"):
+                flaky.append({**record, "pattern": "".join(s[:1].upper() for s in statuses)})
+        flaky.sort(key=lambda r: r["name"])
+        return {
+            "total": len(latest),
+            "totals": dict(sorted(totals.items())),
+            "duration_ms": sum(r["duration_ms"] for r in latest.values()),
+            "suites": sorted({r["suite"] for r in latest.values()}),
+            "failures": failures,
+            "slowest": slowest,
+            "flaky": flaky[:top],
+        }
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    totals = ", ".join(f"{k}={v}" for k, v in summary["totals"].items()) or "-"
+    lines = [
+        "# Allure summary",
+        "",
+        f"- tests: {summary['total']} ({totals})",
+        f"- suites: {', '.join(summary['suites']) or '-'}",
+        f"- total duration: {summary['duration_ms'] / 1000:.1f}s",
+        "",
+        f"## Failures ({len(summary['failures'])})",
+    ]
+    for r in summary["failures"]:
+        lines.append(f"- [{r['status']}] {r['name']} ({r['suite']})" + (f" — {r['message']}" if r["message"] else ""))
+    lines += ["", "## Slowest"]
+    for r in summary["slowest"]:
+        lines.append(f"- {r['duration_ms'] / 1000:8.2f}s  {r['name']} ({r['suite']})")
+    lines += ["", f"## Flaky ({len(summary['flaky'])})"]
+    for r in summary["flaky"]:
+        lines.append(f"- {r['pattern'] or '-':<{HISTORY_MAX}}  {r['name']} ({r['suite']})")
+    return "\n".join(lines) + "\n"
+
+
+# ═══════════════════════════════════════════════════════════════
+# FINGERPRINT
+# ═══════════════════════════════════════════════════════════════
+
+def fingerprint_results(results_dirs: Iterable[Path]) -> str:
+    """结果目录内容指纹（只看 文件名/size/mtime_ns，不读内容）。"""
+    h = hashlib.sha1()
+    for d in sorted(str(p) for p in results_dirs):
+        h.update(d.encode("utf-8") + b"\0")
+        try:
+            entries = sorted(os.scandir(d), key=lambda e: e.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+            st = entry.stat()
+            h.update(f"{entry.name}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def report_is_current(fingerprint_path: Path, fingerprint: str, report_dir: Path) -> bool:
+    data = _load_json(fingerprint_path) or {}
+    return data.get("fingerprint") == fingerprint and data.get("report_dir") == str(report_dir) and (report_dir / "index.html").exists()
+
+
+def record_fingerprint(fingerprint_path: Path, fingerprint: str, report_dir: Path) -> None:
+    _atomic_write(fingerprint_path, json.dumps({"fingerprint": fingerprint, "report_dir": str(report_dir)}))
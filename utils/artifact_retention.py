@@ -0,0 +1,290 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Artifact Retention - per-category disk budgets with LRU eviction
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - 长期运行的 CI agent 上 screenshots/、reports/*.zip（trace）、.auth/、.allure-cache/、
+#   docs/test-plans/artifacts/、.cache/assets/ 只增不减，磁盘迟早被打满
+#
+# 方案（config/project.yaml -> retention；环境变量 RETENTION_* 优先）：
+# - 每个类别一个根目录 + 匹配规则；清理单位是根目录下的一级条目（文件或目录），
+#   .allure-cache 的清理单位是 suite 目录（清理后回收无引用的 blob，见 utils/allure_cache.py）；
+#   .cache/assets 的清理单位是单个 blob / 索引文件（blob 缺失时 AssetCache.lookup 视为未命中，重新下载）
+# - 先删超过 max_age_days 的条目，再按最近使用时间（max(atime, mtime)）从旧到新删，直到类别总量 <= max_mb
+# - 硬链接按 inode 去重计算：只有某个 inode 的所有引用方都被删掉时才计入释放空间
+# - 永不删除：
+#     本次运行的产物（mtime 晚于 protect_since：session 结束时为本进程启动时间，命令行默认最近 30 分钟）
+#     pinned suite（retention.pinned_suites，或目录内放一个 .pinned 文件）
+# - 执行时机：RETENTION=1 / retention.enabled 时 session 结束（controller）执行并在终端汇总；
+#   或随时 `python -m utils.artifact_retention [--dry-run]`
+#
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.config import ConfigManager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROCESS_STARTED_AT = time.time()
+PIN_MARKER = ".pinned"
+_TRUE_VALUES = {"1", "true", "True", "yes", "YES"}
+
+# name -> (path, pattern, max_mb, max_age_days)；均可被 retention.categories.<name>.* 覆盖
+DEFAULT_CATEGORIES: Dict[str, Tuple[str, str, float, float]] = {
+    "screenshots": ("screenshots", "*", 500, 7),
+    "traces": ("reports", "*.zip", 1024, 7),
+    "auth": (".auth", "*.json", 50, 3),
+    "allure_cache": (".allure-cache", "*", 2048, 30),
+    "test_plan_artifacts": ("docs/test-plans/artifacts", "*", 500, 30),
+    "asset_cache": (".cache/assets", "*/*/*", 1024, 14),
+}
+
+
+def retention_enabled(config: Optional[ConfigManager] = None) -> bool:
+    raw = os.getenv("RETENTION")
+    if raw is None:
+        raw = str((config or ConfigManager()).get("retention.enabled", False) or "")
+    return raw.strip() in _TRUE_VALUES
+
+
+@dataclass
+class Category:
+    name: str
+    path: Path
+    pattern: str = "*"
+    max_mb: float = 0.0          # 0 = 不限总量
+    max_age_days: float = 0.0    # 0 = 不限年龄
+
+    @classmethod
+    def from_config(cls, name: str, root: Path, config: ConfigManager) -> "Category":
+        path, pattern, max_mb, max_age = DEFAULT_CATEGORIES[name]
+        prefix = f"retention.categories.{name}"
+
+        def num(key: str, default: float) -> float:
+            try:
+                return max(float(config.get(f"{prefix}.{key}", default)), 0.0)
+            except (TypeError, ValueError):
+                return default
+
+        return cls(
+            name=name,
+            path=root / str(config.get(f"{prefix}.path", path) or path),
+            pattern=str(config.get(f"{prefix}.pattern", pattern) or pattern),
+            max_mb=num("max_mb", max_mb),
+            max_age_days=num("max_age_days", max_age),
+        )
+
+
+@dataclass
+class Unit:
+    """一个可清理单位（顶层文件或目录）。"""
+
+    path: Path
+    last_used: float
+    last_modified: float
+    inodes: Dict[Tuple[int, int], int] = field(default_factory=dict)  # (dev, ino) -> size
+    links: Dict[Tuple[int, int], Tuple[int, int]] = field(default_factory=dict)  # (dev, ino) -> (本单位内路径数, st_nlink)
+    pinned: bool = False
+
+
+@dataclass
+class CategoryResult:
+    name: str
+    evicted: List[str] = field(default_factory=list)
+    freed_bytes: int = 0
+    remaining_bytes: int = 0
+    protected: int = 0
+
+
+def _scan_unit(path: Path) -> Unit:
+    st = path.lstat()
+    unit = Unit(path=path, last_used=max(st.st_atime, st.st_mtime), last_modified=st.st_mtime)
+    files = [path] if not path.is_dir() else [Path(d) / f for d, _dirs, fs in os.walk(path) for f in fs]
+    for f in files:
+        try:
+            fst = f.lstat()
+        except OSError:
+            continue
+        key = (fst.st_dev, fst.st_ino)
+        unit.inodes[key] = fst.st_size
+        unit.links[key] = (unit.links.get(key, (0, 0))[0] + 1, fst.st_nlink)
+        unit.last_used = max(unit.last_used, fst.st_atime, fst.st_mtime)
+        unit.last_modified = max(unit.last_modified, fst.st_mtime)
+        if f.name == PIN_MARKER:
+            unit.pinned = True
+    return unit
+
+
+def _category_units(category: Category, pinned_names: Iterable[str]) -> List[Unit]:
+    root = category.path
+    if not root.is_dir():
+        return []
+    pinned = set(pinned_names)
+    if category.name == "allure_cache":
+        candidates = [p for p in root.iterdir() if p.is_dir() and (p / "allure-results").is_dir()]
+    else:
+        candidates = [p for p in root.glob(category.pattern) if not p.is_symlink() and not p.name.endswith(".lock")]
+    units = []
+    for p in candidates:
+        try:
+            unit = _scan_unit(p)
+        except OSError:
+            continue
+        unit.pinned = unit.pinned or p.name in pinned
+        units.append(unit)
+    return units
+
+
+def plan_evictions(
+    units: List[Unit],
+    *,
+    max_bytes: float,
+    max_age_s: float,
+    protect_since: float,
+    now: float,
+    managed_links: int = 0,
+) -> Tuple[List[Unit], int, int, int]:
+    """
+    选出要删除的单位（纯计算，不改磁盘）。
+    返回 (待删除列表, 释放字节, 剩余字节, 受保护条目数)。
+
+    类别用量按 inode 去重；“释放字节”只计入所有硬链接都在被删单位里的 inode
+    （managed_links：类别外、但随后会被一并回收的链接数，例如 blob 存储里的 1 个）。
+    """
+    owners: Dict[Tuple[int, int], int] = {}
+    sizes: Dict[Tuple[int, int], int] = {}
+    outside: Dict[Tuple[int, int], int] = {}
+    for unit in units:
+        for key, size in unit.inodes.items():
+            owners[key] = owners.get(key, 0) + 1
+            sizes[key] = size
+            count, nlink = unit.links.get(key, (1, 1))
+            outside[key] = outside.get(key, nlink - managed_links) - count
+    total = sum(sizes.values())
+    protected = [u for u in units if u.pinned or u.last_modified >= protect_since]
+    candidates = sorted((u for u in units if u not in protected), key=lambda u: u.last_used)
+
+    evicted: List[Unit] = []
+    freed = 0
+    for unit in candidates:
+        expired = max_age_s > 0 and now - unit.last_used > max_age_s
+        over_budget = max_bytes > 0 and total > max_bytes
+        if not (expired or over_budget):
+            continue
+        evicted.append(unit)
+        for key in unit.inodes:
+            owners[key] -= 1
+            if owners[key] == 0:
+                total -= sizes[key]
+                if outside[key] <= 0:
+                    freed += sizes[key]
+    return evicted, freed, total, len(protected)
+
+
+class RetentionManager:
+    """
+    按类别执行保留策略（见模块说明）。
+
+    使用方式:
+        results = RetentionManager().run(protect_since=PROCESS_STARTED_AT)
+        for line in format_results(results):
+            print(line)
+    """
+
+    def __init__(self, config: Optional[ConfigManager] = None, root: Optional[Path] = None) -> None:
+        self.config = config or ConfigManager()
+        self.root = root or Path(__file__).resolve().parent.parent
+        self.pinned_suites = list(self.config.get("retention.pinned_suites", []) or [])
+
+    def categories(self) -> List[Category]:
+        return [Category.from_config(name, self.root, self.config) for name in DEFAULT_CATEGORIES]
+
+    def run(self, *, protect_since: float, dry_run: bool = False, now: Optional[float] = None) -> List[CategoryResult]:
+        now = time.time() if now is None else now
+        results = []
+        for category in self.categories():
+            units = _category_units(category, self.pinned_suites)
+            evicted, freed, remaining, protected = plan_evictions(
+                units,
+                max_bytes=category.max_mb * 1024 * 1024,
+                max_age_s=category.max_age_days * 86400,
+                protect_since=protect_since,
+                now=now,
+                managed_links=1 if category.name == "allure_cache" else 0,
+            )
+            result = CategoryResult(category.name, [str(u.path) for u in evicted], freed, remaining, protected)
+            if not dry_run:
+                for unit in evicted:
+                    self._remove(unit.path)
+                if evicted and category.name == "allure_cache":
+                    # suite 里是指向 blob 的链接：实际释放量以 GC 结果为准
+                    result.freed_bytes = self._gc_blobs()
+            results.append(result)
+        return results
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"清理失败（已跳过）: {path} ({type(e).__name__}: {e})")
+
+    @staticmethod
+    def _gc_blobs() -> int:
+        try:
+            from utils.allure_cache import _cache_lock, gc_blobs
+
+            with _cache_lock():
+                return gc_blobs()[1]
+        except Exception as e:
+            logger.warning(f"blob GC 失败（已忽略）: {type(e).__name__}: {e}")
+            return 0
+
+
+def format_results(results: List[CategoryResult], *, dry_run: bool = False) -> List[str]:
+    verb = "would reclaim" if dry_run else "reclaimed"
+    total = sum(r.freed_bytes for r in results)
+    lines = [f"{verb} {total / 1024 / 1024:.1f}MB"]
+    for r in results:
+        lines.append(
+            f"  {r.name:<20} evicted={len(r.evicted):<4} {verb}={r.freed_bytes / 1024 / 1024:8.1f}MB "
+            f"remaining={r.remaining_bytes / 1024 / 1024:8.1f}MB protected={r.protected}"
+        )
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="artifact_retention", description="apply artifact retention budgets")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be removed")
+    parser.add_argument(
+        "--protect-minutes", type=float, default=30.0, help="never touch artifacts modified within N minutes"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="list evicted paths")
+    args = parser.parse_args(argv)
+
+    results = RetentionManager().run(protect_since=time.time() - args.protect_minutes * 60, dry_run=args.dry_run)
+    for line in format_results(results, dry_run=args.dry_run):
+        print(line)
+    if args.verbose:
+        for r in results:
+            for path in r.evicted:
+                print(f"  - {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
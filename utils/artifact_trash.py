@@ -0,0 +1,84 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Artifact Trash - O(1) directory reset with background deletion
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - setup_test_environment 在 gw0 上同步 rmtree allure-results / allure-report / screenshots
+# - 上一次运行留下数万文件 + GB 级 trace 时，rmtree 要几十秒，其它 worker 全部在栅栏上等
+#
+# 方案：
+# - reset_directory(path)：把旧目录 rename 到 .pytest_cache/pts-trash/<name>-<时间戳>-<pid>（同一文件系统上是原子操作），
+#   立即重建空目录；耗时与目录大小无关
+# - purge_trash_async()：启动一个脱离当前会话的后台进程（nice 10）删除整个 trash 目录，
+#   pytest 结束/被中断也不影响；上次没删完的残留会在下次一并删除
+# - rename 失败（跨设备挂载、权限等）时回退为同步 rmtree，行为与原来一致
+#
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_TRASH_DIR = Path(".pytest_cache") / "pts-trash"
+
+_PURGE_SCRIPT = (
+    "import os, shutil, sys\n"
+    "try:\n"
+    "    os.nice(10)\n"
+    "except Exception:\n"
+    "    pass\n"
+    "root = sys.argv[1]\n"
+    "for name in os.listdir(root):\n"
+    "    shutil.rmtree(os.path.join(root, name), ignore_errors=True)\n"
+)
+
+
+def reset_directory(path: Path, *, trash_dir: Optional[Path] = None, recreate: bool = True) -> bool:
+    """
+    清空并重建 path（recreate=False 时只移走不重建）：旧内容移入 trash（不删除）。
+    返回 True 表示走了 rename（需要随后调用 purge_trash_async），False 表示目录不存在或已同步删除。
+    """
+    path = Path(path)
+    trash = Path(trash_dir) if trash_dir is not None else DEFAULT_TRASH_DIR
+    moved = False
+    if path.exists():
+        target = trash / f"{path.name}-{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}"
+        try:
+            trash.mkdir(parents=True, exist_ok=True)
+            os.rename(path, target)
+            moved = True
+        except OSError as e:
+            logger.debug(f"rename 到 trash 失败，回退同步删除: {path} ({type(e).__name__}: {e})")
+            shutil.rmtree(path, ignore_errors=True)
+    if recreate:
+        path.mkdir(parents=True, exist_ok=True)
+    return moved
+
+
+def purge_trash_async(trash_dir: Optional[Path] = None) -> Optional[subprocess.Popen]:
+    """后台删除 trash 下的全部内容（不等待）；trash 为空时不启动进程。"""
+    trash = Path(trash_dir) if trash_dir is not None else DEFAULT_TRASH_DIR
+    try:
+        if not trash.is_dir() or not any(trash.iterdir()):
+            return None
+        return subprocess.Popen(  # noqa: S603
+            [sys.executable, "-c", _PURGE_SCRIPT, str(trash)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except Exception as e:
+        logger.warning(f"后台清理 trash 启动失败（残留会在下次运行时清理）: {type(e).__name__}: {e}")
+        return None
@@ -0,0 +1,273 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Static Asset Cache - disk-backed, shared by all browser contexts
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - BrowserContext 之间不共享 HTTP cache：每个新 context 都重新下载前端 JS/CSS bundle、字体、图片
+# - 大套件 + xdist 下，这部分流量会把前端 dev server 压得很慢
+#
+# 方案（opt-in：ASSET_CACHE=1）：
+# - context.route 拦截“静态资源”请求（is_probably_asset + resource_type 白名单，仅 GET）
+# - 内容寻址落盘：blobs/<sha256[:2]>/<sha256>；索引按 URL：index/<sha256(url)>.json
+# - 命中：
+#   - immutable / max-age 未过期：直接从磁盘 fulfill（不发网络请求）
+#   - 有 ETag/Last-Modified：条件请求复验，304 则从磁盘 fulfill
+#   - Cache-Control: no-cache（或 max-age=0）且带校验器的响应也落盘，但每次都复验；只有 no-store 不落盘
+# - API 请求（/api/、xhr/fetch/document 等）永不缓存
+# - 所有写入走 tmp + os.replace，xdist 多 worker 并发读写安全
+#
+# 容量：
+# - 缓存本身不做淘汰；长期运行的 agent 上由 utils/artifact_retention.py 的 asset_cache 类别按容量/年龄 LRU 清理
+#
+# 约束：
+# - 不引入第三方依赖
+#
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_TRUE_VALUES = {"1", "true", "True", "yes", "YES"}
+
+_ASSET_EXTS = {
+    ".js",
+    ".css",
+    ".map",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".svg",
+    ".ico",
+    ".woff",
+    ".woff2",
+    ".ttf",
+    ".eot",
+    ".pdf",
+    ".zip",
+}
+
+_ASSET_PREFIXES = ("/_next/", "/static/", "/assets/")
+
+# 传给 context.route 的正则（由 driver 侧匹配，非资源请求不会回到 Python）
+ASSET_URL_PATTERN = re.compile(
+    r"^https?://[^?#]*(/_next/|/static/|/assets/|\.(js|css|map|png|jpe?g|gif|webp|svg|ico|woff2?|ttf|eot|pdf|zip)([?#]|$))",
+    re.IGNORECASE,
+)
+
+_CACHEABLE_RESOURCE_TYPES = {"script", "stylesheet", "image", "font", "media", "manifest", "other"}
+
+# 回放时保留的响应头（body 已解压，content-encoding/content-length 不能原样带回）
+_KEEP_HEADERS = {
+    "content-type",
+    "cache-control",
+    "etag",
+    "last-modified",
+    "access-control-allow-origin",
+    "vary",
+}
+
+
+def asset_cache_enabled() -> bool:
+    return os.getenv("ASSET_CACHE", "").strip() in _TRUE_VALUES
+
+
+def is_probably_asset(url: str) -> bool:
+    p = urlparse(url)
+    path = (p.path or "").lower()
+    if not path:
+        return False
+    if path.startswith(_ASSET_PREFIXES):
+        return True
+    return any(path.endswith(ext) for ext in _ASSET_EXTS)
+
+
+def is_api_request(url: str) -> bool:
+    path = (urlparse(url).path or "").lower()
+    return "/api/" in path or path.endswith("/api")
+
+
+def is_cacheable_request(url: str, method: str, resource_type: str) -> bool:
+    if (method or "").upper() != "GET":
+        return False
+    if is_api_request(url):
+        return False
+    if (resource_type or "other") not in _CACHEABLE_RESOURCE_TYPES:
+        return False
+    return is_probably_asset(url)
+
+
+def _freshness_s(cache_control: str) -> Optional[float]:
+    """immutable -> 无限；max-age=N -> N；no-store/no-cache -> 0（每次复验）；未声明 -> None。"""
+    cc = (cache_control or "").lower()
+    if "no-store" in cc or "no-cache" in cc:
+        return 0.0
+    if "immutable" in cc:
+        return float("inf")
+    m = re.search(r"max-age=(\d+)", cc)
+    if m:
+        return float(m.group(1))
+    return None
+
+
+def _storable(headers: Dict[str, str]) -> bool:
+    """no-store 不落盘；需要每次复验（新鲜度为 0）的响应只有带 ETag/Last-Modified 时才值得落盘。"""
+    cc = (headers.get("cache-control") or "").lower()
+    if "no-store" in cc:
+        return False
+    if _freshness_s(cc) == 0.0:
+        return bool(headers.get("etag") or headers.get("last-modified"))
+    return True
+
+
+@dataclass
+class AssetCacheStats:
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    stored: int = 0
+    bypassed: int = 0
+    bytes_served: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class AssetCache:
+    """
+    内容寻址的静态资源缓存（跨 context / 跨 worker 共享同一目录）。
+
+    使用方式:
+        cache = AssetCache()
+        cache.install(context)
+    """
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self.root = Path(root or os.getenv("ASSET_CACHE_DIR", "") or ".cache/assets")
+        self.stats = AssetCacheStats()
+        self._stats_lock = threading.Lock()
+
+    def _count(self, **deltas: int) -> None:
+        """route 回调可能在不同线程上并发执行，统计计数统一加锁。"""
+        with self._stats_lock:
+            for key, delta in deltas.items():
+                setattr(self.stats, key, getattr(self.stats, key) + delta)
+
+    # ═══════════════════════════════════════════════════════════════
+    # STORAGE
+    # ═══════════════════════════════════════════════════════════════
+
+    def _index_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / "index" / key[:2] / f"{key}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.tmp.{os.getpid()}.{time.time_ns()}")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        p = self._index_path(url)
+        try:
+            entry = json.loads(p.read_text(encoding="utf-8"))
+        except Exception:
+            return None
+        if entry.get("url") != url or not self._blob_path(entry.get("sha256", "")).exists():
+            return None
+        return entry
+
+    def store(self, url: str, body: bytes, headers: Dict[str, str]) -> Dict[str, Any]:
+        digest = hashlib.sha256(body).hexdigest()
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            self._atomic_write(blob, body)
+        kept = {k.lower(): v for k, v in (headers or {}).items() if k.lower() in _KEEP_HEADERS}
+        entry = {"url": url, "sha256": digest, "size": len(body), "headers": kept, "stored_at": time.time()}
+        self._atomic_write(self._index_path(url), json.dumps(entry).encode("utf-8"))
+        self._count(stored=1)
+        return entry
+
+    def is_fresh(self, entry: Dict[str, Any], now: Optional[float] = None) -> bool:
+        ttl = _freshness_s((entry.get("headers") or {}).get("cache-control", ""))
+        if ttl is None:
+            # 未声明缓存策略：带内容 hash 的构建产物（/_next/static/）按不可变处理，其它一律复验
+            return "/_next/static/" in (urlparse(entry.get("url", "")).path or "")
+        return ((now or time.time()) - float(entry.get("stored_at") or 0)) < ttl
+
+    # ═══════════════════════════════════════════════════════════════
+    # ROUTE HANDLER
+    # ═══════════════════════════════════════════════════════════════
+
+    def install(self, context) -> None:
+        context.route(ASSET_URL_PATTERN, self.handle)
+
+    def _fulfill_from_disk(self, route, entry: Dict[str, Any]) -> None:
+        blob = self._blob_path(entry["sha256"])
+        route.fulfill(status=200, headers=entry.get("headers") or {}, body=blob.read_bytes())
+        self._count(bytes_served=int(entry.get("size") or 0))
+
+    def handle(self, route, request) -> None:
+        url = request.url
+        if not is_cacheable_request(url, request.method, request.resource_type):
+            self._count(bypassed=1)
+            route.fallback()
+            return
+
+        try:
+            entry = self.lookup(url)
+            if entry is not None and self.is_fresh(entry):
+                self._fulfill_from_disk(route, entry)
+                self._count(hits=1)
+                return
+
+            headers = dict(request.headers)
+            if entry is not None:
+                h = entry.get("headers") or {}
+                if h.get("etag"):
+                    headers["if-none-match"] = h["etag"]
+                if h.get("last-modified"):
+                    headers["if-modified-since"] = h["last-modified"]
+
+            resp = route.fetch(headers=headers)
+            if resp.status == 304 and entry is not None:
+                self._fulfill_from_disk(route, entry)
+                self._count(revalidated=1)
+                return
+
+            body = resp.body()
+            self._count(misses=1)
+            resp_headers = {k.lower(): v for k, v in (resp.headers or {}).items()}
+            if resp.status == 200 and _storable(resp_headers):
+                try:
+                    self.store(url, body, resp_headers)
+                except Exception as e:
+                    logger.debug(f"asset cache 写入失败（已忽略）: {url} {type(e).__name__}: {e}")
+            route.fulfill(response=resp, body=body)
+        except Exception as e:
+            # 缓存层任何异常都不能影响页面加载：交回默认网络处理
+            logger.debug(f"asset cache 异常，回退网络: {url} {type(e).__name__}: {e}")
+            try:
+                route.fallback()
+            except Exception:
+                pass
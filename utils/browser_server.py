@@ -0,0 +1,242 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Shared Browser Servers - one Chromium for many xdist workers
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - xdist 下每个 worker 都通过 pytest-playwright 各自启动一个 Chromium；
+#   generators 的 PageAnalyzer.analyze 每次调用又会再启动一个
+# - 32 核 runner 上浏览器进程数 = worker 数，内存与冷启动开销都随之放大
+#
+# 方案：
+# - controller（xdist master / 非 xdist 的主进程）启动 N 个 Chromium（remote debugging），
+#   把 endpoint 写进环境变量 PTS_BROWSER_ENDPOINTS（逗号分隔），worker 进程继承该变量
+# - worker 用 connect_over_cdp 连接（按 worker 序号取模分配），以 BrowserContext 作为隔离单元
+# - 浏览器进程数（BROWSER_SERVERS）与 pytest worker 数（-n）相互独立
+#
+# 说明：
+# - Playwright Python 没有 launch_server（仅 Node 提供）；`playwright run-server` 又是“每个连接一个浏览器”，
+#   达不到共享目的，因此这里用 Chromium 原生 remote debugging + connect_over_cdp 实现
+# - 仅支持 chromium；其它浏览器类型回退为各自 launch
+#
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from utils.config import ConfigManager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ENDPOINTS_ENV = "PTS_BROWSER_ENDPOINTS"
+
+
+def configured_server_count() -> int:
+    """BROWSER_SERVERS / browser.servers：共享浏览器进程数（0 = 关闭）。"""
+    try:
+        return max(int(ConfigManager().get("browser.servers", 0) or 0), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def shared_endpoints() -> List[str]:
+    raw = os.getenv(ENDPOINTS_ENV, "").strip()
+    return [x.strip() for x in raw.split(",") if x.strip()]
+
+
+def endpoint_for_worker(worker_id: str, endpoints: List[str]) -> Optional[str]:
+    """按 xdist worker 序号（gw<N>）取模分配 endpoint；非 xdist 取第一个。"""
+    if not endpoints:
+        return None
+    idx = 0
+    if worker_id.startswith("gw"):
+        try:
+            idx = int(worker_id[2:] or "0")
+        except ValueError:
+            idx = 0
+    return endpoints[idx % len(endpoints)]
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+@dataclass
+class _ServerProcess:
+    proc: subprocess.Popen
+    endpoint: str
+    user_data_dir: str
+    log_file: object
+
+
+class BrowserServerGroup:
+    """
+    controller 侧启动/回收一组共享 Chromium。
+
+    使用方式:
+        group = BrowserServerGroup(count=2, headless=True)
+        endpoints = group.start()
+        ...
+        group.stop()
+    """
+
+    def __init__(
+        self,
+        *,
+        count: int,
+        headless: bool = True,
+        args: Optional[List[str]] = None,
+        executable_path: Optional[str] = None,
+        log_dir: Path = Path("reports"),
+        startup_timeout_s: float = 30.0,
+    ) -> None:
+        self.count = max(int(count), 0)
+        self.headless = headless
+        self.args = list(args or [])
+        self.executable_path = executable_path
+        self.log_dir = log_dir
+        self.startup_timeout_s = startup_timeout_s
+        self._servers: List[_ServerProcess] = []
+
+    @property
+    def endpoints(self) -> List[str]:
+        return [s.endpoint for s in self._servers]
+
+    def _resolve_executable(self) -> str:
+        if self.executable_path:
+            return self.executable_path
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as p:
+            return p.chromium.executable_path
+
+    def start(self) -> List[str]:
+        if self._servers or self.count <= 0:
+            return self.endpoints
+        exe = self._resolve_executable()
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            for i in range(self.count):
+                self._servers.append(self._start_one(exe, i))
+        except Exception:
+            self.stop()
+            raise
+        logger.info(f"🌐 共享浏览器已启动: count={self.count} endpoints={self.endpoints}")
+        return self.endpoints
+
+    def _start_one(self, exe: str, index: int) -> _ServerProcess:
+        port = _free_port()
+        user_data_dir = tempfile.mkdtemp(prefix=f"pts-browser-{index}-")
+        cmd = [
+            exe,
+            f"--remote-debugging-port={port}",
+            "--remote-debugging-address=127.0.0.1",
+            f"--user-data-dir={user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            *self.args,
+        ]
+        if self.headless:
+            cmd.append("--headless=new")
+        cmd.append("about:blank")
+
+        log_file = open(self.log_dir / f"browser_server.{index}.log", "wb")  # noqa: SIM115
+        proc = subprocess.Popen(cmd, stdout=log_file, stderr=subprocess.STDOUT)  # noqa: S603
+        server = _ServerProcess(proc=proc, endpoint="", user_data_dir=user_data_dir, log_file=log_file)
+
+        deadline = time.time() + self.startup_timeout_s
+        version_url = f"http://127.0.0.1:{port}/json/version"
+        while time.time() < deadline:
+            if proc.poll() is not None:
+                self._stop_one(server)
+                raise RuntimeError(f"browser server #{index} exited early (code={proc.returncode})")
+            try:
+                with urllib.request.urlopen(version_url, timeout=1) as resp:  # noqa: S310
+                    info = json.loads(resp.read().decode("utf-8"))
+                server.endpoint = str(info.get("webSocketDebuggerUrl") or f"http://127.0.0.1:{port}")
+                return server
+            except Exception:
+                time.sleep(0.1)
+        self._stop_one(server)
+        raise RuntimeError(f"browser server #{index} not ready within {self.startup_timeout_s}s")
+
+    def stop(self) -> None:
+        for server in self._servers:
+            self._stop_one(server)
+        self._servers = []
+
+    @staticmethod
+    def _stop_one(server: _ServerProcess) -> None:
+        try:
+            server.proc.terminate()
+            server.proc.wait(timeout=10)
+        except Exception:
+            try:
+                server.proc.kill()
+            except Exception:
+                pass
+        try:
+            server.log_file.close()
+        except Exception:
+            pass
+        shutil.rmtree(server.user_data_dir, ignore_errors=True)
+
+
+def open_browser(playwright, *, headless: bool = True, worker_id: str = ""):
+    """
+    有共享 endpoint 时 connect_over_cdp，否则本地 launch（generators 复用此入口）。
+
+    返回的 browser 调用 close() 时：connect 模式仅断开连接，不会关闭共享进程。
+    """
+    endpoint = endpoint_for_worker(worker_id or os.getenv("PYTEST_XDIST_WORKER", "") or "", shared_endpoints())
+    if endpoint:
+        try:
+            return playwright.chromium.connect_over_cdp(endpoint)
+        except Exception as e:
+            logger.warning(f"连接共享浏览器失败，回退为本地 launch: {endpoint} ({type(e).__name__}: {e})")
+    return playwright.chromium.launch(headless=headless)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    手动启动共享浏览器（供 generators 等非 pytest 场景复用）:
+
+        python -m utils.browser_server --count 2
+        # 按提示 export PTS_BROWSER_ENDPOINTS=... 后运行生成脚本；Ctrl+C 退出并回收
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="browser_server")
+    parser.add_argument("--count", type=int, default=max(configured_server_count(), 1))
+    parser.add_argument("--headed", action="store_true", help="disable headless mode")
+    args = parser.parse_args(argv)
+
+    group = BrowserServerGroup(count=args.count, headless=not args.headed)
+    endpoints = group.start()
+    print(f"export {ENDPOINTS_ENV}={','.join(endpoints)}", flush=True)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        group.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
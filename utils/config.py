@@ -221,6 +221,8 @@ class ConfigManager:
             "timeout": self.get("health_check.timeout", 10),
             "retry_count": self.get("health_check.retry_count", 3),
             "retry_interval": self.get("health_check.retry_interval", 2),
+            "deadline": self.get("health_check.deadline", 30),
+            "required": self.get("health_check.required", []),
         }
     
     def get_service_startup_config(self, service_name: str = None) -> Dict:
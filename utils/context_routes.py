@@ -0,0 +1,89 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Context Routes - opt-in context.route layers in one place
+# ═══════════════════════════════════════════════════════════════
+#
+# 说明：
+# - fixtures（auth_page/unauth_page/shared_page/page）与 generators 创建 context 后统一调用
+#   install_context_routes(ctx)，避免每个入口各自拼装 route
+# - Playwright route 优先级：后注册的先匹配；未处理的请求用 route.fallback() 交给先注册的 handler
+# - 复用池里的 context 在 reset 时会 unroute_all，因此每次 acquire 后都需要重新 install
+#
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from utils.asset_cache import AssetCache, asset_cache_enabled
+from utils.logger import get_logger
+from utils.request_blocker import BlockPolicy, RequestBlocker, blocked_counts
+
+logger = get_logger(__name__)
+
+# 进程内单例：统计按 worker 汇总，落盘目录跨 worker 共享
+_ASSET_CACHE: Optional[AssetCache] = None
+_BLOCKER: Optional[RequestBlocker] = None
+_BLOCKER_LOADED = False
+
+
+def get_asset_cache() -> Optional[AssetCache]:
+    global _ASSET_CACHE
+    if not asset_cache_enabled():
+        return None
+    if _ASSET_CACHE is None:
+        _ASSET_CACHE = AssetCache()
+    return _ASSET_CACHE
+
+
+def log_asset_cache_stats() -> None:
+    """session 结束时调用：记录本进程的 asset cache 统计（未启用或未使用过则 no-op）。"""
+    if _ASSET_CACHE is None:
+        return
+    logger.info(f"📦 asset cache stats: {_ASSET_CACHE.stats.as_dict()}")
+
+
+def get_request_blocker() -> Optional[RequestBlocker]:
+    global _BLOCKER, _BLOCKER_LOADED
+    if not _BLOCKER_LOADED:
+        _BLOCKER_LOADED = True
+        try:
+            policy = BlockPolicy.from_config()
+        except Exception as e:
+            logger.warning(f"network.block 配置解析失败（已忽略）: {type(e).__name__}: {e}")
+            policy = None
+        _BLOCKER = RequestBlocker(policy) if policy is not None else None
+    return _BLOCKER
+
+
+def install_context_routes(context) -> None:
+    """按开关为 context 安装 route 层；任何失败只记日志，不影响用例。"""
+    # 注册顺序 = 优先级从低到高：第三方拦截最后注册，先于 asset cache 生效
+    cache = get_asset_cache()
+    if cache is not None:
+        try:
+            cache.install(context)
+        except Exception as e:
+            logger.warning(f"asset cache route 安装失败（已忽略）: {type(e).__name__}: {e}")
+
+    blocker = get_request_blocker()
+    if blocker is not None:
+        try:
+            blocker.install(context)
+        except Exception as e:
+            logger.warning(f"request blocker route 安装失败（已忽略）: {type(e).__name__}: {e}")
+
+
+def attach_route_stats(context) -> None:
+    """把本用例期间被拦截的第三方请求数附加到 Allure（无拦截时不附加）。"""
+    counts = blocked_counts(context)
+    if not counts:
+        return
+    lines = [f"total={sum(counts.values())}"]
+    lines.extend(f"{n:5d}  {key}" for key, n in counts.most_common())
+    try:
+        import allure  # type: ignore
+
+        allure.attach("\n".join(lines), name="blocked_requests", attachment_type=allure.attachment_type.TEXT)
+    except Exception:
+        pass
@@ -0,0 +1,242 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# DOM Query - bulk element reads in one evaluate_all round trip
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - PageUtils.get_all_attributes 先 locator.all()，再对每个元素 get_attribute：N 个元素 = N+1 次 driver 往返
+# - 生成器抽取元素时每个元素还要再读 10+ 个属性，500 行表格/大页面会慢到分钟级
+#
+# 方案：
+# - 字段列表下发到页面，一次 locator.evaluate_all 返回紧凑记录列表（list[dict]，key 即字段名）
+# - 支持的字段：
+#     text        textContent
+#     inner_text  innerText（受 CSS 影响，较慢）
+#     value       input/textarea/select 的 value（其它元素为 None）
+#     tag         小写标签名
+#     attr:<名>   getAttribute（不存在为 None）
+#     has:<名>    hasAttribute（布尔属性：required/disabled/...）
+#     visible     与 Playwright 可见性语义一致：有非空 bbox 且 visibility 不为 hidden
+#     checked     checkbox/radio 的 checked
+#     bbox        {x, y, width, height}；不可见元素为 None
+#
+# 说明：
+# - selector 仍走 Playwright 选择器引擎（支持 :has-text / text= 等扩展），不会因 CSS 不兼容丢元素
+# - 未知字段在 Python 侧直接报错，避免拼错字段名时静默返回 None
+#
+# 批量填写（fill_many）：
+# - PageUtils.fill_form / 生成的 fill_* 每个字段一次 fill，且每次都先等可见：一个 10 字段表单 ~30 次往返
+# - fill_many({selector: value})（PageActions.fill_many，显式选用；fill_form 行为不变）一次 page.evaluate 完成
+#   唯一性/可见性/可编辑校验 + 赋值：
+#     通过原生 value setter 赋值（React 受控组件靠它感知变化），再派发 input/change（冒泡）与 focusout，
+#     react-hook-form 的 onChange/onBlur 模式都能拿到新值
+# - 脚本处理不了的字段（Playwright 扩展选择器、尚未渲染/不可见/禁用、非表单元素）逐个回退到 page.fill，
+#   保留原有的等待与超时报错（<select> 的值不是 option value 时按 label 选择）
+# - 与 Playwright strict 模式一致：selector 匹配多个元素时直接报错；匹配 0 个时回退 page.fill（等待渲染，超时报错）
+# - 确实依赖键盘事件的字段（自动补全、输入掩码）用 FillValue(value, realistic=True) 单独标记，仅它们逐键输入
+#   （按键间隔默认 0，TYPE_TEXT_DELAY_MS 可调；只影响 realistic 字段，type_text 仍默认 50ms）
+#
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+QUERY_FIELDS = ("text", "inner_text", "value", "tag", "visible", "checked", "bbox")
+_FIELD_PREFIXES = ("attr:", "has:")
+
+DOM_QUERY_JS = """
+(elements, fields) => {
+  const visible = (el) => {
+    const rect = el.getBoundingClientRect();
+    if (!rect.width || !rect.height) return false;
+    const style = window.getComputedStyle(el);
+    return !!style && style.visibility !== 'hidden';
+  };
+  const read = (el, field) => {
+    if (field === 'text') return el.textContent;
+    if (field === 'inner_text') return el.innerText;
+    if (field === 'value') return ('value' in el) && typeof el.value === 'string' ? el.value : null;
+    if (field === 'tag') return el.tagName.toLowerCase();
+    if (field === 'visible') return visible(el);
+    if (field === 'checked') return !!el.checked;
+    if (field === 'bbox') {
+      if (!visible(el)) return null;
+      const r = el.getBoundingClientRect();
+      return { x: r.x, y: r.y, width: r.width, height: r.height };
+    }
+    if (field.startsWith('attr:')) return el.getAttribute(field.slice(5));
+    if (field.startsWith('has:')) return el.hasAttribute(field.slice(4));
+    return null;
+  };
+  return elements.map((el) => {
+    const record = {};
+    for (const field of fields) record[field] = read(el, field);
+    return record;
+  });
+}
+"""
+
+
+def normalize_fields(fields: Optional[Sequence[str]]) -> List[str]:
+    """校验字段名并去重（保持顺序）；None/空 -> ["text"]。"""
+    out: List[str] = []
+    for field in fields or ["text"]:
+        field = str(field).strip()
+        if field not in QUERY_FIELDS and not (field.startswith(_FIELD_PREFIXES) and ":" in field and field.split(":", 1)[1]):
+            raise ValueError(f"未知查询字段: {field!r}（可用: {', '.join(QUERY_FIELDS)}, attr:<name>, has:<name>）")
+        if field not in out:
+            out.append(field)
+    return out
+
+
+def query_locator(locator, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """对 sync Locator 执行一次 evaluate_all，返回每个匹配元素的字段记录（无匹配返回 []）。"""
+    return locator.evaluate_all(DOM_QUERY_JS, normalize_fields(fields))
+
+
+# ═══════════════════════════════════════════════════════════════
+# BULK FILL
+# ═══════════════════════════════════════════════════════════════
+
+FILL_MANY_JS = """
+(items) => {
+  const setters = {};
+  const nativeSetter = (el) => {
+    const proto = Object.getPrototypeOf(el);
+    const key = proto.constructor.name;
+    if (!(key in setters)) {
+      const desc = Object.getOwnPropertyDescriptor(proto, 'value');
+      setters[key] = desc && desc.set;
+    }
+    return setters[key];
+  };
+  const visible = (el) => {
+    const rect = el.getBoundingClientRect();
+    if (!rect.width || !rect.height) return false;
+    const style = window.getComputedStyle(el);
+    return !!style && style.visibility !== 'hidden';
+  };
+  return items.map(([selector, value]) => {
+    let matches = null;
+    try { matches = document.querySelectorAll(selector); } catch (e) { return 'invalid'; }
+    if (!matches.length) return 'missing';
+    if (matches.length > 1) return 'multiple';
+    const el = matches[0];
+    if (!visible(el)) return 'hidden';
+    const tag = el.tagName.toLowerCase();
+    const editable = tag === 'input' || tag === 'textarea' || tag === 'select';
+    if (!editable && !el.isContentEditable) return 'unsupported';
+    if (editable && ['checkbox', 'radio', 'file'].includes((el.type || '').toLowerCase())) return 'unsupported';
+    if (el.disabled || el.readOnly) return 'disabled';
+    el.focus();
+    if (editable) {
+      const setter = nativeSetter(el);
+      if (setter) setter.call(el, value); else el.value = value;
+      if (tag === 'select' && el.value !== value) return 'select';
+    } else {
+      el.textContent = value;
+    }
+    el.dispatchEvent(new Event('input', { bubbles: true }));
+    el.dispatchEvent(new Event('change', { bubbles: true }));
+    el.dispatchEvent(new FocusEvent('focusout', { bubbles: true }));
+    el.blur();
+    return 'ok';
+  });
+}
+"""
+
+
+@dataclass(frozen=True)
+class FillValue:
+    """fill_many 的单字段值；realistic=True 表示该字段需要真实键盘事件（逐键输入）。"""
+
+    value: str
+    realistic: bool = False
+    delay: Optional[int] = None
+
+
+FillValues = Mapping[str, Union[str, FillValue]]
+
+
+def _ambiguous(statuses: Sequence[str], items: Sequence[Tuple[str, FillValue]]) -> None:
+    many = [selector for (selector, _item), status in zip(items, statuses) if status == "multiple"]
+    if many:
+        raise ValueError(f"fill_many: selector 匹配到多个元素（需唯一）: {many}")
+
+
+def type_delay_ms(delay: Optional[int] = None) -> int:
+    """逐键输入的按键间隔：显式传入优先，否则 TYPE_TEXT_DELAY_MS（默认 0）。"""
+    if delay is not None:
+        return max(int(delay), 0)
+    try:
+        return max(int(os.getenv("TYPE_TEXT_DELAY_MS", "0") or "0"), 0)
+    except ValueError:
+        return 0
+
+
+def plan_fill(values: FillValues) -> List[Tuple[bool, List[Tuple[str, FillValue]]]]:
+    """
+    按原顺序把字段切成批次：连续的普通字段合并为一批（一次 evaluate），realistic 字段单独成批。
+    返回 [(realistic, [(selector, FillValue), ...]), ...]
+    """
+    batches: List[Tuple[bool, List[Tuple[str, FillValue]]]] = []
+    for selector, raw in values.items():
+        item = raw if isinstance(raw, FillValue) else FillValue("" if raw is None else str(raw))
+        if batches and not item.realistic and not batches[-1][0]:
+            batches[-1][1].append((selector, item))
+        else:
+            batches.append((item.realistic, [(selector, item)]))
+    return batches
+
+
+def fill_many(page, values: FillValues, *, timeout: int = 30000) -> None:
+    """
+    sync 版批量填写（见模块说明）；任一字段最终失败时抛出 page.fill 的原始异常。
+    """
+    for realistic, items in plan_fill(values):
+        if realistic:
+            selector, item = items[0]
+            locator = page.locator(selector)
+            locator.fill("", timeout=timeout)
+            locator.press_sequentially(item.value, delay=type_delay_ms(item.delay), timeout=timeout)
+            continue
+        try:
+            statuses = page.evaluate(FILL_MANY_JS, [[sel, item.value] for sel, item in items])
+        except Exception as e:
+            logger.debug(f"批量填写脚本失败，逐个回退: {type(e).__name__}: {e}")
+            statuses = ["error"] * len(items)
+        _ambiguous(statuses, items)
+        for (selector, item), status in zip(items, statuses):
+            if status == "select":
+                page.select_option(selector, label=item.value, timeout=timeout)
+            elif status != "ok":
+                page.fill(selector, item.value, timeout=timeout)
+
+
+async def async_fill_many(page, values: FillValues, *, timeout: int = 30000) -> None:
+    """fill_many 的 async 版本（playwright.async_api）。"""
+    for realistic, items in plan_fill(values):
+        if realistic:
+            selector, item = items[0]
+            locator = page.locator(selector)
+            await locator.fill("", timeout=timeout)
+            await locator.press_sequentially(item.value, delay=type_delay_ms(item.delay), timeout=timeout)
+            continue
+        try:
+            statuses = await page.evaluate(FILL_MANY_JS, [[sel, item.value] for sel, item in items])
+        except Exception as e:
+            logger.debug(f"批量填写脚本失败，逐个回退: {type(e).__name__}: {e}")
+            statuses = ["error"] * len(items)
+        _ambiguous(statuses, items)
+        for (selector, item), status in zip(items, statuses):
+            if status == "select":
+                await page.select_option(selector, label=item.value, timeout=timeout)
+            elif status != "ok":
+                await page.fill(selector, item.value, timeout=timeout)
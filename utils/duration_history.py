@@ -0,0 +1,483 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Duration History - per-test setup/call/teardown durations across runs
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - conftest 的 pytest_runtest_logreport 只在内存里按文件累加本次 call 耗时，跑完即丢
+# - 调度（分片/排序）、超时、性能回归判断都需要“这个用例以前通常跑多久”
+#
+# 方案（SQLite，默认 .test-history/durations.sqlite；make clean 不会删除）：
+# - runs:     每次运行一行（开始/结束时间、环境 TEST_ENV、主机、commit、worker 数、exitstatus）
+# - tests:    每个用例每次尝试一行（setup/call/teardown 秒数、outcome、worker；重跑 attempt 递增）
+# - fixtures: 每个用例实际执行的 fixture setup 耗时（session/module 级 fixture 只记在触发它的那个用例上）
+# - 写入只在 session 结束时由 controller 做一次（一个事务），超过 keep_runs 的旧运行自动删除
+#
+# 查询（python -m utils.duration_history <cmd>，或 DurationHistory API）：
+# - slowest      最近 N 次运行中位数/p90 最慢的用例
+# - regressions  最新一次运行 vs 每个用例之前最近 N 个 passed 样本（同环境）：稳健 z 分数
+#                (x - median) / (1.4826 * MAD) >= z，且同时超过 min_ratio 倍与 min_delta_s 秒才算回归
+# - fixtures     各 fixture 的 setup 开销（次数/均值/p90/每次运行合计）
+# - expected_durations()  每个用例的历史中位耗时，供调度与超时决策使用
+#
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
+
+from utils.config import ConfigManager
+
+DEFAULT_DB_PATH = Path(".test-history") / "durations.sqlite"
+SCHEMA_VERSION = 1
+_FALSE_VALUES = {"0", "false", "False", "no", "NO"}
+
+# phase -> SQL 表达式（白名单，避免拼接任意列名）
+PHASES = {
+    "setup": "setup_s",
+    "call": "call_s",
+    "teardown": "teardown_s",
+    "total": "setup_s + call_s + teardown_s",
+}
+TIMED_OUTCOMES = ("passed", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_uid     TEXT,
+    started_at  REAL,
+    finished_at REAL,
+    env         TEXT,
+    host        TEXT,
+    git_commit  TEXT,
+    workers     INTEGER,
+    exitstatus  INTEGER
+);
+CREATE TABLE IF NOT EXISTS tests (
+    run_id     INTEGER NOT NULL,
+    nodeid     TEXT NOT NULL,
+    attempt    INTEGER NOT NULL DEFAULT 1,
+    worker     TEXT,
+    outcome    TEXT,
+    setup_s    REAL NOT NULL DEFAULT 0,
+    call_s     REAL NOT NULL DEFAULT 0,
+    teardown_s REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS tests_by_node ON tests (nodeid, run_id);
+CREATE INDEX IF NOT EXISTS tests_by_run ON tests (run_id);
+CREATE TABLE IF NOT EXISTS fixtures (
+    run_id  INTEGER NOT NULL,
+    nodeid  TEXT NOT NULL,
+    fixture TEXT NOT NULL,
+    scope   TEXT,
+    setup_s REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS fixtures_by_run ON fixtures (run_id);
+"""
+
+
+def history_enabled(config: Optional[ConfigManager] = None) -> bool:
+    raw = os.getenv("DURATION_HISTORY")
+    if raw is None:
+        raw = str((config or ConfigManager()).get("duration_history.enabled", True))
+    return raw.strip() not in _FALSE_VALUES
+
+
+@dataclass
+class DurationRecord:
+    """一个用例的一次尝试。"""
+
+    nodeid: str
+    attempt: int = 1
+    worker: str = "main"
+    outcome: str = "passed"
+    setup_s: float = 0.0
+    call_s: float = 0.0
+    teardown_s: float = 0.0
+    fixtures: Dict[str, Tuple[str, float]] = field(default_factory=dict)  # name -> (scope, setup 秒数)
+
+    @property
+    def total_s(self) -> float:
+        return self.setup_s + self.call_s + self.teardown_s
+
+
+# ═══════════════════════════════════════════════════════════════
+# STATISTICS
+# ═══════════════════════════════════════════════════════════════
+
+def percentile(values: List[float], q: float) -> float:
+    """线性插值分位数（q ∈ [0, 1]）；空列表返回 0。"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def robust_score(value: float, baseline: List[float]) -> Tuple[float, float]:
+    """
+    返回 (baseline 中位数, 稳健 z 分数)。
+    尺度用 1.4826 * MAD（对偶发的慢样本不敏感），并至少取中位数的 5% / 10ms，避免完全稳定的用例被微小抖动判为回归。
+    """
+    median = percentile(baseline, 0.5)
+    mad = percentile([abs(v - median) for v in baseline], 0.5)
+    scale = max(1.4826 * mad, 0.05 * median, 0.01)
+    return median, (value - median) / scale
+
+
+# ═══════════════════════════════════════════════════════════════
+# STORE
+# ═══════════════════════════════════════════════════════════════
+
+class DurationHistory:
+    """
+    用例耗时历史库（见模块说明）。
+
+    使用方式:
+        history = DurationHistory.from_config()
+        run_id = history.record_run(records, env="dev", started_at=t0)
+        for row in history.regressions(run_id=run_id):
+            print(row["nodeid"], row["value"], row["median"])
+    """
+
+    def __init__(self, path: Path = DEFAULT_DB_PATH, *, keep_runs: int = 200) -> None:
+        self.path = Path(path)
+        self.keep_runs = keep_runs
+
+    @classmethod
+    def from_config(cls, config: Optional[ConfigManager] = None) -> "DurationHistory":
+        config = config or ConfigManager()
+        try:
+            keep_runs = int(config.get("duration_history.keep_runs", 200))
+        except (TypeError, ValueError):
+            keep_runs = 200
+        return cls(Path(str(config.get("duration_history.path", DEFAULT_DB_PATH) or DEFAULT_DB_PATH)), keep_runs=keep_runs)
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return conn
+
+    # ───────────────────────── write ─────────────────────────
+
+    def record_run(
+        self,
+        records: Iterable[DurationRecord],
+        *,
+        env: str,
+        started_at: float,
+        finished_at: Optional[float] = None,
+        exitstatus: int = 0,
+        run_uid: Optional[str] = None,
+    ) -> int:
+        """写入一次运行的全部记录（单个事务），返回 run id。"""
+        records = list(records)
+        workers = len({r.worker for r in records})
+        commit = os.getenv("GIT_COMMIT") or os.getenv("CI_COMMIT_SHA") or os.getenv("GITHUB_SHA") or ""
+        with closing(self._connect()) as conn, conn:
+            cur = conn.execute(
+                "INSERT INTO runs (run_uid, started_at, finished_at, env, host, git_commit, workers, exitstatus)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_uid or os.getenv("PYTEST_XDIST_TESTRUNUID") or uuid4().hex,
+                    started_at,
+                    time.time() if finished_at is None else finished_at,
+                    env,
+                    socket.gethostname(),
+                    commit,
+                    workers,
+                    int(exitstatus),
+                ),
+            )
+            run_id = int(cur.lastrowid)
+            conn.executemany(
+                "INSERT INTO tests (run_id, nodeid, attempt, worker, outcome, setup_s, call_s, teardown_s)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, r.nodeid, r.attempt, r.worker, r.outcome, r.setup_s, r.call_s, r.teardown_s) for r in records],
+            )
+            conn.executemany(
+                "INSERT INTO fixtures (run_id, nodeid, fixture, scope, setup_s) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (run_id, r.nodeid, name, scope, seconds)
+                    for r in records
+                    for name, (scope, seconds) in r.fixtures.items()
+                ],
+            )
+            self._prune(conn)
+        return run_id
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        if self.keep_runs <= 0:
+            return
+        row = conn.execute("SELECT id FROM runs ORDER BY id DESC LIMIT 1 OFFSET ?", (self.keep_runs - 1,)).fetchone()
+        if row is None:
+            return
+        for table in ("tests", "fixtures"):
+            conn.execute(f"DELETE FROM {table} WHERE run_id < ?", (row["id"],))
+        conn.execute("DELETE FROM runs WHERE id < ?", (row["id"],))
+
+    # ───────────────────────── read ─────────────────────────
+
+    def runs(self, limit: int = 20, env: Optional[str] = None) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT r.*, COUNT(t.nodeid) AS tests, COALESCE(SUM(t.setup_s + t.call_s + t.teardown_s), 0) AS busy_s"
+                " FROM runs r LEFT JOIN tests t ON t.run_id = r.id"
+                " WHERE (? IS NULL OR r.env = ?) GROUP BY r.id ORDER BY r.id DESC LIMIT ?",
+                (env, env, limit),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def _run_ids(self, conn: sqlite3.Connection, runs: int, env: Optional[str], before: Optional[int] = None) -> List[int]:
+        rows = conn.execute(
+            "SELECT id FROM runs WHERE (? IS NULL OR env = ?) AND (? IS NULL OR id < ?) ORDER BY id DESC LIMIT ?",
+            (env, env, before, before, runs),
+        ).fetchall()
+        return [int(r["id"]) for r in rows]
+
+    def _samples(
+        self, conn: sqlite3.Connection, run_ids: List[int], phase: str, outcomes: Iterable[str] = TIMED_OUTCOMES
+    ) -> Dict[str, List[float]]:
+        expr = PHASES[phase]
+        outcomes = tuple(outcomes)
+        samples: Dict[str, List[float]] = {}
+        if not run_ids:
+            return samples
+        rows = conn.execute(
+            f"SELECT nodeid, {expr} AS value FROM tests"
+            f" WHERE run_id IN ({','.join('?' * len(run_ids))}) AND outcome IN ({','.join('?' * len(outcomes))})",
+            (*run_ids, *outcomes),
+        )
+        for row in rows:
+            samples.setdefault(row["nodeid"], []).append(float(row["value"]))
+        return samples
+
+    def _passed_baseline(
+        self, conn: sqlite3.Connection, nodeids: Iterable[str], env: Optional[str], before: int, phase: str, window: int
+    ) -> Dict[str, List[float]]:
+        """每个 nodeid 在 before 之前（同环境）最近 window 个 passed 样本；按用例取，不受其它运行没跑它的影响。"""
+        expr = PHASES[phase]
+        samples: Dict[str, List[float]] = {}
+        for nodeid in nodeids:
+            rows = conn.execute(
+                f"SELECT {expr} AS value FROM tests"
+                " WHERE nodeid = ? AND run_id < ? AND outcome = 'passed'"
+                " AND (? IS NULL OR run_id IN (SELECT id FROM runs WHERE env = ?))"
+                " ORDER BY run_id DESC, attempt DESC LIMIT ?",
+                (nodeid, before, env, env, window),
+            ).fetchall()
+            if rows:
+                samples[nodeid] = [float(row["value"]) for row in rows]
+        return samples
+
+    def expected_durations(self, *, runs: int = 20, phase: str = "total", env: Optional[str] = None) -> Dict[str, float]:
+        """最近 runs 次运行中每个用例的中位耗时（秒）。"""
+        if not self.path.exists():
+            return {}
+        with closing(self._connect()) as conn:
+            samples = self._samples(conn, self._run_ids(conn, runs, env), phase)
+        return {nodeid: percentile(values, 0.5) for nodeid, values in samples.items()}
+
+    def slowest(
+        self, *, runs: int = 20, top: int = 20, phase: str = "total", env: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        with closing(self._connect()) as conn:
+            samples = self._samples(conn, self._run_ids(conn, runs, env), phase)
+        rows = [
+            {
+                "nodeid": nodeid,
+                "samples": len(values),
+                "median": percentile(values, 0.5),
+                "p90": percentile(values, 0.9),
+                "max": max(values),
+            }
+            for nodeid, values in samples.items()
+        ]
+        rows.sort(key=lambda r: r["median"], reverse=True)
+        return rows[:top]
+
+    def regressions(
+        self,
+        *,
+        run_id: Optional[int] = None,
+        window: int = 20,
+        phase: str = "total",
+        z: float = 3.0,
+        min_ratio: float = 1.5,
+        min_delta_s: float = 0.5,
+        min_samples: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """run_id（默认最新一次）中相对各自之前 window 个 passed 样本（同环境）变慢的 passed 用例，按分数降序。"""
+        if not self.path.exists():
+            return []
+        with closing(self._connect()) as conn:
+            run = conn.execute(
+                "SELECT id, env FROM runs WHERE (? IS NULL OR id = ?) ORDER BY id DESC LIMIT 1", (run_id, run_id)
+            ).fetchone()
+            if run is None:
+                return []
+            current = self._samples(conn, [int(run["id"])], phase, outcomes=("passed",))
+            baseline = self._passed_baseline(conn, current, run["env"], int(run["id"]), phase, window)
+        found = []
+        for nodeid, values in current.items():
+            history = baseline.get(nodeid, [])
+            if len(history) < min_samples:
+                continue
+            value = max(values)
+            median, score = robust_score(value, history)
+            if score >= z and value >= median * min_ratio and value - median >= min_delta_s:
+                found.append({"nodeid": nodeid, "value": value, "median": median, "score": score, "samples": len(history)})
+        found.sort(key=lambda r: r["score"], reverse=True)
+        return found
+
+    def fixture_overhead(self, *, runs: int = 20, top: int = 20, env: Optional[str] = None) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        with closing(self._connect()) as conn:
+            run_ids = self._run_ids(conn, runs, env)
+            if not run_ids:
+                return []
+            rows = conn.execute(
+                f"SELECT fixture, scope, setup_s FROM fixtures WHERE run_id IN ({','.join('?' * len(run_ids))})",
+                run_ids,
+            ).fetchall()
+        grouped: Dict[Tuple[str, str], List[float]] = {}
+        for row in rows:
+            grouped.setdefault((row["fixture"], row["scope"] or ""), []).append(float(row["setup_s"]))
+        result = [
+            {
+                "fixture": name,
+                "scope": scope,
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                "p90": percentile(values, 0.9),
+                "per_run": sum(values) / len(run_ids),
+            }
+            for (name, scope), values in grouped.items()
+        ]
+        result.sort(key=lambda r: r["per_run"], reverse=True)
+        return result[:top]
+
+
+# ═══════════════════════════════════════════════════════════════
+# FORMAT / CLI
+# ═══════════════════════════════════════════════════════════════
+
+def format_runs(rows: List[Dict[str, Any]]) -> List[str]:
+    lines = []
+    for r in rows:
+        wall = (r["finished_at"] or 0) - (r["started_at"] or 0)
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(r["started_at"] or 0))
+        lines.append(
+            f"#{r['id']:<5} {when}  env={r['env']:<8} tests={r['tests']:<5} workers={r['workers']:<3} "
+            f"wall={wall:8.1f}s busy={r['busy_s']:8.1f}s exit={r['exitstatus']}"
+        )
+    return lines
+
+
+def format_slowest(rows: List[Dict[str, Any]]) -> List[str]:
+    return [
+        f"{r['median']:8.2f}s  p90={r['p90']:7.2f}s  max={r['max']:7.2f}s  n={r['samples']:<3} {r['nodeid']}"
+        for r in rows
+    ]
+
+
+def format_regressions(rows: List[Dict[str, Any]]) -> List[str]:
+    return [
+        f"{r['value']:8.2f}s  vs median {r['median']:7.2f}s ({r['value'] / r['median'] if r['median'] else 0:4.1f}x, "
+        f"z={r['score']:5.1f}, n={r['samples']})  {r['nodeid']}"
+        for r in rows
+    ]
+
+
+def format_fixtures(rows: List[Dict[str, Any]]) -> List[str]:
+    return [
+        f"{r['per_run']:8.2f}s/run  mean={r['mean']:7.3f}s  p90={r['p90']:7.3f}s  n={r['count']:<5} "
+        f"{r['fixture']} ({r['scope']})"
+        for r in rows
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    config = ConfigManager()
+    parser = argparse.ArgumentParser(prog="duration_history", description="query per-test duration history")
+    parser.add_argument("--db", type=Path, default=None, help=f"history database (default {DEFAULT_DB_PATH})")
+    parser.add_argument("--env", default=None, help="only runs of this TEST_ENV")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_runs = sub.add_parser("runs", help="list recorded runs")
+    p_runs.add_argument("--limit", type=int, default=20)
+
+    p_slow = sub.add_parser("slowest", help="slowest tests by median duration")
+    p_slow.add_argument("--runs", type=int, default=20)
+    p_slow.add_argument("--top", type=int, default=20)
+    p_slow.add_argument("--phase", choices=sorted(PHASES), default="total")
+
+    p_reg = sub.add_parser("regressions", help="tests slower than their history in the latest (or given) run")
+    p_reg.add_argument("--run", type=int, default=None, help="run id (default: latest)")
+    p_reg.add_argument("--window", type=int, default=int(config.get("duration_history.regression.window", 20)))
+    p_reg.add_argument("--phase", choices=sorted(PHASES), default="total")
+    p_reg.add_argument("--z", type=float, default=float(config.get("duration_history.regression.z", 3.0)))
+    p_reg.add_argument("--min-ratio", type=float, default=float(config.get("duration_history.regression.min_ratio", 1.5)))
+    p_reg.add_argument("--min-delta", type=float, default=float(config.get("duration_history.regression.min_delta_s", 0.5)))
+    p_reg.add_argument("--min-samples", type=int, default=int(config.get("duration_history.regression.min_samples", 5)))
+    p_reg.add_argument("--fail", action="store_true", help="exit 1 when regressions are found")
+
+    p_fix = sub.add_parser("fixtures", help="per-fixture setup overhead")
+    p_fix.add_argument("--runs", type=int, default=20)
+    p_fix.add_argument("--top", type=int, default=20)
+
+    args = parser.parse_args(argv)
+    history = DurationHistory.from_config(config)
+    if args.db is not None:
+        history.path = args.db
+    if not history.path.exists():
+        print(f"no duration history at {history.path}")
+        return 0
+
+    if args.command == "runs":
+        lines = format_runs(history.runs(args.limit, env=args.env))
+    elif args.command == "slowest":
+        lines = format_slowest(history.slowest(runs=args.runs, top=args.top, phase=args.phase, env=args.env))
+    elif args.command == "fixtures":
+        lines = format_fixtures(history.fixture_overhead(runs=args.runs, top=args.top, env=args.env))
+    else:
+        found = history.regressions(
+            run_id=args.run,
+            window=args.window,
+            phase=args.phase,
+            z=args.z,
+            min_ratio=args.min_ratio,
+            min_delta_s=args.min_delta,
+            min_samples=args.min_samples,
+        )
+        for line in format_regressions(found) or ["no duration regressions"]:
+            print(line)
+        return 1 if args.fail and found else 0
+
+    for line in lines or ["no data"]:
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
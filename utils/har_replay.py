@@ -0,0 +1,398 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# HAR Record / Replay - backend API traffic per test or per module
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - UI 回归依赖共享 staging 后端：排队、慢、数据漂移导致不稳定
+# - 首次运行录制 /api/** 流量，之后回放：只需前端在线（若 url_globs 覆盖静态资源，则什么都不需要在线）
+#
+# 模式（API_HAR_MODE，默认 off）：
+# - record   透传到真实后端（route.fetch），同时把请求/响应写入精简 HAR
+# - replay   按匹配规则从 HAR 返回响应；未命中默认回落真实网络
+# - API_HAR_STRICT=1：回放未命中直接 abort，并在用例结束时判失败
+#
+# 粒度（API_HAR_SCOPE，默认 test）：
+# - test     每个用例一个文件：<dir>/<nodeid>.har
+# - module   每个测试文件一个文件：<dir>/<module>.har（按用例 nodeid 分段合并写入，flock 保护）
+#
+# 匹配规则（config/project.yaml -> har）：
+# - method + path + query（忽略 ignore_query_params）+ 归一化 body（JSON 去掉 ignore_body_fields，键排序）
+# - 请求头默认全部忽略，仅 match_headers 中列出的参与匹配
+# - 同一个 key 多次出现按录制顺序回放，耗尽后重复最后一个
+# - module 粒度下文件里混有同模块各用例的条目：某个 key 有本用例（comment == nodeid）录制的条目时只用它们，
+#   没有才回落到其它用例的条目（避免 B 回放 A 在改数据前后录下的同一个 GET）
+#
+# 安全：
+# - redact_body_fields（默认 password 类字段）落盘前替换为 "***"，且不参与匹配
+# - HAR 目录包含会话数据，请勿提交到仓库
+#
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from utils.config import ConfigManager
+from utils.logger import get_logger
+from utils.request_blocker import _glob_to_regex
+
+logger = get_logger(__name__)
+
+HAR_MODES = ("off", "record", "replay")
+HAR_SCOPES = ("test", "module")
+_TRUE_VALUES = {"1", "true", "True", "yes", "YES"}
+
+_DEFAULT_REDACT_FIELDS = ["password", "currentPassword", "newPassword", "confirmPassword"]
+_DROP_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+_TEXT_MIME_RE = re.compile(r"(json|text|javascript|xml|html|x-www-form-urlencoded)", re.IGNORECASE)
+
+
+def har_mode() -> str:
+    raw = (os.getenv("API_HAR_MODE", "") or "off").strip().lower()
+    return raw if raw in HAR_MODES else "off"
+
+
+def har_scope() -> str:
+    raw = (os.getenv("API_HAR_SCOPE", "") or "test").strip().lower()
+    return raw if raw in HAR_SCOPES else "test"
+
+
+def har_strict() -> bool:
+    return os.getenv("API_HAR_STRICT", "").strip() in _TRUE_VALUES
+
+
+def _safe_name(s: str) -> str:
+    out = re.sub(r"[^A-Za-z0-9_.-]+", "_", s or "").strip("_")
+    return out[:180] or "default"
+
+
+class HarRules:
+    """匹配/脱敏规则（来自 config/project.yaml 的 har 段）。"""
+
+    def __init__(
+        self,
+        *,
+        url_globs: Optional[List[str]] = None,
+        match_headers: Optional[List[str]] = None,
+        ignore_query_params: Optional[List[str]] = None,
+        ignore_body_fields: Optional[List[str]] = None,
+        redact_body_fields: Optional[List[str]] = None,
+    ) -> None:
+        self.url_globs = list(url_globs or ["*/api/*"])
+        self.match_headers = [h.lower() for h in (match_headers or [])]
+        self.ignore_query_params = set(ignore_query_params or [])
+        self.redact_body_fields = set(redact_body_fields if redact_body_fields is not None else _DEFAULT_REDACT_FIELDS)
+        self.ignore_body_fields = set(ignore_body_fields or []) | self.redact_body_fields
+
+    @classmethod
+    def from_config(cls, config: Optional[ConfigManager] = None) -> "HarRules":
+        config = config or ConfigManager()
+        return cls(
+            url_globs=config.get("har.url_globs", None),
+            match_headers=config.get("har.match_headers", None),
+            ignore_query_params=config.get("har.ignore_query_params", None),
+            ignore_body_fields=config.get("har.ignore_body_fields", None),
+            redact_body_fields=config.get("har.redact_body_fields", None),
+        )
+
+    def route_patterns(self) -> List["re.Pattern[str]"]:
+        return [_glob_to_regex(g) for g in self.url_globs]
+
+    # ═══════════════════════════════════════════════════════════════
+    # NORMALIZATION
+    # ═══════════════════════════════════════════════════════════════
+
+    def _strip_fields(self, obj: Any, fields: set, replacement: Any = None, drop: bool = True) -> Any:
+        if isinstance(obj, dict):
+            out = {}
+            for k, v in obj.items():
+                if k in fields:
+                    if not drop:
+                        out[k] = replacement
+                    continue
+                out[k] = self._strip_fields(v, fields, replacement, drop)
+            return out
+        if isinstance(obj, list):
+            return [self._strip_fields(x, fields, replacement, drop) for x in obj]
+        return obj
+
+    def normalize_body(self, body: Optional[str]) -> str:
+        if not body:
+            return ""
+        try:
+            data = json.loads(body)
+        except Exception:
+            return body
+        return json.dumps(self._strip_fields(data, self.ignore_body_fields), sort_keys=True, separators=(",", ":"))
+
+    def redact_body(self, body: Optional[str]) -> Optional[str]:
+        if not body or not self.redact_body_fields:
+            return body
+        try:
+            data = json.loads(body)
+        except Exception:
+            return body
+        return json.dumps(self._strip_fields(data, self.redact_body_fields, replacement="***", drop=False))
+
+    def request_key(self, method: str, url: str, headers: Dict[str, str], body: Optional[str]) -> str:
+        p = urlparse(url)
+        query = sorted((k, v) for k, v in parse_qsl(p.query, keep_blank_values=True) if k not in self.ignore_query_params)
+        hdrs = {k.lower(): v for k, v in (headers or {}).items()}
+        parts = [
+            (method or "GET").upper(),
+            p.path or "/",
+            urlencode(query),
+            "|".join(f"{h}={hdrs.get(h, '')}" for h in self.match_headers),
+            self.normalize_body(body),
+        ]
+        return "\n".join(parts)
+
+
+# ═══════════════════════════════════════════════════════════════
+# HAR FILE IO
+# ═══════════════════════════════════════════════════════════════
+
+def _empty_har() -> Dict[str, Any]:
+    return {"log": {"version": "1.2", "creator": {"name": "playwright-test-scaffold", "version": "1"}, "entries": []}}
+
+
+def load_har(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return _empty_har()
+
+
+def _merge_write(path: Path, owner: str, entries: List[Dict[str, Any]]) -> None:
+    """把 owner（用例 nodeid）的条目写入 HAR：先删掉该 owner 的旧条目，再追加。多 worker 下用 flock 串行化。"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lock_path = path.with_name(path.name + ".lock")
+    with open(lock_path, "a+") as lock_f:
+        try:
+            import fcntl
+
+            fcntl.flock(lock_f.fileno(), fcntl.LOCK_EX)
+        except Exception:
+            pass
+        har = load_har(path) if path.exists() else _empty_har()
+        kept = [e for e in har["log"].get("entries", []) if e.get("comment") != owner]
+        har["log"]["entries"] = kept + entries
+        tmp = path.with_name(f"{path.name}.tmp.{os.getpid()}.{time.time_ns()}")
+        tmp.write_text(json.dumps(har, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+# ═══════════════════════════════════════════════════════════════
+# PER-TEST SESSION
+# ═══════════════════════════════════════════════════════════════
+
+class HarSession:
+    """
+    单个用例的 HAR 录制/回放会话。
+
+    使用方式（fixtures 内）:
+        har = HarSession.for_nodeid(request.node.nodeid)
+        if har: har.install(context)
+        ...
+        har.finish()   # record：落盘；replay + strict：返回未命中列表
+    """
+
+    def __init__(self, *, mode: str, nodeid: str, har_path: Path, rules: HarRules, strict: bool = False) -> None:
+        self.mode = mode
+        self.nodeid = nodeid
+        self.har_path = har_path
+        self.rules = rules
+        self.strict = strict
+        self.recorded: List[Dict[str, Any]] = []
+        self.unmatched: List[str] = []
+        self._replay: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursor: Dict[str, int] = {}
+
+    @classmethod
+    def for_nodeid(cls, nodeid: str, *, har_dir: Optional[Path] = None) -> Optional["HarSession"]:
+        mode = har_mode()
+        if mode == "off":
+            return None
+        root = Path(har_dir or os.getenv("API_HAR_DIR", "") or ".har")
+        module = nodeid.split("::", 1)[0]
+        name = module if har_scope() == "module" else nodeid
+        return cls(
+            mode=mode,
+            nodeid=nodeid,
+            har_path=root / f"{_safe_name(name)}.har",
+            rules=HarRules.from_config(),
+            strict=har_strict(),
+        )
+
+    def install(self, context) -> None:
+        if self.mode == "replay":
+            self._load_replay()
+            handler = self._handle_replay
+        else:
+            handler = self._handle_record
+        for pattern in self.rules.route_patterns():
+            context.route(pattern, handler)
+
+    # ═══════════════════════════════════════════════════════════════
+    # RECORD
+    # ═══════════════════════════════════════════════════════════════
+
+    def _handle_record(self, route, request) -> None:
+        started = time.time()
+        try:
+            resp = route.fetch()
+            body = resp.body()
+        except Exception:
+            route.fallback()
+            return
+        route.fulfill(response=resp, body=body)
+        try:
+            self.recorded.append(self._to_entry(request, resp.status, resp.headers, body, started))
+        except Exception as e:
+            logger.debug(f"HAR 记录失败（已忽略）: {request.url} {type(e).__name__}: {e}")
+
+    def _to_entry(self, request, status: int, headers: Dict[str, str], body: bytes, started: float) -> Dict[str, Any]:
+        mime = headers.get("content-type", "")
+        content: Dict[str, Any] = {"size": len(body), "mimeType": mime}
+        if _TEXT_MIME_RE.search(mime or ""):
+            content["text"] = body.decode("utf-8", errors="replace")
+        else:
+            content["text"] = base64.b64encode(body).decode("ascii")
+            content["encoding"] = "base64"
+
+        req_headers = {k.lower(): v for k, v in (request.headers or {}).items()}
+        post = request.post_data
+        entry: Dict[str, Any] = {
+            "comment": self.nodeid,
+            "startedDateTime": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(started)) + "Z",
+            "request": {
+                "method": request.method,
+                "url": request.url,
+                "headers": [{"name": h, "value": req_headers[h]} for h in self.rules.match_headers if h in req_headers],
+            },
+            "response": {
+                "status": status,
+                "headers": [
+                    {"name": k, "value": v} for k, v in (headers or {}).items() if k.lower() not in _DROP_RESPONSE_HEADERS
+                ],
+                "content": content,
+            },
+        }
+        if post is not None:
+            entry["request"]["postData"] = {
+                "mimeType": req_headers.get("content-type", ""),
+                "text": self.rules.redact_body(post),
+            }
+        return entry
+
+    # ═══════════════════════════════════════════════════════════════
+    # REPLAY
+    # ═══════════════════════════════════════════════════════════════
+
+    def _entry_key(self, entry: Dict[str, Any]) -> str:
+        req = entry.get("request") or {}
+        headers = {h.get("name", ""): h.get("value", "") for h in (req.get("headers") or [])}
+        body = (req.get("postData") or {}).get("text")
+        return self.rules.request_key(req.get("method", "GET"), req.get("url", ""), headers, body)
+
+    def _load_replay(self) -> None:
+        har = load_har(self.har_path)
+        own: Dict[str, List[Dict[str, Any]]] = {}
+        others: Dict[str, List[Dict[str, Any]]] = {}
+        for e in har.get("log", {}).get("entries", []):
+            bucket = own if e.get("comment") == self.nodeid else others
+            bucket.setdefault(self._entry_key(e), []).append(e)
+        self._replay = {key: own.get(key) or entries for key, entries in others.items()}
+        self._replay.update(own)
+        if not self._replay:
+            logger.warning(f"HAR 回放文件不存在或为空: {self.har_path}")
+
+    def match(self, method: str, url: str, headers: Dict[str, str], body: Optional[str]) -> Optional[Dict[str, Any]]:
+        key = self.rules.request_key(method, url, headers, body)
+        entries = self._replay.get(key)
+        if not entries:
+            return None
+        i = self._cursor.get(key, 0)
+        self._cursor[key] = i + 1
+        return entries[min(i, len(entries) - 1)]
+
+    def _handle_replay(self, route, request) -> None:
+        entry = self.match(request.method, request.url, request.headers, request.post_data)
+        if entry is None:
+            self.unmatched.append(f"{request.method} {request.url}")
+            if self.strict:
+                route.abort("failed")
+            else:
+                route.fallback()
+            return
+        resp = entry.get("response") or {}
+        content = resp.get("content") or {}
+        text = content.get("text") or ""
+        body = base64.b64decode(text) if content.get("encoding") == "base64" else text.encode("utf-8")
+        headers = {h.get("name", ""): h.get("value", "") for h in (resp.get("headers") or [])}
+        route.fulfill(status=int(resp.get("status") or 200), headers=headers, body=body)
+
+    # ═══════════════════════════════════════════════════════════════
+    # FINISH
+    # ═══════════════════════════════════════════════════════════════
+
+    def finish(self) -> Tuple[bool, List[str]]:
+        """
+        用例结束时调用。
+        返回 (ok, unmatched)：strict 回放有未命中时 ok=False。
+        """
+        if self.mode == "record":
+            try:
+                _merge_write(self.har_path, self.nodeid, self.recorded)
+                logger.info(f"🎞️ HAR 已录制: {self.har_path} entries={len(self.recorded)}")
+            except Exception as e:
+                logger.warning(f"HAR 写入失败: {self.har_path} {type(e).__name__}: {e}")
+            return True, []
+        return (not (self.strict and self.unmatched)), list(self.unmatched)
+
+
+# ═══════════════════════════════════════════════════════════════
+# FIXTURE HELPERS
+# ═══════════════════════════════════════════════════════════════
+
+_SESSION_ATTR = "_pts_har_session"
+
+
+def install_har(context, nodeid: str) -> Optional[HarSession]:
+    """API_HAR_MODE 开启时为当前用例安装录制/回放 route（需在其它 route 之后安装，优先级最高）。"""
+    session = HarSession.for_nodeid(nodeid)
+    if session is None:
+        return None
+    try:
+        session.install(context)
+    except Exception as e:
+        logger.warning(f"HAR route 安装失败（已忽略）: {type(e).__name__}: {e}")
+        return None
+    setattr(context, _SESSION_ATTR, session)
+    return session
+
+
+def finish_har(context) -> Optional[str]:
+    """结束当前用例的 HAR 会话；strict 回放出现未命中时返回失败说明（供 fixture pytest.fail）。"""
+    session = getattr(context, _SESSION_ATTR, None)
+    if session is None:
+        return None
+    try:
+        delattr(context, _SESSION_ATTR)
+    except Exception:
+        pass
+    ok, unmatched = session.finish()
+    if ok:
+        if unmatched:
+            logger.info(f"HAR 回放未命中 {len(unmatched)} 个请求（已回落真实网络）: {session.har_path}")
+        return None
+    preview = "\n".join(unmatched[:20])
+    return f"API_HAR_STRICT: {len(unmatched)} 个请求未在 {session.har_path} 中命中:\n{preview}"
@@ -0,0 +1,188 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Request Blocker - third-party block/allow policy for contexts
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - 前端每次导航都会拉 analytics / 字体 / 遥测 beacon / 在线客服挂件
+# - 它们增加延迟，偶尔还会拖住 domcontentloaded（BasePage.goto 默认用 commit 就是在绕这个问题）
+#
+# 配置（config/project.yaml -> network，默认关闭；NETWORK_BLOCK_ENABLED=1 可临时开启）：
+#   network:
+#     block:
+#       enabled: true
+#       domains: ["google-analytics.com", ...]   # 命中主域及其子域；为空时使用 DEFAULT_BLOCK_DOMAINS
+#       resource_types: ["font", "media"]       # 仅作用于第三方域名（frontend/backend 域名不受影响）
+#       url_globs: ["*/beacon/*"]               # 匹配完整 URL；fnmatch 语义（* 可跨 /，? 匹配单字符）
+#     allow:
+#       domains: []                             # allow 优先于 block
+#       url_globs: []
+#
+# 说明：
+# - domains/url_globs 以 route 匹配模式下发到 driver 侧，未命中的请求不会回到 Python
+# - 配置了 resource_types 时需要拦截全部请求（只有 handler 能看到 resource_type），开销略高
+# - 每个 context 记录被拦截的请求数，由 fixtures 在用例结束时附加到 Allure
+#
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+from urllib.parse import urlparse
+
+from utils.config import ConfigManager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BLOCK_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "fonts.googleapis.com",
+    "fonts.gstatic.com",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "hotjar.com",
+    "clarity.ms",
+    "fullstory.com",
+    "sentry.io",
+    "nr-data.net",
+    "newrelic.com",
+    "intercom.io",
+    "intercomcdn.com",
+    "crisp.chat",
+    "zdassets.com",
+]
+
+_COUNTER_ATTR = "_pts_blocked_requests"
+
+
+def _host_of(url: str) -> str:
+    return (urlparse(url or "").hostname or "").lower()
+
+
+def _domain_matches(host: str, domains: List[str]) -> Optional[str]:
+    for d in domains:
+        if host == d or host.endswith("." + d):
+            return d
+    return None
+
+
+def _glob_to_regex(glob: str) -> "re.Pattern[str]":
+    """fnmatch 风格 glob -> JS 兼容正则（route 匹配在 driver 侧执行，不能用 fnmatch.translate 的 \\Z 等语法）。"""
+    out = []
+    for ch in glob:
+        if ch == "*":
+            out.append(".*")
+        elif ch == "?":
+            out.append(".")
+        else:
+            out.append(re.escape(ch))
+    return re.compile("^" + "".join(out) + "$")
+
+
+def _glob_matches(url: str, globs: List[str]) -> Optional[str]:
+    for g in globs:
+        if fnmatch.fnmatchcase(url, g):
+            return g
+    return None
+
+
+@dataclass
+class BlockPolicy:
+    domains: List[str] = field(default_factory=list)
+    resource_types: List[str] = field(default_factory=list)
+    url_globs: List[str] = field(default_factory=list)
+    allow_domains: List[str] = field(default_factory=list)
+    allow_url_globs: List[str] = field(default_factory=list)
+    first_party_hosts: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_config(cls, config: Optional[ConfigManager] = None) -> Optional["BlockPolicy"]:
+        """读取 network.* 配置；未启用返回 None。"""
+        config = config or ConfigManager()
+        if not config.get("network.block.enabled", False):
+            return None
+
+        def _list(key: str) -> List[str]:
+            v = config.get(key, []) or []
+            if isinstance(v, str):
+                v = v.split(",")
+            return [str(x).strip().lower() for x in v if str(x).strip()]
+
+        first_party = [h for h in (_host_of(config.get_service_url(n)) for n in ("frontend", "backend")) if h]
+        return cls(
+            domains=_list("network.block.domains") or list(DEFAULT_BLOCK_DOMAINS),
+            resource_types=_list("network.block.resource_types"),
+            url_globs=[str(x) for x in (config.get("network.block.url_globs", []) or [])],
+            allow_domains=_list("network.allow.domains"),
+            allow_url_globs=[str(x) for x in (config.get("network.allow.url_globs", []) or [])],
+            first_party_hosts=first_party,
+        )
+
+    def block_reason(self, url: str, resource_type: str) -> Optional[str]:
+        """返回拦截原因（None = 放行）。"""
+        host = _host_of(url)
+        if _domain_matches(host, self.allow_domains) or _glob_matches(url, self.allow_url_globs):
+            return None
+        d = _domain_matches(host, self.domains)
+        if d:
+            return f"domain:{d}"
+        g = _glob_matches(url, self.url_globs)
+        if g:
+            return f"glob:{g}"
+        if self.resource_types and (resource_type or "") in self.resource_types:
+            if host and host not in self.first_party_hosts:
+                return f"type:{resource_type}"
+        return None
+
+    def route_patterns(self) -> List[Any]:
+        """下发给 context.route 的匹配模式（尽量让未命中的请求留在 driver 侧）。"""
+        if self.resource_types:
+            return ["**/*"]
+        patterns: List[Any] = []
+        if self.domains:
+            alt = "|".join(re.escape(d) for d in self.domains)
+            patterns.append(re.compile(rf"^[a-z][a-z0-9+.-]*://([^/?#@]*\.)?({alt})(:\d+)?([/?#]|$)", re.IGNORECASE))
+        patterns.extend(_glob_to_regex(g) for g in self.url_globs)
+        return patterns
+
+
+class RequestBlocker:
+    """把 BlockPolicy 安装到 context，并按 context 统计拦截数。"""
+
+    def __init__(self, policy: BlockPolicy) -> None:
+        self.policy = policy
+
+    def install(self, context) -> None:
+        setattr(context, _COUNTER_ATTR, Counter())
+
+        def _handle(route, request) -> None:
+            reason = self.policy.block_reason(request.url, request.resource_type)
+            if reason is None:
+                route.fallback()
+                return
+            try:
+                getattr(context, _COUNTER_ATTR)[f"{reason} {_host_of(request.url)}"] += 1
+            except Exception:
+                pass
+            route.abort("blockedbyclient")
+
+        for pattern in self.policy.route_patterns():
+            context.route(pattern, _handle)
+
+
+def blocked_counts(context) -> Counter:
+    """读取并清零 context 上的拦截统计（复用池里的 context 跨用例不串数）。"""
+    counts = getattr(context, _COUNTER_ATTR, None)
+    if not counts:
+        return Counter()
+    out = Counter(counts)
+    counts.clear()
+    return out
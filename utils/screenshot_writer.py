@@ -0,0 +1,289 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Screenshot Writer - background writes, single file per frame
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - BasePage.take_screenshot 在测试线程上同步写 screenshots/，再把同样的 bytes 交给 allure.attach（又写一份）
+# - artifacts_on_failure、goto 超时重试还会再截整页 PNG；同一帧常被重复写入
+#
+# 方案：
+# - 截图本身仍在测试线程调用 page.screenshot（sync API 不能跨线程），编码参数由配置决定：
+#     screenshot.format   png / jpeg（默认 png；SCREENSHOT_FORMAT）
+#     screenshot.quality  jpeg 质量 0-100（默认 80；SCREENSHOT_QUALITY）
+#     screenshot.scale    device / css（css = 按 CSS 像素输出，高 DPI 下即降采样；SCREENSHOT_SCALE）
+#     screenshot.writers  后台写线程数（默认 2；SCREENSHOT_WRITERS）
+# - 落盘交给后台线程池；同一进程内内容 hash 相同的帧只写一次：后续请求在首次写入完成后
+#   把已写文件硬链接（无法链接时复制）到各自请求的路径，调用方拿到的总是自己要求的路径
+#   - 内容索引最多 DEDUP_MAX_ENTRIES 条（按最近使用淘汰）；某路径被写入新内容时，以它为源的旧索引项立即作废
+#   - 链接完成后再校验目标内容的 hash，与期望不符（源文件被并发改写）时按普通写入落盘
+# - 调用方需要文件立即存在（显式 file_path）时用 wait(path) 等待该路径写完
+# - Allure：在测试线程登记附件（拿到 allure-results 下的文件名），后台线程写完后用硬链接指向同一文件，
+#   不再写第二份（跨文件系统等无法硬链接时回退为复制）；无法预留附件路径时回退为 allure.attach(bytes)
+# - 进程退出 / session 结束时 flush，保证报告生成前文件都已落盘
+#
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.allure_attach import link_alias, link_or_copy, reserve_attachment
+from utils.config import ConfigManager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCREENSHOT_FORMATS = ("png", "jpeg")
+DEDUP_MAX_ENTRIES = 512
+
+
+@dataclass
+class ScreenshotOptions:
+    format: str = "png"
+    quality: int = 80
+    scale: str = "device"
+
+    @classmethod
+    def from_config(cls, config: Optional[ConfigManager] = None) -> "ScreenshotOptions":
+        config = config or ConfigManager()
+        fmt = str(config.get("screenshot.format", "png") or "png").strip().lower()
+        if fmt == "jpg":
+            fmt = "jpeg"
+        if fmt not in SCREENSHOT_FORMATS:
+            logger.warning(f"未知 screenshot.format={fmt!r}，回退为 png")
+            fmt = "png"
+        try:
+            quality = min(max(int(config.get("screenshot.quality", 80) or 80), 0), 100)
+        except (TypeError, ValueError):
+            quality = 80
+        scale = str(config.get("screenshot.scale", "device") or "device").strip().lower()
+        return cls(format=fmt, quality=quality, scale=scale if scale in {"css", "device"} else "device")
+
+    @property
+    def extension(self) -> str:
+        return "jpg" if self.format == "jpeg" else "png"
+
+    def screenshot_kwargs(self) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"type": self.format, "scale": self.scale}
+        if self.format == "jpeg":
+            kwargs["quality"] = self.quality
+        return kwargs
+
+
+@dataclass
+class ScreenshotStats:
+    captured: int = 0
+    written: int = 0
+    deduped: int = 0
+    bytes_written: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+def _reserve_allure_attachment(name: str, options: ScreenshotOptions) -> Optional[Path]:
+    """
+    在当前 Allure step/test 上登记附件，返回 allure-results 下的目标路径（由调用方负责写入）。
+    allure 插件未启用（或内部 API 不可用）时返回 None。
+    """
+    try:
+        import allure
+    except Exception:
+        return None
+    attachment_type = allure.attachment_type.JPG if options.format == "jpeg" else allure.attachment_type.PNG
+    return reserve_attachment(name, attachment_type)
+
+
+def _attach_bytes(data: bytes, name: str, options: ScreenshotOptions) -> None:
+    """预留附件路径失败时的回退：按原方式把 bytes 交给 allure（allure 未启用时为 no-op）。"""
+    try:
+        import allure
+
+        attachment_type = allure.attachment_type.JPG if options.format == "jpeg" else allure.attachment_type.PNG
+        allure.attach(data, name=name, attachment_type=attachment_type)
+    except Exception as e:
+        logger.debug(f"截图附件登记失败（已忽略）: {name} {type(e).__name__}: {e}")
+
+
+class ScreenshotWriter:
+    """
+    截图后台写入器（进程级单例，见 get_screenshot_writer）。
+
+    使用方式:
+        writer = get_screenshot_writer()
+        path = writer.capture(page, Path("screenshots") / "login_step", name="login_step")
+    """
+
+    def __init__(self, options: Optional[ScreenshotOptions] = None, max_workers: int = 2) -> None:
+        self.options = options or ScreenshotOptions()
+        self.stats = ScreenshotStats()
+        self._executor = ThreadPoolExecutor(max_workers=max(int(max_workers), 1), thread_name_prefix="screenshot")
+        self._lock = threading.Lock()
+        self._by_digest: "OrderedDict[str, Tuple[Path, Future]]" = OrderedDict()
+        self._digest_at: Dict[Path, str] = {}
+        self._by_path: Dict[Path, Future] = {}
+        self._pending: List[Future] = []
+
+    def capture(self, page, stem: Path, *, name: str, full_page: bool = True, attach: bool = True) -> Path:
+        """在当前线程截图并提交后台写入；返回最终文件路径（写入可能尚未完成）。"""
+        data = page.screenshot(full_page=full_page, **self.options.screenshot_kwargs())
+        self._count(captured=1)
+        return self.submit(data, stem.with_name(f"{stem.name}.{self.options.extension}"), name=name, attach=attach)
+
+    def submit(self, data: bytes, path: Path, *, name: str, attach: bool = True) -> Path:
+        """
+        提交已有的截图 bytes，返回 path（写入可能尚未完成，需要时用 wait(path)）。
+        同内容的帧只写一次：path 与第一次写入的文件是同一个 inode。
+        """
+        allure_dst = _reserve_allure_attachment(name, self.options) if attach else None
+        if attach and allure_dst is None:
+            _attach_bytes(data, name, self.options)
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            stale = self._digest_at.get(path)
+            if stale is not None and stale != digest:
+                # path 即将被写入新内容：以它为源的旧索引项不能再用于链接
+                self._by_digest.pop(stale, None)
+                del self._digest_at[path]
+            existing = self._by_digest.get(digest)
+            if existing is not None:
+                self._by_digest.move_to_end(digest)
+                self.stats.deduped += 1
+                primary, write_future = existing
+                target = None if path == primary else path
+                if target is None and allure_dst is None:
+                    return path
+                future = self._executor.submit(
+                    self._link_after, write_future, primary, digest, data, target, allure_dst
+                )
+            else:
+                future = self._executor.submit(self._write, data, path, allure_dst)
+                self._remember(digest, path, future)
+            self._by_path[path] = future
+            self._track(future)
+        return path
+
+    def wait(self, path: Path, timeout: Optional[float] = 30.0) -> bool:
+        """等待 path 的写入（或链接）完成；返回文件是否存在。"""
+        with self._lock:
+            future = self._by_path.get(path)
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+        return path.exists()
+
+    def _remember(self, digest: str, path: Path, future: Future) -> None:
+        """登记 digest -> 首次写入路径（调用方持有 _lock）；超过 DEDUP_MAX_ENTRIES 时淘汰最久未用的。"""
+        self._by_digest[digest] = (path, future)
+        self._digest_at[path] = digest
+        while len(self._by_digest) > DEDUP_MAX_ENTRIES:
+            old_digest, (old_path, _future) = self._by_digest.popitem(last=False)
+            if self._digest_at.get(old_path) == old_digest:
+                del self._digest_at[old_path]
+
+    def _count(self, **deltas: int) -> None:
+        """统计计数在测试线程与写线程上都会更新，统一加锁。"""
+        with self._lock:
+            for key, delta in deltas.items():
+                setattr(self.stats, key, getattr(self.stats, key) + delta)
+
+    def _track(self, future: Future) -> None:
+        self._pending = [f for f in self._pending if not f.done()]
+        self._by_path = {p: f for p, f in self._by_path.items() if not f.done() or f is future}
+        self._pending.append(future)
+
+    def _write(self, data: bytes, path: Path, allure_dst: Optional[Path]) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self._count(written=1, bytes_written=len(data))
+            if allure_dst is not None:
+                link_or_copy(path, allure_dst)
+        except Exception as e:
+            logger.warning(f"截图写入失败: {path} {type(e).__name__}: {e}")
+
+    def _link_after(
+        self,
+        write_future: Future,
+        primary: Path,
+        digest: str,
+        data: bytes,
+        target: Optional[Path],
+        allure_dst: Optional[Path],
+    ) -> None:
+        """等首次写入完成后，把同一文件放到本次请求的路径（target）与 Allure 附件路径。"""
+        try:
+            write_future.result()
+            if target is not None and primary.exists() and not link_alias(primary, target):
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(primary, target)
+            dest = target or primary
+            if not _holds(dest, digest):
+                # 首次写入失败、文件已被清理，或 primary 已被改写成别的内容：不能复用，按普通写入处理
+                if target is not None:
+                    self._write(data, target, allure_dst)
+                elif allure_dst is not None:
+                    allure_dst.parent.mkdir(parents=True, exist_ok=True)
+                    allure_dst.write_bytes(data)
+                return
+            if allure_dst is not None:
+                link_or_copy(dest, allure_dst)
+        except Exception as e:
+            logger.debug(f"截图复用写入失败（已忽略）: {target or allure_dst} {type(e).__name__}: {e}")
+
+    def flush(self, timeout: Optional[float] = 60.0) -> None:
+        """等待所有已提交的写入完成。"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for f in pending:
+            try:
+                f.result(timeout=timeout)
+            except Exception:
+                pass
+
+
+def _holds(path: Path, digest: str) -> bool:
+    try:
+        return hashlib.sha1(path.read_bytes()).hexdigest() == digest
+    except OSError:
+        return False
+
+
+_WRITER: Optional[ScreenshotWriter] = None
+_WRITER_LOCK = threading.Lock()
+
+
+def get_screenshot_writer() -> ScreenshotWriter:
+    global _WRITER
+    with _WRITER_LOCK:
+        if _WRITER is None:
+            config = ConfigManager()
+            try:
+                workers = int(config.get("screenshot.writers", 2) or 2)
+            except (TypeError, ValueError):
+                workers = 2
+            _WRITER = ScreenshotWriter(ScreenshotOptions.from_config(config), max_workers=workers)
+            atexit.register(_WRITER.flush)
+        return _WRITER
+
+
+def flush_screenshot_writer() -> None:
+    """session 结束时调用：等待后台写入完成并记录统计（未使用过则 no-op）。"""
+    if _WRITER is None:
+        return
+    _WRITER.flush()
+    logger.info(f"🖼️ screenshot writer stats: {_WRITER.stats.as_dict()}")
@@ -11,15 +11,24 @@
 # - 不引入第三方依赖（requests）
 # - 以 config/project.yaml 的 health_check 配置为准
 # - HTTPS 本地自签证书：默认跳过证书校验（避免 dev 环境阻塞）
+# - 所有服务并发探测（每个服务一个线程），共享一个总时限 health_check.deadline：
+#     单次探测超时 = min(timeout, 剩余时限)；重试间隔指数退避 + 抖动（retry_interval * 2^n * U(0.5, 1.5)）
+#     任一必需服务（health_check.required，为空=全部）确定不可用时其余探测立即结束，不再陪跑
+# - fail-fast 只看必需服务自己的失败（blocking_failures）；可选服务失败、因提前结束而 aborted 的探测只告警
+# - 结果附带每个服务的探测耗时/次数（ServiceProbe），启动日志可直接看出哪个服务慢
 #
 """
 
 from __future__ import annotations
 
+import random
 import ssl
+import threading
 import time
 import urllib.request
-from typing import Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
 
 from utils.config import ConfigManager
 from utils.logger import get_logger
@@ -27,6 +36,26 @@ from utils.logger import get_logger
 logger = get_logger(__name__)
 
 
+@dataclass
+class ServiceProbe:
+    """单个服务的探测结果。"""
+
+    name: str
+    ok: bool
+    reason: str
+    latency_ms: float = 0.0
+    attempts: int = 0
+    url: str = ""
+
+    @property
+    def aborted(self) -> bool:
+        """其它必需服务已确定不可用，本探测被提前结束（结果不代表本服务的状态）。"""
+        return self.reason.startswith("aborted")
+
+    def summary(self) -> str:
+        return f"{self.reason} latency={self.latency_ms:.0f}ms attempts={self.attempts}"
+
+
 class ServiceChecker:
     """
     服务健康检查器（可选）。
@@ -35,10 +64,21 @@ class ServiceChecker:
     def __init__(self) -> None:
         self.config = ConfigManager()
         self.hc = self.config.get_health_check_config()
+        self.last_probes: Dict[str, ServiceProbe] = {}
 
     def is_enabled(self) -> bool:
         return bool(self.hc.get("enabled", True))
 
+    def required_services(self) -> Set[str]:
+        """health_check.required；为空 = 全部服务都必需。"""
+        names = list(self.config.get_all_services().keys())
+        return set(self.hc.get("required") or []) or set(names)
+
+    def blocking_failures(self) -> List[ServiceProbe]:
+        """上次探测中应当阻塞运行的失败：必需服务自己确定失败（不含 aborted）。"""
+        required = self.required_services()
+        return [p for name, p in self.last_probes.items() if name in required and not p.ok and not p.aborted]
+
     def _http_get_ok(self, url: str, *, timeout_s: float) -> Tuple[bool, str]:
         if not url:
             return False, "empty_url"
@@ -55,39 +95,99 @@ class ServiceChecker:
 
     def check_all_services(self) -> Dict[str, Tuple[bool, str]]:
         """
-        返回：{service_name: (ok, reason)}
+        并发探测所有服务，返回：{service_name: (ok, reason)}（reason 含耗时/次数）。
+        详细结果见 self.last_probes。
         """
+        probes = self.probe_all()
+        return {name: (p.ok, p.summary()) for name, p in probes.items()}
+
+    def probe_all(self) -> Dict[str, ServiceProbe]:
         timeout_s = float(self.hc.get("timeout", 10) or 10)
-        retry_count = int(self.hc.get("retry_count", 3) or 3)
+        retry_count = max(int(self.hc.get("retry_count", 3) or 3), 1)
         retry_interval = float(self.hc.get("retry_interval", 2) or 2)
+        deadline = time.monotonic() + float(self.hc.get("deadline", 30) or 30)
 
-        services = self.config.get_all_services()
-        results: Dict[str, Tuple[bool, str]] = {}
-
-        for name in services.keys():
-            url = self.config.get_health_check_url(name)
-            ok = False
-            reason = "unknown"
-            for i in range(max(retry_count, 1)):
-                ok, reason = self._http_get_ok(url, timeout_s=timeout_s)
-                if ok:
-                    break
-                if i < retry_count - 1:
-                    try:
-                        time.sleep(retry_interval)
-                    except Exception:
-                        pass
-            results[name] = (ok, reason)
-        return results
+        names = list(self.config.get_all_services().keys())
+        required = self.required_services()
+        stop = threading.Event()
+        results: Dict[str, ServiceProbe] = {}
+
+        def _probe(name: str) -> None:
+            probe = self._probe_one(
+                name,
+                timeout_s=timeout_s,
+                retry_count=retry_count,
+                retry_interval=retry_interval,
+                deadline=deadline,
+                stop=stop,
+            )
+            results[name] = probe
+            if not probe.ok and name in required and not stop.is_set():
+                # 必需服务已确定不可用：其余探测没有继续等待的意义
+                stop.set()
+                logger.warning(f"服务不可用，提前结束健康检查: {name} ({probe.reason})")
+
+        if names:
+            with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="health") as pool:
+                list(pool.map(_probe, names))
+        self.last_probes = {name: results[name] for name in names}
+        return self.last_probes
+
+    def _probe_one(
+        self,
+        name: str,
+        *,
+        timeout_s: float,
+        retry_count: int,
+        retry_interval: float,
+        deadline: float,
+        stop: threading.Event,
+    ) -> ServiceProbe:
+        url = self.config.get_health_check_url(name)
+        probe = ServiceProbe(name=name, ok=False, reason="unknown", url=url)
+        for attempt in range(retry_count):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                probe.reason = f"deadline exceeded ({probe.reason})"
+                break
+            if stop.is_set():
+                probe.reason = f"aborted ({probe.reason})"
+                break
+            started = time.monotonic()
+            probe.ok, probe.reason = self._http_get_ok(url, timeout_s=min(timeout_s, remaining))
+            probe.latency_ms = (time.monotonic() - started) * 1000
+            probe.attempts = attempt + 1
+            if probe.ok or attempt >= retry_count - 1:
+                break
+            backoff = retry_interval * (2 ** attempt) * random.uniform(0.5, 1.5)
+            # stop.wait 代替 sleep：其它必需服务确定失败时立即醒来
+            if stop.wait(min(backoff, max(deadline - time.monotonic(), 0))):
+                probe.reason = f"aborted ({probe.reason})"
+                break
+        return probe
+
+    def probe_once(self, name: str, *, timeout_s: float) -> ServiceProbe:
+        """单次探测（不重试），供后台监控周期性调用。"""
+        url = self.config.get_health_check_url(name)
+        started = time.monotonic()
+        ok, reason = self._http_get_ok(url, timeout_s=timeout_s)
+        return ServiceProbe(
+            name=name, ok=ok, reason=reason, latency_ms=(time.monotonic() - started) * 1000, attempts=1, url=url
+        )
 
     def get_status_report(self) -> str:
         """
         打印友好报告（用于 pytest 运行时输出）。
         """
         services = self.config.get_all_services()
+        probes = self.last_probes
         lines = ["", "Service Health Check", "-------------------"]
         for name, cfg in services.items():
-            lines.append(f"- {name}: {cfg.get('url', '')}{cfg.get('health_check', '')}")
+            line = f"- {name}: {cfg.get('url', '')}{cfg.get('health_check', '')}"
+            probe = probes.get(name)
+            if probe is not None:
+                line += f"  [{'OK' if probe.ok else 'FAIL'} {probe.summary()}]"
+            lines.append(line)
         return "\n".join(lines) + "\n"
 
 
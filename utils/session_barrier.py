@@ -0,0 +1,211 @@
+"""
+# ═══════════════════════════════════════════════════════════════
+# Session Barrier - cross-process "run once per session" rendezvous
+# ═══════════════════════════════════════════════════════════════
+#
+# 背景：
+# - xdist 下 setup_test_environment 只让 gw0 清场/预检，其它 worker 轮询 .tmp_env_ready（200ms × 最多 60s）
+# - 轮询超时后静默继续：gw0 还在 rmtree 时其它 worker 已开始写 allure-results；gw0 崩溃时也只是白等 60s
+#
+# 方案（fcntl.flock + 状态文件，目录 .pytest_cache/pts-barriers/）：
+# - leader（setup_test_environment 中第一个到达的 worker）begin()/try_begin()：对 <name>.lock 加排它锁，状态文件写 running；complete()/fail() 写 done/failed 后解锁
+# - follower wait()：对同一文件加共享锁 —— 阻塞到 leader 解锁为止，解锁瞬间即醒（无轮询延迟）
+#     拿到锁后读状态：done -> 返回；failed -> 抛 BarrierError（带 leader 给出的原因）
+#     仍是 running -> leader 进程没走到 complete 就退出了（崩溃 / pytest.exit），同样抛 BarrierError
+#     （进程退出时内核自动释放 flock，follower 不会永久挂住）
+# - 状态带本次运行的 run id（PYTEST_XDIST_TESTRUNUID，无则用父进程 pid），上一次运行留下的状态不会被误认
+# - follower 比 leader 先启动时，最多等 start_timeout 秒让 leader 出现（这段是轮询，leader 出现后即转为阻塞等待）
+#
+# 复用：
+#   barrier = SessionBarrier("allure_history")
+#   barrier.run_once(fn)     # 无固定 leader：先到者执行 fn，其它进程等待其完成（fn 抛错则都失败）
+#   barrier.try_begin()      # 无固定 leader 的 begin：先到者返回 True 成为 leader，其它进程返回 False 后 wait()
+#                            # （固定 leader 可能永远不启动，例如用例数少于 worker 数时 gw0 分不到用例）
+#
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BARRIER_DIR = Path(".pytest_cache") / "pts-barriers"
+
+
+class BarrierError(RuntimeError):
+    """leader 失败/崩溃，或在 start_timeout 内没有出现。"""
+
+
+def current_run_id() -> str:
+    return os.getenv("PYTEST_XDIST_TESTRUNUID") or f"ppid-{os.getppid()}"
+
+
+class SessionBarrier:
+    """
+    跨进程的一次性栅栏（见模块说明）。
+
+    使用方式（固定 leader）:
+        barrier = SessionBarrier("env_ready")
+        if is_primary:
+            barrier.begin()
+            ...  # 清场 / 预检
+            barrier.complete()
+        else:
+            barrier.wait()
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        run_id: Optional[str] = None,
+        directory: Optional[Path] = None,
+        start_timeout: float = 120.0,
+    ) -> None:
+        self.name = name
+        self.run_id = run_id or current_run_id()
+        self.directory = Path(directory) if directory is not None else DEFAULT_BARRIER_DIR
+        self.start_timeout = start_timeout
+        self._lock_file = None
+
+    @property
+    def lock_path(self) -> Path:
+        return self.directory / f"{self.name}.lock"
+
+    @property
+    def state_path(self) -> Path:
+        return self.directory / f"{self.name}.json"
+
+    # ───────────────────────── state file ─────────────────────────
+
+    def _read_state(self) -> Optional[Dict[str, Any]]:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return state if isinstance(state, dict) and state.get("run") == self.run_id else None
+
+    def _write_state(self, status: str, reason: str = "") -> None:
+        payload = {
+            "run": self.run_id,
+            "status": status,
+            "pid": os.getpid(),
+            "worker": os.getenv("PYTEST_XDIST_WORKER", "main"),
+            "reason": reason,
+            "at": time.time(),
+        }
+        tmp = self.state_path.with_name(f"{self.state_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+    # ───────────────────────── leader ─────────────────────────
+
+    def begin(self) -> None:
+        """leader：持有排它锁并标记 running（直到 complete/fail 或进程退出）。"""
+        if self._lock_file is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        lf = open(self.lock_path, "a+", encoding="utf-8")
+        fcntl.flock(lf, fcntl.LOCK_EX)
+        self._lock_file = lf
+        self._write_state("running")
+
+    def complete(self) -> None:
+        self._finish("done")
+
+    def fail(self, reason: str) -> None:
+        self._finish("failed", reason)
+
+    def _finish(self, status: str, reason: str = "") -> None:
+        lf, self._lock_file = self._lock_file, None
+        if lf is None:
+            return
+        try:
+            self._write_state(status, reason)
+        finally:
+            try:
+                fcntl.flock(lf, fcntl.LOCK_UN)
+            finally:
+                lf.close()
+
+    # ───────────────────────── follower ─────────────────────────
+
+    def wait(self) -> Dict[str, Any]:
+        """follower：阻塞到 leader 完成；leader 失败/崩溃/未出现时抛 BarrierError。返回 leader 的状态。"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        started = time.monotonic()
+        while True:
+            state = self._read_state()
+            if state is not None:
+                with open(self.lock_path, "a+", encoding="utf-8") as lf:
+                    fcntl.flock(lf, fcntl.LOCK_SH)
+                    try:
+                        state = self._read_state() or state
+                    finally:
+                        fcntl.flock(lf, fcntl.LOCK_UN)
+                return self._check(state)
+            if time.monotonic() - started > self.start_timeout:
+                raise BarrierError(
+                    f"session barrier {self.name!r}: leader 在 {self.start_timeout:.0f}s 内未启动（run={self.run_id}）"
+                )
+            time.sleep(0.05)
+
+    def _check(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        status = state.get("status")
+        who = f"{state.get('worker')} (pid={state.get('pid')})"
+        if status == "done":
+            return state
+        if status == "failed":
+            raise BarrierError(f"session barrier {self.name!r}: leader {who} 失败: {state.get('reason') or '<no reason>'}")
+        raise BarrierError(
+            f"session barrier {self.name!r}: leader {who} 未完成就退出（崩溃或 fail-fast 退出），详见该 worker 的日志"
+        )
+
+    # ───────────────────────── leaderless ─────────────────────────
+
+    def try_begin(self) -> bool:
+        """
+        先到的进程成为 leader（等同 begin()）并返回 True；本次运行已有 leader 时返回 False（之后调用 wait()）。
+        leader 正在执行时，这里会阻塞到它结束再返回 False。
+        """
+        if self._lock_file is not None:
+            return True
+        self.directory.mkdir(parents=True, exist_ok=True)
+        lf = open(self.lock_path, "a+", encoding="utf-8")
+        try:
+            fcntl.flock(lf, fcntl.LOCK_EX)
+            if self._read_state() is not None:
+                fcntl.flock(lf, fcntl.LOCK_UN)
+                lf.close()
+                return False
+            self._lock_file = lf
+            self._write_state("running")
+        except BaseException:
+            if self._lock_file is None:
+                lf.close()
+            raise
+        return True
+
+    def run_once(self, fn: Callable[[], Any]) -> Any:
+        """
+        先到的进程成为 leader 执行 fn 并返回其结果；其它进程等待完成后返回 None。
+        fn 抛错时 leader 原样抛出，其它进程抛 BarrierError。
+        """
+        if not self.try_begin():
+            self.wait()
+            return None
+        try:
+            result = fn()
+        except BaseException as e:
+            self.fail(f"{type(e).__name__}: {e}")
+            raise
+        self.complete()
+        return result